@@ -1,10 +1,14 @@
 # company/managers.py
-import logging
 from django.db import models
+
+from crp_core.logging_utils import get_hot_path_logger
+
 from .utils import get_current_company  # Relies on utils.py to provide the Company instance
 from .models import Company  # For type checking in create method
 
-logger = logging.getLogger(__name__)
+# get_queryset runs for every tenant query: routine messages are sampled DEBUG detail;
+# unfiltered (cross-tenant) access is always logged as a WARNING
+logger = get_hot_path_logger(__name__)
 
 
 class CompanyManager(models.Manager):
@@ -20,22 +24,20 @@ class CompanyManager(models.Manager):
 
         if company:
             if not hasattr(self.model, 'company'):
-                logger.error(f"CompanyManager on {self.model.__name__} which lacks 'company' field.")
+                logger.error("CompanyManager on %s which lacks 'company' field.", self.model.__name__)
                 return queryset.none()  # Prevent accidental data leakage
 
-            logger.debug(
-                f"CompanyManager: Filtering {self.model.__name__} by Company '{company.name}' (ID: {company.id})")
+            logger.sampled("CompanyManager: Filtering %s by Company ID %s", self.model.__name__, company.pk)
             return queryset.filter(company=company)
         else:
             # No company in context
-            logger.debug(f"CompanyManager: No active company in context for {self.model.__name__}.")
             if self._allow_unfiltered_global_access:
-                logger.warning(
-                    f"CompanyManager: Unfiltered queryset for {self.model.__name__} (global access allowed and no company context).")
+                logger.warning("CompanyManager: Unfiltered queryset for %s (global access allowed and no company "
+                               "context).", self.model.__name__)
                 return queryset  # Superuser/system task access
             else:
-                logger.debug(
-                    f"CompanyManager: Empty queryset for {self.model.__name__} (no company context, global access disallowed).")
+                logger.sampled("CompanyManager: Empty queryset for %s (no company context, global access "
+                               "disallowed).", self.model.__name__)
                 return queryset.none()  # Strict isolation
 
     def create(self, **kwargs):
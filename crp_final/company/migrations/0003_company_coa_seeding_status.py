@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:18
+
+from django.db import migrations, models
+
+
+def mark_existing_companies_seeded(apps, schema_editor):
+    # Companies created before this migration were seeded synchronously by the company signal
+    Company = apps.get_model('company', 'Company')
+    Company.objects.update(coa_seeding_status='COMPLETED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='coa_seeding_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', editable=False, help_text='Progress of the default Chart of Accounts seeding run for this company.', max_length=20, verbose_name='CoA Seeding Status'),
+        ),
+        migrations.RunPython(mark_existing_companies_seeded, migrations.RunPython.noop),
+    ]
@@ -25,6 +25,12 @@ class CompanyGroup(models.Model):
         return self.name
 
 class Company(models.Model):
+    class CoaSeedingStatus(models.TextChoices):
+        PENDING = 'PENDING', _('Pending')
+        RUNNING = 'RUNNING', _('Running')
+        COMPLETED = 'COMPLETED', _('Completed')
+        FAILED = 'FAILED', _('Failed')
+
     subdomain_prefix = models.CharField(
         _("Subdomain Prefix"),
         max_length=100,
@@ -142,6 +148,14 @@ class Company(models.Model):
         null=True, blank=True
     )
     is_suspended_by_admin = models.BooleanField(default=False, verbose_name=_("Suspended by Admin"))
+    coa_seeding_status = models.CharField(
+        _("CoA Seeding Status"),
+        max_length=20,
+        choices=CoaSeedingStatus.choices,
+        default=CoaSeedingStatus.PENDING,
+        editable=False,
+        help_text=_("Progress of the default Chart of Accounts seeding run for this company.")
+    )
     created_at = models.DateTimeField(_("Registered At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Last Updated"), auto_now=True)
 
@@ -1,9 +1,10 @@
 # company/signals.py
 import logging # Ensure logging is imported
 
+from django.conf import settings
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-# from django.conf import settings # Not strictly needed for this version of the file
 
 from .models import Company  # Your Company model
 
@@ -65,9 +66,16 @@ def company_created_onboarding_handler(sender, instance: Company, created: bool,
         try:
             from crp_accounting.services.coa_seeding_service import seed_coa_for_company, COASeedingError # Assuming COASeedingError exists
 
-            logger.info(f"{log_prefix} Attempting to seed COA...")
-            seed_coa_for_company(company=instance)
-            logger.info(f"{log_prefix} COA seeding task/call initiated. See crp_accounting logs for details.")
+            if getattr(settings, 'COA_SEEDING_ASYNC', False):
+                # Seeded by a Celery task once the company row is committed; progress in coa_seeding_status
+                from crp_accounting.tasks import seed_coa_for_company_task
+                company_pk = instance.pk
+                transaction.on_commit(lambda: seed_coa_for_company_task.delay(company_pk))
+                logger.info(f"{log_prefix} COA seeding task will be enqueued on commit.")
+            else:
+                logger.info(f"{log_prefix} Attempting to seed COA...")
+                seed_coa_for_company(company=instance, user=instance.created_by_user)
+                logger.info(f"{log_prefix} COA seeding task/call initiated. See crp_accounting logs for details.")
         except ImportError:
             logger.error(
                 f"{log_prefix} Could not import 'crp_accounting.services.coa_seeding_service'. "
@@ -4,3 +4,5 @@ from .journal import *
 from .period import *
 from .receivables import *
 from .payables import *
+
+from .recurring import *
\ No newline at end of file
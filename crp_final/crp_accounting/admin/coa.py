@@ -116,7 +116,7 @@ class AccountGroupAdmin(TenantAccountingModelAdmin):
     def parent_group_display(self, obj: AccountGroup) -> str:
         return obj.parent_group.name if obj.parent_group else "—"
 
-    @admin.display(description=_('Full Path'))
+    @admin.display(description=_('Full Path'), ordering='full_path')
     def get_full_path_display(self, obj: AccountGroup) -> str:
         return obj.get_full_path()
 
@@ -13,6 +13,7 @@ from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError as DjangoValidationError, PermissionDenied
 from django.conf import settings
 from django.forms import ModelForm
+from rest_framework.exceptions import PermissionDenied as DRFPermissionDenied
 
 # --- Base Admin Class Import ---
 from .admin_base import TenantAccountingModelAdmin
@@ -36,7 +37,7 @@ from ..services import voucher_service
 
 # --- Custom Exceptions ---
 from ..exceptions import (
-    VoucherWorkflowError, InvalidVoucherStatusError, PeriodLockedError,
+    VoucherWorkflowError, PeriodLockedError,
     BalanceError
 )
 
@@ -348,7 +349,8 @@ class VoucherAdmin(TenantAccountingModelAdmin):
     autocomplete_fields = ['company', 'party', 'accounting_period', 'created_by', 'approved_by', 'posted_by',
                            'is_reversal_for']
     inlines = [VoucherLineInline, VoucherApprovalInline]
-    actions = ['admin_action_submit_vouchers', 'admin_action_approve_and_post_vouchers', 'admin_action_reject_vouchers']
+    actions = ['admin_action_submit_vouchers', 'admin_action_approve_and_post_vouchers', 'admin_action_reject_vouchers',
+               'admin_action_reverse_vouchers']
     ordering = ('-date', '-created_at')
     date_hierarchy = 'date'
 
@@ -500,82 +502,51 @@ class VoucherAdmin(TenantAccountingModelAdmin):
         color = color_map.get(obj.status, "blue")
         return format_html(f'<strong style="color:{color};">{obj.get_status_display()}</strong>')
 
-    # --- Admin Actions (Corrected Calls) ---
-    def _call_voucher_service_action(
-            self, request, queryset, service_method_name: str,
-            user_param_name: str,  # Specific user parameter name for the service function
-            success_msg_template: str,
-            action_params=None
-    ):
+    # --- Admin Actions (Batched: one permission check, lock and bulk write per company) ---
+    def _call_voucher_service_batch_ids(self, request, queryset, service_method_name: str, user_param_name: str,
+                                        success_msg_template: str, action_params=None):
         if action_params is None: action_params = {}
-        updated_count, error_count = 0, 0
-        processed_vouchers_info = []
-
-        for voucher in queryset:
+        service_method = getattr(voucher_service, service_method_name, None)
+        if not service_method: messages.error(request, _("Action misconfigured.")); return
+        items_by_co = {}
+        for pk, co_id in queryset.values_list('pk', 'company_id'):
+            if not co_id: messages.error(request, _("Voucher PK %(pk)s missing company.") % {'pk': pk}); continue
+            items_by_co.setdefault(co_id, []).append(pk)
+        s_all, e_all = 0, 0
+        for co_id, pks in items_by_co.items():
             try:
-                if not voucher.company_id:
-                    messages.error(request, _("Voucher '%(num)s' is missing company association. Cannot process.") % {
-                        'num': self.voucher_number_display(voucher)})
-                    error_count += 1;
-                    continue
-
-                service_method = getattr(voucher_service, service_method_name)
-
-                # Prepare arguments for the service call, including the correctly named user parameter
-                service_call_kwargs = {
-                    'company_id': voucher.company_id,
-                    'voucher_id': voucher.pk,
-                    user_param_name: request.user,  # Pass request.user to the specific user parameter
-                    **action_params
-                }
-
-                service_method(**service_call_kwargs)  # Call using keyword arguments
-
-                updated_count += 1
-                processed_vouchers_info.append(
-                    f"{self.voucher_number_display(voucher)} ({voucher.company.name if voucher.company else 'N/A'})")
-            except (DjangoValidationError, PermissionDenied, VoucherWorkflowError, BalanceError, PeriodLockedError,
-                    InvalidVoucherStatusError) as e:
+                s_c, e_c, e_details = service_method(company_id=co_id, voucher_ids=pks,
+                                                     **{user_param_name: request.user}, **action_params)
+                s_all += s_c
+                e_all += e_c
+                for detail in e_details: messages.error(request, f"CoID {co_id}: {detail}")
+            except (DjangoValidationError, PermissionDenied, DRFPermissionDenied, VoucherWorkflowError,
+                    PeriodLockedError) as e:
                 msg = e.messages_joined if hasattr(e, 'messages_joined') else str(e)
-                messages.error(request,
-                               _("Voucher '%(num)s': %(error)s") % {'num': self.voucher_number_display(voucher),
-                                                                    'error': msg});
-                error_count += 1
-            except TypeError as te:
-                logger.exception(
-                    f"Admin Action TypeError on '{service_method_name}' for Vch {voucher.pk} (Co {voucher.company_id}): {te}. Args: {service_call_kwargs}")
-                messages.error(request,
-                               _("Programming error calling service for voucher '%(num)s'. Check service function signature. Error: %(type_err)s") % {
-                                   'num': self.voucher_number_display(voucher), 'type_err': str(te)});
-                error_count += 1
+                messages.error(request, _("Batch error for CoID %(co)s: %(err)s") % {'co': co_id, 'err': msg})
+                e_all += len(pks)
             except Exception as e:
-                logger.exception(
-                    f"Admin Action '{service_method_name}' failed for Vch {voucher.pk}, Co {voucher.company_id}")
-                messages.error(request, _("Unexpected error on voucher '%(num)s': %(error)s") % {
-                    'num': self.voucher_number_display(voucher), 'error': str(e)});
-                error_count += 1
-
-        # ... (messaging logic as before) ...
-        if updated_count > 0: self.message_user(request, success_msg_template % {'count': updated_count,
-                                                                                 'details': ", ".join(
-                                                                                     processed_vouchers_info)},
-                                                messages.SUCCESS if not error_count else messages.WARNING)
-        if error_count > 0 and updated_count == 0:
+                logger.exception(f"Admin batch action '{service_method_name}' failed for Co {co_id}")
+                messages.error(request, _("Critical batch error for CoID %(co)s: %(err)s") % {'co': co_id,
+                                                                                             'err': str(e)})
+                e_all += len(pks)
+        if s_all > 0: self.message_user(request, success_msg_template % {'count': s_all},
+                                        messages.SUCCESS if not e_all else messages.WARNING)
+        if e_all > 0 and s_all == 0:
             self.message_user(request, _("No vouchers were processed due to errors."), messages.ERROR)
-        elif error_count > 0:
-            self.message_user(request,
-                              _("Action partially completed with %(errors)d error(s).") % {'errors': error_count},
+        elif e_all > 0:
+            self.message_user(request, _("Action partially completed with %(errors)d error(s).") % {'errors': e_all},
                               messages.WARNING)
 
     @admin.action(description=_('Submit selected DRAFT vouchers for approval'))
     def admin_action_submit_vouchers(self, request, queryset):
         eligible_qs = queryset.filter(status=TransactionStatus.DRAFT.value)
         if not eligible_qs.exists(): self.message_user(request, _("No DRAFT vouchers selected."), messages.INFO); return
-        self._call_voucher_service_action(
+        self._call_voucher_service_batch_ids(
             request, eligible_qs,
-            service_method_name='submit_voucher_for_approval',
-            user_param_name='submitted_by_user',  # Correct parameter name
-            success_msg_template=_("%(count)d voucher(s) submitted: %(details)s")
+            service_method_name='bulk_submit_vouchers',
+            user_param_name='submitted_by_user',
+            success_msg_template=_("%(count)d voucher(s) submitted.")
         )
 
     @admin.action(description=_('Approve & POST selected PENDING/REJECTED vouchers'))
@@ -584,11 +555,11 @@ class VoucherAdmin(TenantAccountingModelAdmin):
             status__in=[TransactionStatus.PENDING_APPROVAL.value, TransactionStatus.REJECTED.value])
         if not eligible_qs.exists(): self.message_user(request, _("No PENDING or REJECTED vouchers selected."),
                                                        messages.INFO); return
-        self._call_voucher_service_action(
+        self._call_voucher_service_batch_ids(
             request, eligible_qs,
-            service_method_name='approve_and_post_voucher',
-            user_param_name='approver_user',  # Correct parameter name
-            success_msg_template=_("%(count)d voucher(s) approved and posted: %(details)s"),
+            service_method_name='bulk_approve_and_post_vouchers',
+            user_param_name='approver_user',
+            success_msg_template=_("%(count)d voucher(s) approved and posted."),
             action_params={'comments': _("Approved via admin action.")}
         )
 
@@ -597,15 +568,27 @@ class VoucherAdmin(TenantAccountingModelAdmin):
         eligible_qs = queryset.filter(status=TransactionStatus.PENDING_APPROVAL.value)
         if not eligible_qs.exists(): self.message_user(request, _("No PENDING vouchers selected."),
                                                        messages.INFO); return
-        self._call_voucher_service_action(
+        self._call_voucher_service_batch_ids(
             request, eligible_qs,
-            service_method_name='reject_voucher',
-            user_param_name='rejecting_user',  # Correct parameter name
-            success_msg_template=_("%(count)d voucher(s) rejected: %(details)s"),
+            service_method_name='bulk_reject_vouchers',
+            user_param_name='rejecting_user',
+            success_msg_template=_("%(count)d voucher(s) rejected."),
             action_params={
                 'comments': _("Rejected via admin bulk action by %(user)s.") % {'user': request.user.name}}
         )
 
+    @admin.action(description=_('Reverse selected POSTED vouchers (reversals created as DRAFT)'))
+    def admin_action_reverse_vouchers(self, request, queryset):
+        eligible_qs = queryset.filter(status=TransactionStatus.POSTED.value, is_reversed=False)
+        if not eligible_qs.exists(): self.message_user(request, _("No unreversed POSTED vouchers selected."),
+                                                       messages.INFO); return
+        self._call_voucher_service_batch_ids(
+            request, eligible_qs,
+            service_method_name='bulk_reverse_vouchers',
+            user_param_name='user',
+            success_msg_template=_("%(count)d reversing voucher(s) created.")
+        )
+
 
 # =============================================================================
 # VoucherLine Admin (Standalone - For Superuser/Debugging)
@@ -17,6 +17,7 @@ from .admin_base import TenantAccountingModelAdmin
 # --- Model & Enum Imports ---
 from ..models.party import Party
 from ..models.coa import Account
+from ..services.party_exposure_service import annotate_party_balances
 from crp_core.enums import PartyType
 
 logger = logging.getLogger(__name__)
@@ -33,6 +34,8 @@ class PartyAdmin(TenantAccountingModelAdmin):
         'is_active',
         'contact_phone',
         'credit_limit',
+        'balance_column',
+        'credit_utilization_column',
         'updated_at',
     )
     list_filter = (
@@ -53,6 +56,9 @@ class PartyAdmin(TenantAccountingModelAdmin):
     readonly_fields = (
         'display_balance_in_form',
         'display_credit_status_in_form',
+        'unposted_documents_amount',
+        'open_orders_amount',
+        'exposure_updated_at',
         # 'created_at', 'updated_at' are handled by base if needed as readonly,
         # but also explicitly listed in fieldsets for collapsed section
     )
@@ -68,7 +74,10 @@ class PartyAdmin(TenantAccountingModelAdmin):
                 'control_account',
                 'credit_limit',
                 'display_balance_in_form',
+                'unposted_documents_amount',
+                'open_orders_amount',
                 'display_credit_status_in_form',
+                'exposure_updated_at',
             )
         }),
         ('Audit Information', {
@@ -83,7 +92,24 @@ class PartyAdmin(TenantAccountingModelAdmin):
 
     def get_queryset(self, request: HttpRequest):
         qs = super().get_queryset(request)
-        return qs.select_related('control_account')
+        qs = qs.select_related('control_account')
+        if request.resolver_match and request.resolver_match.url_name == 'crp_accounting_party_changelist':
+            # Balance columns for the whole page come from one grouped query and are sortable
+            qs = annotate_party_balances(qs, timezone.now().date())
+        return qs
+
+    @admin.display(description=_('Balance'), ordering='balance')
+    def balance_column(self, obj: Party):
+        balance = getattr(obj, 'balance', None)
+        return f"{balance:,.2f}" if balance is not None else "-"
+
+    @admin.display(description=_('Credit Used %'), ordering='credit_utilization')
+    def credit_utilization_column(self, obj: Party):
+        utilization = getattr(obj, 'credit_utilization', None)
+        if utilization is None:
+            return "-"
+        color = "red" if utilization > 100 else "darkorange" if utilization >= 80 else "green"
+        return format_html('<span style="color: {};">{}%</span>', color, f"{utilization:,.1f}")
 
     def formfield_for_foreignkey(self, db_field, request: HttpRequest, **kwargs):
         field = super().formfield_for_foreignkey(db_field, request, **kwargs)
@@ -140,7 +166,7 @@ class PartyAdmin(TenantAccountingModelAdmin):
     def display_balance_in_form(self, obj: Party):
         if not obj.pk or not obj.control_account: return _("N/A")
         try:
-            balance = obj.calculate_outstanding_balance()
+            balance = obj.posted_balance
             return f"{balance:,.2f}"
         except Exception as e:
             logger.warning(
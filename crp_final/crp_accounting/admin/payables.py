@@ -25,6 +25,7 @@ from ..models.payables import (
 from ..models.coa import Account
 from ..models.party import Party
 from ..models.journal import Voucher  # VoucherType as JournalVoucherType unused, removed
+from ..models.deferred_recalc import deferred_parent_recalculation
 from company.models import Company
 
 # --- Enum Imports ---
@@ -374,7 +375,8 @@ class VendorBillAdmin(TenantAccountingModelAdmin):
         super().save_model(request, obj, form, change)
 
     def save_formset(self, request, form, formset, change):
-        super().save_formset(request, form, formset, change)
+        with deferred_parent_recalculation():  # Recalculate the parent once, not once per inline row
+            super().save_formset(request, form, formset, change)
         bill_instance: VendorBill = form.instance
         if bill_instance and bill_instance.pk:
             logger.debug(
@@ -783,7 +785,8 @@ class VendorPaymentAdmin(TenantAccountingModelAdmin):
         super().save_model(request, obj, form, change)
 
     def save_formset(self, request, form, formset, change):
-        super().save_formset(request, form, formset, change)
+        with deferred_parent_recalculation():  # Recalculate the parent once, not once per inline row
+            super().save_formset(request, form, formset, change)
         payment_instance: VendorPayment = form.instance
         if payment_instance and payment_instance.pk: logger.debug(
             f"[VPAdmin SaveFormset] Payment {payment_instance.payment_number or payment_instance.pk} allocations changed. Model's save should handle recalc.")
@@ -24,15 +24,11 @@ from ..services import reports_service  # If used by actions (like export_trial_
 from .admin_base import TenantAccountingModelAdmin  # Your base tenant-aware admin class
 from company.models import Company  # For type hinting and direct use
 
-# --- Excel Library (Conditional Import) ---
-try:
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-    from openpyxl.styles import Font
-
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+# --- Excel Library (imported on first export, see utils/export_backends.py) ---
+from ..utils.export_backends import is_export_backend_available, load_export_backend
+
+OPENPYXL_AVAILABLE = is_export_backend_available('xlsx')
+if not OPENPYXL_AVAILABLE:
     logging.warning("Admin Period: 'openpyxl' library not found. Excel exports will be disabled.")
 
 logger = logging.getLogger("crp_accounting.admin.period")  # Specific logger for this admin file
@@ -405,6 +401,9 @@ class AccountingPeriodAdmin(TenantAccountingModelAdmin):
         if not OPENPYXL_AVAILABLE:
             self.message_user(request, _("Excel export requires 'openpyxl' library to be installed."), messages.ERROR)
             return
+        openpyxl = load_export_backend('xlsx')
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
         if queryset.count() != 1:
             self.message_user(request, _("Please select exactly one accounting period for this export action."),
                               messages.WARNING)
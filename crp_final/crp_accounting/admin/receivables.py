@@ -27,6 +27,7 @@ from ..models.receivables import (
 from ..models.coa import Account
 from ..models.party import Party
 from ..models.journal import Voucher  # Use Voucher.VoucherType if needed
+from ..models.deferred_recalc import deferred_parent_recalculation
 
 from company.models import Company
 
@@ -290,7 +291,8 @@ class CustomerInvoiceAdmin(TenantAccountingModelAdmin):
             return
 
     def save_formset(self, request, form, formset, change):
-        super().save_formset(request, form, formset, change)
+        with deferred_parent_recalculation():  # Recalculate the parent once, not once per inline row
+            super().save_formset(request, form, formset, change)
         invoice_instance: CustomerInvoice = form.instance
         if invoice_instance and invoice_instance.pk:
             logger.debug(
@@ -635,7 +637,8 @@ class CustomerPaymentAdmin(TenantAccountingModelAdmin):
             messages.error(request, _("Failed to save payment: %(err)s") % {'err': str(e_save)}); return
 
     def save_formset(self, request, form, formset, change):
-        super().save_formset(request, form, formset, change)
+        with deferred_parent_recalculation():  # Recalculate the parent once, not once per inline row
+            super().save_formset(request, form, formset, change)
         payment_instance: CustomerPayment = form.instance
         if payment_instance and payment_instance.pk:
             logger.debug(f"[CPAdmin SaveFS] Recalc applied amounts for Pmt {payment_instance.pk}")
@@ -0,0 +1,75 @@
+# crp_accounting/admin/recurring.py
+
+import logging
+from typing import Optional
+
+from django.contrib import admin, messages
+from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .admin_base import TenantAccountingModelAdmin
+from ..models.recurring import RecurringVoucherTemplate, RecurringVoucherTemplateLine
+from ..services.recurring_voucher_service import generate_recurring_vouchers
+from company.utils import override_current_company
+
+logger = logging.getLogger("crp_accounting.admin.recurring")
+
+
+class RecurringVoucherTemplateLineInline(admin.TabularInline):
+    model = RecurringVoucherTemplateLine
+    fields = ('account', 'dr_cr', 'amount', 'narration')
+    extra = 1
+    autocomplete_fields = ['account']
+    verbose_name = _("Template Line")
+    verbose_name_plural = _("Template Lines")
+
+
+# =============================================================================
+# Recurring Voucher Template Admin
+# =============================================================================
+@admin.register(RecurringVoucherTemplate)
+class RecurringVoucherTemplateAdmin(TenantAccountingModelAdmin):
+    list_display = ('name', 'voucher_type', 'frequency', 'interval', 'next_run_date', 'last_generated_date',
+                    'auto_post', 'is_active')
+    list_filter_non_superuser = ('voucher_type', 'frequency', 'auto_post', 'is_active')
+    search_fields = ('name', 'narration', 'reference')
+    list_select_related = ('company', 'party')
+    autocomplete_fields = ['party']
+    inlines = [RecurringVoucherTemplateLineInline]
+    ordering = ('company__name', 'name')
+    actions = ['admin_action_generate_due_vouchers']
+
+    def get_list_filter(self, request: HttpRequest) -> tuple:
+        if request.user.is_superuser:
+            return ('company',) + self.list_filter_non_superuser
+        return self.list_filter_non_superuser
+
+    def get_fieldsets(self, request: HttpRequest, obj: Optional[RecurringVoucherTemplate] = None) -> tuple:
+        fieldsets = (
+            (_('Template'), {'fields': ('company', 'name', 'voucher_type', 'party', 'narration', 'reference')}),
+            (_('Schedule'), {'fields': ('frequency', 'interval', 'start_date', 'end_date', 'auto_post', 'is_active')}),
+        )
+        if obj is not None:
+            fieldsets += (
+                (_('Generation Status'), {'fields': ('next_run_date', 'last_generated_date')}),
+                (_('Audit Information'), {'fields': ('created_at', 'updated_at', 'created_by', 'updated_by'),
+                                          'classes': ('collapse',)}),
+            )
+        return fieldsets
+
+    def get_readonly_fields(self, request: HttpRequest, obj: Optional[RecurringVoucherTemplate] = None) -> tuple:
+        return tuple(set(super().get_readonly_fields(request, obj)) | {'next_run_date', 'last_generated_date'})
+
+    @admin.action(description=_("Generate due vouchers now for the selected templates' companies"))
+    def admin_action_generate_due_vouchers(self, request: HttpRequest, queryset):
+        today = timezone.now().date()
+        companies = {template.company_id: template.company for template in queryset.select_related('company')}
+        for company in companies.values():
+            with override_current_company(company):
+                result = generate_recurring_vouchers(company.pk, as_of=today, user=request.user)
+            self.message_user(request, _("%(company)s: %(drafts)d drafts created, %(posted)d vouchers posted.") % {
+                'company': company.name, 'drafts': result.drafts_created, 'posted': result.vouchers_posted},
+                messages.SUCCESS)
+            for reason in result.skipped:
+                self.message_user(request, reason, messages.WARNING)
@@ -32,27 +32,21 @@ except ImportError:
 from crp_core.enums import AccountNature, \
     PartyType as CorePartyType
 
-# --- PDF/Excel Imports ---
-try:
-    from xhtml2pdf import pisa
+# --- PDF/Excel Backends (imported on first export, see utils/export_backends.py) ---
+from .utils.export_backends import is_export_backend_available, load_export_backend
+from .utils.charts import pl_waterfall_png, png_data_uri
 
-    XHTML2PDF_AVAILABLE = True
-except ImportError:
-    XHTML2PDF_AVAILABLE = False
+XHTML2PDF_AVAILABLE = is_export_backend_available('pdf')
+if not XHTML2PDF_AVAILABLE:
     logging.warning("Admin Views: xhtml2pdf library not found. PDF export will not be available.")
-try:
-    import openpyxl
-    from openpyxl.utils import get_column_letter
-    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+OPENPYXL_AVAILABLE = is_export_backend_available('xlsx')
+if not OPENPYXL_AVAILABLE:
     logging.warning("Admin Views: openpyxl library not found. Excel export will not be available.")
 
 # --- Service Imports ---
 from .services import reports_service, ledger_service
 from .exceptions import ReportGenerationError
+from crp_core.db_routers import use_reporting_replica
 
 logger = logging.getLogger("crp_accounting.admin_views")
 ZERO = Decimal('0.00')
@@ -129,6 +123,9 @@ def _default_link_callback(uri: str, rel: str) -> Optional[str]:
     static_url = getattr(settings, 'STATIC_URL', None)
     static_root = getattr(settings, 'STATIC_ROOT', None)  # This is what collectstatic uses
 
+    if uri.startswith('data:'):  # Embedded images (e.g. cached report charts)
+        return uri
+
     path = None
     if media_url and uri.startswith(media_url) and media_root:
         path = os.path.join(media_root, uri.replace(media_url, "", 1))
@@ -214,6 +211,7 @@ def _render_to_pdf(template_src: str, context_dict: Optional[Dict[str, Any]] = N
     # MODIFIED: Pass the 'request' object to render_to_string
     html_content = render_to_string(template_src, context_dict, request=request)
     result_buffer = BytesIO()
+    pisa = load_export_backend('pdf')
 
     try:
         pdf_status = pisa.CreatePDF(
@@ -252,6 +250,7 @@ def _write_bs_hierarchy_excel(
         sheet: Any, nodes: List[Dict[str, Any]], start_row: int,
         level_offset: int = 0, currency_symbol: str = ""
 ) -> int:
+    from openpyxl.styles import Font, Alignment
     current_row = start_row
     bold_font = Font(bold=True)
     # Ensure currency_symbol is not None for formatting
@@ -300,6 +299,7 @@ def _get_validated_date_params_for_download(request: HttpRequest, date_param_nam
 # HTML Report Views (No changes here needed for this specific error)
 # =========================================
 @staff_member_required
+@use_reporting_replica()
 def admin_trial_balance_view(request: HttpRequest) -> HttpResponse:
     context = _get_admin_base_context(str(_("Trial Balance Report")), request)
     target_company: Optional[Company] = None
@@ -354,6 +354,7 @@ def admin_trial_balance_view(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def admin_profit_loss_view(request: HttpRequest) -> HttpResponse:
     context = _get_admin_base_context(str(_("Profit & Loss Statement")), request)
     target_company: Optional[Company] = None
@@ -414,6 +415,7 @@ def admin_profit_loss_view(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def admin_balance_sheet_view(request: HttpRequest) -> HttpResponse:
     context = _get_admin_base_context(str(_("Balance Sheet")), request)
     target_company: Optional[Company] = None
@@ -473,6 +475,7 @@ def admin_balance_sheet_view(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def admin_account_ledger_view(request: HttpRequest, account_pk: PK_TYPE) -> HttpResponse:
     context = _get_admin_base_context(str(_("Account Ledger")), request)
     target_company: Optional[Company] = None
@@ -582,6 +585,7 @@ def admin_account_ledger_view(request: HttpRequest, account_pk: PK_TYPE) -> Http
 
 
 @staff_member_required
+@use_reporting_replica()
 def admin_ar_aging_report_view(request: HttpRequest) -> HttpResponse:
     context = _get_admin_base_context(str(_("AR Aging Report")), request)
     target_company: Optional[Company] = None
@@ -643,6 +647,7 @@ def admin_ar_aging_report_view(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def admin_customer_statement_view(request: HttpRequest, customer_pk: Optional[PK_TYPE] = None) -> HttpResponse:
     context = _get_admin_base_context(str(_("Customer Statement")), request)
     target_company: Optional[Company] = None
@@ -734,10 +739,14 @@ def admin_customer_statement_view(request: HttpRequest, customer_pk: Optional[PK
 # EXCEL Download Views (CORRECTIONS APPLIED HERE)
 # =========================================
 @staff_member_required
+@use_reporting_replica()
 def download_trial_balance_excel(request: HttpRequest) -> HttpResponse:
     target_company: Optional[Company] = None
     if not OPENPYXL_AVAILABLE:
         return HttpResponse(str(_("Excel export library (openpyxl) is not installed.")), status=501)
+    openpyxl = load_export_backend('xlsx')
+    from openpyxl.styles import Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
     try:
         target_company = _get_company_for_report_or_raise(request)
         date_params = _get_validated_date_params_for_download(request, ['as_of_date'])
@@ -818,10 +827,14 @@ def download_trial_balance_excel(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_profit_loss_excel(request: HttpRequest) -> HttpResponse:
     target_company: Optional[Company] = None
     if not OPENPYXL_AVAILABLE:
         return HttpResponse(str(_("Excel export library (openpyxl) is not installed.")), status=501)
+    openpyxl = load_export_backend('xlsx')
+    from openpyxl.styles import Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
     try:
         target_company = _get_company_for_report_or_raise(request)
         date_params = _get_validated_date_params_for_download(request, ['start_date', 'end_date'])
@@ -921,10 +934,13 @@ def download_profit_loss_excel(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_balance_sheet_excel(request: HttpRequest) -> HttpResponse:
     target_company: Optional[Company] = None
     if not OPENPYXL_AVAILABLE:
         return HttpResponse(str(_("Excel export library (openpyxl) is not installed.")), status=501)
+    openpyxl = load_export_backend('xlsx')
+    from openpyxl.styles import Font, Alignment
     try:
         target_company = _get_company_for_report_or_raise(request)
         date_params = _get_validated_date_params_for_download(request, ['as_of_date'])
@@ -1021,10 +1037,14 @@ def download_balance_sheet_excel(request: HttpRequest) -> HttpResponse:
         return HttpResponse(str(_("Excel generation error.")), status=500)
 
 @staff_member_required
+@use_reporting_replica()
 def download_ar_aging_excel(request: HttpRequest) -> HttpResponse:
     target_company: Optional[Company] = None
     if not OPENPYXL_AVAILABLE:
         return HttpResponse(str(_("Excel export library (openpyxl) is not installed.")), status=501)
+    openpyxl = load_export_backend('xlsx')
+    from openpyxl.styles import Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
 
     try:
         target_company = _get_company_for_report_or_raise(request)
@@ -1134,6 +1154,7 @@ def download_ar_aging_excel(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_customer_statement_excel(request: HttpRequest, customer_pk: str) -> HttpResponse:
     """
     Generates and serves a Customer Statement as a styled Excel file.
@@ -1141,6 +1162,9 @@ def download_customer_statement_excel(request: HttpRequest, customer_pk: str) ->
     """
     if not OPENPYXL_AVAILABLE:
         return HttpResponse(str(_("Excel export library (openpyxl) is not installed.")), status=501)
+    openpyxl = load_export_backend('xlsx')
+    from openpyxl.styles import Font, Alignment, PatternFill
+    from openpyxl.utils import get_column_letter
 
     target_company: Optional[Company] = None
     target_customer: Optional[Party] = None
@@ -1286,6 +1310,7 @@ def download_customer_statement_excel(request: HttpRequest, customer_pk: str) ->
 # NEW: Accounts Payable (AP) HTML Report Views (Tenant Aware)
 # =============================================================================
 @staff_member_required
+@use_reporting_replica()
 def admin_ap_aging_report_view(request: HttpRequest) -> HttpResponse:
     """Displays the Accounts Payable Aging Report."""
     context = _get_admin_base_context(_("AP Aging Report"), request)
@@ -1380,6 +1405,7 @@ def admin_ap_aging_report_view(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def admin_vendor_statement_view(request: HttpRequest,
                                 supplier_pk: Optional[PK_TYPE] = None) -> HttpResponse:
     """Displays a Vendor/Supplier Statement."""
@@ -1524,9 +1550,13 @@ def admin_vendor_statement_view(request: HttpRequest,
 # =============================================================================
 
 @staff_member_required
+@use_reporting_replica()
 def download_ap_aging_excel(request: HttpRequest) -> HttpResponse:
     target_company: Optional[Company] = None
     if not OPENPYXL_AVAILABLE: return HttpResponse(str(_("Excel export library is missing.")), status=501)
+    openpyxl = load_export_backend('xlsx')
+    from openpyxl.styles import Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
     try:
         target_company = _get_company_for_report_or_raise(request)
         date_params = _get_validated_date_params_for_download(request, ['as_of_date'])
@@ -1630,6 +1660,7 @@ def download_ap_aging_excel(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_vendor_statement_excel(request: HttpRequest, supplier_pk: PK_TYPE) -> HttpResponse:
     """
     Generates and serves a Vendor Statement as an Excel file.
@@ -1638,6 +1669,9 @@ def download_vendor_statement_excel(request: HttpRequest, supplier_pk: PK_TYPE)
     target_supplier: Optional[Party] = None
     if not OPENPYXL_AVAILABLE:
         return HttpResponse(str(_("Excel export library (openpyxl) is not installed.")), status=501)
+    openpyxl = load_export_backend('xlsx')
+    from openpyxl.styles import Font, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
 
     try:
         # 1. Get company, supplier, and date parameters (similar to the PDF function)
@@ -1767,6 +1801,7 @@ def download_vendor_statement_excel(request: HttpRequest, supplier_pk: PK_TYPE)
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_trial_balance_pdf(request: HttpRequest) -> HttpResponse:
     """
     Generates and serves the Trial Balance report as a clean PDF file.
@@ -1802,6 +1837,7 @@ def download_trial_balance_pdf(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_profit_loss_pdf(request: HttpRequest) -> HttpResponse:
     """
     Generates and serves the Profit & Loss Statement as a clean PDF file.
@@ -1821,7 +1857,9 @@ def download_profit_loss_pdf(request: HttpRequest) -> HttpResponse:
             'report_title': _("Profit & Loss Statement"),
             'start_date_param': start_date_val,  # **FIX:** Pass date object
             'end_date_param': end_date_val,  # **FIX:** Pass date object
-            **report_data
+            **report_data,
+            # Rendered once per distinct P&L content, then served from the cache
+            'pl_waterfall_chart': png_data_uri(pl_waterfall_png(report_data.get('report_lines', []))),
         }
 
         # **FIX:** Point to the dedicated PDF template
@@ -1838,6 +1876,7 @@ def download_profit_loss_pdf(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_balance_sheet_pdf(request: HttpRequest) -> HttpResponse:
     """
     Generates and serves the Balance Sheet as a clean PDF file using a
@@ -1907,6 +1946,7 @@ def download_balance_sheet_pdf(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_ar_aging_pdf(request: HttpRequest) -> HttpResponse:
     """
     Generates and serves the AR Aging report as a clean PDF file.
@@ -1963,6 +2003,7 @@ def download_ar_aging_pdf(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_customer_statement_pdf(request: HttpRequest, customer_pk: PK_TYPE) -> HttpResponse:
     """
     Generates and serves the Customer Statement as a clean PDF file. (Corrected Currency)
@@ -2023,6 +2064,7 @@ def download_customer_statement_pdf(request: HttpRequest, customer_pk: PK_TYPE)
         logger.exception("Error generating Customer Statement PDF")
         return HttpResponse(f"Error: {e}", status=500)
 @staff_member_required
+@use_reporting_replica()
 def download_ap_aging_pdf(request: HttpRequest) -> HttpResponse:
     """
     Generates and serves the AP Aging report as a clean PDF file.
@@ -2062,6 +2104,7 @@ def download_ap_aging_pdf(request: HttpRequest) -> HttpResponse:
 
 
 @staff_member_required
+@use_reporting_replica()
 def download_vendor_statement_pdf(request: HttpRequest, supplier_pk: PK_TYPE) -> HttpResponse:
     """
     Generates and serves the Vendor Statement as a clean PDF file.
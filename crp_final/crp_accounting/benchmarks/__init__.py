@@ -0,0 +1,6 @@
+# crp_accounting/benchmarks/__init__.py
+"""
+Benchmark suite: a synthetic multi-tenant ledger generator (`generator`) and a runner that times
+the hot report / posting / export paths against it and writes comparable JSON results (`runner`).
+Driven by the `generate_benchmark_data` and `run_benchmarks` management commands.
+"""
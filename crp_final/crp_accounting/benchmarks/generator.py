@@ -0,0 +1,327 @@
+# crp_accounting/benchmarks/generator.py
+"""
+Synthetic multi-tenant ledger data.
+
+`generate_dataset` creates N companies, each with the seeded Chart of Accounts
+(`seed_coa_for_company`), monthly accounting periods, customers and suppliers, and then runs
+realistic volume through the normal services: invoices posted to the GL and (partly) paid,
+vendor bills approved, posted and paid through a payment run, plus M posted journal vouchers
+written through the batched posting path. Data is generated with Faker from a fixed seed, so a
+given spec always produces the same dataset shape and amounts.
+
+Companies are recognisable by their subdomain prefix (`<prefix>-<seed>-<n>`); the runner and
+the query-budget tests select them that way.
+"""
+
+import logging
+import random
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from company.models import Company, CompanyMembership
+from company.utils import override_current_company
+from crp_core.enums import AccountType, DrCrType, InvoiceStatus, PartyType, TransactionStatus, VoucherType
+
+from ..models.coa import Account
+from ..models.journal import Voucher, VoucherLine
+from ..models.party import Party
+from ..models.period import AccountingPeriod, FiscalYear
+from ..services import payables_service, receivables_service, sequence_service, voucher_service
+from ..services.coa_seeding_service import seed_coa_for_company
+from ..services.payment_run_service import execute_payment_run
+
+logger = logging.getLogger("crp_accounting.benchmarks.generator")
+
+User = get_user_model()
+ZERO_DECIMAL = Decimal('0.00')
+
+# Seeded account numbers the generated documents post to (see crp_core.constants.ACCOUNT_ROLE_GROUPS)
+AR_CONTROL_ACCOUNT = '1030_accounts_receivable_trade'
+AP_CONTROL_ACCOUNT = '2000_accounts_payable_trade'
+BANK_ACCOUNT = '1011_bank_account_checking'
+SALES_REVENUE_ACCOUNT = '4000_sales_revenue'
+RETAINED_EARNINGS_ACCOUNT = '3200_retained_earnings'
+SALES_TAX_PAYABLE_ACCOUNT = '2021_sales_tax_payable_gst_vat'
+PURCHASE_TAX_ACCOUNT = '1110_tax_recoverable_gst_vat'
+
+
+@dataclass
+class DatasetSpec:
+    companies: int = 2
+    customers: int = 50          # Per company
+    suppliers: int = 30          # Per company
+    invoices: int = 300          # Per company, posted to the GL
+    paid_invoice_ratio: float = 0.6
+    bills: int = 200             # Per company, approved and posted to the GL
+    vouchers: int = 5000         # Per company, posted journal vouchers (batched path)
+    months: int = 12             # Monthly periods ending with the current month
+    seed: int = 42
+    prefix: str = 'bench'
+    batch_size: int = 1000
+
+    def subdomain(self, index: int) -> str:
+        return f"{self.prefix}-{self.seed}-{index}"
+
+
+@dataclass
+class GeneratedCompany:
+    company_id: Any
+    name: str
+    subdomain_prefix: str
+    start_date: date
+    end_date: date
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class BenchmarkDataset:
+    spec: DatasetSpec
+    user_email: str
+    companies: List[GeneratedCompany] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for company in data['companies']:
+            company['company_id'] = str(company['company_id'])
+            company['start_date'] = company['start_date'].isoformat()
+            company['end_date'] = company['end_date'].isoformat()
+        return data
+
+
+def benchmark_companies(prefix: str = 'bench'):
+    """Companies created by the generator with the given prefix, in creation order."""
+    return Company.objects.filter(subdomain_prefix__startswith=f"{prefix}-").order_by('pk')
+
+
+def _dataset_user(spec: DatasetSpec):
+    email = f"{spec.prefix}-{spec.seed}@benchmark.invalid"
+    user = User.objects.filter(email=email).first()
+    if user is None:
+        user = User.objects.create_user(email=email, name=f"Benchmark {spec.prefix}", tc=True)  # Unusable password
+        user.is_staff = True  # Admin report views are staff-only
+        user.save(update_fields=['is_staff'])
+    return user
+
+
+def _create_periods(company: Company, start: date, end: date) -> None:
+    """One fiscal year per calendar year touched, one period per month."""
+    fiscal_years: Dict[int, FiscalYear] = {}
+    month_start = start
+    while month_start <= end:
+        year = month_start.year
+        if year not in fiscal_years:
+            fiscal_years[year] = FiscalYear(
+                company=company, name=f"FY {year}", start_date=date(year, 1, 1), end_date=date(year, 12, 31),
+                is_active=(year == end.year))
+            fiscal_years[year].save()
+        month_end = month_start + relativedelta(months=1, days=-1)
+        AccountingPeriod(company=company, fiscal_year=fiscal_years[year], name=month_start.strftime('%b %Y'),
+                         start_date=month_start, end_date=month_end).save()
+        month_start += relativedelta(months=1)
+
+
+def _configure_accounting_settings(company: Company, accounts: Dict[str, Account], expense_account: Account) -> None:
+    acc_settings = company.accounting_settings
+    acc_settings.default_accounts_receivable_control = accounts[AR_CONTROL_ACCOUNT]
+    acc_settings.default_accounts_payable_control = accounts[AP_CONTROL_ACCOUNT]
+    acc_settings.default_sales_revenue_account = accounts[SALES_REVENUE_ACCOUNT]
+    acc_settings.default_bank_account_for_payments_made = accounts[BANK_ACCOUNT]
+    acc_settings.default_retained_earnings_account = accounts[RETAINED_EARNINGS_ACCOUNT]
+    acc_settings.default_sales_tax_payable_account = accounts[SALES_TAX_PAYABLE_ACCOUNT]
+    acc_settings.default_purchase_tax_asset_account = accounts[PURCHASE_TAX_ACCOUNT]
+    acc_settings.default_purchase_expense_account = expense_account
+    acc_settings.save()
+
+
+def _create_parties(fake: Faker, company: Company, user, party_type: str, count: int,
+                    control_account: Account) -> List[Party]:
+    parties = []
+    for _ in range(count):
+        party = Party(company=company, party_type=party_type, name=fake.unique.company()[:200],
+                      contact_email=fake.company_email(), contact_phone=fake.numerify('+1##########'),
+                      address=fake.address(), control_account=control_account,
+                      credit_limit=Decimal(fake.random_int(5, 50)) * 1000, created_by=user, updated_by=user)
+        party.save()
+        parties.append(party)
+    return parties
+
+
+def _random_amount(rng: random.Random, low: int, high: int) -> Decimal:
+    return (Decimal(rng.randint(low * 100, high * 100)) / 100).quantize(Decimal('0.01'))
+
+
+def _random_date(rng: random.Random, start: date, end: date) -> date:
+    return start + timedelta(days=rng.randint(0, (end - start).days))
+
+
+def _generate_invoices(fake, rng, spec, company, user, customers, revenue_accounts, bank, start, end) -> Tuple[int, int]:
+    invoice_dates = sorted(_random_date(rng, start, end) for _ in range(spec.invoices))  # Numbering is sequential
+    invoices = []
+    for invoice_date in invoice_dates:
+        lines = [{'description': fake.bs()[:200], 'quantity': rng.randint(1, 10),
+                  'unit_price': _random_amount(rng, 20, 2000), 'revenue_account_id': rng.choice(revenue_accounts).pk}
+                 for _ in range(rng.randint(1, 4))]
+        invoices.append(receivables_service.create_customer_invoice(
+            company_id=company.pk, created_by_user=user, customer_id=rng.choice(customers).pk,
+            invoice_date=invoice_date, due_date=invoice_date + timedelta(days=rng.choice([15, 30, 45, 60])),
+            lines_data=lines, initial_status=InvoiceStatus.SENT.value, post_to_gl_on_finalize=True))
+
+    payments = 0
+    for invoice in invoices:
+        if rng.random() >= spec.paid_invoice_ratio:
+            continue
+        payment_date = min(invoice.invoice_date + timedelta(days=rng.randint(5, 60)), end)
+        amount = invoice.total_amount if rng.random() < 0.8 else (invoice.total_amount / 2).quantize(Decimal('0.01'))
+        receivables_service.record_customer_payment(
+            company_id=company.pk, created_by_user=user, customer_id=invoice.customer_id, payment_date=payment_date,
+            amount_received=amount, currency=invoice.currency, bank_account_credited_id=bank.pk,
+            reference_number=fake.bothify('RCPT-#######'),
+            allocations_data=[{'invoice_id': invoice.pk, 'amount_applied': amount}], post_to_gl_immediately=True)
+        payments += 1
+    return len(invoices), payments
+
+
+def _generate_bills(fake, rng, spec, company, user, suppliers, expense_accounts, bank, start, end) -> Tuple[int, int]:
+    bill_dates = sorted(_random_date(rng, start, end) for _ in range(spec.bills))
+    for bill_date in bill_dates:
+        lines = [{'description': fake.catch_phrase()[:200], 'quantity': rng.randint(1, 5),
+                  'unit_price': _random_amount(rng, 10, 1500), 'expense_account_id': rng.choice(expense_accounts).pk}
+                 for _ in range(rng.randint(1, 3))]
+        bill = payables_service.create_vendor_bill(
+            company_id=company.pk, supplier_id=rng.choice(suppliers).pk, issue_date=bill_date,
+            currency=company.default_currency_code, lines_data=lines, created_by_user=user,
+            supplier_bill_reference=fake.bothify('SUP-####-??'),
+            due_date=bill_date + timedelta(days=rng.choice([15, 30, 60])))
+        payables_service.submit_vendor_bill_for_approval(bill.pk, company.pk, user)
+        payables_service.approve_vendor_bill(bill.pk, company.pk, user)
+        payables_service.post_vendor_bill_to_gl(bill.pk, company.pk, user)
+
+    # Everything due more than a month before the end is paid; the rest stays open for AP aging
+    run = execute_payment_run(company.pk, due_by=end - relativedelta(months=1), payment_account_id=bank.pk,
+                              user=user, payment_date=end - relativedelta(months=1), dry_run=False,
+                              batch_size=spec.batch_size)
+    return len(bill_dates), len(run.payment_ids)
+
+
+def _generate_journal_vouchers(fake, rng, spec, company, user, accounts_by_type, start, end) -> int:
+    """Posted GENERAL vouchers (2-4 lines) through the batched posting path."""
+    now = timezone.now()
+    narrations = [fake.sentence(nb_words=6) for _ in range(50)]
+    periods = list(AccountingPeriod.global_objects.filter(company=company).order_by('start_date'))
+    by_period: Dict[Any, List[Tuple[Voucher, List[VoucherLine]]]] = defaultdict(list)
+    debit_types = [account_type for account_type in (AccountType.EXPENSE.value, AccountType.ASSET.value,
+                                                     AccountType.COST_OF_GOODS_SOLD.value)
+                   if accounts_by_type[account_type]]
+    credit_types = [account_type for account_type in (AccountType.INCOME.value, AccountType.ASSET.value,
+                                                      AccountType.LIABILITY.value)
+                    if accounts_by_type[account_type]]
+    for _ in range(spec.vouchers):
+        voucher_date = _random_date(rng, start, end)
+        period = next(p for p in periods if p.start_date <= voucher_date <= p.end_date)
+        voucher = Voucher(
+            company=company, voucher_type=VoucherType.GENERAL.value, date=voucher_date, effective_date=voucher_date,
+            narration=rng.choice(narrations), reference=fake.bothify('JV-######'), accounting_period=period,
+            status=TransactionStatus.POSTED.value, approved_by=user, posted_by=user, approved_at=now, posted_at=now,
+            balances_updated=True, created_by=user, updated_by=user)
+        amounts = [_random_amount(rng, 10, 5000) for _ in range(rng.randint(1, 3))]
+        lines = [VoucherLine(voucher=voucher, account=rng.choice(accounts_by_type[rng.choice(debit_types)]),
+                             dr_cr=DrCrType.DEBIT.value, amount=amount, narration=voucher.narration)
+                 for amount in amounts]
+        lines.append(VoucherLine(voucher=voucher, account=rng.choice(accounts_by_type[rng.choice(credit_types)]),
+                                 dr_cr=DrCrType.CREDIT.value, amount=sum(amounts, ZERO_DECIMAL),
+                                 narration=voucher.narration))
+        by_period[period.pk].append((voucher, lines))
+
+    for period_pk, items in by_period.items():
+        numbers = sequence_service.reserve_voucher_numbers(
+            company_id=company.pk, voucher_type_value=VoucherType.GENERAL.value, period_id=period_pk, count=len(items))
+        for (voucher, _lines), number in zip(items, numbers):
+            voucher.voucher_number = number
+        for offset in range(0, len(items), spec.batch_size):
+            chunk = items[offset:offset + spec.batch_size]
+            voucher_service.bulk_insert_posted_vouchers(
+                [voucher for voucher, _lines in chunk], [line for _voucher, lines in chunk for line in lines], user,
+                comments="Benchmark data.", batch_size=spec.batch_size)
+    return spec.vouchers
+
+
+def _generate_company(spec: DatasetSpec, index: int, user, start: date, end: date,
+                      periods_end: date) -> GeneratedCompany:
+    fake = Faker()
+    fake.seed_instance(spec.seed * 1000 + index)
+    rng = random.Random(spec.seed * 1000 + index)
+    subdomain = spec.subdomain(index)
+
+    with transaction.atomic():  # A failed company leaves nothing behind and can simply be regenerated
+        company = Company.objects.create(subdomain_prefix=subdomain, name=f"{fake.company()} ({subdomain})",
+                                         default_currency_code='USD', financial_year_start_month=1,
+                                         created_by_user=user)
+        CompanyMembership.objects.get_or_create(company=company, user=user,
+                                                defaults={'role': CompanyMembership.Role.OWNER.value})
+        return _populate_company(fake, rng, spec, company, user, start, end, periods_end)
+
+
+def _populate_company(fake, rng, spec, company, user, start, end, periods_end) -> GeneratedCompany:
+    with override_current_company(company):
+        if not Account.global_objects.filter(company=company).exists():  # Normally seeded by the company signal
+            seed_coa_for_company(company)
+        accounts = {account.account_number: account for account in Account.global_objects.filter(company=company)}
+        accounts_by_type: Dict[str, List[Account]] = defaultdict(list)
+        for account in sorted(accounts.values(), key=lambda acc: acc.account_number):  # Stable for the seed
+            if account.allow_direct_posting and account.is_active and not account.is_control_account:
+                accounts_by_type[account.account_type].append(account)
+        bank = accounts[BANK_ACCOUNT]
+        _configure_accounting_settings(company, accounts, accounts_by_type[AccountType.EXPENSE.value][0])
+        _create_periods(company, start, periods_end)
+
+        customers = _create_parties(fake, company, user, PartyType.CUSTOMER.value, spec.customers,
+                                    accounts[AR_CONTROL_ACCOUNT])
+        suppliers = _create_parties(fake, company, user, PartyType.SUPPLIER.value, spec.suppliers,
+                                    accounts[AP_CONTROL_ACCOUNT])
+        invoices, customer_payments = _generate_invoices(
+            fake, rng, spec, company, user, customers, accounts_by_type[AccountType.INCOME.value], bank, start, end)
+        bills, vendor_payments = _generate_bills(
+            fake, rng, spec, company, user, suppliers, accounts_by_type[AccountType.EXPENSE.value], bank, start, end)
+        vouchers = _generate_journal_vouchers(fake, rng, spec, company, user, accounts_by_type, start, end)
+
+    counts = {'accounts': len(accounts), 'customers': len(customers), 'suppliers': len(suppliers),
+              'invoices': invoices, 'customer_payments': customer_payments, 'bills': bills,
+              'vendor_payments': vendor_payments, 'journal_vouchers': vouchers}
+    logger.info(f"[BenchData][Co:{company.pk}] '{company.name}' generated: {counts}")
+    return GeneratedCompany(company.pk, company.name, company.subdomain_prefix, start, end, counts)
+
+
+def generate_dataset(spec: Optional[DatasetSpec] = None, progress=None) -> BenchmarkDataset:
+    """
+    Creates `spec.companies` companies with their full ledger. Companies already generated for
+    the same prefix/seed are left alone and skipped (delete them to regenerate).
+    `progress` is an optional callable receiving one message per company.
+    """
+    spec = spec or DatasetSpec()
+    end = timezone.now().date()  # Documents are dated up to today, periods run to the end of the month
+    month_start = end.replace(day=1)
+    periods_end = month_start + relativedelta(months=1, days=-1)
+    start = month_start - relativedelta(months=spec.months - 1)
+    user = _dataset_user(spec)
+    dataset = BenchmarkDataset(spec=spec, user_email=user.email)
+
+    for index in range(1, spec.companies + 1):
+        existing = Company.objects.filter(subdomain_prefix=spec.subdomain(index)).first()
+        if existing:
+            if progress:
+                progress(f"Company '{existing.subdomain_prefix}' already exists, skipped.")
+            continue
+        generated = _generate_company(spec, index, user, start, end, periods_end)
+        dataset.companies.append(generated)
+        if progress:
+            progress(f"Company '{generated.subdomain_prefix}' generated: {generated.counts}")
+    return dataset
@@ -0,0 +1,298 @@
+# crp_accounting/benchmarks/runner.py
+"""
+Times the hot paths against generated (or any existing) companies.
+
+Each case is run `warmup` times untimed and then `repeat` times, recording wall time
+(median/min/max) and the number of SQL queries of the last run. Posting cases run inside a
+transaction that is rolled back, so the dataset is left unchanged and results stay comparable
+between runs. `write_results` produces JSON tagged with the git commit; `compare_results` lines
+two such files up case by case.
+"""
+
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import django
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from company.models import Company, CompanyMembership
+from company.utils import override_current_company
+from crp_core.enums import AccountType, DrCrType, PartyType, TransactionStatus, VoucherType
+
+from ..models.coa import Account
+from ..models.journal import Voucher, VoucherLine
+from ..models.party import Party
+from ..models.period import AccountingPeriod
+from .. import admin_views
+from ..services import ledger_service, reports_service, sequence_service, voucher_service
+from ..utils.charts import pl_waterfall_steps, render_waterfall_png
+
+logger = logging.getLogger("crp_accounting.benchmarks.runner")
+
+RESULTS_FORMAT_VERSION = 1
+
+
+@dataclass
+class CaseResult:
+    name: str
+    company: str
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    queries: int
+    runs: int
+    items: int = 1  # Units of work per run (vouchers posted, ...); throughput = items / median
+    error: Optional[str] = None
+
+    @property
+    def per_second(self) -> Optional[float]:
+        return round(self.items / (self.median_ms / 1000), 1) if self.median_ms else None
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    func: Callable[[], Any]
+    items: int = 1
+    rolled_back: bool = False  # Writes: run in a transaction that is rolled back
+
+
+@dataclass
+class CompanyContext:
+    """What the cases of one company need, resolved once before timing."""
+    company: Company
+    user: Any
+    start_date: date
+    end_date: date
+    ledger_account: Account
+    debit_account: Account
+    customer: Optional[Party]
+    supplier: Optional[Party]
+    prepared: Dict[str, Any] = field(default_factory=dict)
+
+
+@contextmanager
+def _rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_company_context(company: Company) -> CompanyContext:
+    membership = (CompanyMembership.objects.select_related('user')
+                  .filter(company=company, is_active_membership=True, role=CompanyMembership.Role.OWNER.value)
+                  .order_by('date_joined').first())
+    if membership is None:
+        raise ValueError(f"Company '{company.subdomain_prefix}' has no active owner to run the posting cases as.")
+    periods = AccountingPeriod.global_objects.filter(company=company).order_by('start_date')
+    first_period, last_period = periods.first(), periods.last()
+    if first_period is None:
+        raise ValueError(f"Company '{company.subdomain_prefix}' has no accounting periods.")
+    settings_obj = company.accounting_settings
+    ledger_account = settings_obj.default_bank_account_for_payments_made or Account.global_objects.filter(
+        company=company, account_type=AccountType.ASSET.value, allow_direct_posting=True).order_by(
+        'account_number').first()
+    debit_account = settings_obj.default_purchase_expense_account or Account.global_objects.filter(
+        company=company, account_type=AccountType.EXPENSE.value, allow_direct_posting=True,
+        is_control_account=False).order_by('account_number').first()
+    parties = Party.global_objects.filter(company=company, is_active=True).order_by('name')
+    return CompanyContext(
+        company=company, user=membership.user, start_date=first_period.start_date, end_date=last_period.end_date,
+        ledger_account=ledger_account, debit_account=debit_account,
+        customer=parties.filter(party_type=PartyType.CUSTOMER.value).first(),
+        supplier=parties.filter(party_type=PartyType.SUPPLIER.value).first(),
+    )
+
+
+def admin_get(ctx: CompanyContext, view: Callable, *args: Any, **params: Any) -> HttpResponse:
+    """Calls an admin report view as the company's owner would (company resolved as by the middleware)."""
+    request = RequestFactory().get('/', {name: str(value) for name, value in params.items()})
+    request.user = ctx.user
+    request.company = ctx.company
+    request.session = {}
+    request._messages = CookieStorage(request)
+    response = view(request, *args)
+    if response.status_code != 200:
+        raise ValueError(f"{getattr(view, '__name__', view)} returned HTTP {response.status_code}.")
+    return response
+
+
+def post_vouchers_in_bulk(ctx: CompanyContext, count: int) -> None:
+    """`count` two-line journal vouchers through the batched posting path (numbering included)."""
+    now = timezone.now()
+    period = AccountingPeriod.global_objects.get(company=ctx.company, start_date__lte=ctx.end_date,
+                                                 end_date__gte=ctx.end_date)
+    numbers = sequence_service.reserve_voucher_numbers(ctx.company.pk, VoucherType.GENERAL.value, period.pk, count)
+    vouchers, lines = [], []
+    for index, number in enumerate(numbers):
+        amount = Decimal(100 + index % 900)
+        voucher = Voucher(
+            company=ctx.company, voucher_type=VoucherType.GENERAL.value, voucher_number=number, date=ctx.end_date,
+            effective_date=ctx.end_date, narration="Benchmark posting", accounting_period=period,
+            status=TransactionStatus.POSTED.value, approved_by=ctx.user, posted_by=ctx.user, approved_at=now,
+            posted_at=now, balances_updated=True, created_by=ctx.user, updated_by=ctx.user)
+        vouchers.append(voucher)
+        lines.append(VoucherLine(voucher=voucher, account=ctx.debit_account, dr_cr=DrCrType.DEBIT.value,
+                                 amount=amount))
+        lines.append(VoucherLine(voucher=voucher, account=ctx.ledger_account, dr_cr=DrCrType.CREDIT.value,
+                                 amount=amount))
+    voucher_service.bulk_insert_posted_vouchers(vouchers, lines, ctx.user, comments="Benchmark posting.")
+
+
+def post_vouchers_one_by_one(ctx: CompanyContext, count: int) -> None:
+    """`count` vouchers through the per-document path: draft, submit, approve and post."""
+    for index in range(count):
+        amount = str(100 + index)
+        voucher = voucher_service.create_draft_voucher(
+            ctx.company.pk, ctx.user, VoucherType.GENERAL.value, ctx.end_date, "Benchmark posting",
+            [{'account_id': ctx.debit_account.pk, 'dr_cr': DrCrType.DEBIT.value, 'amount': amount},
+             {'account_id': ctx.ledger_account.pk, 'dr_cr': DrCrType.CREDIT.value, 'amount': amount}])
+        voucher_service.submit_voucher_for_approval(ctx.company.pk, voucher.pk, ctx.user)
+        voucher_service.approve_and_post_voucher(ctx.company.pk, voucher.pk, ctx.user)
+
+
+def default_cases(ctx: CompanyContext, posting_batch: int = 500, single_posts: int = 20) -> List[BenchmarkCase]:
+    company_id, start, end = ctx.company.pk, ctx.start_date, ctx.end_date
+    cases = [
+        BenchmarkCase('reports.trial_balance', lambda: reports_service.generate_trial_balance_structured(company_id, end)),
+        BenchmarkCase('reports.profit_loss', lambda: reports_service.generate_profit_loss(company_id, start, end)),
+        BenchmarkCase('reports.balance_sheet', lambda: reports_service.generate_balance_sheet(company_id, end)),
+        BenchmarkCase('reports.account_ledger', lambda: ledger_service.get_account_ledger_data(
+            company_id, ctx.ledger_account.pk, start, end)),
+        BenchmarkCase('reports.ar_aging', lambda: reports_service.generate_ar_aging_report(company_id, end)),
+        BenchmarkCase('reports.ap_aging', lambda: reports_service.generate_ap_aging_report(company_id, end)),
+    ]
+    if ctx.customer:
+        cases.append(BenchmarkCase('reports.customer_statement', lambda: reports_service.generate_customer_statement(
+            company_id, ctx.customer.pk, start, end)))
+    if ctx.supplier:
+        cases.append(BenchmarkCase('reports.vendor_statement', lambda: reports_service.generate_vendor_statement(
+            company_id, ctx.supplier.pk, start, end)))
+    cases += [
+        BenchmarkCase('posting.bulk', lambda: post_vouchers_in_bulk(ctx, posting_batch), items=posting_batch,
+                      rolled_back=True),
+        BenchmarkCase('posting.single', lambda: post_vouchers_one_by_one(ctx, single_posts), items=single_posts,
+                      rolled_back=True),
+        # Exports through the admin download views (report generation included), as users get them
+        BenchmarkCase('exports.trial_balance_xlsx', lambda: admin_get(
+            ctx, admin_views.download_trial_balance_excel, as_of_date=end)),
+        BenchmarkCase('exports.profit_loss_xlsx', lambda: admin_get(
+            ctx, admin_views.download_profit_loss_excel, start_date=start, end_date=end)),
+        BenchmarkCase('exports.balance_sheet_xlsx', lambda: admin_get(
+            ctx, admin_views.download_balance_sheet_excel, as_of_date=end)),
+        BenchmarkCase('exports.profit_loss_pdf', lambda: admin_get(
+            ctx, admin_views.download_profit_loss_pdf, start_date=start, end_date=end)),
+        # Chart drawing alone, bypassing the chart cache
+        BenchmarkCase('exports.pl_waterfall_png', lambda: render_waterfall_png(
+            pl_waterfall_steps(ctx.prepared['profit_loss'].get('report_lines', [])), "Profit & Loss Waterfall")),
+    ]
+    return cases
+
+
+def run_case(case: BenchmarkCase, company_label: str, repeat: int = 5, warmup: int = 1,
+             cold_cache: bool = False) -> CaseResult:
+    timings, queries = [], 0
+    try:
+        for run_index in range(warmup + repeat):
+            if cold_cache:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                if case.rolled_back:
+                    with _rolled_back():
+                        case.func()
+                else:
+                    case.func()
+                elapsed_ms = (time.perf_counter() - started) * 1000
+            if run_index >= warmup:
+                timings.append(elapsed_ms)
+                queries = len(captured.captured_queries)
+    except Exception as e:
+        logger.error(f"[Bench][{company_label}] Case '{case.name}' failed: {e}", exc_info=True)
+        return CaseResult(case.name, company_label, 0.0, 0.0, 0.0, 0, len(timings), case.items,
+                          error=f"{type(e).__name__}: {e}")
+    return CaseResult(case.name, company_label, round(statistics.median(timings), 2), round(min(timings), 2),
+                      round(max(timings), 2), queries, len(timings), case.items)
+
+
+def run_benchmarks(companies: Iterable[Company], repeat: int = 5, warmup: int = 1, only: Optional[List[str]] = None,
+                   cold_cache: bool = False, posting_batch: int = 500, single_posts: int = 20,
+                   progress: Optional[Callable[[CaseResult], None]] = None) -> Dict[str, Any]:
+    """Runs the default cases for each company. `only` filters cases by name prefix."""
+    results: List[CaseResult] = []
+    for company in companies:
+        with override_current_company(company):
+            ctx = build_company_context(company)
+            ctx.prepared['profit_loss'] = reports_service.generate_profit_loss(company.pk, ctx.start_date,
+                                                                               ctx.end_date)
+            for case in default_cases(ctx, posting_batch, single_posts):
+                if only and not any(case.name.startswith(prefix) for prefix in only):
+                    continue
+                result = run_case(case, company.subdomain_prefix, repeat, warmup, cold_cache)
+                results.append(result)
+                if progress:
+                    progress(result)
+
+    return {
+        'format_version': RESULTS_FORMAT_VERSION,
+        'meta': {
+            'git_commit': _git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': repeat, 'warmup': warmup, 'cold_cache': cold_cache,
+        },
+        'results': [dict(asdict(result), per_second=result.per_second) for result in results],
+    }
+
+
+def write_results(results: Dict[str, Any], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(results, handle, indent=2, default=str)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per (company, case): baseline vs current median and queries, with the relative time change."""
+    baseline_by_key = {(row['company'], row['name']): row for row in baseline.get('results', [])}
+    rows = []
+    for row in current.get('results', []):
+        before = baseline_by_key.get((row['company'], row['name']))
+        if before is None or before.get('error') or row.get('error'):
+            continue
+        change_pct = ((row['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+                      if before['median_ms'] else None)
+        rows.append({'company': row['company'], 'name': row['name'],
+                     'baseline_ms': before['median_ms'], 'current_ms': row['median_ms'],
+                     'change_pct': round(change_pct, 1) if change_pct is not None else None,
+                     'baseline_queries': before['queries'], 'current_queries': row['queries']})
+    return rows
@@ -2,7 +2,9 @@
 
 import django_filters
 from django.db.models import Q # For complex lookups if needed
+from rest_framework import filters
 from .models.journal import Voucher, VoucherType, TransactionStatus, Party, AccountingPeriod
+from .services import voucher_search_service
 
 class VoucherFilterSet(django_filters.FilterSet):
     """
@@ -28,13 +30,13 @@ class VoucherFilterSet(django_filters.FilterSet):
 
     # Example: Filter by voucher number (exact match or contains)
     voucher_number_exact = django_filters.CharFilter(field_name='voucher_number', lookup_expr='exact', label='Voucher Number (Exact)')
-    voucher_number_contains = django_filters.CharFilter(field_name='voucher_number', lookup_expr='icontains', label='Voucher Number (Contains)')
+    voucher_number_contains = django_filters.CharFilter(field_name='voucher_number', method='filter_contains', label='Voucher Number (Contains)')
 
     # Example: Filter by reference contains
-    reference_contains = django_filters.CharFilter(field_name='reference', lookup_expr='icontains', label='Reference (Contains)')
+    reference_contains = django_filters.CharFilter(field_name='reference', method='filter_contains', label='Reference (Contains)')
 
     # Example: Filter by narration contains
-    narration_contains = django_filters.CharFilter(field_name='narration', lookup_expr='icontains', label='Narration (Contains)')
+    narration_contains = django_filters.CharFilter(field_name='narration', method='filter_contains', label='Narration (Contains)')
 
     class Meta:
         model = Voucher
@@ -45,4 +47,33 @@ class VoucherFilterSet(django_filters.FilterSet):
             'accounting_period',
             # Add other exact match fields if needed
         ]
-        # Note: More specific filters defined above override these defaults if names match.
\ No newline at end of file
+        # Note: More specific filters defined above override these defaults if names match.
+
+    def filter_contains(self, queryset, name, value):
+        """Case-insensitive contains, narrowed by the trigram-indexed search document (PostgreSQL)."""
+        return voucher_search_service.filter_contains(queryset, name, value)
+
+
+class VoucherSearchFilter(filters.SearchFilter):
+    """
+    `?search=` over the voucher search documents (voucher_search_service): every term must occur in
+    the voucher number, reference, narration, party name or a line narration, and matches carry a
+    `search_rank`. Databases without search documents use DRF's search over `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not voucher_search_service.uses_search_documents(queryset):
+            return super().filter_queryset(request, queryset, view)
+        return voucher_search_service.search_vouchers(queryset, terms)
+
+
+class SearchRankOrderingFilter(filters.OrderingFilter):
+    """OrderingFilter that puts the most relevant search matches first unless `?ordering=` is given."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if request.query_params.get(self.ordering_param) or \
+                voucher_search_service.SEARCH_RANK not in queryset.query.annotations:
+            return ordering
+        return ['-' + voucher_search_service.SEARCH_RANK, *(ordering or [])]
\ No newline at end of file
@@ -0,0 +1,61 @@
+# crp_accounting/management/commands/auto_match_customer_payments.py
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+# --- Model Imports ---
+try:
+    from company.models import Company
+    from company.utils import override_current_company
+    from crp_accounting.services import cash_application_service
+except ImportError as e:
+    raise CommandError(f"Could not import models/services needed for cash application: {e}")
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Matches unapplied customer payments to open invoices (invoice reference, exact amount, "
+            "then oldest-first). Runs as a dry run unless --apply is given.")
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--companies', nargs='+', type=str, help='List of specific Company IDs to process.')
+        group.add_argument('--all', action='store_true', help='Process all active companies.')
+        parser.add_argument('--apply', action='store_true',
+                            help='Write the allocations. Without this flag only the proposals are reported.')
+        parser.add_argument('--rules', nargs='+', choices=cash_application_service.DEFAULT_MATCHING_RULES,
+                            default=list(cash_application_service.DEFAULT_MATCHING_RULES),
+                            help='Matching rules to use, in order.')
+        parser.add_argument('--verbose-proposals', action='store_true',
+                            help='Print every proposed allocation, not only the per-company summary.')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            companies = Company.objects.filter(is_active=True)
+        else:
+            companies = Company.objects.filter(pk__in=options['companies'])
+            if companies.count() != len(set(options['companies'])):
+                raise CommandError("One or more of the given Company IDs were not found.")
+
+        dry_run = not options['apply']
+        for company in companies.order_by('name'):
+            with override_current_company(company):
+                try:
+                    result = cash_application_service.auto_match_customer_payments(
+                        company_id=company.pk, dry_run=dry_run, rules=options['rules'])
+                except Exception as e:
+                    logger.exception(f"Cash application failed for company {company.pk}.")
+                    self.stderr.write(self.style.ERROR(f"[{company.name}] Failed: {e}"))
+                    continue
+
+            mode = "DRY RUN" if dry_run else "APPLIED"
+            self.stdout.write(self.style.SUCCESS(
+                f"[{company.name}] {mode}: {result.payments_matched}/{result.payments_considered} payments matched, "
+                f"{len(result.proposals)} allocations, total {result.total_applied} "
+                f"(by rule: {result.counts_by_rule()})."
+            ))
+            if options['verbose_proposals']:
+                for proposal in result.proposals:
+                    self.stdout.write(f"  Payment {proposal.payment_id} -> Invoice {proposal.invoice_number} "
+                                      f"{proposal.amount} [{proposal.rule}]")
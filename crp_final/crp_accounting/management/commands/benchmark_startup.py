@@ -0,0 +1,92 @@
+# crp_accounting/management/commands/benchmark_startup.py
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a fresh process of each kind imports before it can serve its first request / task
+STARTUP_SCRIPTS = {
+    'web': (
+        "import django; django.setup(); "
+        "from django.core.wsgi import get_wsgi_application; get_wsgi_application(); "
+        "from django.urls import get_resolver; get_resolver().url_patterns"
+    ),
+    'worker': (
+        "import django; django.setup(); "
+        "from crp_final.celery import app; app.loader.import_default_modules()"
+    ),
+}
+EXPORT_LIBRARIES = ('openpyxl', 'xhtml2pdf', 'reportlab', 'PIL')
+# Printed by the child process after the startup script, parsed by the command
+REPORT_SCRIPT = (
+    "import resource, sys, time; "
+    "print('STARTUP', time.perf_counter() - _t0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, "
+    f"' '.join(sorted(m for m in {EXPORT_LIBRARIES!r} if m in sys.modules)))"
+)
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def _run_startup(target, python_executable):
+    code = f"import time; _t0 = time.perf_counter(); {STARTUP_SCRIPTS[target]}; {REPORT_SCRIPT}"
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'crp_final.settings'))
+    completed = subprocess.run(
+        [python_executable, '-X', 'importtime', '-c', code],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    report = next((line for line in completed.stdout.splitlines() if line.startswith('STARTUP ')), None)
+    if completed.returncode != 0 or report is None:
+        raise CommandError(f"'{target}' startup failed:\n{completed.stderr[-2000:]}")
+    _label, seconds, max_rss_kb, *loaded = report.split(' ')
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), len(indent)))
+    return float(seconds), int(max_rss_kb), [name for name in loaded if name], imports
+
+
+class Command(BaseCommand):
+    help = ("Measures cold start of a web worker and a Celery worker in fresh interpreters "
+            "(python -X importtime): wall time, peak RSS, the slowest imports and whether the "
+            "report export libraries (openpyxl, xhtml2pdf, Pillow) were loaded at startup.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=['web', 'worker', 'all'], default='all',
+                            help='Which process kind to start. Default: all.')
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes per target (median is reported).')
+        parser.add_argument('--top', type=int, default=15, help='Number of slowest imports to list.')
+        parser.add_argument('--python', default=sys.executable, help='Interpreter to benchmark with.')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError("--runs must be at least 1.")
+        targets = list(STARTUP_SCRIPTS) if options['target'] == 'all' else [options['target']]
+        for target in targets:
+            runs = [_run_startup(target, options['python']) for _ in range(options['runs'])]
+            seconds = statistics.median(run[0] for run in runs)
+            max_rss_mb = statistics.median(run[1] for run in runs) / 1024  # ru_maxrss is in KiB on Linux
+            loaded_export_libraries = runs[-1][2]
+            imports = runs[-1][3]
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"=== {target} startup ({options['runs']} runs) ==="))
+            self.stdout.write(f"Wall time (median): {seconds * 1000:.0f} ms")
+            self.stdout.write(f"Peak RSS (median):  {max_rss_mb:.1f} MB")
+            self.stdout.write(f"Modules imported:   {len(imports)} "
+                              f"({sum(item[1] for item in imports) / 1000:.0f} ms self time, last run)")
+            if loaded_export_libraries:
+                self.stdout.write(self.style.WARNING(
+                    f"Export libraries loaded at startup: {', '.join(loaded_export_libraries)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"No export library loaded at startup ({', '.join(EXPORT_LIBRARIES)})."))
+
+            self.stdout.write("Slowest top-level imports (cumulative, last run):")
+            top_level = sorted((item for item in imports if item[3] == 1), key=lambda item: item[2], reverse=True)
+            for module, _self_us, cumulative_us, _depth in top_level[:options['top']]:
+                self.stdout.write(f"  {cumulative_us / 1000:9.1f} ms  {module}")
@@ -0,0 +1,81 @@
+# crp_accounting/management/commands/explain_open_item_queries.py
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+try:
+    from company.models import Company
+    from crp_accounting.models.receivables import (
+        CustomerInvoice, CustomerPayment, OPEN_INVOICE_STATUSES, AR_AGING_INVOICE_STATUSES, UNAPPLIED_PAYMENT_STATUSES
+    )
+    from crp_accounting.models.payables import VendorBill
+except ImportError as e:
+    raise CommandError(f"Could not import models needed to explain open item queries: {e}")
+
+# Partial (conditional) indexes this benchmark is about, per model
+PARTIAL_INDEX_MODELS = (CustomerInvoice, CustomerPayment, VendorBill)
+
+
+def _open_item_querysets(company_id, as_of_date):
+    """The hot open-item queries, as issued by aging, cash application, party overdue and the status sweep."""
+    open_bill_statuses = [VendorBill.BillStatus.APPROVED.value, VendorBill.BillStatus.PARTIALLY_PAID.value]
+    first_customer_id = CustomerInvoice.global_objects.filter(company_id=company_id).values_list(
+        'customer_id', flat=True).first()
+    return [
+        ("AR aging (unpaid invoices as of date)", CustomerInvoice.global_objects.filter(
+            company_id=company_id, invoice_date__lte=as_of_date, status__in=AR_AGING_INVOICE_STATUSES)),
+        ("AP aging (open bills)", VendorBill.global_objects.filter(
+            company_id=company_id, amount_due__gt=0, status__in=open_bill_statuses)),
+        ("Open invoices of one customer", CustomerInvoice.global_objects.filter(
+            company_id=company_id, customer_id=first_customer_id, status__in=OPEN_INVOICE_STATUSES,
+            amount_due__gt=0).order_by('due_date')),
+        ("Overdue invoices (status sweep)", CustomerInvoice.global_objects.filter(
+            company_id=company_id, status__in=OPEN_INVOICE_STATUSES, due_date__lt=as_of_date, amount_due__gt=0)),
+        ("Unapplied customer payments", CustomerPayment.global_objects.filter(
+            company_id=company_id, status__in=UNAPPLIED_PAYMENT_STATUSES, amount_unapplied__gt=0)),
+    ]
+
+
+class Command(BaseCommand):
+    help = ("Prints the PostgreSQL plans of the open-item queries (aging, cash application, overdue lookups). "
+            "With --compare the plans are also taken with the partial open-item indexes dropped inside a "
+            "rolled-back transaction, to show the before/after. Use on a benchmark copy: --compare locks the tables.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', required=True, type=str, help='Company ID whose data the queries target.')
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='As-of date (YYYY-MM-DD) for the aging/overdue queries. Defaults to today.')
+        parser.add_argument('--analyze', action='store_true', help='Run EXPLAIN (ANALYZE, BUFFERS) instead of EXPLAIN.')
+        parser.add_argument('--compare', action='store_true',
+                            help='Also explain the queries without the partial indexes (dropped and rolled back).')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Partial index plans can only be explained on PostgreSQL.")
+        if not Company.objects.filter(pk=options['company']).exists():
+            raise CommandError(f"Company '{options['company']}' not found.")
+        as_of_date = options['date'] or timezone.now().date()
+        explain_options = {'analyze': True, 'buffers': True} if options['analyze'] else {}
+
+        self._explain_all(options['company'], as_of_date, explain_options, "WITH partial indexes")
+        if options['compare']:
+            partial_index_names = [index.name for model in PARTIAL_INDEX_MODELS
+                                   for index in model._meta.indexes if index.condition is not None]
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for name in partial_index_names:
+                        cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+                self._explain_all(options['company'], as_of_date, explain_options, "WITHOUT partial indexes")
+                transaction.set_rollback(True)  # Restores the dropped indexes
+
+    def _explain_all(self, company_id, as_of_date, explain_options, heading):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"=== {heading} ==="))
+        for label, queryset in _open_item_querysets(company_id, as_of_date):
+            start = time.perf_counter()
+            plan = queryset.explain(**explain_options)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stdout.write(self.style.SUCCESS(f"--- {label} ({elapsed_ms:.1f} ms incl. EXPLAIN)"))
+            self.stdout.write(plan)
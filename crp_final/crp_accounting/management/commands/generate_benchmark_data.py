@@ -0,0 +1,62 @@
+# crp_accounting/management/commands/generate_benchmark_data.py
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    from crp_accounting.benchmarks.generator import DatasetSpec, generate_dataset
+except ImportError as e:
+    raise CommandError(f"Could not import the benchmark data generator: {e}")
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Creates synthetic companies for benchmarking: seeded Chart of Accounts, monthly periods, parties, "
+            "posted invoices/payments, approved and paid vendor bills, and posted journal vouchers. "
+            "Deterministic for a given --seed; existing companies of the same prefix/seed are skipped.")
+
+    def add_arguments(self, parser):
+        defaults = DatasetSpec()
+        parser.add_argument('--companies', type=int, default=defaults.companies, help='Number of companies.')
+        parser.add_argument('--customers', type=int, default=defaults.customers, help='Customers per company.')
+        parser.add_argument('--suppliers', type=int, default=defaults.suppliers, help='Suppliers per company.')
+        parser.add_argument('--invoices', type=int, default=defaults.invoices, help='Posted invoices per company.')
+        parser.add_argument('--paid-ratio', type=float, default=defaults.paid_invoice_ratio,
+                            help='Share of invoices receiving a payment (0-1).')
+        parser.add_argument('--bills', type=int, default=defaults.bills, help='Posted vendor bills per company.')
+        parser.add_argument('--vouchers', type=int, default=defaults.vouchers,
+                            help='Posted journal vouchers per company.')
+        parser.add_argument('--months', type=int, default=defaults.months,
+                            help='Months of history, ending with the current month.')
+        parser.add_argument('--seed', type=int, default=defaults.seed, help='Random seed.')
+        parser.add_argument('--prefix', type=str, default=defaults.prefix,
+                            help='Subdomain prefix of the generated companies.')
+        parser.add_argument('--batch-size', type=int, default=defaults.batch_size,
+                            help='Rows per bulk insert when posting journal vouchers.')
+        parser.add_argument('--output', type=str, default=None, help='Write a JSON summary of the dataset here.')
+
+    def handle(self, *args, **options):
+        if options['companies'] < 1 or options['months'] < 1:
+            raise CommandError("--companies and --months must be at least 1.")
+        if not 0 <= options['paid_ratio'] <= 1:
+            raise CommandError("--paid-ratio must be between 0 and 1.")
+        spec = DatasetSpec(
+            companies=options['companies'], customers=options['customers'], suppliers=options['suppliers'],
+            invoices=options['invoices'], paid_invoice_ratio=options['paid_ratio'], bills=options['bills'],
+            vouchers=options['vouchers'], months=options['months'], seed=options['seed'], prefix=options['prefix'],
+            batch_size=options['batch_size'],
+        )
+        try:
+            dataset = generate_dataset(spec, progress=self.stdout.write)
+        except Exception as e:
+            logger.exception("Benchmark data generation failed.")
+            raise CommandError(f"Benchmark data generation failed: {e}")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(dataset.to_dict(), handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(dataset.companies)} companies generated (prefix '{spec.prefix}', seed {spec.seed}, "
+            f"user {dataset.user_email})."))
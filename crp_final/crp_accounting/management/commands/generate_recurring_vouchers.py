@@ -0,0 +1,57 @@
+# crp_accounting/management/commands/generate_recurring_vouchers.py
+import logging
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+try:
+    from company.models import Company
+    from company.utils import override_current_company
+    from crp_accounting.services.recurring_voucher_service import (
+        generate_recurring_vouchers, companies_with_due_templates
+    )
+except ImportError as e:
+    raise CommandError(f"Could not import models/services needed for recurring voucher generation: {e}")
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ("Generates the vouchers of all due recurring voucher templates (catching up missed occurrences). "
+            "Same as the daily 'generate_recurring_vouchers' Celery task; safe to re-run.")
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--companies', nargs='+', type=str, help='List of specific Company IDs to process.')
+        group.add_argument('--all', action='store_true', help='Process all active companies with due templates.')
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='Generate occurrences due on or before this date (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--user', type=str, default=None,
+                            help='Email of the user recorded as creator/poster. Defaults to each template\'s editor.')
+
+    def handle(self, *args, **options):
+        as_of = options['date'] or timezone.now().date()
+        if options['all']:
+            companies = Company.objects.filter(pk__in=companies_with_due_templates(as_of), is_active=True)
+        else:
+            companies = Company.objects.filter(pk__in=options['companies'])
+            if companies.count() != len(set(options['companies'])):
+                raise CommandError("One or more of the given Company IDs were not found.")
+
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found.")
+
+        for company in companies.order_by('name'):
+            with override_current_company(company):
+                result = generate_recurring_vouchers(company.pk, as_of=as_of, user=user)
+            self.stdout.write(self.style.SUCCESS(
+                f"[{company.name}] {result.drafts_created} drafts created, {result.vouchers_posted} vouchers posted."))
+            for reason in result.skipped:
+                self.stdout.write(self.style.WARNING(f"  Skipped: {reason}"))
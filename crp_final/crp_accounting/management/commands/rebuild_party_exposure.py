@@ -0,0 +1,31 @@
+# crp_accounting/management/commands/rebuild_party_exposure.py
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    from company.models import Company
+    from crp_accounting.services.party_exposure_service import rebuild_party_exposure
+except ImportError as e:
+    raise CommandError(f"Could not import models/services needed to rebuild party exposure: {e}")
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Recomputes the maintained party exposure (posted balance and unposted documents) "
+            "from posted vouchers and open documents. Safe to re-run.")
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--companies', nargs='+', type=str, help='List of specific Company IDs to process.')
+        group.add_argument('--all', action='store_true', help='Process all companies.')
+
+    def handle(self, *args, **options):
+        companies = Company.objects.all() if options['all'] else Company.objects.filter(pk__in=options['companies'])
+        if not options['all'] and companies.count() != len(set(options['companies'])):
+            raise CommandError("One or more of the given Company IDs were not found.")
+
+        for company in companies.order_by('name'):
+            changed = rebuild_party_exposure(company.pk)
+            self.stdout.write(self.style.SUCCESS(f"[{company.name}] {changed} parties updated."))
@@ -0,0 +1,80 @@
+# crp_accounting/management/commands/run_benchmarks.py
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    from company.models import Company
+    from crp_accounting.benchmarks.generator import benchmark_companies
+    from crp_accounting.benchmarks.runner import compare_results, load_results, run_benchmarks, write_results
+except ImportError as e:
+    raise CommandError(f"Could not import the benchmark runner: {e}")
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Times report generation (TB, P&L, BS, ledger, AR/AP aging, statements), posting throughput "
+            "(batched and per-document) and exports against benchmark companies, counting SQL queries. "
+            "Writes JSON results that can be compared across commits with --compare.")
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--companies', nargs='+', type=str, help='List of specific Company IDs to benchmark.')
+        group.add_argument('--prefix', type=str, default='bench',
+                           help='Benchmark companies by subdomain prefix (see generate_benchmark_data).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case (median is reported).')
+        parser.add_argument('--warmup', type=int, default=1, help='Untimed runs per case.')
+        parser.add_argument('--only', nargs='+', type=str, default=None,
+                            help="Case name prefixes to run, e.g. 'reports' 'posting.bulk'.")
+        parser.add_argument('--cold-cache', action='store_true', help='Clear the Django cache before every run.')
+        parser.add_argument('--posting-batch', type=int, default=500, help='Vouchers per batched posting run.')
+        parser.add_argument('--single-posts', type=int, default=20, help='Vouchers per per-document posting run.')
+        parser.add_argument('--output', type=str, default=None, help='Write the JSON results here.')
+        parser.add_argument('--compare', type=str, default=None, help='Baseline JSON results to compare against.')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or options['warmup'] < 0:
+            raise CommandError("--repeat must be at least 1 and --warmup not negative.")
+        if options['companies']:
+            companies = Company.objects.filter(pk__in=options['companies'])
+            if companies.count() != len(set(options['companies'])):
+                raise CommandError("One or more of the given Company IDs were not found.")
+        else:
+            companies = benchmark_companies(options['prefix'])
+        companies = list(companies)
+        if not companies:
+            raise CommandError("No companies to benchmark. Run 'generate_benchmark_data' first.")
+
+        def report(result):
+            if result.error:
+                self.stdout.write(self.style.ERROR(f"[{result.company}] {result.name:<30} FAILED: {result.error}"))
+                return
+            throughput = f"  {result.per_second:>9.1f}/s" if result.items > 1 else ""
+            self.stdout.write(f"[{result.company}] {result.name:<30} {result.median_ms:>10.2f} ms "
+                              f"(min {result.min_ms:.2f}, max {result.max_ms:.2f})  {result.queries:>5} queries"
+                              f"{throughput}")
+
+        try:
+            results = run_benchmarks(companies, repeat=options['repeat'], warmup=options['warmup'],
+                                     only=options['only'], cold_cache=options['cold_cache'],
+                                     posting_batch=options['posting_batch'], single_posts=options['single_posts'],
+                                     progress=report)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            write_results(results, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+        if options['compare']:
+            baseline = load_results(options['compare'])
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"=== vs {baseline['meta'].get('git_commit') or options['compare']} ==="))
+            for row in compare_results(baseline, results):
+                change = f"{row['change_pct']:+.1f}%" if row['change_pct'] is not None else "n/a"
+                style = self.style.ERROR if (row['change_pct'] or 0) > 10 else (
+                    self.style.SUCCESS if (row['change_pct'] or 0) < -10 else (lambda text: text))
+                self.stdout.write(style(
+                    f"[{row['company']}] {row['name']:<30} {row['baseline_ms']:>10.2f} -> {row['current_ms']:>10.2f} ms "
+                    f"({change})  queries {row['baseline_queries']} -> {row['current_queries']}"))
@@ -0,0 +1,80 @@
+# crp_accounting/management/commands/run_vendor_payments.py
+import logging
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+# --- Model Imports ---
+try:
+    from company.models import Company
+    from company.utils import override_current_company
+    from crp_accounting.services import payment_run_service
+    from crp_accounting.services.payables_service import PayablesServiceError
+except ImportError as e:
+    raise CommandError(f"Could not import models/services needed for the vendor payment run: {e}")
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ("Pays all approved vendor bills due by a date: one payment and one posted GL voucher per supplier. "
+            "Prints the proposal only (dry run) unless --apply is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', required=True, type=str, help='Company ID to run the payments for.')
+        parser.add_argument('--due-by', required=True, type=date.fromisoformat,
+                            help='Pay bills due on or before this date (YYYY-MM-DD).')
+        parser.add_argument('--payment-account', required=True, type=str,
+                            help='ID of the Bank/Cash account the payments are made from.')
+        parser.add_argument('--payment-date', type=date.fromisoformat, default=None,
+                            help='Payment / GL posting date (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--suppliers', nargs='+', type=str, help='Only pay these supplier (Party) IDs.')
+        parser.add_argument('--currency', type=str, default=None, help='Only pay bills in this currency.')
+        parser.add_argument('--user', type=str, help='Email of the user recorded as creator/poster. Required with --apply.')
+        parser.add_argument('--apply', action='store_true', help='Create and post the payments.')
+        parser.add_argument('--chunk-size', type=int, default=100, help='Suppliers per transaction.')
+        parser.add_argument('--verbose-proposals', action='store_true', help='Print every bill of the proposal.')
+
+    def handle(self, *args, **options):
+        try:
+            company = Company.objects.get(pk=options['company'])
+        except (Company.DoesNotExist, ValueError):
+            raise CommandError(f"Company '{options['company']}' not found.")
+
+        user = None
+        if options['apply']:
+            if not options['user']:
+                raise CommandError("--user is required with --apply.")
+            try:
+                user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' not found.")
+
+        with override_current_company(company):
+            try:
+                result = payment_run_service.execute_payment_run(
+                    company_id=company.pk, due_by=options['due_by'], payment_account_id=options['payment_account'],
+                    user=user, payment_date=options['payment_date'], supplier_ids=options['suppliers'],
+                    currency=options['currency'], dry_run=not options['apply'], chunk_size=options['chunk_size'])
+            except PayablesServiceError as e:
+                raise CommandError(str(e))
+
+        for proposal in result.proposals:
+            self.stdout.write(f"{proposal.supplier_name}: {len(proposal.bills)} bills, {proposal.total} {proposal.currency}")
+            if options['verbose_proposals']:
+                for bill in proposal.bills:
+                    self.stdout.write(f"  Bill {bill.bill_number} due {bill.due_date}: {bill.amount}")
+
+        mode = "DRY RUN" if result.dry_run else "APPLIED"
+        self.stdout.write(self.style.SUCCESS(
+            f"[{company.name}] {mode}: {len(result.proposals)} supplier payments for {result.bill_count} bills, "
+            f"total {result.total_amount}."
+        ))
+        if not result.dry_run:
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(result.payment_ids)} payments created and posted; {len(result.skipped_bill_ids)} bills skipped."))
+        if result.error:
+            raise CommandError(f"Payment run stopped: {result.error}. {len(result.unpaid_proposals)} supplier payments "
+                               f"were not made; re-run the command to pay them.")
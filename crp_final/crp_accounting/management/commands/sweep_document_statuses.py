@@ -0,0 +1,44 @@
+# crp_accounting/management/commands/sweep_document_statuses.py
+import logging
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+try:
+    from company.models import Company
+    from crp_accounting.services.document_status_service import sweep_document_statuses
+except ImportError as e:
+    raise CommandError(f"Could not import models/services needed for the status sweep: {e}")
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ("Marks past-due invoices OVERDUE and syncs paid / partially paid statuses of invoices and bills "
+            "with set-based updates. Same as the nightly 'sweep_document_statuses' Celery task.")
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument('--companies', nargs='+', type=str, help='List of specific Company IDs to process.')
+        group.add_argument('--all', action='store_true', help='Process all active companies.')
+        parser.add_argument('--date', type=date.fromisoformat, default=None,
+                            help='Sweep as of this date (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--dry-run', action='store_true', help='Report the counts without updating anything.')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            companies = Company.objects.filter(is_active=True)
+        else:
+            companies = Company.objects.filter(pk__in=options['companies'])
+            if companies.count() != len(set(options['companies'])):
+                raise CommandError("One or more of the given Company IDs were not found.")
+
+        company_names = dict(companies.values_list('pk', 'name'))
+        counts = sweep_document_statuses(company_ids=list(company_names), today=options['date'],
+                                         dry_run=options['dry_run'])
+
+        mode = "DRY RUN" if options['dry_run'] else "UPDATED"
+        for company_id, name in sorted(company_names.items(), key=lambda item: item[1]):
+            company_counts = counts.get(company_id, {})
+            summary = ", ".join(f"{rule}={n}" for rule, n in company_counts.items()) or "no changes"
+            self.stdout.write(self.style.SUCCESS(f"[{name}] {mode}: {summary}."))
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:56
+
+import django.db.models.deletion
+import simple_history.models
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_initial'),
+        ('crp_accounting', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fiscalyear',
+            name='closing_voucher',
+            field=models.OneToOneField(blank=True, editable=False, help_text='Year-end voucher that transferred P&L balances to retained earnings.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='closed_fiscal_year', to='crp_accounting.voucher', verbose_name='Closing Voucher'),
+        ),
+        migrations.AddField(
+            model_name='fiscalyear',
+            name='opening_balances_posted',
+            field=models.BooleanField(default=False, editable=False, help_text='Set when the previous year was closed and opening balances were carried into this year.', verbose_name='Opening Balances Posted'),
+        ),
+        migrations.AddField(
+            model_name='historicalfiscalyear',
+            name='closing_voucher',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, help_text='Year-end voucher that transferred P&L balances to retained earnings.', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='crp_accounting.voucher', verbose_name='Closing Voucher'),
+        ),
+        migrations.AddField(
+            model_name='historicalfiscalyear',
+            name='opening_balances_posted',
+            field=models.BooleanField(default=False, editable=False, help_text='Set when the previous year was closed and opening balances were carried into this year.', verbose_name='Opening Balances Posted'),
+        ),
+        migrations.AddField(
+            model_name='historicalvoucher',
+            name='is_year_end_closing',
+            field=models.BooleanField(default=False, editable=False, help_text='System-generated entry closing P&L into retained earnings.', verbose_name='Year-End Closing Entry'),
+        ),
+        migrations.AddField(
+            model_name='voucher',
+            name='is_year_end_closing',
+            field=models.BooleanField(default=False, editable=False, help_text='System-generated entry closing P&L into retained earnings.', verbose_name='Year-End Closing Entry'),
+        ),
+        migrations.CreateModel(
+            name='HistoricalAccountOpeningBalance',
+            fields=[
+                ('deleted', models.DateTimeField(db_index=True, editable=False, null=True)),
+                ('deleted_by_cascade', models.BooleanField(default=False, editable=False)),
+                ('id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(blank=True, editable=False, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(blank=True, editable=False, verbose_name='Updated At')),
+                ('debit_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20, verbose_name='Opening Debit')),
+                ('credit_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20, verbose_name='Opening Credit')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('account', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='crp_accounting.account', verbose_name='Account')),
+                ('company', models.ForeignKey(blank=True, db_constraint=False, help_text='The company this record belongs to.', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='company.company', verbose_name='Company')),
+                ('created_by', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('fiscal_year', models.ForeignKey(blank=True, db_constraint=False, help_text='The fiscal year this opening balance belongs to.', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='crp_accounting.fiscalyear', verbose_name='Fiscal Year')),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('updated_by', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Last Updated By')),
+            ],
+            options={
+                'verbose_name': 'historical Account Opening Balance',
+                'verbose_name_plural': 'historical Account Opening Balances',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name='AccountOpeningBalance',
+            fields=[
+                ('deleted', models.DateTimeField(db_index=True, editable=False, null=True)),
+                ('deleted_by_cascade', models.BooleanField(default=False, editable=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('debit_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20, verbose_name='Opening Debit')),
+                ('credit_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=20, verbose_name='Opening Credit')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='opening_balances', to='crp_accounting.account', verbose_name='Account')),
+                ('company', models.ForeignKey(help_text='The company this record belongs to.', on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_related', to='company.company', verbose_name='Company')),
+                ('created_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(app_label)s_%(class)s_set', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('fiscal_year', models.ForeignKey(help_text='The fiscal year this opening balance belongs to.', on_delete=django.db.models.deletion.CASCADE, related_name='opening_balances', to='crp_accounting.fiscalyear', verbose_name='Fiscal Year')),
+                ('updated_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(app_label)s_%(class)s_set', to=settings.AUTH_USER_MODEL, verbose_name='Last Updated By')),
+            ],
+            options={
+                'verbose_name': 'Account Opening Balance',
+                'verbose_name_plural': 'Account Opening Balances',
+                'ordering': ['fiscal_year__start_date', 'account__account_number'],
+                'indexes': [models.Index(fields=['company', 'fiscal_year'], name='acctopen_co_fy_idx')],
+                'unique_together': {('fiscal_year', 'account')},
+            },
+        ),
+    ]
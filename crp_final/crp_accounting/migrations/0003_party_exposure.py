@@ -0,0 +1,97 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:04
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, Q, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_party_exposure(apps, schema_editor):
+    """Initial posted balance / unposted documents per party, one grouped query each."""
+    Party = apps.get_model('crp_accounting', 'Party')
+    VoucherLine = apps.get_model('crp_accounting', 'VoucherLine')
+    CustomerInvoice = apps.get_model('crp_accounting', 'CustomerInvoice')
+    VendorBill = apps.get_model('crp_accounting', 'VendorBill')
+    zero = Decimal('0.00')
+
+    posted = {}
+    rows = VoucherLine.objects.filter(
+        voucher__status='POSTED', voucher__party__isnull=False,
+        account_id=F('voucher__party__control_account_id'),
+    ).values('voucher__party_id', 'account__account_nature').annotate(
+        dr=Coalesce(Sum('amount', filter=Q(dr_cr='DEBIT')), zero, output_field=models.DecimalField()),
+        cr=Coalesce(Sum('amount', filter=Q(dr_cr='CREDIT')), zero, output_field=models.DecimalField()),
+    ).order_by()
+    for row in rows:
+        is_credit = row['account__account_nature'] == 'CREDIT'
+        posted[row['voucher__party_id']] = (row['cr'] - row['dr']) if is_credit else (row['dr'] - row['cr'])
+
+    unposted = {}
+    for party_field, qs in (
+            ('customer_id', CustomerInvoice.objects.filter(
+                deleted__isnull=True, related_gl_voucher__isnull=True,
+                status__in=['SENT', 'OVERDUE', 'PARTIALLY_PAID'])),
+            ('supplier_id', VendorBill.objects.filter(
+                deleted__isnull=True, related_gl_voucher__isnull=True,
+                status__in=['SUBMITTED', 'APPROVED', 'PARTIALLY_PAID'])),
+    ):
+        for row in qs.values(party_field).annotate(due=Sum('amount_due')).order_by():
+            unposted[row[party_field]] = unposted.get(row[party_field], zero) + (row['due'] or zero)
+
+    parties = []
+    for party in Party.objects.filter(pk__in=set(posted) | set(unposted)).only('id'):
+        party.posted_balance = posted.get(party.pk, zero)
+        party.unposted_documents_amount = unposted.get(party.pk, zero)
+        parties.append(party)
+    Party.objects.bulk_update(parties, ['posted_balance', 'unposted_documents_amount'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crp_accounting', '0002_year_end_close'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalparty',
+            name='exposure_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Exposure Last Updated'),
+        ),
+        migrations.AddField(
+            model_name='historicalparty',
+            name='open_orders_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Value of open orders not yet invoiced (optional; maintained by the ordering module).', max_digits=20, verbose_name='Open Orders Amount'),
+        ),
+        migrations.AddField(
+            model_name='historicalparty',
+            name='posted_balance',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Running balance of POSTED vouchers for this party on its Control Account (positive = customer owes us / we owe supplier).', max_digits=20, verbose_name='Posted Balance'),
+        ),
+        migrations.AddField(
+            model_name='historicalparty',
+            name='unposted_documents_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Amount due on issued invoices / approved bills not yet posted to the GL.', max_digits=20, verbose_name='Unposted Documents Amount'),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='exposure_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Exposure Last Updated'),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='open_orders_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Value of open orders not yet invoiced (optional; maintained by the ordering module).', max_digits=20, verbose_name='Open Orders Amount'),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='posted_balance',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Running balance of POSTED vouchers for this party on its Control Account (positive = customer owes us / we owe supplier).', max_digits=20, verbose_name='Posted Balance'),
+        ),
+        migrations.AddField(
+            model_name='party',
+            name='unposted_documents_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Amount due on issued invoices / approved bills not yet posted to the GL.', max_digits=20, verbose_name='Unposted Documents Amount'),
+        ),
+        migrations.RunPython(backfill_party_exposure, migrations.RunPython.noop),
+    ]
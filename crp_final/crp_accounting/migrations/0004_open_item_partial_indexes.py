@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_initial'),
+        ('crp_accounting', '0003_party_exposure'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customerinvoice',
+            index=models.Index(condition=models.Q(('deleted__isnull', True), ('status__in', ['SENT', 'PARTIALLY_PAID', 'OVERDUE'])), fields=['company', 'customer', 'due_date'], name='custinv_open_co_cust_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerinvoice',
+            index=models.Index(condition=models.Q(('deleted__isnull', True), ('status__in', ['DRAFT', 'SENT', 'PARTIALLY_PAID', 'OVERDUE'])), fields=['company', 'invoice_date'], name='custinv_aging_co_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerpayment',
+            index=models.Index(condition=models.Q(('deleted__isnull', True), ('status__in', ['UNAPPLIED', 'PARTIALLY_APPLIED'])), fields=['company', 'customer', 'payment_date'], name='custpay_unapplied_co_cust_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendorbill',
+            index=models.Index(condition=models.Q(('amount_due__gt', 0), ('deleted__isnull', True), ('status__in', ['APPROVED', 'PARTIALLY_PAID'])), fields=['company', 'supplier', 'due_date'], name='vbill_open_co_supp_due_idx'),
+        ),
+    ]
@@ -0,0 +1,146 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:16
+
+import django.core.validators
+import django.db.models.deletion
+import simple_history.models
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_initial'),
+        ('crp_accounting', '0004_open_item_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringVoucherTemplateLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dr_cr', models.CharField(choices=[('DEBIT', 'Dr'), ('CREDIT', 'Cr')], max_length=6, verbose_name='Dr/Cr')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=20, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))], verbose_name='Amount')),
+                ('narration', models.TextField(blank=True, verbose_name='Line Narration')),
+            ],
+            options={
+                'verbose_name': 'Recurring Voucher Template Line',
+                'verbose_name_plural': 'Recurring Voucher Template Lines',
+                'ordering': ['pk'],
+            },
+        ),
+        migrations.AddField(
+            model_name='historicalvoucher',
+            name='recurring_occurrence_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Recurring Occurrence'),
+        ),
+        migrations.AddField(
+            model_name='voucher',
+            name='recurring_occurrence_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Recurring Occurrence'),
+        ),
+        migrations.CreateModel(
+            name='HistoricalRecurringVoucherTemplate',
+            fields=[
+                ('deleted', models.DateTimeField(db_index=True, editable=False, null=True)),
+                ('deleted_by_cascade', models.BooleanField(default=False, editable=False)),
+                ('id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(blank=True, editable=False, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(blank=True, editable=False, verbose_name='Updated At')),
+                ('name', models.CharField(max_length=150, verbose_name='Template Name')),
+                ('voucher_type', models.CharField(choices=[('GENERAL', 'General Voucher'), ('SALES', 'Sales Voucher'), ('PURCHASE', 'Purchase Voucher'), ('RECEIPT', 'Receipt Voucher'), ('PAYMENT', 'Payment Voucher'), ('CONTRA', 'Contra Voucher'), ('DEBIT_NOTE', 'Debit Note'), ('CREDIT_NOTE', 'Credit Note'), ('STOCK_JOURNAL', 'Stock Journal'), ('DEPRECIATION', 'Depreciation'), ('PURCHASE_REVERSAL', 'Purchase Reversal Voucher'), ('PAYMENT_REVERSAL', 'Payment Reversal Voucher')], default='GENERAL', max_length=30, verbose_name='Voucher Type')),
+                ('narration', models.TextField(verbose_name='Narration')),
+                ('reference', models.CharField(blank=True, max_length=100, null=True, verbose_name='Reference')),
+                ('frequency', models.CharField(choices=[('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly'), ('QUARTERLY', 'Quarterly'), ('YEARLY', 'Yearly')], default='MONTHLY', max_length=20, verbose_name='Frequency')),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Generate every N weeks/months/quarters/years.', validators=[django.core.validators.MinValueValidator(1)], verbose_name='Every')),
+                ('start_date', models.DateField(verbose_name='First Occurrence')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='Last Possible Occurrence')),
+                ('next_run_date', models.DateField(blank=True, db_index=True, editable=False, null=True, verbose_name='Next Occurrence')),
+                ('last_generated_date', models.DateField(blank=True, editable=False, null=True, verbose_name='Last Generated Occurrence')),
+                ('auto_post', models.BooleanField(default=False, help_text='Post generated vouchers immediately instead of leaving them as drafts.', verbose_name='Post Automatically')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active')),
+                ('history_id', models.AutoField(primary_key=True, serialize=False)),
+                ('history_date', models.DateTimeField(db_index=True)),
+                ('history_change_reason', models.CharField(max_length=100, null=True)),
+                ('history_type', models.CharField(choices=[('+', 'Created'), ('~', 'Changed'), ('-', 'Deleted')], max_length=1)),
+                ('company', models.ForeignKey(blank=True, db_constraint=False, help_text='The company this record belongs to.', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='company.company', verbose_name='Company')),
+                ('created_by', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('history_user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('party', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='crp_accounting.party', verbose_name='Party')),
+                ('updated_by', models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Last Updated By')),
+            ],
+            options={
+                'verbose_name': 'historical Recurring Voucher Template',
+                'verbose_name_plural': 'historical Recurring Voucher Templates',
+                'ordering': ('-history_date', '-history_id'),
+                'get_latest_by': ('history_date', 'history_id'),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+        migrations.CreateModel(
+            name='RecurringVoucherTemplate',
+            fields=[
+                ('deleted', models.DateTimeField(db_index=True, editable=False, null=True)),
+                ('deleted_by_cascade', models.BooleanField(default=False, editable=False)),
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('name', models.CharField(max_length=150, verbose_name='Template Name')),
+                ('voucher_type', models.CharField(choices=[('GENERAL', 'General Voucher'), ('SALES', 'Sales Voucher'), ('PURCHASE', 'Purchase Voucher'), ('RECEIPT', 'Receipt Voucher'), ('PAYMENT', 'Payment Voucher'), ('CONTRA', 'Contra Voucher'), ('DEBIT_NOTE', 'Debit Note'), ('CREDIT_NOTE', 'Credit Note'), ('STOCK_JOURNAL', 'Stock Journal'), ('DEPRECIATION', 'Depreciation'), ('PURCHASE_REVERSAL', 'Purchase Reversal Voucher'), ('PAYMENT_REVERSAL', 'Payment Reversal Voucher')], default='GENERAL', max_length=30, verbose_name='Voucher Type')),
+                ('narration', models.TextField(verbose_name='Narration')),
+                ('reference', models.CharField(blank=True, max_length=100, null=True, verbose_name='Reference')),
+                ('frequency', models.CharField(choices=[('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly'), ('QUARTERLY', 'Quarterly'), ('YEARLY', 'Yearly')], default='MONTHLY', max_length=20, verbose_name='Frequency')),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Generate every N weeks/months/quarters/years.', validators=[django.core.validators.MinValueValidator(1)], verbose_name='Every')),
+                ('start_date', models.DateField(verbose_name='First Occurrence')),
+                ('end_date', models.DateField(blank=True, null=True, verbose_name='Last Possible Occurrence')),
+                ('next_run_date', models.DateField(blank=True, db_index=True, editable=False, null=True, verbose_name='Next Occurrence')),
+                ('last_generated_date', models.DateField(blank=True, editable=False, null=True, verbose_name='Last Generated Occurrence')),
+                ('auto_post', models.BooleanField(default=False, help_text='Post generated vouchers immediately instead of leaving them as drafts.', verbose_name='Post Automatically')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active')),
+                ('company', models.ForeignKey(help_text='The company this record belongs to.', on_delete=django.db.models.deletion.PROTECT, related_name='%(app_label)s_%(class)s_related', to='company.company', verbose_name='Company')),
+                ('created_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_%(app_label)s_%(class)s_set', to=settings.AUTH_USER_MODEL, verbose_name='Created By')),
+                ('party', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='recurring_voucher_templates', to='crp_accounting.party', verbose_name='Party')),
+                ('updated_by', models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_%(app_label)s_%(class)s_set', to=settings.AUTH_USER_MODEL, verbose_name='Last Updated By')),
+            ],
+            options={
+                'verbose_name': 'Recurring Voucher Template',
+                'verbose_name_plural': 'Recurring Voucher Templates',
+                'ordering': ['company__name', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='historicalvoucher',
+            name='recurring_template',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='crp_accounting.recurringvouchertemplate', verbose_name='Recurring Template'),
+        ),
+        migrations.AddField(
+            model_name='voucher',
+            name='recurring_template',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_vouchers', to='crp_accounting.recurringvouchertemplate', verbose_name='Recurring Template'),
+        ),
+        migrations.AddConstraint(
+            model_name='voucher',
+            constraint=models.UniqueConstraint(condition=models.Q(('recurring_template__isnull', False)), fields=('recurring_template', 'recurring_occurrence_date'), name='voucher_recurring_occurrence_uniq'),
+        ),
+        migrations.AddField(
+            model_name='recurringvouchertemplateline',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='recurring_template_lines', to='crp_accounting.account', verbose_name='Account'),
+        ),
+        migrations.AddField(
+            model_name='recurringvouchertemplateline',
+            name='template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='crp_accounting.recurringvouchertemplate', verbose_name='Template'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringvouchertemplate',
+            index=models.Index(condition=models.Q(('deleted__isnull', True), ('is_active', True)), fields=['company', 'next_run_date'], name='recurvch_due_co_next_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recurringvouchertemplate',
+            unique_together={('company', 'name')},
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_initial'),
+        ('crp_accounting', '0005_recurring_voucher_templates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voucher',
+            index=models.Index(fields=['company', '-date', '-voucher_number'], name='voucher_co_date_num_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0002_initial'),
+        ('crp_accounting', '0006_voucher_list_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voucher',
+            index=models.Index(fields=['company', 'posted_at'], name='voucher_co_posted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,174 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# PostgreSQL only: VoucherSearchDocument is filled and kept current by triggers, and searched
+# through a pg_trgm GIN index on UPPER(document) (what Django's `icontains` compares).
+CREATE_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    r"""
+    CREATE OR REPLACE FUNCTION crp_voucher_search_document(p_voucher_id uuid) RETURNS text
+    LANGUAGE sql STABLE AS $$
+        SELECT concat_ws(E'\n', v.voucher_number, v.reference, v.narration, p.name,
+                         (SELECT string_agg(l.narration, E'\n' ORDER BY l.id)
+                          FROM crp_accounting_voucherline l
+                          WHERE l.voucher_id = v.id AND l.narration <> ''))
+        FROM crp_accounting_voucher v
+        LEFT JOIN crp_accounting_party p ON p.id = v.party_id
+        WHERE v.id = p_voucher_id
+    $$
+    """,
+    # Vouchers: one upsert per INSERT statement (bulk_create included), one per row on text changes
+    """
+    CREATE OR REPLACE FUNCTION crp_voucher_search_on_voucher_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO crp_accounting_vouchersearchdocument (voucher_id, document)
+        SELECT n.id, crp_voucher_search_document(n.id) FROM new_vouchers n
+        ON CONFLICT (voucher_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION crp_voucher_search_on_voucher_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO crp_accounting_vouchersearchdocument (voucher_id, document)
+        VALUES (NEW.id, crp_voucher_search_document(NEW.id))
+        ON CONFLICT (voucher_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER crp_voucher_search_insert AFTER INSERT ON crp_accounting_voucher
+    REFERENCING NEW TABLE AS new_vouchers
+    FOR EACH STATEMENT EXECUTE FUNCTION crp_voucher_search_on_voucher_insert()
+    """,
+    """
+    CREATE TRIGGER crp_voucher_search_update
+    AFTER UPDATE OF voucher_number, reference, narration, party_id ON crp_accounting_voucher
+    FOR EACH ROW WHEN (OLD.voucher_number IS DISTINCT FROM NEW.voucher_number
+                       OR OLD.reference IS DISTINCT FROM NEW.reference
+                       OR OLD.narration IS DISTINCT FROM NEW.narration
+                       OR OLD.party_id IS DISTINCT FROM NEW.party_id)
+    EXECUTE FUNCTION crp_voucher_search_on_voucher_update()
+    """,
+    # Lines: one refresh per statement of the vouchers whose line narrations changed.
+    # Only existing documents are updated, so a cascading voucher delete cannot re-create one.
+    """
+    CREATE OR REPLACE FUNCTION crp_voucher_search_on_line_change() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE crp_accounting_vouchersearchdocument d
+            SET document = crp_voucher_search_document(d.voucher_id)
+            WHERE d.voucher_id IN (SELECT n.voucher_id FROM new_lines n WHERE n.narration <> '');
+        ELSIF TG_OP = 'DELETE' THEN
+            UPDATE crp_accounting_vouchersearchdocument d
+            SET document = crp_voucher_search_document(d.voucher_id)
+            WHERE d.voucher_id IN (SELECT o.voucher_id FROM old_lines o WHERE o.narration <> '');
+        ELSE
+            UPDATE crp_accounting_vouchersearchdocument d
+            SET document = crp_voucher_search_document(d.voucher_id)
+            WHERE d.voucher_id IN (
+                SELECT unnest(ARRAY[o.voucher_id, n.voucher_id])
+                FROM old_lines o JOIN new_lines n ON n.id = o.id
+                WHERE o.narration IS DISTINCT FROM n.narration OR o.voucher_id IS DISTINCT FROM n.voucher_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER crp_voucher_search_line_insert AFTER INSERT ON crp_accounting_voucherline
+    REFERENCING NEW TABLE AS new_lines
+    FOR EACH STATEMENT EXECUTE FUNCTION crp_voucher_search_on_line_change()
+    """,
+    """
+    CREATE TRIGGER crp_voucher_search_line_update AFTER UPDATE ON crp_accounting_voucherline
+    REFERENCING OLD TABLE AS old_lines NEW TABLE AS new_lines
+    FOR EACH STATEMENT EXECUTE FUNCTION crp_voucher_search_on_line_change()
+    """,
+    """
+    CREATE TRIGGER crp_voucher_search_line_delete AFTER DELETE ON crp_accounting_voucherline
+    REFERENCING OLD TABLE AS old_lines
+    FOR EACH STATEMENT EXECUTE FUNCTION crp_voucher_search_on_line_change()
+    """,
+    # Party renames (rare) rewrite the documents of that party's vouchers
+    """
+    CREATE OR REPLACE FUNCTION crp_voucher_search_on_party_rename() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE crp_accounting_vouchersearchdocument d
+        SET document = crp_voucher_search_document(d.voucher_id)
+        FROM crp_accounting_voucher v
+        WHERE v.id = d.voucher_id AND v.party_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER crp_voucher_search_party_rename AFTER UPDATE OF name ON crp_accounting_party
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION crp_voucher_search_on_party_rename()
+    """,
+    # Backfill after the triggers exist (no write is missed), then index
+    """
+    INSERT INTO crp_accounting_vouchersearchdocument (voucher_id, document)
+    SELECT v.id, crp_voucher_search_document(v.id) FROM crp_accounting_voucher v
+    ON CONFLICT (voucher_id) DO UPDATE SET document = EXCLUDED.document
+    """,
+    """
+    CREATE INDEX voucher_search_doc_trgm_idx ON crp_accounting_vouchersearchdocument
+    USING gin (UPPER(document) gin_trgm_ops)
+    """,
+]
+
+DROP_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS voucher_search_doc_trgm_idx",
+    "DROP TRIGGER IF EXISTS crp_voucher_search_party_rename ON crp_accounting_party",
+    "DROP TRIGGER IF EXISTS crp_voucher_search_line_delete ON crp_accounting_voucherline",
+    "DROP TRIGGER IF EXISTS crp_voucher_search_line_update ON crp_accounting_voucherline",
+    "DROP TRIGGER IF EXISTS crp_voucher_search_line_insert ON crp_accounting_voucherline",
+    "DROP TRIGGER IF EXISTS crp_voucher_search_update ON crp_accounting_voucher",
+    "DROP TRIGGER IF EXISTS crp_voucher_search_insert ON crp_accounting_voucher",
+    "DROP FUNCTION IF EXISTS crp_voucher_search_on_party_rename()",
+    "DROP FUNCTION IF EXISTS crp_voucher_search_on_line_change()",
+    "DROP FUNCTION IF EXISTS crp_voucher_search_on_voucher_update()",
+    "DROP FUNCTION IF EXISTS crp_voucher_search_on_voucher_insert()",
+    "DROP FUNCTION IF EXISTS crp_voucher_search_document(uuid)",
+]
+
+
+def _run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return  # Other databases search the columns directly
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crp_accounting', '0007_voucher_posted_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoucherSearchDocument',
+            fields=[
+                ('voucher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='crp_accounting.voucher', verbose_name='Voucher')),
+                ('document', models.TextField(blank=True, default='', editable=False, verbose_name='Search Document')),
+            ],
+            options={
+                'verbose_name': 'Voucher Search Document',
+                'verbose_name_plural': 'Voucher Search Documents',
+            },
+        ),
+        migrations.RunPython(_run_on_postgresql(CREATE_SEARCH_SQL), _run_on_postgresql(DROP_SEARCH_SQL)),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_tree_paths(apps, schema_editor):
+    # Same derivation as AccountGroup._set_tree_fields, walked top-down from the top-level groups
+    AccountGroup = apps.get_model('crp_accounting', 'AccountGroup')
+    groups = list(AccountGroup.objects.only('id', 'name', 'parent_group_id'))
+    children = {}
+    for group in groups:
+        children.setdefault(group.parent_group_id, []).append(group)
+    pending = [(group, None) for group in children.get(None, [])]
+    while pending:
+        group, parent = pending.pop()
+        step = f"{group.pk.hex}/"
+        if parent is None:
+            group.tree_path, group.depth, group.full_path = f"/{step}", 0, group.name
+        else:
+            group.tree_path = f"{parent.tree_path}{step}"
+            group.depth = parent.depth + 1
+            group.full_path = f"{parent.full_path} > {group.name}"
+        pending.extend((child, group) for child in children.get(group.pk, []))
+    AccountGroup.objects.bulk_update(groups, ['tree_path', 'depth', 'full_path'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0003_company_coa_seeding_status'),
+        ('crp_accounting', '0008_voucher_search_documents'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accountgroup',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='0 for top-level groups.', verbose_name='Depth'),
+        ),
+        migrations.AddField(
+            model_name='accountgroup',
+            name='full_path',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Names from the top-level group down (e.g., Assets > Current Assets).', verbose_name='Full Path'),
+        ),
+        migrations.AddField(
+            model_name='accountgroup',
+            name='tree_path',
+            field=models.CharField(default='', editable=False, help_text='Ids of the ancestors and of the group itself, from the top-level group down.', max_length=661, verbose_name='Tree Path'),
+        ),
+        migrations.AddField(
+            model_name='historicalaccountgroup',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='0 for top-level groups.', verbose_name='Depth'),
+        ),
+        migrations.AddField(
+            model_name='historicalaccountgroup',
+            name='full_path',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Names from the top-level group down (e.g., Assets > Current Assets).', verbose_name='Full Path'),
+        ),
+        migrations.AddField(
+            model_name='historicalaccountgroup',
+            name='tree_path',
+            field=models.CharField(default='', editable=False, help_text='Ids of the ancestors and of the group itself, from the top-level group down.', max_length=661, verbose_name='Tree Path'),
+        ),
+        migrations.RunPython(backfill_tree_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='accountgroup',
+            index=models.Index(fields=['tree_path'], name='acctgroup_tree_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
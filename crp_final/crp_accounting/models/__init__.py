@@ -3,4 +3,5 @@ from .party import *
 from .journal import *
 from .period import *
 from .receivables import *
-from .payables import *
\ No newline at end of file
+from .payables import *
+from .recurring import *
\ No newline at end of file
@@ -1,12 +1,13 @@
 # crp_accounting/models/coa.py
 import logging
+import uuid
 from datetime import date # For date type hinting and operations
 from decimal import Decimal # For precise monetary calculations
 from typing import Optional, List, Dict, Any  # For type hints to improve code readability and maintainability
 
 from django.db import models, transaction # Django ORM and atomic transaction support
-from django.db.models import Sum, Q # For complex database queries (Sum aggregation, Q objects for OR/AND)
-from django.db.models.functions import Coalesce # For handling NULL values in database aggregations
+from django.db.models import Sum, Q, F, Max, Value # For complex database queries (Sum aggregation, Q objects for OR/AND)
+from django.db.models.functions import Coalesce, Concat, Substr # NULL handling in aggregations, path rewrites
 from django.utils.translation import gettext_lazy as _ # For internationalization of strings
 from django.core.exceptions import ValidationError # For raising data validation errors
 from django.utils import timezone  # Django's timezone utility for datetime operations
@@ -44,6 +45,13 @@ ACCOUNT_TYPE_TO_NATURE: Dict[str, str] = {
     AccountType.COST_OF_GOODS_SOLD.value: AccountNature.DEBIT.value,
 }
 
+# Account group tree (materialized path). Every AccountGroup stores the ids of its ancestors and
+# itself ("/<root id>/.../<own id>/", hex UUIDs), its depth and its full name path, so a subtree is
+# one indexed prefix query and a path needs no walk up the parents.
+GROUP_TREE_MAX_DEPTH = 20  # Levels, top-level groups included
+GROUP_TREE_STEP_LENGTH = 33  # 32 hex digits + '/'
+GROUP_FULL_PATH_SEPARATOR = " > "
+
 
 class PLSection(models.TextChoices):
     """
@@ -100,6 +108,21 @@ class AccountGroup(TenantScopedModel):
         related_name='sub_groups', # Name to use for the reverse relation from parent to sub-groups.
         help_text=_("Assign parent for hierarchy. Leave blank for top-level group.")
     )
+    # Materialized path, maintained by save() (descendants rewritten in bulk on moves and renames)
+    tree_path = models.CharField(
+        _("Tree Path"),
+        max_length=1 + GROUP_TREE_MAX_DEPTH * GROUP_TREE_STEP_LENGTH,
+        default='', editable=False,
+        help_text=_("Ids of the ancestors and of the group itself, from the top-level group down.")
+    )
+    depth = models.PositiveSmallIntegerField(
+        _("Depth"), default=0, editable=False,
+        help_text=_("0 for top-level groups.")
+    )
+    full_path = models.TextField(
+        _("Full Path"), blank=True, default='', editable=False,
+        help_text=_("Names from the top-level group down (e.g., Assets > Current Assets).")
+    )
 
     class Meta:
         # Ensures that 'name' is unique within the scope of a single 'company'.
@@ -107,6 +130,10 @@ class AccountGroup(TenantScopedModel):
         verbose_name = _('Account Group')
         verbose_name_plural = _('Account Groups')
         ordering = ['name'] # Default ordering when querying lists of account groups.
+        indexes = [
+            # Prefix (LIKE 'path%') lookups for subtrees; the pattern opclass is used on PostgreSQL only
+            models.Index(fields=['tree_path'], name='acctgroup_tree_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
 
     def __str__(self) -> str:
         """
@@ -125,21 +152,25 @@ class AccountGroup(TenantScopedModel):
         """
         super().clean()  # Call the clean method of the parent class (TenantScopedModel).
 
-        # 1. Prevent circular parent references: A group cannot be its own ancestor.
+        # 1. Prevent circular parent references: the new parent cannot be the group or one of its
+        #    descendants, i.e. a group whose stored tree path starts with this group's.
         parent = self.parent_group
-        # Initialize with self.pk if instance is already saved, otherwise an empty set for new instances.
-        visited_ancestors = {self.pk} if self.pk else set()
-        while parent:
-            # Check for unsaved instance pointing to itself as parent.
-            if parent.pk is None and parent is self:
+        if parent is not None:
+            if parent is self or (parent.pk is not None and parent.pk == self.pk):
                 raise ValidationError({'parent_group': _("An account group cannot be its own parent.")})
-            # Check if the current parent's pk has already been visited in the chain.
-            if parent.pk is not None and parent.pk in visited_ancestors:
+            if self.tree_path and parent.tree_path.startswith(self.tree_path):
                 raise ValidationError(
                     {'parent_group': _("Circular dependency detected: This group cannot be an ancestor of itself.")})
-            if parent.pk: # Add saved parent's pk to visited set.
-                visited_ancestors.add(parent.pk)
-            parent = parent.parent_group # Move up to the next parent.
+            if self._tree_parent_changed():
+                subtree_height = 0
+                if self.tree_path:  # Saved group being moved: its deepest descendant moves along
+                    deepest = AccountGroup.global_all_objects_including_deleted.filter(
+                        tree_path__startswith=self.tree_path).aggregate(deepest=Max('depth'))['deepest']
+                    subtree_height = deepest - self.depth if deepest is not None else 0
+                if parent.depth + 1 + subtree_height >= GROUP_TREE_MAX_DEPTH:
+                    raise ValidationError({'parent_group': _(
+                        "Account groups cannot be nested more than %(max)d levels deep.") % {
+                        'max': GROUP_TREE_MAX_DEPTH}})
 
         # 2. Ensure parent group (if any) belongs to the same company as this group.
         if self.parent_group and self.company_id and self.parent_group.company_id != self.company_id:
@@ -147,35 +178,129 @@ class AccountGroup(TenantScopedModel):
                 'parent_group': _("Parent group must belong to the same company as this group.")
             })
 
+    def save_base(self, *args, **kwargs):
+        """
+        Derives the stored tree fields from the parent's, then (moves and renames) rewrites the
+        paths of all descendants with a single UPDATE. Runs after save()'s full_clean, so clean()
+        still sees the stored paths.
+        """
+        old_tree_path, old_full_path, old_depth = self.tree_path, self.full_path, self.depth
+        self._set_tree_fields()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = frozenset(kwargs['update_fields']) | {'tree_path', 'depth', 'full_path'}
+        with transaction.atomic():
+            super().save_base(*args, **kwargs)
+            if old_tree_path and (old_tree_path != self.tree_path or old_full_path != self.full_path):
+                self._rewrite_descendant_paths(old_tree_path, old_full_path, old_depth)
+
+    @property
+    def tree_step(self) -> str:
+        """This group's segment of the tree path."""
+        return f"{uuid.UUID(str(self.pk)).hex}/"
+
+    @property
+    def ancestor_ids(self) -> List[uuid.UUID]:
+        """PKs of the ancestors, top-level group first (from the stored tree path)."""
+        return [uuid.UUID(step) for step in self.tree_path.strip('/').split('/')[:-1]] if self.tree_path else []
+
+    def _set_tree_fields(self) -> None:
+        """Sets tree_path, depth and full_path from the parent's (saved, or built before this group)."""
+        parent = self.parent_group
+        if parent is None:
+            self.tree_path, self.depth, self.full_path = f"/{self.tree_step}", 0, self.name
+        else:
+            self.tree_path = f"{parent.tree_path}{self.tree_step}"
+            self.depth = parent.depth + 1
+            self.full_path = f"{parent.full_path}{GROUP_FULL_PATH_SEPARATOR}{self.name}"
+
+    def _tree_parent_changed(self) -> bool:
+        parent = self.parent_group
+        expected = f"{parent.tree_path}{self.tree_step}" if parent is not None else f"/{self.tree_step}"
+        return self.tree_path != expected
+
+    def _rewrite_descendant_paths(self, old_tree_path: str, old_full_path: str, old_depth: int) -> int:
+        """Replaces the old path prefixes of every descendant (soft-deleted ones included) in one UPDATE."""
+        return AccountGroup.global_all_objects_including_deleted.filter(
+            tree_path__startswith=old_tree_path
+        ).exclude(pk=self.pk).update(
+            tree_path=Concat(Value(self.tree_path), Substr('tree_path', len(old_tree_path) + 1),
+                             output_field=models.CharField()),
+            full_path=Concat(Value(self.full_path), Substr('full_path', len(old_full_path) + 1),
+                             output_field=models.TextField()),
+            depth=F('depth') + (self.depth - old_depth),
+        )
+
+    @classmethod
+    def rebuild_tree_paths(cls, company_id: Any) -> int:
+        """
+        Recomputes the stored tree fields of all groups of a company from `parent_group`
+        (after bulk writes that bypass save()). Returns the number of groups updated.
+        """
+        groups = list(cls.global_all_objects_including_deleted.filter(company_id=company_id)
+                      .only('id', 'name', 'parent_group_id', 'tree_path', 'depth', 'full_path'))
+        children: Dict[Any, List['AccountGroup']] = {}
+        for group in groups:
+            children.setdefault(group.parent_group_id, []).append(group)
+        changed, reached = [], 0
+        pending = [(group, None) for group in children.get(None, [])]
+        while pending:
+            group, parent = pending.pop()
+            reached += 1
+            stored = (group.tree_path, group.depth, group.full_path)
+            group.parent_group = parent  # Walked top-down, so the parent's fields are already current
+            group._set_tree_fields()
+            if (group.tree_path, group.depth, group.full_path) != stored:
+                changed.append(group)
+            pending.extend((child, group) for child in children.get(group.pk, []))
+        if reached != len(groups):
+            logger.warning(f"AccountGroup tree rebuild for Company {company_id}: {len(groups) - reached} groups "
+                           "are not reachable from a top-level group (parent cycle); their paths were left as is.")
+        cls.global_all_objects_including_deleted.bulk_update(changed, ['tree_path', 'depth', 'full_path'],
+                                                             batch_size=500)
+        return len(changed)
+
+    def get_descendants(self, include_self: bool = False) -> models.QuerySet:
+        """Sub-groups at any depth, with one prefix query on the indexed tree path."""
+        descendants = AccountGroup.objects.filter(tree_path__startswith=self.tree_path)
+        return descendants if include_self else descendants.exclude(pk=self.pk)
+
     def get_all_child_accounts(self, include_inactive_accounts: bool = False) -> List['Account']:
         """
-        Recursively retrieves all `Account` instances belonging to this group
-        and all its sub-groups.
+        Retrieves all `Account` instances belonging to this group and all its sub-groups,
+        with two prefix queries on the tree path (sub-groups, then accounts).
+        The order is the same as walking the tree: a group's own accounts by account number,
+        then each sub-group (by name) in turn.
 
         Args:
             include_inactive_accounts (bool): If True, includes accounts that are
-                marked as inactive or soft-deleted (if using SafeDeleteModel features).
-                Defaults to False.
+                soft-deleted (SafeDeleteModel). Defaults to False.
 
         Returns:
             List['Account']: A list of Account objects.
         """
-        # Determine which queryset manager to use based on 'include_inactive_accounts'.
-        # Assumes 'accounts' related manager has 'all_objects_including_deleted' if it's a SafeDelete related manager.
-        if include_inactive_accounts and hasattr(self.accounts, 'all_objects_including_deleted'):
-            accounts_qs = self.accounts.all_objects_including_deleted()
-        else:
-            accounts_qs = self.accounts.all() # Default manager (e.g., TenantSafeDeleteManager)
-
-        accounts = list(accounts_qs) # Get accounts directly under this group.
-        # Recursively get accounts from all sub-groups.
-        for sub_group in self.sub_groups.all(): # .all() on related manager respects default manager filtering.
-            accounts.extend(sub_group.get_all_child_accounts(include_inactive_accounts=include_inactive_accounts))
+        children: Dict[Any, List[Any]] = {}
+        for group_id, parent_id in (self.get_descendants().order_by('name')
+                                    .values_list('pk', 'parent_group_id')):
+            children.setdefault(parent_id, []).append(group_id)
+        manager = Account.all_objects_including_deleted if include_inactive_accounts else Account.objects
+        accounts_by_group: Dict[Any, List['Account']] = {}
+        for account in (manager.filter(account_group__tree_path__startswith=self.tree_path)
+                        .order_by('account_number')):
+            accounts_by_group.setdefault(account.account_group_id, []).append(account)
+
+        accounts: List['Account'] = []
+        pending = [self.pk]
+        while pending:  # Pre-order walk; soft-deleted sub-groups (and what is under them) are skipped
+            group_id = pending.pop()
+            accounts.extend(accounts_by_group.get(group_id, []))
+            pending.extend(reversed(children.get(group_id, [])))
         return accounts
 
-    def get_full_path(self, separator: str = " > ") -> str:
+    def get_full_path(self, separator: str = GROUP_FULL_PATH_SEPARATOR) -> str:
         """
-        Constructs the full hierarchical path of the account group (e.g., "Assets > Current Assets > Cash").
+        The full hierarchical path of the account group (e.g., "Assets > Current Assets > Cash").
+        The default separator returns the stored path; another separator costs one query for the
+        ancestors' names.
 
         Args:
             separator (str): The string used to separate group names in the path.
@@ -183,18 +308,15 @@ class AccountGroup(TenantScopedModel):
         Returns:
             str: The full path string.
         """
-        path_parts = [self.name]
-        parent = self.parent_group
-        recursion_limit, count = 20, 0 # Safety mechanism to prevent infinite loops in case of data corruption.
-        while parent and count < recursion_limit:
-            path_parts.insert(0, parent.name) # Prepend parent's name.
-            parent = parent.parent_group
-            count += 1
-        if count >= recursion_limit: # If recursion limit was hit, indicate path truncation.
-            path_parts.insert(0, "...")
-            logger.warning(
-                f"AccountGroup {self.pk or 'NEW'} full path calculation might be truncated due to excessive depth or a potential cycle not caught by clean().")
-        return separator.join(path_parts)
+        if not self.tree_path:  # Not saved yet: the parent's stored path plus this name
+            parent = self.parent_group
+            return f"{parent.get_full_path(separator)}{separator}{self.name}" if parent else self.name
+        if separator == GROUP_FULL_PATH_SEPARATOR:
+            return self.full_path
+        ancestor_ids = self.ancestor_ids
+        names = dict(AccountGroup.global_all_objects_including_deleted.filter(pk__in=ancestor_ids)
+                     .values_list('pk', 'name'))
+        return separator.join([names.get(pk, "...") for pk in ancestor_ids] + [self.name])
 
 
 class Account(TenantScopedModel):
@@ -0,0 +1,102 @@
+# crp_accounting/models/deferred_recalc.py
+"""
+Deferred, de-duplicated recalculation of parent documents (bills, invoices, payments)
+after their child rows change.
+
+Saving N lines used to recalculate and re-save the parent N times. Child models now call
+`schedule_parent_recalculation(parent, method_name, **kwargs)` instead, which records the
+parent in the dirty set of the enclosing `deferred_parent_recalculation()` block. Each dirty
+parent is recalculated exactly once when that block exits, still inside the caller's
+transaction, so a failing recalculation rolls the line changes back with it.
+Without an enclosing block the recalculation runs immediately, as before.
+"""
+
+import contextvars
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+logger = logging.getLogger("crp_accounting.models.deferred_recalc")
+
+RecalcKey = Tuple[str, Any, str]  # (model label, parent pk, method name)
+
+# Registry of the innermost explicit `deferred_parent_recalculation()` block, if any
+_explicit_registry_context_var: contextvars.ContextVar[Optional['_DirtyParentRegistry']] = contextvars.ContextVar(
+    "deferred_recalc_explicit_registry",
+    default=None
+)
+
+
+class _DirtyParentRegistry:
+    """Dirty parents of one explicit block. Calling the registry recalculates and clears them."""
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.using = using
+        self.pending: Dict[RecalcKey, Tuple[Any, Dict[str, Any]]] = {}
+
+    def add(self, parent, method_name: str, method_kwargs: Dict[str, Any]):
+        key = (parent._meta.label, parent.pk, method_name)
+        # Last scheduled kwargs win; the parent is only recalculated once
+        self.pending[key] = (parent, method_kwargs)
+
+    def __call__(self):
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        logger.debug("[DeferredRecalc] Recalculating %s dirty parent(s).", len(pending))
+        with transaction.atomic(using=self.using):
+            for (_label, _pk, method_name), (parent, method_kwargs) in pending.items():
+                getattr(parent, method_name)(**method_kwargs)
+
+
+def schedule_parent_recalculation(parent, method_name: str, using: str = DEFAULT_DB_ALIAS, **method_kwargs):
+    """
+    Marks `parent` dirty so `getattr(parent, method_name)(**method_kwargs)` runs once per
+    `deferred_parent_recalculation()` block; without an enclosing block it runs right away.
+    """
+    if parent is None or not parent.pk:
+        return
+
+    explicit_registry = _explicit_registry_context_var.get()
+    if explicit_registry is not None and explicit_registry.using == using:
+        explicit_registry.add(parent, method_name, method_kwargs)
+        return
+
+    getattr(parent, method_name)(**method_kwargs)
+
+
+class deferred_parent_recalculation:
+    """
+    Collects parent recalculations scheduled inside the block and runs each once on exit,
+    still inside the caller's transaction (so totals are correct before later code reads them
+    and a failure rolls back with the line changes). The parent instances the lines point at
+    are updated in place. Nothing is recalculated if the block exits with an exception.
+
+    Usage:
+        with transaction.atomic(), deferred_parent_recalculation():
+            for line in lines:
+                line.save()
+        # every touched bill/invoice has been recalculated exactly once here
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.using = using
+        self._registry: Optional[_DirtyParentRegistry] = None
+        self._token = None
+
+    def __enter__(self):
+        if _explicit_registry_context_var.get() is not None:
+            return self  # Nested: the outermost block flushes
+        self._registry = _DirtyParentRegistry(self.using)
+        self._token = _explicit_registry_context_var.set(self._registry)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._token is None:
+            return False
+        _explicit_registry_context_var.reset(self._token)
+        self._token = None
+        if exc_type is None:
+            self._registry()
+        return False
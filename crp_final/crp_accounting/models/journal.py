@@ -8,7 +8,8 @@ from django.conf import settings
 # from django.contrib.contenttypes.fields import GenericForeignKey # Uncomment if GFK is used
 # from django.contrib.contenttypes.models import ContentType      # Uncomment if GFK is used
 from django.db import models
-from django.db.models import Sum, Q
+from django.db.models import Sum, Q, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError as DjangoValidationError, ObjectDoesNotExist
@@ -179,6 +180,12 @@ class Voucher(TenantScopedModel):
     is_reversed = models.BooleanField(_("Is Reversed"), default=False, editable=False, db_index=True)
     balances_updated = models.BooleanField(_("Balances Updated Flag"), default=False, db_index=True, editable=False,
                                            help_text=_("Internal flag for task idempotency."))
+    is_year_end_closing = models.BooleanField(_("Year-End Closing Entry"), default=False, editable=False,
+                                              help_text=_("System-generated entry closing P&L into retained earnings."))
+    recurring_template = models.ForeignKey('crp_accounting.RecurringVoucherTemplate',
+                                           verbose_name=_("Recurring Template"), on_delete=models.SET_NULL,
+                                           null=True, blank=True, editable=False, related_name='generated_vouchers')
+    recurring_occurrence_date = models.DateField(_("Recurring Occurrence"), null=True, blank=True, editable=False)
 
     class Meta:  # Meta for Voucher
         verbose_name = _("Voucher")
@@ -188,20 +195,50 @@ class Voucher(TenantScopedModel):
         indexes = [
             models.Index(fields=['company', 'status', 'accounting_period'], name='vouch_co_stat_period_idx'),
             models.Index(fields=['company', 'date', 'voucher_type'], name='voucher_co_date_type_idx'),
+            # API list ordering (-date, -voucher_number): keyset pagination
+            models.Index(fields=['company', '-date', '-voucher_number'], name='voucher_co_date_num_idx'),
+            # Latest posting per company: report ETag / Last-Modified (ledger_version_service)
+            models.Index(fields=['company', 'posted_at'], name='voucher_co_posted_at_idx'),
             models.Index(fields=['company', 'party'], name='voucher_co_party_idx'),
             models.Index(fields=['is_reversal_for'], name='voucher_is_reversal_idx',
                          condition=Q(is_reversal_for__isnull=False)),
             models.Index(fields=['company', 'is_reversed', 'status'], name='voucher_co_rev_stat_idx'),
             models.Index(fields=['company', 'balances_updated', 'status'], name='voucher_co_balupd_stat_idx'),
         ]
+        constraints = [
+            # One voucher per template occurrence: makes recurring generation idempotent
+            models.UniqueConstraint(fields=['recurring_template', 'recurring_occurrence_date'],
+                                    name='voucher_recurring_occurrence_uniq',
+                                    condition=Q(recurring_template__isnull=False)),
+        ]
         permissions = [("submit_voucher", "Can submit voucher"), ("approve_voucher", "Can approve voucher"),
                        ("reject_voucher", "Can reject voucher"), ("post_voucher", "Can post voucher"),
                        ("create_reversal_voucher", "Can create reversal voucher"),
                        ("delete_draft_voucher", "Can delete draft voucher"),
                        ("view_all_company_vouchers", "Can view all company vouchers"), ]
 
+    @staticmethod
+    def line_totals_annotations() -> dict:
+        """
+        Expressions for annotating querysets with the line totals read by `total_debit`, `total_credit`,
+        `line_count` and `is_balanced` (e.g. `.annotate(**Voucher.line_totals_annotations())`).
+        Correlated subqueries, so they stay correct when the queryset is also filtered/searched on lines.
+        """
+        lines = VoucherLine.objects.filter(voucher=OuterRef('pk')).order_by().values('voucher')
+
+        def lines_sum(dr_cr: str):
+            return Coalesce(Subquery(lines.filter(dr_cr=dr_cr).annotate(total=Sum('amount')).values('total')),
+                            ZERO_DECIMAL, output_field=models.DecimalField(max_digits=20, decimal_places=2))
+
+        return {
+            'lines_total_debit': lines_sum(DrCrType.DEBIT.value),
+            'lines_total_credit': lines_sum(DrCrType.CREDIT.value),
+            'lines_count': Coalesce(Subquery(lines.annotate(count=Count('pk')).values('count')), 0),
+        }
+
     @property
     def total_debit(self) -> Decimal:
+        if hasattr(self, 'lines_total_debit'): return self.lines_total_debit
         if hasattr(self, '_prefetched_lines_total_debit'): return self._prefetched_lines_total_debit
         if not self.pk: return ZERO_DECIMAL
         return self.lines.filter(dr_cr=DrCrType.DEBIT.value).aggregate(total=Sum('amount', default=ZERO_DECIMAL))[
@@ -209,14 +246,22 @@ class Voucher(TenantScopedModel):
 
     @property
     def total_credit(self) -> Decimal:
+        if hasattr(self, 'lines_total_credit'): return self.lines_total_credit
         if hasattr(self, '_prefetched_lines_total_credit'): return self._prefetched_lines_total_credit
         if not self.pk: return ZERO_DECIMAL
         return self.lines.filter(dr_cr=DrCrType.CREDIT.value).aggregate(total=Sum('amount', default=ZERO_DECIMAL))[
             'total']
 
+    @property
+    def line_count(self) -> int:
+        if hasattr(self, 'lines_count'): return self.lines_count
+        if not self.pk: return 0
+        return self.lines.count()
+
     @property
     def is_balanced(self) -> bool:
-        if not self.pk or not self.lines.exists():
+        has_lines = self.lines_count > 0 if hasattr(self, 'lines_count') else bool(self.pk) and self.lines.exists()
+        if not self.pk or not has_lines:
             return True if self.status == TransactionStatus.DRAFT.value else False
         return abs(self.total_debit - self.total_credit) < Decimal('0.005')
 
@@ -275,8 +320,10 @@ class Voucher(TenantScopedModel):
                         "Period (Co: %(ap_co)s) must belong to Voucher's Co (Co: %(v_co)s).") % \
                                                   {'ap_co': period.company.name, 'v_co': voucher_effective_company.name}
                 elif self.date:
-                    if period.locked and (self._state.adding or getattr(Voucher.objects.filter(pk=self.pk).first(),
-                                                                        'accounting_period_id', None) != period.pk):
+                    # Year-end closing entries are posted into the (already locked) final period.
+                    if period.locked and not self.is_year_end_closing and (
+                            self._state.adding or getattr(Voucher.objects.filter(pk=self.pk).first(),
+                                                          'accounting_period_id', None) != period.pk):
                         errors['accounting_period'] = _("Period '%(name)s' is locked.") % {'name': period.name}
                     if not (period.start_date <= self.date <= period.end_date):
                         errors['date'] = _("Date %(v_date)s outside period '%(p_name)s' (%(p_s)s-%(p_e)s).") % \
@@ -481,4 +528,28 @@ class VoucherLine(models.Model):
     def save(self, *args, **kwargs):
         if not kwargs.pop('skip_clean', False): self.full_clean()
         super().save(*args, **kwargs)
-        logger.debug(f"VoucherLine {self.pk} for Voucher {self.voucher_id} saved.")
\ No newline at end of file
+        logger.debug(f"VoucherLine {self.pk} for Voucher {self.voucher_id} saved.")
+
+# =============================================================================
+# Voucher Search Document (PostgreSQL-maintained search text)
+# =============================================================================
+class VoucherSearchDocument(models.Model):
+    """
+    Text searched by the voucher list (`?search=` and the *_contains filters): voucher number,
+    reference, narration, party name and line narrations, one row per voucher.
+    On PostgreSQL, triggers keep it current on every write path (ORM saves, bulk_create, raw SQL)
+    and a pg_trgm GIN index on UPPER(document) answers `icontains`; see migration 0008.
+    Never written by the ORM. Other databases leave it empty and search the columns directly
+    (services.voucher_search_service).
+    """
+    voucher = models.OneToOneField(Voucher, verbose_name=_("Voucher"), on_delete=models.CASCADE, primary_key=True,
+                                   related_name='search_document')
+    document = models.TextField(_("Search Document"), blank=True, default='', editable=False)
+
+    class Meta:
+        verbose_name = _("Voucher Search Document")
+        verbose_name_plural = _("Voucher Search Documents")
+        # Trigram index (voucher_search_doc_trgm_idx) is created with the triggers, PostgreSQL only
+
+    def __str__(self):
+        return f"Search document for Voucher {self.voucher_id}"
@@ -4,7 +4,7 @@ import logging
 from decimal import Decimal
 from django.db import models
 # from django.db import transaction # Not used directly in this snippet
-from django.db.models import Sum, Q
+from django.db.models import Sum, Q, F
 from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
@@ -38,7 +38,8 @@ logger = logging.getLogger(__name__)
 class Party(TenantScopedModel):
     """
     Represents a financial party (Customer, Supplier, etc.) scoped to a specific company.
-    Balances are calculated dynamically based on the linked Control Account.
+    Balances as of a date are calculated dynamically from the linked Control Account; the
+    current credit exposure is maintained incrementally (see services/party_exposure_service.py).
     'company', 'created_at', 'updated_at', 'deleted_at', 'history' and company-aware managers
     are inherited from TenantScopedModel.
     """
@@ -89,6 +90,22 @@ class Party(TenantScopedModel):
         )
     )
 
+    # --- Maintained Exposure (updated by posting/reversal and document saves, not by users) ---
+    posted_balance = models.DecimalField(
+        _("Posted Balance"), max_digits=20, decimal_places=2, default=Decimal('0.00'), editable=False,
+        help_text=_("Running balance of POSTED vouchers for this party on its Control Account "
+                    "(positive = customer owes us / we owe supplier).")
+    )
+    unposted_documents_amount = models.DecimalField(
+        _("Unposted Documents Amount"), max_digits=20, decimal_places=2, default=Decimal('0.00'), editable=False,
+        help_text=_("Amount due on issued invoices / approved bills not yet posted to the GL.")
+    )
+    open_orders_amount = models.DecimalField(
+        _("Open Orders Amount"), max_digits=20, decimal_places=2, default=Decimal('0.00'), editable=False,
+        help_text=_("Value of open orders not yet invoiced (optional; maintained by the ordering module).")
+    )
+    exposure_updated_at = models.DateTimeField(_("Exposure Last Updated"), null=True, blank=True, editable=False)
+
     # --- Status ---
     is_active = models.BooleanField(
         _("Is Active"), default=True, db_index=True,
@@ -159,6 +176,43 @@ class Party(TenantScopedModel):
         self.full_clean(exclude=exclude_from_clean or None)
         super().save(*args, **kwargs)
 
+    # --- Maintained Exposure ---
+    EXPOSURE_FIELDS = ('posted_balance', 'unposted_documents_amount', 'open_orders_amount')
+
+    @staticmethod
+    def exposure_expression():
+        """Expression for annotating querysets with the total exposure (e.g. `.annotate(exposure=...)`)."""
+        return F('posted_balance') + F('unposted_documents_amount') + F('open_orders_amount')
+
+    @property
+    def total_exposure(self) -> Decimal:
+        return (self.posted_balance or Decimal('0.00')) + (self.unposted_documents_amount or Decimal('0.00')) + \
+            (self.open_orders_amount or Decimal('0.00'))
+
+    def refresh_exposure_from_db(self) -> Decimal:
+        """Re-reads only the maintained exposure columns (single-row read) and returns the total exposure."""
+        if self.pk:
+            row = Party._base_manager.filter(pk=self.pk).values(*self.EXPOSURE_FIELDS).first()
+            if row:
+                for field_name, value in row.items():
+                    setattr(self, field_name, value)
+        return self.total_exposure
+
+    def recalculate_unposted_documents_amount(self, perform_save: bool = True) -> Decimal:
+        """
+        Recomputes the amount due on documents issued to/by this party that are not yet in the GL.
+        Scheduled by CustomerInvoice and VendorBill saves (once per deferred_parent_recalculation() block).
+        """
+        from crp_accounting.services.party_exposure_service import aggregate_unposted_documents
+        new_amount = aggregate_unposted_documents(self.company_id, party_ids=[self.pk]).get(self.pk, Decimal('0.00'))
+        if new_amount != self.unposted_documents_amount:
+            self.unposted_documents_amount = new_amount
+            self.exposure_updated_at = timezone.now()
+            if perform_save:
+                Party._base_manager.filter(pk=self.pk).update(
+                    unposted_documents_amount=new_amount, exposure_updated_at=self.exposure_updated_at)
+        return new_amount
+
     def calculate_outstanding_balance(self, date_upto=None):
         if not self.control_account:
             logger.warning(
@@ -207,7 +261,8 @@ class Party(TenantScopedModel):
             return  # No limit to check against
 
         trans_amount_decimal = Decimal(transaction_amount)
-        current_balance = self.calculate_outstanding_balance(date_upto=timezone.now().date())
+        # Single-row read of the maintained exposure instead of aggregating the control account
+        current_balance = self.refresh_exposure_from_db()
         potential_balance = current_balance
 
         # For customers (debit nature), a new transaction increasing their balance (e.g., a sales invoice)
@@ -270,7 +325,8 @@ class Party(TenantScopedModel):
             # unless there's no control account, then it's truly N/A for calculation.
             return "N/A" if not self.control_account else "Within Limit (No Limit Set)"
 
-        current_balance = self.calculate_outstanding_balance(date_upto=timezone.now().date())
+        # Maintained exposure: uses the instance's values (list querysets load them with the row)
+        current_balance = self.total_exposure
 
         # The balance from calculate_outstanding_balance is positive if:
         # - Customer owes us (debit nature control account)
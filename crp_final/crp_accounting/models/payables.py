@@ -13,6 +13,7 @@ from django.core.validators import MinValueValidator
 from django.conf import settings
 
 from . import SMALL_TOLERANCE
+from .deferred_recalc import schedule_parent_recalculation
 
 # --- Base Model & Company Import ---
 try:
@@ -259,6 +260,12 @@ class VendorBill(TenantScopedModel):
         # Bill number (system generated) should be unique per company if not blank
         # Supplier bill reference should be unique for that supplier within the company
         unique_together = [('company', 'supplier', 'supplier_bill_reference'), ('company', 'bill_number')]
+        indexes = [
+            # Partial index over live open bills only (AP aging, payment selection, overdue lookups)
+            models.Index(fields=['company', 'supplier', 'due_date'], name='vbill_open_co_supp_due_idx',
+                         condition=Q(deleted__isnull=True, amount_due__gt=0,
+                                     status__in=[BillStatus.APPROVED.value, BillStatus.PARTIALLY_PAID.value])),
+        ]
         constraints = [models.CheckConstraint(check=Q(bill_number__isnull=False) | Q(status=BillStatus.DRAFT.value),
                                               name='non_draft_bill_must_have_number',
                                               violation_error_message=_("Non-draft bills must have a bill number."))]
@@ -408,6 +415,14 @@ class VendorBill(TenantScopedModel):
         if not kwargs.get('skip_clean', False) and not _recalculating: self.full_clean()
         super().save(*args, **kwargs)
         if not _recalculating and self.pk: self._recalculate_derived_fields(perform_save=True, _triggering_save=True)
+        # Approved-but-unposted bills count towards the supplier's maintained exposure
+        if self.supplier_id:
+            schedule_parent_recalculation(self.supplier, 'recalculate_unposted_documents_amount', perform_save=True)
+
+    def delete(self, *args, **kwargs):
+        supplier = self.supplier if self.supplier_id else None
+        super().delete(*args, **kwargs)
+        schedule_parent_recalculation(supplier, 'recalculate_unposted_documents_amount', perform_save=True)
 
 
 # =============================================================================
@@ -515,7 +530,7 @@ class BillLine(TenantScopedModel):
         Overrides the default save method to inject critical custom logic.
         1. Inherit the 'company' from the parent bill.
         2. Calculate line amounts.
-        3. Trigger recalculation on the parent bill's totals.
+        3. Schedule recalculation of the parent bill's totals (once per deferred block, not per line).
         """
         # --- FIX: Inherit Company from Parent ---
         # This is the crucial fix for the "company cannot be null" error. When a BillLine is
@@ -540,9 +555,10 @@ class BillLine(TenantScopedModel):
         # Call the original save method (from TenantScopedModel), which also runs full_clean().
         super().save(*args, **kwargs)
 
-        # After saving this line, tell the parent bill to update its totals.
-        if self.vendor_bill_id and hasattr(self.vendor_bill, '_recalculate_derived_fields'):
-            self.vendor_bill._recalculate_derived_fields(perform_save=True)
+        # After saving this line, mark the parent bill dirty; its totals are recalculated once when
+        # the enclosing deferred_parent_recalculation() block exits (or immediately without one).
+        if self.vendor_bill_id:
+            schedule_parent_recalculation(self.vendor_bill, '_recalculate_derived_fields', perform_save=True)
 
     def delete(self, *args, **kwargs):
         """Overrides delete to ensure the parent bill's totals are updated."""
@@ -551,9 +567,8 @@ class BillLine(TenantScopedModel):
 
         super().delete(*args, **kwargs)
 
-        # After deletion, trigger the recalculation.
-        if bill_to_update and hasattr(bill_to_update, '_recalculate_derived_fields'):
-            bill_to_update._recalculate_derived_fields(perform_save=True)
+        # After deletion, schedule the recalculation.
+        schedule_parent_recalculation(bill_to_update, '_recalculate_derived_fields', perform_save=True)
 # =============================================================================
 # VendorPayment Model
 # =============================================================================
@@ -831,15 +846,13 @@ class VendorPaymentAllocation(TenantScopedModel):
         super().save(*args, **kwargs)
 
         if self.vendor_payment_id:
-            self.vendor_payment._recalculate_derived_fields(perform_save=True)
+            schedule_parent_recalculation(self.vendor_payment, '_recalculate_derived_fields', perform_save=True)
         if self.vendor_bill_id:
-            self.vendor_bill._recalculate_derived_fields(perform_save=True)
+            schedule_parent_recalculation(self.vendor_bill, '_recalculate_derived_fields', perform_save=True)
 
     def delete(self, *args, **kwargs):
         payment = self.vendor_payment
         bill = self.vendor_bill
         super().delete(*args, **kwargs)
-        if payment:
-            payment._recalculate_derived_fields(perform_save=True)
-        if bill:
-            bill._recalculate_derived_fields(perform_save=True)
\ No newline at end of file
+        schedule_parent_recalculation(payment, '_recalculate_derived_fields', perform_save=True)
+        schedule_parent_recalculation(bill, '_recalculate_derived_fields', perform_save=True)
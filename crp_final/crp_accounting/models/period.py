@@ -1,12 +1,12 @@
 # crp_accounting/models/period.py
 
 import logging
+from decimal import Decimal
 from typing import Optional
 
 from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
-from django.utils import timezone # Import timezone
 
 from company.models import Company
 # --- Tenant Scoped Base Model Import ---
@@ -69,6 +69,21 @@ class FiscalYear(TenantScopedModel): # Inherit from TenantScopedModel
         null=True, blank=True,
         help_text=_("Timestamp when the fiscal year was closed.")
     )
+    closing_voucher = models.OneToOneField(
+        'crp_accounting.Voucher',
+        verbose_name=_("Closing Voucher"),
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='closed_fiscal_year',
+        editable=False,
+        help_text=_("Year-end voucher that transferred P&L balances to retained earnings.")
+    )
+    opening_balances_posted = models.BooleanField(
+        _("Opening Balances Posted"),
+        default=False,
+        editable=False,
+        help_text=_("Set when the previous year was closed and opening balances were carried into this year.")
+    )
 
     class Meta:
         # --- Enforce uniqueness within the company ---
@@ -171,7 +186,11 @@ class FiscalYear(TenantScopedModel): # Inherit from TenantScopedModel
         logger.info(f"FiscalYear {self.name} (ID: {self.pk}) for Company {self.company.name} activated.")
 
     def close_year(self, user=None):
-        """Closes the year for this company, locking further transactions."""
+        """
+        Closes the year for this company, locking further transactions.
+        Posts the year-end closing voucher (P&L -> retained earnings) and carries
+        balance sheet balances forward as opening balances of the next fiscal year.
+        """
         if self.status == "Closed":
             logger.info(f"FiscalYear {self.name} (ID: {self.pk}) for Company {self.company.name} is already closed.")
             return # Or raise error?
@@ -180,12 +199,10 @@ class FiscalYear(TenantScopedModel): # Inherit from TenantScopedModel
         if self.periods.filter(locked=False).exists():
             raise ValidationError(_("Cannot close fiscal year. All accounting periods within it must be locked first."))
 
-        self.status = "Closed"
-        self.is_active = False # A closed year cannot be the active year
-        self.closed_by = user
-        self.closed_at = timezone.now()
-        self.save(update_fields=['status', 'is_active', 'closed_by', 'closed_at', 'updated_at'])
-        logger.info(f"FiscalYear {self.name} (ID: {self.pk}) for Company {self.company.name} closed by user {user.pk if user else 'System'}.")
+        # Imported here to avoid a circular import (services import models)
+        from ..services.year_end_service import close_fiscal_year
+        close_fiscal_year(self, user=user)
+        self.refresh_from_db()
 
 
 # =============================================================================
@@ -356,6 +373,45 @@ class AccountingPeriod(TenantScopedModel): # Inherit from TenantScopedModel
         self.locked = False
         self.save(update_fields=['locked', 'updated_at'])
         logger.info(f"Period {self.name} for Company {self.company.name} unlocked.")
+
+
+# =============================================================================
+# Account Opening Balance Model (Tenant Scoped)
+# =============================================================================
+class AccountOpeningBalance(TenantScopedModel):
+    """
+    Balance carried forward into a fiscal year for a single account, written by the
+    year-end close. Reports sum these rows with the current year's voucher lines
+    instead of re-aggregating every prior year.
+    """
+    fiscal_year = models.ForeignKey(
+        FiscalYear,
+        verbose_name=_("Fiscal Year"),
+        on_delete=models.CASCADE,
+        related_name="opening_balances",
+        help_text=_("The fiscal year this opening balance belongs to.")
+    )
+    account = models.ForeignKey(
+        'crp_accounting.Account',
+        verbose_name=_("Account"),
+        on_delete=models.PROTECT,
+        related_name="opening_balances",
+    )
+    debit_amount = models.DecimalField(_("Opening Debit"), max_digits=20, decimal_places=2, default=Decimal('0.00'))
+    credit_amount = models.DecimalField(_("Opening Credit"), max_digits=20, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        unique_together = ('fiscal_year', 'account')
+        ordering = ['fiscal_year__start_date', 'account__account_number']
+        verbose_name = _('Account Opening Balance')
+        verbose_name_plural = _('Account Opening Balances')
+        indexes = [
+            models.Index(fields=['company', 'fiscal_year'], name='acctopen_co_fy_idx'),
+        ]
+
+    def __str__(self):
+        return f"Opening {self.account_id} (FY: {self.fiscal_year_id}) Dr {self.debit_amount} / Cr {self.credit_amount}"
+
 # from django.db import models
 # from django.utils import timezone
 # from django.core.exceptions import ValidationError
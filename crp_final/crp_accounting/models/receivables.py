@@ -6,7 +6,7 @@ from decimal import Decimal
 from typing import Optional
 
 from django.db import models
-from django.db.models import Sum
+from django.db.models import Sum, Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError as DjangoValidationError, ObjectDoesNotExist
@@ -31,6 +31,8 @@ try:
 except ImportError as e:
     raise ImportError(f"Could not import related accounting models for receivables: {e}.")
 
+from .deferred_recalc import schedule_parent_recalculation
+
 ZERO_DECIMAL = Decimal('0.00')
 # --- Enum Imports ---
 # Fallback mock for enums if crp_core is not fully available
@@ -45,6 +47,7 @@ class BaseEnumMock:
     # Ensure these string values match the actual enum values if they are TextChoices/CharFields
     DRAFT = 'DRAFT'
     UNAPPLIED = 'UNAPPLIED'
+    PARTIALLY_APPLIED = 'PARTIALLY_APPLIED'
     CUSTOMER = 'CUSTOMER'  # For CorePartyType
     INCOME = 'INCOME'  # For CoreAccountType
     ASSET = 'ASSET'  # For CoreAccountType
@@ -92,6 +95,11 @@ logger = logging.getLogger("crp_accounting.models.receivables")
 ZERO = Decimal('0.00')
 SMALL_TOLERANCE = Decimal('0.005')  # For float comparisons
 
+# Status sets behind the partial (open item) indexes; queries should filter on the same sets to use them
+OPEN_INVOICE_STATUSES = [InvoiceStatus.SENT, InvoiceStatus.PARTIALLY_PAID, InvoiceStatus.OVERDUE]
+AR_AGING_INVOICE_STATUSES = [InvoiceStatus.DRAFT] + OPEN_INVOICE_STATUSES
+UNAPPLIED_PAYMENT_STATUSES = [PaymentStatus.UNAPPLIED, PaymentStatus.PARTIALLY_APPLIED]
+
 
 # =============================================================================
 # InvoiceSequence Model (Tenant Scoped)
@@ -201,7 +209,12 @@ class CustomerInvoice(TenantScopedModel):
         unique_together = (('company', 'invoice_number'),)
         ordering = ['company__name', '-invoice_date', '-created_at']
         indexes = [models.Index(fields=['company', 'customer', 'invoice_date'], name='custinv_co_cust_date_idx'),
-                   models.Index(fields=['company', 'status', 'due_date'], name='custinv_co_stat_due_idx')]
+                   models.Index(fields=['company', 'status', 'due_date'], name='custinv_co_stat_due_idx'),
+                   # Partial indexes over live open items only (closed history and soft-deleted rows excluded)
+                   models.Index(fields=['company', 'customer', 'due_date'], name='custinv_open_co_cust_due_idx',
+                                condition=Q(deleted__isnull=True, status__in=OPEN_INVOICE_STATUSES)),
+                   models.Index(fields=['company', 'invoice_date'], name='custinv_aging_co_date_idx',
+                                condition=Q(deleted__isnull=True, status__in=AR_AGING_INVOICE_STATUSES))]
 
     def __str__(self):
         cust_name = _("N/A Customer")
@@ -344,6 +357,16 @@ class CustomerInvoice(TenantScopedModel):
         if errors: raise DjangoValidationError(errors)
 
     # save() inherited from TenantScopedModel, which calls full_clean()
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Issued-but-unposted invoices count towards the customer's maintained exposure
+        if self.customer_id:
+            schedule_parent_recalculation(self.customer, 'recalculate_unposted_documents_amount', perform_save=True)
+
+    def delete(self, *args, **kwargs):
+        customer = self.customer if self.customer_id else None
+        super().delete(*args, **kwargs)
+        schedule_parent_recalculation(customer, 'recalculate_unposted_documents_amount', perform_save=True)
 
 
 # =============================================================================
@@ -490,6 +513,14 @@ class InvoiceLine(TenantScopedModel):
         logger.debug(
             f"InvoiceLine {self.pk or 'Unsaved'} for Invoice {self.invoice_id or 'N/A'} saved. Line total: {self.line_total}."
         )
+        # Invoice totals are recalculated once per deferred block rather than once per line
+        if self.invoice_id:
+            schedule_parent_recalculation(self.invoice, '_recalculate_totals_and_due', perform_save=True)
+
+    def delete(self, *args, **kwargs):
+        invoice_to_update = self.invoice if self.invoice_id else None
+        super().delete(*args, **kwargs)
+        schedule_parent_recalculation(invoice_to_update, '_recalculate_totals_and_due', perform_save=True)
 
 
 # =============================================================================
@@ -527,7 +558,9 @@ class CustomerPayment(TenantScopedModel):
         verbose_name_plural = _("Customer Payments")
         ordering = ['company__name', '-payment_date', '-created_at']
         indexes = [models.Index(fields=['company', 'customer', 'payment_date'], name='custpay_co_cust_date_idx'),
-                   models.Index(fields=['company', 'status'], name='custpay_co_stat_idx')]
+                   models.Index(fields=['company', 'status'], name='custpay_co_stat_idx'),
+                   models.Index(fields=['company', 'customer', 'payment_date'], name='custpay_unapplied_co_cust_idx',
+                                condition=Q(deleted__isnull=True, status__in=UNAPPLIED_PAYMENT_STATUSES))]
 
     def __str__(self):
         cust_name = _("N/A Customer")
@@ -637,7 +670,7 @@ class CustomerPayment(TenantScopedModel):
     def save(self, *args, **kwargs):
         _recalculating = kwargs.pop('_recalculating_payment', False)
 
-        if not self.pk:  # Actions for new instances only
+        if self._state.adding:  # Actions for new instances only (the UUID pk is set before the insert)
             if not self.currency and self.company_id:
                 try:
                     company_obj = Company.objects.get(pk=self.company_id)
@@ -0,0 +1,172 @@
+# crp_accounting/models/recurring.py
+
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from dateutil.relativedelta import relativedelta
+from django.db import models
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import MinValueValidator
+
+# --- Base Model Import ---
+try:
+    from .base import TenantScopedModel
+except ImportError:
+    raise ImportError("Could not import TenantScopedModel from .base. Critical dependency missing.")
+
+# --- Enum/Choice Imports ---
+try:
+    from crp_core.enums import DrCrType, VoucherType
+except ImportError:
+    raise ImportError("Could not import core enums from 'crp_core'. Critical dependency missing.")
+
+# --- Related Model Imports ---
+try:
+    from .coa import Account
+    from .party import Party
+except ImportError as e:
+    raise ImportError(f"Could not import related accounting models for recurring templates: {e}.")
+
+logger = logging.getLogger("crp_accounting.models.recurring")
+
+
+# =============================================================================
+# RecurringVoucherTemplate Model (Tenant Scoped)
+# =============================================================================
+class RecurringVoucherTemplate(TenantScopedModel):
+    """
+    A voucher (lines, narration, type) generated on a schedule, e.g. monthly rent or accruals.
+    Occurrences are anchored on `start_date` (a template starting on the 31st generates on the
+    last day of shorter months and on the 31st again afterwards). Generated vouchers point back
+    to the template and their occurrence date, which is unique per template.
+    """
+
+    class Frequency(models.TextChoices):
+        WEEKLY = 'WEEKLY', _('Weekly')
+        MONTHLY = 'MONTHLY', _('Monthly')
+        QUARTERLY = 'QUARTERLY', _('Quarterly')
+        YEARLY = 'YEARLY', _('Yearly')
+
+    name = models.CharField(_("Template Name"), max_length=150)
+    voucher_type = models.CharField(_("Voucher Type"), max_length=30, choices=VoucherType.choices,
+                                    default=VoucherType.GENERAL.value)
+    narration = models.TextField(_("Narration"))
+    reference = models.CharField(_("Reference"), max_length=100, blank=True, null=True)
+    party = models.ForeignKey(Party, verbose_name=_("Party"), on_delete=models.PROTECT, null=True, blank=True,
+                              related_name="recurring_voucher_templates")
+    frequency = models.CharField(_("Frequency"), max_length=20, choices=Frequency.choices,
+                                 default=Frequency.MONTHLY.value)
+    interval = models.PositiveSmallIntegerField(_("Every"), default=1, validators=[MinValueValidator(1)],
+                                                help_text=_("Generate every N weeks/months/quarters/years."))
+    start_date = models.DateField(_("First Occurrence"))
+    end_date = models.DateField(_("Last Possible Occurrence"), null=True, blank=True)
+    next_run_date = models.DateField(_("Next Occurrence"), null=True, blank=True, editable=False, db_index=True)
+    last_generated_date = models.DateField(_("Last Generated Occurrence"), null=True, blank=True, editable=False)
+    auto_post = models.BooleanField(_("Post Automatically"), default=False,
+                                    help_text=_("Post generated vouchers immediately instead of leaving them as drafts."))
+    is_active = models.BooleanField(_("Active"), default=True)
+
+    class Meta:
+        verbose_name = _("Recurring Voucher Template")
+        verbose_name_plural = _("Recurring Voucher Templates")
+        unique_together = (('company', 'name'),)
+        ordering = ['company__name', 'name']
+        indexes = [
+            models.Index(fields=['company', 'next_run_date'], name='recurvch_due_co_next_idx',
+                         condition=Q(is_active=True, deleted__isnull=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_frequency_display()})"
+
+    def _step(self, n: int) -> relativedelta:
+        every = n * self.interval
+        if self.frequency == self.Frequency.WEEKLY.value:
+            return relativedelta(weeks=every)
+        if self.frequency == self.Frequency.QUARTERLY.value:
+            return relativedelta(months=3 * every)
+        if self.frequency == self.Frequency.YEARLY.value:
+            return relativedelta(years=every)
+        return relativedelta(months=every)
+
+    def occurrence(self, n: int) -> date:
+        """The n-th occurrence (0 = start_date)."""
+        return self.start_date + self._step(n)
+
+    def occurrences_between(self, from_date: date, until_date: date) -> List[date]:
+        """Occurrences in [from_date, until_date], never after end_date."""
+        if self.end_date and self.end_date < until_date:
+            until_date = self.end_date
+        occurrences, n = [], 0
+        while True:
+            occurrence = self.occurrence(n)
+            if occurrence > until_date:
+                return occurrences
+            if occurrence >= from_date:
+                occurrences.append(occurrence)
+            n += 1
+
+    def next_occurrence_after(self, after_date: date) -> Optional[date]:
+        """The first occurrence after `after_date`, or None when it would fall after end_date."""
+        n = 0
+        while self.occurrence(n) <= after_date:
+            n += 1
+        occurrence = self.occurrence(n)
+        if self.end_date and occurrence > self.end_date:
+            return None
+        return occurrence
+
+    def clean(self):
+        super().clean()
+        errors = {}
+        if self.start_date and self.end_date and self.end_date < self.start_date:
+            errors['end_date'] = _("Last occurrence cannot be before the first occurrence.")
+        if self.party_id and self.company_id and self.party.company_id != self.company_id:
+            errors['party'] = _("Party must belong to the template's company.")
+        if errors:
+            raise DjangoValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        next_run_date = self.next_run_date
+        if self.last_generated_date is None:
+            # Not generated yet: the schedule starts at start_date (also after start_date is edited)
+            next_run_date = self.start_date
+        elif self.next_run_date is None or (self.end_date and self.next_run_date > self.end_date):
+            # Finished, or end_date edited: continue after the last generated occurrence while within end_date
+            next_run_date = self.next_occurrence_after(self.last_generated_date)
+        if next_run_date != self.next_run_date:
+            self.next_run_date = next_run_date
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = list(set(kwargs['update_fields']) | {'next_run_date'})
+        super().save(*args, **kwargs)
+
+
+# =============================================================================
+# RecurringVoucherTemplateLine Model
+# =============================================================================
+class RecurringVoucherTemplateLine(models.Model):
+    template = models.ForeignKey(RecurringVoucherTemplate, verbose_name=_("Template"), on_delete=models.CASCADE,
+                                 related_name='lines')
+    account = models.ForeignKey(Account, verbose_name=_("Account"), on_delete=models.PROTECT,
+                                related_name='recurring_template_lines')
+    dr_cr = models.CharField(_("Dr/Cr"), max_length=6, choices=DrCrType.choices)
+    amount = models.DecimalField(_("Amount"), max_digits=20, decimal_places=2,
+                                 validators=[MinValueValidator(Decimal('0.01'))])
+    narration = models.TextField(_("Line Narration"), blank=True)
+
+    class Meta:
+        verbose_name = _("Recurring Voucher Template Line")
+        verbose_name_plural = _("Recurring Voucher Template Lines")
+        ordering = ['pk']
+
+    def __str__(self):
+        return f"{self.get_dr_cr_display()} {self.account_id} - {self.amount}"
+
+    def clean(self):
+        super().clean()
+        if self.account_id and self.template_id and self.account.company_id != self.template.company_id:
+            raise DjangoValidationError({'account': _("Account must belong to the template's company.")})
@@ -4,6 +4,8 @@ import logging
 from rest_framework import serializers
 from decimal import Decimal
 
+from crp_core.serializers import CompiledRepresentationMixin
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -15,7 +17,7 @@ class BalanceSheetNodeSerializer(serializers.Serializer):
     Serializes a node (Account Group or Account) within the Balance Sheet hierarchy.
     Includes currency information for individual accounts.
     """
-    id = serializers.IntegerField(read_only=True, help_text="PK of Account/Group (0 for Retained Earnings).")
+    id = serializers.CharField(read_only=True, help_text="PK of Account/Group (a fixed key for calculated Retained Earnings).")
     name = serializers.CharField(read_only=True, help_text="Name of Group or Account.")
     type = serializers.ChoiceField(choices=['group', 'account'], read_only=True, help_text="Node type.")
     level = serializers.IntegerField(read_only=True, help_text="Hierarchy depth.")
@@ -61,7 +63,7 @@ class BalanceSheetSectionSerializer(serializers.Serializer):
         ref_name = "BalanceSheetSection"
 
 
-class BalanceSheetResponseSerializer(serializers.Serializer):
+class BalanceSheetResponseSerializer(CompiledRepresentationMixin, serializers.Serializer):
     """
     Serializes the complete response for the Balance Sheet report API endpoint.
     """
@@ -9,6 +9,7 @@ from ..models.coa import Account, AccountGroup, PLSection
 
 # --- Enum Imports ---
 from crp_core.enums import AccountType, AccountNature, CurrencyType, PartyType
+from crp_core.serializers import CompiledRepresentationMixin
 
 logger = logging.getLogger(__name__)
 
@@ -348,7 +349,7 @@ class AccountWriteSerializer(serializers.ModelSerializer):
 # =============================================================================
 # Ledger Serializers
 # =============================================================================
-class AccountLedgerEntrySerializer(serializers.Serializer):
+class AccountLedgerEntrySerializer(CompiledRepresentationMixin, serializers.Serializer):
     """Serializer for a single line item in an Account Ledger report."""
     # Fields should match the dictionary keys returned by your ledger_service
     line_pk = serializers.UUIDField(read_only=True)  # Assuming VoucherLine PK is UUID
@@ -363,7 +364,7 @@ class AccountLedgerEntrySerializer(serializers.Serializer):
     running_balance = serializers.DecimalField(max_digits=20, decimal_places=2, read_only=True)
 
 
-class AccountLedgerResponseSerializer(serializers.Serializer):
+class AccountLedgerResponseSerializer(CompiledRepresentationMixin, serializers.Serializer):
     """Serializer for the overall response of the Account Ledger endpoint."""
     account = AccountSummarySerializer(read_only=True)  # Use the summary for account details
     start_date = serializers.DateField(required=False, allow_null=True, read_only=True)
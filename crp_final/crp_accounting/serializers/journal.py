@@ -3,7 +3,7 @@
 import logging
 from datetime import date
 from decimal import Decimal
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 
 from rest_framework import serializers
 from django.db import transaction  # Keep for create/update methods
@@ -17,6 +17,7 @@ from ..models.journal import Voucher, VoucherLine, TransactionStatus, DrCrType,
 from ..models.coa import Account
 from ..models.party import Party
 from ..models.period import AccountingPeriod
+from ..services.period_calendar_service import get_period_calendar
 from company.models import Company  # Import Company for type checking and explicit use
 
 # --- Enum/Constant Imports ---
@@ -110,10 +111,68 @@ class VoucherLineSerializer(serializers.ModelSerializer):
         return account
 
 
+# =============================================================================
+# Sparse Fieldsets (read actions)
+# =============================================================================
+class SparseFieldsetMixin:
+    """
+    Sparse fieldsets for read serializers, driven by two context keys set by the ViewSet:
+      - 'expand': names from `expandable_fields` to add (e.g. nested lines on a list page),
+      - 'sparse_fields': the only fields to render (an expandable field listed here is expanded too).
+    Without these keys the serializer renders its full `Meta.fields`.
+    """
+    expandable_fields: Dict[str, Callable[[], serializers.Field]] = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = set(self.context.get('sparse_fields') or ())
+        for field_name in set(self.context.get('expand') or ()) | (requested & set(self.expandable_fields)):
+            if field_name in self.expandable_fields and field_name not in self.fields:
+                self.fields[field_name] = self.expandable_fields[field_name]()
+        if requested:
+            for field_name in set(self.fields) - requested:
+                self.fields.pop(field_name)
+
+
+# =============================================================================
+# Voucher List Serializer (read-only)
+# =============================================================================
+class VoucherListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Flat voucher header for list pages. Lines are only rendered with `?expand=lines`; totals and
+    line count come from `Voucher.line_totals_annotations()` on the ViewSet's list queryset.
+    """
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    voucher_type_display = serializers.CharField(source='get_voucher_type_display', read_only=True)
+    party_name = serializers.CharField(source='party.name', read_only=True, allow_null=True)
+    total_debit = serializers.DecimalField(max_digits=20, decimal_places=2, read_only=True)
+    total_credit = serializers.DecimalField(max_digits=20, decimal_places=2, read_only=True)
+    line_count = serializers.IntegerField(read_only=True)
+    is_balanced = serializers.BooleanField(read_only=True)
+    is_editable = serializers.BooleanField(read_only=True)
+    created_at = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M:%S")
+    updated_at = serializers.DateTimeField(read_only=True, format="%Y-%m-%d %H:%M:%S")
+
+    expandable_fields = {
+        'lines': lambda: VoucherLineSerializer(many=True, read_only=True),
+    }
+
+    class Meta:
+        model = Voucher
+        fields = [
+            'id', 'voucher_number', 'date', 'effective_date', 'reference', 'narration',
+            'voucher_type', 'voucher_type_display', 'party', 'party_name', 'accounting_period',
+            'status', 'status_display',
+            'total_debit', 'total_credit', 'line_count', 'is_balanced', 'is_editable',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+
 # =============================================================================
 # Main Voucher Serializer
 # =============================================================================
-class VoucherSerializer(serializers.ModelSerializer):
+class VoucherSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     lines = VoucherLineSerializer(many=True, min_length=2)  # Require at least 2 lines for balance
 
     # Read-Only / Display Fields (calculated by model properties or service)
@@ -137,7 +196,9 @@ class VoucherSerializer(serializers.ModelSerializer):
     )
     accounting_period = serializers.PrimaryKeyRelatedField(
         queryset=AccountingPeriod.objects.all(),  # ViewSet MUST override
-        help_text=_("PK of the Accounting Period (must be open/unlocked and belong to the voucher's company).")
+        required=False,
+        help_text=_("PK of the Accounting Period (must be open/unlocked and belong to the voucher's company). "
+                    "Resolved from the voucher date when omitted.")
     )
 
     # Generic Foreign Key for source_document (if used)
@@ -178,6 +239,8 @@ class VoucherSerializer(serializers.ModelSerializer):
         # This company is the one the new/updated Voucher will belong to.
         self.company_from_voucher_context = self.context.get(
             'company_from_voucher_context')  # Ensure ViewSet passes this
+        if self.instance is not None and not isinstance(self.instance, Voucher):
+            return  # many=True: DRF also hands the whole queryset/list to the child serializer's __init__
         if not self.company_from_voucher_context and (self.instance is None or not self.instance.company_id):
             # This could happen if context not passed for a new voucher.
             # For updates, instance.company should be reliable.
@@ -197,7 +260,8 @@ class VoucherSerializer(serializers.ModelSerializer):
 
         # Pass the determined company context down to the nested VoucherLineSerializer
         # This is crucial for VoucherLineSerializer.validate_account
-        self.fields['lines'].context['company_from_voucher_context'] = self.company_from_voucher_context
+        if 'lines' in self.fields:  # Absent when trimmed by a sparse fieldset
+            self.fields['lines'].context['company_from_voucher_context'] = self.company_from_voucher_context
 
         # If updating an existing voucher, make fields read-only if not editable
         if self.instance and not self.instance.is_editable:
@@ -209,7 +273,8 @@ class VoucherSerializer(serializers.ModelSerializer):
             for field_name in immutable_fields:
                 if field_name in self.fields:
                     self.fields[field_name].read_only = True
-            self.fields['lines'].read_only = True  # Prevent line modifications for non-editable vouchers
+            if 'lines' in self.fields:
+                self.fields['lines'].read_only = True  # Prevent line modifications for non-editable vouchers
 
     def validate_accounting_period(self, period: AccountingPeriod) -> AccountingPeriod:
         if not self.company_from_voucher_context:
@@ -333,7 +398,15 @@ class VoucherSerializer(serializers.ModelSerializer):
 
         # --- Date within Accounting Period ---
         # `data` contains validated instances for FKs like accounting_period, or new values for date fields.
+        # Periods are resolved through the company's cached period calendar (no date-range query).
         voucher_date = data.get('date', getattr(self.instance, 'date', None))
+        calendar = get_period_calendar(effective_company.id)
+        if voucher_date and 'accounting_period' not in data and (self.instance is None or 'date' in data):
+            open_period = calendar.open_period_for(voucher_date)
+            if open_period is None:
+                raise serializers.ValidationError({'accounting_period': _(
+                    "No open accounting period covers the voucher date %(v_date)s.") % {'v_date': voucher_date}})
+            data['accounting_period'] = calendar.as_model_instance(open_period)
         accounting_period_instance = data.get('accounting_period', getattr(self.instance, 'accounting_period', None))
 
         if voucher_date and accounting_period_instance:
@@ -342,11 +415,12 @@ class VoucherSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(
                     {'accounting_period': _("Accounting Period does not belong to the voucher's company.")})
 
-            if not (accounting_period_instance.start_date <= voucher_date <= accounting_period_instance.end_date):
+            period_for_date = calendar.period_for(voucher_date)
+            if period_for_date is None or str(period_for_date.pk) != str(accounting_period_instance.pk):
                 raise serializers.ValidationError({
                     'date': _(
                         "Voucher date %(v_date)s is outside the selected period '%(p_name)s' (%(p_start)s - %(p_end)s).") %
-                            {'v_date': voucher_date, 'p_name': str(accounting_period_instance),
+                            {'v_date': voucher_date, 'p_name': accounting_period_instance.name,
                              'p_start': accounting_period_instance.start_date,
                              'p_end': accounting_period_instance.end_date}
                 })
@@ -526,4 +600,16 @@ class VoucherSerializer(serializers.ModelSerializer):
                 VoucherLine.objects.filter(voucher=instance, id__in=ids_to_delete).delete()
 
         instance.refresh_from_db()  # Get latest state including line changes
-        return instance
\ No newline at end of file
+        return instance
+
+# =============================================================================
+# Voucher Bulk Workflow Action Serializer (input only)
+# =============================================================================
+class VoucherBulkActionSerializer(serializers.Serializer):
+    """Validates the payload of the bulk submit/approve/reject/reverse endpoints."""
+    voucher_ids = serializers.ListField(child=serializers.UUIDField(), min_length=1, max_length=1000)
+    comments = serializers.CharField(required=False, allow_blank=True, default="")
+    reversal_date = serializers.DateField(required=False, allow_null=True, default=None)
+    reversal_voucher_type = serializers.ChoiceField(choices=VoucherType.choices, required=False,
+                                                    default=VoucherType.GENERAL.value)
+    post_immediately = serializers.BooleanField(required=False, default=False)
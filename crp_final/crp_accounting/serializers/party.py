@@ -27,7 +27,8 @@ class PartyReadSerializer(serializers.ModelSerializer):
     # ... (Your PartyReadSerializer is good as is) ...
     control_account = AccountSummarySerializer(read_only=True, allow_null=True)
     party_type_display = serializers.CharField(source='get_party_type_display', read_only=True)
-    balance = serializers.SerializerMethodField(help_text=_("Dynamically calculated outstanding balance."))
+    balance = serializers.SerializerMethodField(help_text=_("Posted balance on the control account (maintained on posting)."))
+    exposure = serializers.SerializerMethodField(help_text=_("Posted balance + unposted documents + open orders."))
     credit_status = serializers.SerializerMethodField(help_text=_("Credit limit status ('Within Limit', 'Over Credit Limit', 'N/A')."))
 
     class Meta:
@@ -44,6 +45,9 @@ class PartyReadSerializer(serializers.ModelSerializer):
             'credit_limit',
             'is_active',
             'balance',
+            'unposted_documents_amount',
+            'open_orders_amount',
+            'exposure',
             'credit_status',
             'created_at',
             'updated_at',
@@ -51,11 +55,14 @@ class PartyReadSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_balance(self, obj: Party) -> Decimal | None:
-        try:
-            return obj.calculate_outstanding_balance()
-        except (ValueError, AttributeError, ObjectDoesNotExist) as e:
-            logger.warning(f"Could not calculate balance for Party {obj.pk} (Co {obj.company_id}): {e}")
-            return None
+        if not obj.control_account_id:
+            return Decimal('0.00')
+        return obj.posted_balance
+
+    def get_exposure(self, obj: Party) -> Decimal:
+        # Annotated by PartyViewSet.get_queryset; falls back to the in-memory sum
+        exposure = getattr(obj, 'exposure', None)
+        return exposure if exposure is not None else obj.total_exposure
 
     def get_credit_status(self, obj: Party) -> str:
         try:
@@ -65,6 +72,34 @@ class PartyReadSerializer(serializers.ModelSerializer):
             return 'Error'
 
 
+class PartyBalanceSerializer(serializers.ModelSerializer):
+    """Row of the party balances listing; values come from `annotate_party_balances`."""
+    party_type_display = serializers.CharField(source='get_party_type_display', read_only=True)
+    control_account_number = serializers.CharField(source='control_account.account_number', read_only=True,
+                                                   allow_null=True, default=None)
+    balance = serializers.DecimalField(max_digits=20, decimal_places=2, read_only=True)
+    overdue_amount = serializers.DecimalField(max_digits=20, decimal_places=2, read_only=True)
+    credit_utilization = serializers.DecimalField(
+        max_digits=20, decimal_places=2, read_only=True, allow_null=True,
+        help_text=_("Balance as a percentage of the credit limit; null when no limit is set."))
+
+    class Meta:
+        model = Party
+        fields = [
+            'id',
+            'name',
+            'party_type',
+            'party_type_display',
+            'control_account_number',
+            'is_active',
+            'credit_limit',
+            'balance',
+            'overdue_amount',
+            'credit_utilization',
+        ]
+        read_only_fields = fields
+
+
 class PartyWriteSerializer(serializers.ModelSerializer):
     control_account = serializers.PrimaryKeyRelatedField(
         queryset=Account.objects.all(), # <<< VIEW MUST OVERRIDE THIS QUERYSET with company filter
@@ -4,6 +4,8 @@ import logging
 from rest_framework import serializers
 from decimal import Decimal
 
+from crp_core.serializers import CompiledRepresentationMixin
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -15,7 +17,7 @@ class ProfitLossAccountDetailSerializer(serializers.Serializer):
     Serializes the details of a single account contributing to a P&L line item.
     Indicates the movement amount in the account's specific currency.
     """
-    account_pk = serializers.IntegerField(read_only=True, help_text="Primary key of the Account.")
+    account_pk = serializers.UUIDField(read_only=True, help_text="Primary key of the Account.")
     account_number = serializers.CharField(read_only=True, help_text="Unique account number within the company.")
     account_name = serializers.CharField(read_only=True, help_text="Name of the account.")
     amount = serializers.DecimalField(
@@ -51,7 +53,7 @@ class ProfitLossLineItemSerializer(serializers.Serializer):
         ref_name = "ProfitLossLineItem"
 
 
-class ProfitLossResponseSerializer(serializers.Serializer):
+class ProfitLossResponseSerializer(CompiledRepresentationMixin, serializers.Serializer):
     """
     Serializes the complete response payload for the Profit & Loss report.
     """
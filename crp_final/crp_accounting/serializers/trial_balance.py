@@ -4,6 +4,8 @@ import logging
 from rest_framework import serializers
 from decimal import Decimal
 
+from crp_core.serializers import CompiledRepresentationMixin
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -15,7 +17,7 @@ class TrialBalanceFlatEntrySerializer(serializers.Serializer):
     Serializes a single account line for the *flat list* view of the Trial Balance.
     Represents the final debit or credit balance for an active account as of the report date.
     """
-    account_pk = serializers.IntegerField(read_only=True, help_text="Primary key of the Account.")
+    account_pk = serializers.UUIDField(read_only=True, help_text="Primary key of the Account.")
     account_number = serializers.CharField(read_only=True, help_text="Unique account number within the company.")
     account_name = serializers.CharField(read_only=True, help_text="Name of the account.")
     # Note: Standard Trial Balance typically sums amounts directly, regardless of
@@ -69,7 +71,7 @@ class TrialBalanceHierarchyNodeSerializer(serializers.Serializer):
         ref_name = "TrialBalanceHierarchyNode"
 
 
-class TrialBalanceStructuredResponseSerializer(serializers.Serializer):
+class TrialBalanceStructuredResponseSerializer(CompiledRepresentationMixin, serializers.Serializer):
     """
     Serializes the complete response for the structured Trial Balance report.
     Includes company context, report date, totals, and both hierarchical and flat views.
@@ -0,0 +1,310 @@
+# crp_accounting/services/cash_application_service.py
+"""
+Automatic cash application: matches unapplied customer payments to open invoices in bulk.
+
+Matching rules, tried in order for every payment until its unapplied amount is used up:
+  1. REFERENCE - an invoice number appears in the payment's reference / notes.
+  2. EXACT_AMOUNT - exactly one open invoice of the customer is due for the payment's unapplied amount.
+  3. FIFO - remaining cash goes to the customer's open invoices, oldest due date first.
+
+All open invoices of the customers involved are loaded once and indexed in memory per
+customer (by invoice number and by amount due), so a run costs a fixed number of queries
+regardless of how many payments it processes. Allocations, invoice totals and payment
+totals are then written with bulk operations, followed by one refresh of the matched
+customers' unposted documents amount.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+# --- Model Imports ---
+from ..models.receivables import (
+    CustomerInvoice, CustomerPayment, PaymentAllocation, InvoiceStatus, PaymentStatus,
+    OPEN_INVOICE_STATUSES, UNAPPLIED_PAYMENT_STATUSES
+)
+from .party_exposure_service import refresh_unposted_documents_amounts
+
+logger = logging.getLogger("crp_accounting.services.cash_application")
+
+ZERO = Decimal('0.00')
+SMALL_TOLERANCE = Decimal('0.005')
+
+RULE_REFERENCE = 'REFERENCE'
+RULE_EXACT_AMOUNT = 'EXACT_AMOUNT'
+RULE_FIFO = 'FIFO'
+DEFAULT_MATCHING_RULES: Tuple[str, ...] = (RULE_REFERENCE, RULE_EXACT_AMOUNT, RULE_FIFO)
+
+# Same status set as the partial unapplied-payments index on CustomerPayment
+MATCHABLE_PAYMENT_STATUSES = UNAPPLIED_PAYMENT_STATUSES
+
+# Splits payment references like "INV-0001, INV-0002 / remittance" into candidate invoice numbers
+_REFERENCE_TOKEN_SPLIT_RE = re.compile(r"[\s,;/|]+")
+
+
+@dataclass
+class AllocationProposal:
+    payment_id: Any
+    invoice_id: Any
+    invoice_number: str
+    amount: Decimal
+    rule: str
+
+
+@dataclass
+class CashApplicationResult:
+    dry_run: bool
+    payments_considered: int = 0
+    payments_matched: int = 0
+    proposals: List[AllocationProposal] = field(default_factory=list)
+
+    @property
+    def total_applied(self) -> Decimal:
+        return sum((p.amount for p in self.proposals), ZERO)
+
+    def counts_by_rule(self) -> Dict[str, int]:
+        counts: Dict[str, int] = defaultdict(int)
+        for proposal in self.proposals:
+            counts[proposal.rule] += 1
+        return dict(counts)
+
+
+class _OpenInvoiceIndex:
+    """In-memory view of one customer's open invoices, keyed by number and by amount due."""
+
+    def __init__(self, invoices: Iterable[CustomerInvoice]):
+        # Callers pass invoices oldest first; that order is the FIFO order
+        self.fifo: List[CustomerInvoice] = list(invoices)
+        self.remaining_due: Dict[Any, Decimal] = {inv.pk: inv.amount_due for inv in self.fifo}
+        self.by_number: Dict[str, CustomerInvoice] = {
+            self.normalize_number(inv.invoice_number): inv for inv in self.fifo if inv.invoice_number
+        }
+        self.by_amount: Dict[Decimal, List[CustomerInvoice]] = defaultdict(list)
+        for inv in self.fifo:
+            self.by_amount[inv.amount_due].append(inv)
+
+    @staticmethod
+    def normalize_number(value: str) -> str:
+        return (value or "").strip().upper()
+
+    def is_open(self, invoice: CustomerInvoice) -> bool:
+        return self.remaining_due[invoice.pk] > SMALL_TOLERANCE
+
+    def consume(self, invoice: CustomerInvoice, amount: Decimal) -> None:
+        before = self.remaining_due[invoice.pk]
+        self.remaining_due[invoice.pk] = before - amount
+        # Keep the amount index pointing at what is still due
+        bucket = self.by_amount.get(before)
+        if bucket and invoice in bucket:
+            bucket.remove(invoice)
+        if self.is_open(invoice):
+            self.by_amount[self.remaining_due[invoice.pk]].append(invoice)
+
+    def find_by_reference(self, *texts: str) -> List[CustomerInvoice]:
+        matches = []
+        for text in texts:
+            for token in _REFERENCE_TOKEN_SPLIT_RE.split(text or ""):
+                invoice = self.by_number.get(self.normalize_number(token))
+                if invoice is not None and invoice not in matches and self.is_open(invoice):
+                    matches.append(invoice)
+        return matches
+
+    def find_single_by_amount(self, amount: Decimal) -> Optional[CustomerInvoice]:
+        candidates = [inv for inv in self.by_amount.get(amount, []) if self.is_open(inv)]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def open_invoices_fifo(self) -> List[CustomerInvoice]:
+        return [inv for inv in self.fifo if self.is_open(inv)]
+
+
+def _match_payment(payment: CustomerPayment, index: _OpenInvoiceIndex, rules: Sequence[str],
+                   already_allocated_invoice_ids: Set[Any]) -> List[AllocationProposal]:
+    """Runs the matching rules for one payment against its customer's index (in memory only)."""
+    proposals: List[AllocationProposal] = []
+    unapplied = payment.amount_unapplied
+
+    def apply(invoice: CustomerInvoice, rule: str):
+        nonlocal unapplied
+        if invoice.pk in already_allocated_invoice_ids:
+            return  # One allocation per payment/invoice pair; existing ones are edited manually
+        amount = min(unapplied, index.remaining_due[invoice.pk])
+        if amount <= ZERO:
+            return
+        index.consume(invoice, amount)
+        unapplied -= amount
+        proposals.append(AllocationProposal(payment.pk, invoice.pk, invoice.invoice_number, amount, rule))
+
+    for rule in rules:
+        if unapplied <= SMALL_TOLERANCE:
+            break
+        if rule == RULE_REFERENCE:
+            for invoice in index.find_by_reference(payment.reference_number, payment.notes):
+                if unapplied <= SMALL_TOLERANCE:
+                    break
+                apply(invoice, rule)
+        elif rule == RULE_EXACT_AMOUNT:
+            invoice = index.find_single_by_amount(unapplied)
+            if invoice is not None:
+                apply(invoice, rule)
+        elif rule == RULE_FIFO:
+            for invoice in index.open_invoices_fifo():
+                if unapplied <= SMALL_TOLERANCE:
+                    break
+                apply(invoice, rule)
+        else:
+            raise ValueError(f"Unknown cash application rule '{rule}'.")
+    return proposals
+
+
+def _invoice_status_after_payment(invoice: CustomerInvoice) -> str:
+    if invoice.amount_due <= ZERO:
+        return InvoiceStatus.PAID.value
+    return InvoiceStatus.PARTIALLY_PAID.value
+
+
+def _payment_status_after_allocation(payment: CustomerPayment) -> str:
+    if abs(payment.amount_unapplied) < SMALL_TOLERANCE:
+        return PaymentStatus.APPLIED.value
+    return PaymentStatus.PARTIALLY_APPLIED.value if payment.amount_applied > ZERO else PaymentStatus.UNAPPLIED.value
+
+
+def _write_allocations(company_id: Any, proposals: List[AllocationProposal],
+                       payments_by_pk: Dict[Any, CustomerPayment], invoices_by_pk: Dict[Any, CustomerInvoice],
+                       user: Optional[settings.AUTH_USER_MODEL], batch_size: int) -> None:
+    """Persists proposals: one bulk insert for allocations, one bulk update each for invoices and payments."""
+    allocation_date = timezone.now().date()
+    applied_per_payment: Dict[Any, Decimal] = defaultdict(lambda: ZERO)
+    applied_per_invoice: Dict[Any, Decimal] = defaultdict(lambda: ZERO)
+    allocations = []
+    for proposal in proposals:
+        applied_per_payment[proposal.payment_id] += proposal.amount
+        applied_per_invoice[proposal.invoice_id] += proposal.amount
+        allocations.append(PaymentAllocation(
+            company_id=company_id, payment_id=proposal.payment_id, invoice_id=proposal.invoice_id,
+            amount_applied=proposal.amount, allocation_date=allocation_date,
+            created_by=user, updated_by=user,
+        ))
+
+    now = timezone.now()
+    invoices_to_update = []
+    for invoice_pk, applied in applied_per_invoice.items():
+        invoice = invoices_by_pk[invoice_pk]
+        invoice.amount_paid = (invoice.amount_paid or ZERO) + applied
+        invoice.amount_due = (invoice.total_amount or ZERO) - invoice.amount_paid
+        invoice.status = _invoice_status_after_payment(invoice)
+        invoice.updated_at = now
+        invoice.updated_by = user
+        invoices_to_update.append(invoice)
+
+    payments_to_update = []
+    for payment_pk, applied in applied_per_payment.items():
+        payment = payments_by_pk[payment_pk]
+        payment.amount_applied = (payment.amount_applied or ZERO) + applied
+        payment.amount_unapplied = (payment.amount_received or ZERO) - payment.amount_applied
+        payment.status = _payment_status_after_allocation(payment)
+        payment.updated_at = now
+        payment.updated_by = user
+        payments_to_update.append(payment)
+
+    bulk_create_with_history(allocations, PaymentAllocation, batch_size=batch_size, default_user=user)
+    bulk_update_with_history(invoices_to_update, CustomerInvoice,
+                             ['amount_paid', 'amount_due', 'status', 'updated_at', 'updated_by'],
+                             batch_size=batch_size, default_user=user)
+    bulk_update_with_history(payments_to_update, CustomerPayment,
+                             ['amount_applied', 'amount_unapplied', 'status', 'updated_at', 'updated_by'],
+                             batch_size=batch_size, default_user=user)
+
+    # The bulk update skips CustomerInvoice.save(), so refresh the customers' unposted documents amount here
+    refresh_unposted_documents_amounts(company_id, {invoice.customer_id for invoice in invoices_to_update})
+
+
+@transaction.atomic
+def auto_match_customer_payments(
+        company_id: Any, user: Optional[settings.AUTH_USER_MODEL] = None, dry_run: bool = True,
+        payment_ids: Optional[Iterable[Any]] = None, customer_ids: Optional[Iterable[Any]] = None,
+        rules: Sequence[str] = DEFAULT_MATCHING_RULES, batch_size: int = 1000
+) -> CashApplicationResult:
+    """
+    Matches unapplied/partially applied customer payments of a company to open invoices.
+
+    Args:
+        company_id: Company whose payments are processed.
+        user: Recorded as created_by/updated_by on the written rows and in history.
+        dry_run: If True (default), only returns the proposed allocations; nothing is written.
+        payment_ids / customer_ids: Optional filters; by default all matchable payments are processed.
+        rules: Matching rules to apply, in order (see module docstring).
+        batch_size: Batch size for the bulk insert/updates.
+
+    Returns:
+        CashApplicationResult with the proposed (or, if not dry_run, applied) allocations.
+    """
+    log_prefix = f"[CashApplication][Co:{company_id}][{'DryRun' if dry_run else 'Apply'}]"
+    unknown_rules = set(rules) - set(DEFAULT_MATCHING_RULES)
+    if unknown_rules:
+        raise ValueError(f"Unknown cash application rule(s): {', '.join(sorted(unknown_rules))}.")
+
+    payments_qs = CustomerPayment.objects.filter(
+        company_id=company_id, status__in=MATCHABLE_PAYMENT_STATUSES, amount_unapplied__gt=SMALL_TOLERANCE
+    )
+    if payment_ids is not None:
+        payments_qs = payments_qs.filter(pk__in=list(payment_ids))
+    if customer_ids is not None:
+        payments_qs = payments_qs.filter(customer_id__in=list(customer_ids))
+    if not dry_run:
+        payments_qs = payments_qs.select_for_update()
+    # Full rows: bulk_update_with_history copies every tracked field into the history rows, so
+    # deferring fields here would cost one query per deferred field and payment.
+    payments = list(payments_qs.order_by('payment_date', 'created_at'))
+    result = CashApplicationResult(dry_run=dry_run, payments_considered=len(payments))
+    if not payments:
+        logger.info(f"{log_prefix} No unapplied payments to match.")
+        return result
+
+    customer_pks = {p.customer_id for p in payments}
+    invoices_qs = CustomerInvoice.objects.filter(
+        company_id=company_id, customer_id__in=customer_pks,
+        status__in=OPEN_INVOICE_STATUSES, amount_due__gt=SMALL_TOLERANCE
+    )
+    if not dry_run:
+        invoices_qs = invoices_qs.select_for_update()
+    invoices = list(invoices_qs.order_by('due_date', 'invoice_date', 'created_at'))
+    invoices_by_pk = {inv.pk: inv for inv in invoices}
+
+    # One index per (customer, currency): payments are only ever matched in their own currency
+    grouped_invoices: Dict[Tuple[Any, str], List[CustomerInvoice]] = defaultdict(list)
+    for invoice in invoices:
+        grouped_invoices[(invoice.customer_id, invoice.currency)].append(invoice)
+    indexes = {key: _OpenInvoiceIndex(group) for key, group in grouped_invoices.items()}
+
+    existing_pairs: Dict[Any, Set[Any]] = defaultdict(set)
+    for payment_pk, invoice_pk in PaymentAllocation.objects.filter(
+            company_id=company_id, payment_id__in=[p.pk for p in payments]
+    ).values_list('payment_id', 'invoice_id'):
+        existing_pairs[payment_pk].add(invoice_pk)
+
+    for payment in payments:
+        index = indexes.get((payment.customer_id, payment.currency))
+        if index is None:
+            continue
+        proposals = _match_payment(payment, index, rules, existing_pairs[payment.pk])
+        if proposals:
+            result.payments_matched += 1
+            result.proposals.extend(proposals)
+
+    logger.info(f"{log_prefix} {result.payments_matched}/{result.payments_considered} payments matched, "
+                f"{len(result.proposals)} allocations totalling {result.total_applied} "
+                f"(by rule: {result.counts_by_rule()}).")
+    if dry_run or not result.proposals:
+        return result
+
+    _write_allocations(company_id, result.proposals, {p.pk: p for p in payments}, invoices_by_pk, user, batch_size)
+    logger.info(f"{log_prefix} Wrote {len(result.proposals)} allocations.")
+    return result
@@ -1,13 +1,33 @@
 # crp_accounting/services/coa_seeding_service.py
+"""
+Chart of Accounts seeding for new (and existing) companies.
+
+ACCOUNT_ROLE_GROUPS is compiled once per process into a CoaTemplate: the group tree and one
+validated AccountTemplate per account (type, P&L section, nature, control flags), so nothing
+about the template is re-derived or re-validated per company. `seed_coa_for_company` then
+builds the company's CoA in memory and writes it with bulk inserts and bulk history rows:
+  - a company without groups (the company signal) gets every group and account inserted
+    directly, with no per-row lookups, saves or full_clean,
+  - a company with a CoA is diffed against the template in memory; missing rows are inserted
+    and changed rows bulk updated (the old update_or_create semantics, minus the unchanged writes).
+The company's `coa_seeding_status` tracks the run, so seeding can run in
+`crp_accounting.tasks.seed_coa_for_company_task` (settings.COA_SEEDING_ASYNC) after sign-up.
+"""
 import logging
-from typing import Dict, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
+from django.conf import settings
 from django.db import transaction, IntegrityError
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 # --- Model Imports ---
 # Ensure these paths are correct for your project structure
-from crp_accounting.models.coa import AccountGroup, Account, PLSection
+from crp_accounting.models.coa import AccountGroup, Account, PLSection, ACCOUNT_TYPE_TO_NATURE
+from crp_accounting.models.journal import VoucherLine, TransactionStatus
 from company.models import Company  # Your tenant model
 logger = logging.getLogger(__name__)
 # --- Core/Enum Imports ---
@@ -30,7 +50,7 @@ except ImportError as e:
         value = None; label = None
 
 
-    AccountType, AccountNature, PartyType, CurrencyType, PLSection = (DummyEnum,) * 5
+    AccountType, AccountNature, PartyType, CurrencyType = (DummyEnum,) * 4
 
 logger = logging.getLogger(__name__)
 
@@ -71,157 +91,325 @@ class COASeedingError(Exception):
     pass
 
 
-@transaction.atomic  # Ensure all operations for the company succeed or fail together
-def seed_coa_for_company(company: Company):
+
+
+COA_SEEDING_BATCH_SIZE = getattr(settings, 'COA_SEEDING_BATCH_SIZE', 500)
+
+# Seeded fields an update may rewrite (account_nature only where the template overrides it).
+# The soft-delete fields are among them: seeding restores template rows that were soft-deleted.
+SOFT_DELETE_FIELDS = ('deleted', 'deleted_by_cascade')
+SEEDED_GROUP_FIELDS = ('parent_group_id', 'description') + SOFT_DELETE_FIELDS
+SEEDED_ACCOUNT_FIELDS = ('account_name', 'account_group_id', 'account_type', 'pl_section', 'currency',
+                         'description', 'allow_direct_posting', 'is_active', 'is_control_account',
+                         'control_account_party_type') + SOFT_DELETE_FIELDS
+
+
+@dataclass(frozen=True)
+class GroupTemplate:
+    name: str
+    parent_name: Optional[str]
+    description: str
+
+
+@dataclass(frozen=True)
+class AccountTemplate:
+    account_number: str
+    account_name: str
+    group_name: str
+    account_type: str
+    account_nature: str
+    nature_override: bool  # Nature given in ACCOUNT_ROLE_GROUPS rather than derived from the type
+    pl_section: str
+    is_control_account: bool
+    control_account_party_type: Optional[str]
+
+
+@dataclass(frozen=True)
+class CoaTemplate:
+    groups: Tuple[GroupTemplate, ...]  # Primary groups before their sub-groups
+    accounts: Tuple[AccountTemplate, ...]
+    rejected_accounts: int = 0  # Entries of ACCOUNT_ROLE_GROUPS that fail Account validation
+
+
+@dataclass
+class CoaSeedingResult:
+    groups_created: int = 0
+    groups_updated: int = 0
+    accounts_created: int = 0
+    accounts_updated: int = 0
+    accounts_failed: int = 0
+
+
+def _pl_section_for(account_type: AccountType, account_name: str) -> str:
+    pl_section = ACCOUNT_TYPE_TO_DEFAULT_PL_SECTION_ENUM.get(account_type, PLSection.NONE).value
+    lowered_name = account_name.lower()
+    if account_type == AccountType.EXPENSE:
+        if 'tax' in lowered_name:
+            pl_section = PLSection.TAX_EXPENSE.value
+        elif 'interest expense' in lowered_name:
+            pl_section = PLSection.OTHER_EXPENSE.value
+    elif account_type == AccountType.INCOME and 'interest income' in lowered_name:
+        pl_section = PLSection.OTHER_INCOME.value
+    return pl_section
+
+
+def _validate_account_template(spec: AccountTemplate) -> None:
+    """Runs Account's field and clean() validation once, without a company (no queries)."""
+    account = Account(
+        account_number=spec.account_number, account_name=spec.account_name,
+        account_group=AccountGroup(name=spec.group_name), account_type=spec.account_type,
+        account_nature=spec.account_nature, pl_section=spec.pl_section, currency=CurrencyType.USD.value,
+        is_control_account=spec.is_control_account, control_account_party_type=spec.control_account_party_type,
+    )
+    account.full_clean(exclude=['company', 'account_group'], validate_unique=False, validate_constraints=False)
+
+
+def compile_coa_template(role_groups: Dict[str, list]) -> CoaTemplate:
+    """Compiles an ACCOUNT_ROLE_GROUPS-style mapping into the group tree and validated account specs."""
+    groups: Dict[str, GroupTemplate] = {}
+    accounts: Dict[str, AccountTemplate] = {}
+    account_names = set()
+    rejected = 0
+
+    for group_display_name, account_tuples in role_groups.items():
+        primary_name = get_primary_group_name(group_display_name)
+        if primary_name not in groups:
+            groups[primary_name] = GroupTemplate(primary_name, None, f"Primary group: {primary_name}")
+        if group_display_name != primary_name and group_display_name not in groups:
+            groups[group_display_name] = GroupTemplate(group_display_name, primary_name,
+                                                       f"Sub-group: {group_display_name}")
+
+        account_type = GROUP_CONCEPT_TO_ACCOUNT_TYPE_ENUM.get(primary_name)
+        if not account_type:
+            logger.warning(f"COA Template: No AccountType mapping for primary concept '{primary_name}'. "
+                           f"Skipping accounts in '{group_display_name}'.")
+            continue
+
+        for acc_info_tuple in account_tuples:
+            account_code = acc_info_tuple[0].strip()
+            account_name = acc_info_tuple[1].strip()
+            nature = ACCOUNT_TYPE_TO_NATURE.get(account_type.value)
+            nature_override = False
+            if len(acc_info_tuple) == 3 and acc_info_tuple[2]:
+                try:
+                    nature = AccountNature[acc_info_tuple[2].upper()].value
+                    nature_override = True
+                except KeyError:
+                    logger.error(f"COA Template: Invalid nature override '{acc_info_tuple[2]}' for account "
+                                 f"'{account_name}'. Model default will apply.")
+            if account_code in accounts or account_name in account_names:
+                logger.error(f"COA Template: Duplicate account {account_code} ('{account_name}'). Skipped.")
+                rejected += 1
+                continue
+            spec = AccountTemplate(
+                account_number=account_code, account_name=account_name, group_name=group_display_name,
+                account_type=account_type.value, account_nature=nature, nature_override=nature_override,
+                pl_section=_pl_section_for(account_type, account_name),
+                is_control_account=account_code in CONTROL_ACCOUNTS_MAP,
+                control_account_party_type=CONTROL_ACCOUNTS_MAP.get(account_code),
+            )
+            try:
+                _validate_account_template(spec)
+            except ValidationError as e:
+                logger.error(f"COA Template: VALIDATION ERROR for account {account_code} ('{account_name}'): {e}")
+                rejected += 1
+                continue
+            accounts[account_code] = spec
+            account_names.add(account_name)
+
+    ordered_groups = sorted(groups.values(), key=lambda group: group.parent_name is not None)
+    return CoaTemplate(groups=tuple(ordered_groups), accounts=tuple(accounts.values()), rejected_accounts=rejected)
+
+
+@lru_cache(maxsize=None)
+def get_coa_template() -> CoaTemplate:
+    """The compiled ACCOUNT_ROLE_GROUPS, built on first use and shared for the process."""
+    return compile_coa_template(ACCOUNT_ROLE_GROUPS)
+
+
+def set_coa_seeding_status(company: Company, status: str) -> None:
+    """Writes the seeding status with a single UPDATE (no Company.save, no signals) and on the instance."""
+    Company.objects.filter(pk=company.pk).update(coa_seeding_status=status)
+    company.coa_seeding_status = status
+
+
+def seed_coa_for_company(company: Company, user=None) -> CoaSeedingResult:
     """
     Seeds the Chart of Accounts for the given Company instance.
-    This function is designed to be called when a new company is created (e.g., via a signal).
-    It's idempotent using update_or_create.
+    This function is designed to be called when a new company is created (e.g., via the company
+    signal or seed_coa_for_company_task). It is idempotent: a second run only creates what is
+    missing and updates what differs from the template.
 
     Args:
         company: The Company instance to seed the COA for.
+        user: Optional user recorded as created_by/updated_by and as the history user.
 
     Raises:
         COASeedingError: If a critical error occurs that should prevent company setup.
     """
-    if not ACCOUNT_ROLE_GROUPS:  # Check if constants failed to load
+    template = get_coa_template()
+    if not template.accounts:  # Check if constants failed to load
         logger.error(
             f"COA Seeding for '{company.name}': ACCOUNT_ROLE_GROUPS is empty. Cannot seed. Constants might not have loaded.")
         raise COASeedingError("ACCOUNT_ROLE_GROUPS constant is missing or empty.")
+    if not company.effective_is_active:
+        raise COASeedingError(f"Company '{company.name}' is inactive or suspended.")
 
     logger.info(f"Starting COA Seeding for Company: '{company.name}' (ID: {company.pk})")
-
-    stats = {
-        'groups_created': 0, 'groups_found_or_updated': 0,
-        'accounts_created': 0, 'accounts_found_or_updated': 0, 'accounts_failed': 0
-    }
-    group_objects_map: Dict[str, AccountGroup] = {}
-
-    for group_display_name_from_constant, account_tuples in ACCOUNT_ROLE_GROUPS.items():
-        primary_concept_name = get_primary_group_name(group_display_name_from_constant)
-        parent_group_obj = group_objects_map.get(primary_concept_name)
-
-        # 1. Ensure Primary Group
-        if not parent_group_obj:
-            group_defaults = {'parent_group': None, 'description': f"Primary group: {primary_concept_name}"}
-            try:
-                parent_group_obj, created = AccountGroup.objects.update_or_create(
-                    company=company, name=primary_concept_name, defaults=group_defaults
-                )
-                group_objects_map[primary_concept_name] = parent_group_obj
-                if created:
-                    stats['groups_created'] += 1
-                else:
-                    stats['groups_found_or_updated'] += 1
-            except Exception as e:
-                logger.error(
-                    f"COA Seeding for '{company.name}': ERROR creating primary group '{primary_concept_name}': {e}. Aborting seed for this company.",
-                    exc_info=True)
-                raise COASeedingError(f"Failed on primary group '{primary_concept_name}': {e}") from e
-
-        # 2. Determine Target AccountGroup
-        target_account_group_obj: AccountGroup
-        if group_display_name_from_constant == primary_concept_name:
-            target_account_group_obj = parent_group_obj
-        else:
-            sub_group_defaults = {'parent_group': parent_group_obj,
-                                  'description': f"Sub-group: {group_display_name_from_constant}"}
-            try:
-                target_account_group_obj, created = AccountGroup.objects.update_or_create(
-                    company=company, name=group_display_name_from_constant, defaults=sub_group_defaults
-                )
-                group_objects_map[group_display_name_from_constant] = target_account_group_obj
-                if created:
-                    stats['groups_created'] += 1
-                else:
-                    stats['groups_found_or_updated'] += 1
-            except Exception as e:
-                logger.error(
-                    f"COA Seeding for '{company.name}': ERROR creating sub-group '{group_display_name_from_constant}': {e}. Skipping its accounts.",
-                    exc_info=True)
-                continue  # Skip accounts for this sub-group, but continue with other group definitions
-
-        # 3. Determine AccountType
-        account_type_enum_member = GROUP_CONCEPT_TO_ACCOUNT_TYPE_ENUM.get(primary_concept_name)
-        if not account_type_enum_member:
-            logger.warning(
-                f"COA Seeding for '{company.name}': No AccountType mapping for primary concept '{primary_concept_name}'. Skipping accounts in '{group_display_name_from_constant}'.")
-            continue
-
-        default_pl_section_enum_member = ACCOUNT_TYPE_TO_DEFAULT_PL_SECTION_ENUM.get(account_type_enum_member,
-                                                                                     PLSection.NONE)
-
-        # 4. Create/Update Accounts
-        for acc_info_tuple in account_tuples:
-            try:
-                account_code = acc_info_tuple[0].strip()
-                account_name = acc_info_tuple[1].strip()
-
-                explicit_nature_override_str: Optional[str] = None
-                if len(acc_info_tuple) == 3:
-                    explicit_nature_override_str = acc_info_tuple[2]
-
-                is_control = account_code in CONTROL_ACCOUNTS_MAP
-                control_party_type_val = CONTROL_ACCOUNTS_MAP.get(account_code)
-
-                final_pl_section_val = default_pl_section_enum_member.value
-                if account_type_enum_member == AccountType.EXPENSE:
-                    if 'tax' in account_name.lower():
-                        final_pl_section_val = PLSection.TAX_EXPENSE.value
-                    elif 'interest expense' in account_name.lower():
-                        final_pl_section_val = PLSection.OTHER_EXPENSE.value
-                elif account_type_enum_member == AccountType.INCOME:
-                    if 'interest income' in account_name.lower(): final_pl_section_val = PLSection.OTHER_INCOME.value
-
-                account_defaults = {
-                    'account_name': account_name,
-                    'account_group': target_account_group_obj,
-                    'account_type': account_type_enum_member.value,
-                    'pl_section': final_pl_section_val,
-                    'currency': company.default_currency_code or CurrencyType.USD.value,
-                    'description': f"Seeded account: {account_name}",
-                    'allow_direct_posting': True,
-                    'is_active': True,
-                    'is_control_account': is_control,
-                    'control_account_party_type': control_party_type_val,
-                    # account_nature is intentionally omitted here if no override.
-                    # The Account model's save() method will derive it.
-                }
-
-                if explicit_nature_override_str:
-                    try:
-                        account_defaults['account_nature'] = AccountNature[explicit_nature_override_str.upper()].value
-                    except KeyError:
-                        logger.error(
-                            f"COA Seeding for '{company.name}': Invalid nature override '{explicit_nature_override_str}' for account '{account_name}'. Model default will apply.")
-
-                _account_obj, created = Account.objects.update_or_create(
-                    company=company,
-                    account_number=account_code,
-                    defaults=account_defaults
-                )
-                if created:
-                    stats['accounts_created'] += 1
-                else:
-                    stats['accounts_found_or_updated'] += 1
-
-            except (IntegrityError, ValidationError) as e:
-                logger.error(
-                    f"COA Seeding for '{company.name}': VALIDATION/INTEGRITY ERROR for account {account_code} ('{account_name}'): {e}",
-                    exc_info=False)  # exc_info=False for cleaner logs for these
-                stats['accounts_failed'] += 1
-            except Exception as e:  # Catch any other unexpected error for a specific account
-                logger.error(
-                    f"COA Seeding for '{company.name}': UNEXPECTED ERROR for account {account_code} ('{account_name}'): {e}",
-                    exc_info=True)
-                stats['accounts_failed'] += 1
+    set_coa_seeding_status(company, Company.CoaSeedingStatus.RUNNING)
+    try:
+        with transaction.atomic():  # Ensure all operations for the company succeed or fail together
+            has_groups = AccountGroup.global_all_objects_including_deleted.filter(company=company).exists()
+            if has_groups:
+                result = _seed_existing_coa(company, template, user)
+            else:  # Accounts need a group, so no groups means an empty CoA
+                result = _seed_new_coa(company, template, user)
+    except (IntegrityError, ValidationError) as e:
+        set_coa_seeding_status(company, Company.CoaSeedingStatus.FAILED)
+        logger.error(f"COA Seeding for '{company.name}': ERROR writing the chart of accounts: {e}", exc_info=True)
+        raise COASeedingError(f"Failed to seed the chart of accounts: {e}") from e
+    except Exception:
+        set_coa_seeding_status(company, Company.CoaSeedingStatus.FAILED)
+        raise
+    result.accounts_failed += template.rejected_accounts
+    set_coa_seeding_status(company, Company.CoaSeedingStatus.COMPLETED)
 
     logger.info(f"Finished COA Seeding for Company: '{company.name}' (ID: {company.pk}). "
-                f"Groups Created: {stats['groups_created']}, Groups Found/Updated: {stats['groups_found_or_updated']}. "
-                f"Accounts Created: {stats['accounts_created']}, Accounts Found/Updated: {stats['accounts_found_or_updated']}. "
-                f"Accounts Failed: {stats['accounts_failed']}.")
-
-    if stats['accounts_failed'] > 0:
-        # Depending on policy, you might want to raise an error here to indicate partial failure
-        # raise COASeedingError(f"COA seeding for company '{company.name}' completed with {stats['accounts_failed']} account creation/update failures.")
-        pass  # For now, just log it.
\ No newline at end of file
+                f"Groups Created: {result.groups_created}, Groups Updated: {result.groups_updated}. "
+                f"Accounts Created: {result.accounts_created}, Accounts Updated: {result.accounts_updated}. "
+                f"Accounts Failed: {result.accounts_failed}.")
+    return result
+
+
+def _company_currency(company: Company) -> str:
+    return company.default_currency_code or CurrencyType.USD.value
+
+
+def _new_group(company: Company, spec: GroupTemplate, parent: Optional[AccountGroup], user) -> AccountGroup:
+    group = AccountGroup(company=company, name=spec.name, description=spec.description, parent_group=parent,
+                         created_by=user, updated_by=user)
+    group._set_tree_fields()  # bulk_create skips save(); the parent's path is already set
+    return group
+
+
+def _new_account(company: Company, spec: AccountTemplate, group: AccountGroup, currency: str, user) -> Account:
+    return Account(
+        company=company, account_number=spec.account_number, account_name=spec.account_name, account_group=group,
+        account_type=spec.account_type, account_nature=spec.account_nature, pl_section=spec.pl_section,
+        currency=currency, description=f"Seeded account: {spec.account_name}", allow_direct_posting=True,
+        is_active=True, is_control_account=spec.is_control_account,
+        control_account_party_type=spec.control_account_party_type, created_by=user, updated_by=user,
+    )
+
+
+def _seed_new_coa(company: Company, template: CoaTemplate, user) -> CoaSeedingResult:
+    """Fast path for an empty CoA: every row is built in memory (client-side UUIDs) and bulk inserted."""
+    groups: Dict[str, AccountGroup] = {}
+    for spec in template.groups:  # Parents first
+        groups[spec.name] = _new_group(company, spec, groups.get(spec.parent_name), user)
+    currency = _company_currency(company)
+    accounts = [_new_account(company, spec, groups[spec.group_name], currency, user) for spec in template.accounts]
+
+    bulk_create_with_history(list(groups.values()), AccountGroup, batch_size=COA_SEEDING_BATCH_SIZE, default_user=user)
+    bulk_create_with_history(accounts, Account, batch_size=COA_SEEDING_BATCH_SIZE, default_user=user)
+    return CoaSeedingResult(groups_created=len(groups), accounts_created=len(accounts))
+
+
+def _seed_existing_coa(company: Company, template: CoaTemplate, user) -> CoaSeedingResult:
+    """Diffs the company's CoA against the template; inserts the missing rows, bulk updates the changed ones."""
+    result = CoaSeedingResult()
+    now = timezone.now()
+    audit_fields = ['updated_at', 'updated_by'] if user else ['updated_at']
+
+    # Soft-deleted rows still hold their (company, name/number) keys, so they are restored and updated
+    groups = {group.name: group for group in AccountGroup.global_all_objects_including_deleted.filter(company=company)}
+    groups_to_create, groups_to_update, changed_group_fields = [], [], set()
+    for spec in template.groups:
+        parent = groups.get(spec.parent_name)
+        group = groups.get(spec.name)
+        if group is None:
+            groups[spec.name] = _new_group(company, spec, parent, user)
+            groups_to_create.append(groups[spec.name])
+            continue
+        values = {'parent_group_id': parent.pk if parent else None, 'description': spec.description,
+                  'deleted': None, 'deleted_by_cascade': False}
+        changed = [field for field in SEEDED_GROUP_FIELDS if getattr(group, field) != values[field]]
+        if changed:
+            for field in changed:
+                setattr(group, field, values[field])
+            group.updated_at, group.updated_by = now, user or group.updated_by
+            groups_to_update.append(group)
+            changed_group_fields.update(changed)
+
+    currency = _company_currency(company)
+    accounts = {account.account_number: account
+                for account in Account.global_all_objects_including_deleted.filter(company=company)}
+    number_by_name = {account.account_name: number for number, account in accounts.items()}
+    accounts_to_create, account_changes = [], []
+    for spec in template.accounts:
+        group = groups[spec.group_name]
+        name_owner = number_by_name.get(spec.account_name)
+        if name_owner is not None and name_owner != spec.account_number:
+            logger.error(f"COA Seeding for '{company.name}': Account name '{spec.account_name}' is used by account "
+                         f"{name_owner}; account {spec.account_number} skipped.")
+            result.accounts_failed += 1
+            continue
+        account = accounts.get(spec.account_number)
+        if account is None:
+            accounts_to_create.append(_new_account(company, spec, group, currency, user))
+            number_by_name[spec.account_name] = spec.account_number
+            continue
+        values = {
+            'account_name': spec.account_name, 'account_group_id': group.pk, 'account_type': spec.account_type,
+            'pl_section': spec.pl_section, 'currency': currency, 'description': f"Seeded account: {spec.account_name}",
+            'allow_direct_posting': True, 'is_active': True, 'is_control_account': spec.is_control_account,
+            'control_account_party_type': spec.control_account_party_type,
+            'deleted': None, 'deleted_by_cascade': False,
+        }
+        fields = SEEDED_ACCOUNT_FIELDS + ('account_nature',) if spec.nature_override else SEEDED_ACCOUNT_FIELDS
+        if spec.nature_override:
+            values['account_nature'] = spec.account_nature
+        changed = [field for field in fields if getattr(account, field) != values[field]]
+        if changed:
+            account_changes.append((account, values, changed))
+            if 'account_name' in changed:
+                number_by_name.pop(account.account_name, None)
+                number_by_name[spec.account_name] = spec.account_number
+
+    # Same rule as Account.clean(): the type of an account with posted transactions cannot change
+    retyped_ids = [account.pk for account, _values, changed in account_changes if 'account_type' in changed]
+    locked_ids = set(VoucherLine.objects.filter(
+        account_id__in=retyped_ids, voucher__status=TransactionStatus.POSTED.value
+    ).values_list('account_id', flat=True).distinct()) if retyped_ids else set()
+
+    accounts_to_update, changed_account_fields = [], set()
+    for account, values, changed in account_changes:
+        if account.pk in locked_ids:
+            logger.error(f"COA Seeding for '{company.name}': Account {account.account_number} has posted "
+                         f"transactions; its type cannot change to '{values['account_type']}'. Skipped.")
+            result.accounts_failed += 1
+            continue
+        for field in changed:
+            setattr(account, field, values[field])
+        account.updated_at, account.updated_by = now, user or account.updated_by
+        accounts_to_update.append(account)
+        changed_account_fields.update(changed)
+
+    if groups_to_create:
+        bulk_create_with_history(groups_to_create, AccountGroup, batch_size=COA_SEEDING_BATCH_SIZE, default_user=user)
+    if groups_to_update:
+        bulk_update_with_history(groups_to_update, AccountGroup, sorted(changed_group_fields) + audit_fields,
+                                 batch_size=COA_SEEDING_BATCH_SIZE, default_user=user,
+                                 manager=AccountGroup.global_all_objects_including_deleted)
+        if 'parent_group_id' in changed_group_fields:  # Moved groups take their subtrees along
+            AccountGroup.rebuild_tree_paths(company.pk)
+    if accounts_to_create:
+        bulk_create_with_history(accounts_to_create, Account, batch_size=COA_SEEDING_BATCH_SIZE, default_user=user)
+    if accounts_to_update:
+        bulk_update_with_history(accounts_to_update, Account, sorted(changed_account_fields) + audit_fields,
+                                 batch_size=COA_SEEDING_BATCH_SIZE, default_user=user,
+                                 manager=Account.global_all_objects_including_deleted)
+
+    result.groups_created, result.groups_updated = len(groups_to_create), len(groups_to_update)
+    result.accounts_created, result.accounts_updated = len(accounts_to_create), len(accounts_to_update)
+    return result
@@ -0,0 +1,102 @@
+# crp_accounting/services/document_status_service.py
+"""
+Set-based status sweeper for customer invoices and vendor bills.
+
+Statuses are otherwise only re-evaluated when a document is saved, so an unpaid invoice
+whose due date passes stays SENT until something touches it. `sweep_document_statuses`
+brings every company's documents up to date with a handful of UPDATE statements
+(bypassing save()/full_clean()/history), mirroring the rules of
+CustomerInvoice.update_payment_status and VendorBill.update_payment_status_internal.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+# --- Model Imports ---
+from ..models.receivables import CustomerInvoice, InvoiceStatus
+from ..models.payables import VendorBill
+
+logger = logging.getLogger("crp_accounting.services.document_status")
+
+SweepCounts = Dict[Any, Dict[str, int]]  # company_id -> {rule name: rows updated}
+
+
+def _invoice_rules(today: date):
+    """(rule name, filter, new status) for CustomerInvoice, applied in order."""
+    unpaid_statuses = [InvoiceStatus.SENT.value, InvoiceStatus.OVERDUE.value, InvoiceStatus.PARTIALLY_PAID.value]
+    return [
+        # Fully settled (e.g. allocations or credit adjustments written without a status refresh)
+        ('invoice_paid', Q(status__in=unpaid_statuses, amount_due__lte=0), InvoiceStatus.PAID.value),
+        # Past due with nothing paid yet
+        ('invoice_overdue', Q(status=InvoiceStatus.SENT.value, due_date__lt=today, amount_due__gt=0, amount_paid__lte=0),
+         InvoiceStatus.OVERDUE.value),
+        # Due date moved forward after the invoice had gone overdue
+        ('invoice_no_longer_overdue', Q(status=InvoiceStatus.OVERDUE.value, due_date__gte=today),
+         InvoiceStatus.SENT.value),
+    ]
+
+
+def _bill_rules(today: date):
+    """
+    (rule name, filter, new status) for VendorBill. Bills have no OVERDUE status (overdue is
+    derived from due_date in AP aging), so only settled/part-settled bills are corrected.
+    """
+    statuses = VendorBill.BillStatus
+    return [
+        ('bill_paid', Q(status__in=[statuses.APPROVED.value, statuses.PARTIALLY_PAID.value],
+                        total_amount__gt=0, amount_due__lte=0), statuses.PAID.value),
+        ('bill_partially_paid', Q(status=statuses.APPROVED.value, amount_paid__gt=0, amount_due__gt=0),
+         statuses.PARTIALLY_PAID.value),
+    ]
+
+
+def _apply_rule(model, base_qs, rule_name: str, rule_filter: Q, new_status: str, now,
+                counts: SweepCounts, dry_run: bool) -> int:
+    qs = base_qs.filter(rule_filter)
+    per_company = qs.values('company_id').annotate(n=Count('pk')).order_by()
+    total = 0
+    for row in per_company:
+        counts[row['company_id']][rule_name] = row['n']
+        total += row['n']
+    if total and not dry_run:
+        # QuerySet.update: one statement, no per-instance save()/full_clean()/history rows
+        qs.update(status=new_status, updated_at=now)
+    logger.debug(f"[StatusSweep] {model.__name__} rule '{rule_name}': {total} rows{' (dry run)' if dry_run else ''}.")
+    return total
+
+
+@transaction.atomic
+def sweep_document_statuses(company_ids: Optional[Iterable[Any]] = None, today: Optional[date] = None,
+                            dry_run: bool = False) -> SweepCounts:
+    """
+    Re-evaluates invoice and bill statuses for all (or the given) companies.
+
+    Returns:
+        {company_id: {rule_name: count}} for every company that had at least one change.
+    """
+    today = today or timezone.now().date()
+    now = timezone.now()
+    counts: SweepCounts = defaultdict(dict)
+
+    # Unfiltered managers: runs from beat/management command without a company context
+    invoices_qs = CustomerInvoice.global_objects.all()
+    bills_qs = VendorBill.global_objects.all()
+    if company_ids is not None:
+        company_ids = list(company_ids)
+        invoices_qs = invoices_qs.filter(company_id__in=company_ids)
+        bills_qs = bills_qs.filter(company_id__in=company_ids)
+
+    for rule_name, rule_filter, new_status in _invoice_rules(today):
+        _apply_rule(CustomerInvoice, invoices_qs, rule_name, rule_filter, new_status, now, counts, dry_run)
+    for rule_name, rule_filter, new_status in _bill_rules(today):
+        _apply_rule(VendorBill, bills_qs, rule_name, rule_filter, new_status, now, counts, dry_run)
+
+    for company_id, company_counts in counts.items():
+        logger.info(f"[StatusSweep][Co:{company_id}] {company_counts}{' (dry run)' if dry_run else ''}")
+    return dict(counts)
@@ -19,6 +19,8 @@ from ..models.journal import Voucher, VoucherLine, DrCrType, TransactionStatus
 from ..models.coa import Account
 # from ..models.party import Party # Uncomment if directly used for particulars
 from crp_core.enums import AccountNature  # Assuming crp_core is an app at the same level or in PYTHONPATH
+from crp_core.db_routers import use_reporting_replica
+from crp_core.instrumentation import span, record_cache_lookup
 
 # --- Company Import ---
 try:
@@ -43,6 +45,7 @@ class MinimalAccountForBalance(NamedTuple):
 # Ledger Service Functions (Tenant Aware & Optimized)
 # =============================================================================
 
+@span('ledger.opening_balance')
 def calculate_account_balance_upto(
         company_id: Union[int, str],
         account_for_balance: MinimalAccountForBalance,
@@ -58,12 +61,13 @@ def calculate_account_balance_upto(
 
     cache_key = f"acc_ob_{company_id}_{account_for_balance.pk}_{date_exclusive.isoformat()}"
     cached_balance = cache.get(cache_key)
+    record_cache_lookup(hit=cached_balance is not None)
     if cached_balance is not None:
         # logger.debug(f"Cache HIT for opening balance: Key='{cache_key}'")
         return Decimal(cached_balance)
 
-    logger.debug(
-        f"Cache MISS for opening balance: Key='{cache_key}'. Calculating for Co {company_id}, Acc PK {account_for_balance.pk}...")
+    logger.debug("Cache MISS for opening balance: Key='%s'. Calculating for Co %s, Acc PK %s...",
+                 cache_key, company_id, account_for_balance.pk)
 
     lines = VoucherLine.objects.filter(
         account_id=account_for_balance.pk,
@@ -72,16 +76,17 @@ def calculate_account_balance_upto(
         voucher__date__lt=date_exclusive
     )
 
-    aggregation = lines.aggregate(
-        total_debit=Coalesce(
-            Sum('amount', filter=Q(dr_cr=DrCrType.DEBIT.value)),
-            ZERO_DECIMAL, output_field=models.DecimalField()
-        ),
-        total_credit=Coalesce(
-            Sum('amount', filter=Q(dr_cr=DrCrType.CREDIT.value)),
-            ZERO_DECIMAL, output_field=models.DecimalField()
+    with span('aggregate'):
+        aggregation = lines.aggregate(
+            total_debit=Coalesce(
+                Sum('amount', filter=Q(dr_cr=DrCrType.DEBIT.value)),
+                ZERO_DECIMAL, output_field=models.DecimalField()
+            ),
+            total_credit=Coalesce(
+                Sum('amount', filter=Q(dr_cr=DrCrType.CREDIT.value)),
+                ZERO_DECIMAL, output_field=models.DecimalField()
+            )
         )
-    )
     debit_total = aggregation['total_debit']
     credit_total = aggregation['total_credit']
 
@@ -106,6 +111,8 @@ def calculate_account_balance_upto(
     return balance
 
 
+@span('ledger.account_ledger')
+@use_reporting_replica()
 def get_account_ledger_data(
         company_id: Union[int, str],
         account_pk: Union[int, str],
@@ -137,10 +144,8 @@ def get_account_ledger_data(
         account_nature=account_data_dict['account_nature']
     )
 
-    logger.info(
-        f"Generating ledger for Co ID {company_id}, Acc: {account_data_dict['account_name']} ({account_pk}) | "
-        f"Period: {start_date or 'Beginning'} to {end_date or 'End'}"
-    )
+    logger.info("Generating ledger for Co ID %s, Acc: %s (%s) | Period: %s to %s",
+                company_id, account_data_dict['account_name'], account_pk, start_date or 'Beginning', end_date or 'End')
 
     opening_balance = calculate_account_balance_upto(
         company_id=company_id,
@@ -165,7 +170,8 @@ def get_account_ledger_data(
     if end_date:
         ledger_lines_query = ledger_lines_query.filter(voucher__date__lte=end_date)
 
-    ledger_lines = list(ledger_lines_query)
+    with span('ledger.lines'):
+        ledger_lines = list(ledger_lines_query)
 
     entries: List[Dict] = []
     running_balance: Decimal = opening_balance
@@ -0,0 +1,53 @@
+# crp_accounting/services/ledger_version_service.py
+"""
+Cheap "has anything changed?" validator for a company's financial reports.
+
+`get_ledger_last_modified` returns the latest change time of everything the trial balance,
+P&L, balance sheet and account ledger read, in one query of indexed MAX() lookups:
+  - Voucher.posted_at: every posting, reversal and year-end closing voucher (vouchers do not
+    change once posted, and bulk-inserted POSTED vouchers set posted_at too),
+  - Account / AccountGroup updated_at: chart of accounts structure, names, report sections,
+  - FiscalYear updated_at: year-end close and carried-forward opening balances,
+  - ExchangeRate updated_at (company and global rates): report currency conversion,
+  - Company.updated_at: default currency and report header.
+Report views use it for conditional GET (ETag / Last-Modified, see LedgerConditionalGetMixin),
+so polling dashboards get a 304 without the report being computed.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Optional
+
+from django.db.models import OuterRef, Q, Subquery
+
+from company.models import Company
+
+from ..models.base import ExchangeRate
+from ..models.coa import Account, AccountGroup
+from ..models.journal import Voucher
+from ..models.period import FiscalYear
+
+logger = logging.getLogger("crp_accounting.services.ledger_version")
+
+
+def _latest(queryset, field_name: str) -> Subquery:
+    """Newest `field_name` of the queryset (top-1 on an index rather than an aggregate)."""
+    return Subquery(queryset.filter(**{f'{field_name}__isnull': False}).order_by(f'-{field_name}')
+                    .values(field_name)[:1])
+
+
+def get_ledger_last_modified(company_id: Any) -> Optional[datetime]:
+    """Latest change affecting the company's financial reports, or None if the company does not exist."""
+    company = OuterRef('pk')
+    row = Company.objects.filter(pk=company_id).values('updated_at').annotate(
+        vouchers=_latest(Voucher.global_all_objects_including_deleted.filter(company=company), 'posted_at'),
+        accounts=_latest(Account.global_all_objects_including_deleted.filter(company=company), 'updated_at'),
+        groups=_latest(AccountGroup.global_all_objects_including_deleted.filter(company=company), 'updated_at'),
+        fiscal_years=_latest(FiscalYear.global_all_objects_including_deleted.filter(company=company), 'updated_at'),
+        exchange_rates=_latest(ExchangeRate.objects.filter(Q(company=company) | Q(company__isnull=True)),
+                               'updated_at'),
+    ).first()
+    if row is None:
+        return None
+    timestamps = [value for value in row.values() if value is not None]
+    return max(timestamps) if timestamps else None
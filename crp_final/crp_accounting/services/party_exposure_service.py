@@ -0,0 +1,239 @@
+# crp_accounting/services/party_exposure_service.py
+"""
+Maintained party exposure (Party.posted_balance / unposted_documents_amount / open_orders_amount).
+
+- `apply_posted_voucher_to_party_exposure` is called wherever account balances are applied for a
+  POSTED voucher (the voucher post_save/pre_delete signals and the balance update task, including
+  reversing vouchers), so `posted_balance` moves with the GL.
+- `aggregate_unposted_documents` backs Party.recalculate_unposted_documents_amount, which
+  CustomerInvoice/VendorBill saves schedule through the deferred parent recalculation, and
+  `refresh_unposted_documents_amounts`, its set-based form for batch writers (payment runs,
+  cash application).
+- `rebuild_party_exposure` recomputes everything from scratch (backfill / repair).
+- `annotate_party_balances` adds balance-as-of-date, overdue and credit utilization columns to
+  a Party queryset so listings can filter/sort on them in the database.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from datetime import date
+from typing import Any, Dict, Iterable, Optional
+
+from django.db import models, transaction
+from django.db.models import Sum, Q, F, Case, When, Value, OuterRef, Subquery, ExpressionWrapper
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# --- Model Imports ---
+from ..models.party import Party
+from ..models.journal import Voucher, VoucherLine, TransactionStatus, DrCrType
+from ..models.receivables import CustomerInvoice, InvoiceStatus
+from ..models.payables import VendorBill
+from crp_core.enums import AccountNature
+
+logger = logging.getLogger("crp_accounting.services.party_exposure")
+
+ZERO_DECIMAL = Decimal('0.00')
+
+# Issued but not yet posted documents count towards exposure; drafts and voided ones do not
+UNPOSTED_INVOICE_STATUSES = [InvoiceStatus.SENT.value, InvoiceStatus.OVERDUE.value, InvoiceStatus.PARTIALLY_PAID.value]
+UNPOSTED_BILL_STATUSES = [VendorBill.BillStatus.SUBMITTED_FOR_APPROVAL.value, VendorBill.BillStatus.APPROVED.value,
+                          VendorBill.BillStatus.PARTIALLY_PAID.value]
+# Documents that can fall overdue
+OPEN_INVOICE_STATUSES = [InvoiceStatus.SENT.value, InvoiceStatus.OVERDUE.value, InvoiceStatus.PARTIALLY_PAID.value]
+OPEN_BILL_STATUSES = [VendorBill.BillStatus.APPROVED.value, VendorBill.BillStatus.PARTIALLY_PAID.value]
+
+
+def _signed_balance(account_nature: str, total_debit: Decimal, total_credit: Decimal) -> Decimal:
+    """Balance from the party's perspective, same convention as Party.calculate_outstanding_balance."""
+    if account_nature == AccountNature.CREDIT.value:
+        return total_credit - total_debit
+    return total_debit - total_credit
+
+
+def apply_posted_voucher_to_party_exposure(voucher: Voucher, lines: Iterable[VoucherLine],
+                                           current_time=None, is_reversal: bool = False) -> Optional[Decimal]:
+    """
+    Adds a POSTED voucher's effect on its party's control account to Party.posted_balance
+    (or removes it when `is_reversal`, e.g. a posted voucher being deleted).
+    Must run inside the same transaction that updates account balances (idempotency is
+    provided by the voucher's `balances_updated` flag). Returns the applied delta, or None.
+    """
+    if not voucher.party_id:
+        return None
+    party_row = Party._base_manager.filter(pk=voucher.party_id).values(
+        'control_account_id', 'control_account__account_nature').first()
+    if not party_row or not party_row['control_account_id']:
+        return None
+
+    total_debit = total_credit = ZERO_DECIMAL
+    for line in lines:
+        if line.account_id != party_row['control_account_id'] or not line.amount:
+            continue
+        if line.dr_cr == DrCrType.DEBIT.value:
+            total_debit += line.amount
+        elif line.dr_cr == DrCrType.CREDIT.value:
+            total_credit += line.amount
+    delta = _signed_balance(party_row['control_account__account_nature'], total_debit, total_credit)
+    if is_reversal:
+        delta = -delta
+    if delta == ZERO_DECIMAL:
+        return delta
+
+    Party._base_manager.filter(pk=voucher.party_id).update(
+        posted_balance=F('posted_balance') + delta, exposure_updated_at=current_time or timezone.now())
+    logger.debug(f"[PartyExposure][Party:{voucher.party_id}] Posted balance {delta:+} from voucher {voucher.pk}.")
+    return delta
+
+
+def aggregate_posted_balances(company_id: Any, party_ids: Optional[Iterable[Any]] = None,
+                              date_upto=None) -> Dict[Any, Decimal]:
+    """
+    Posted balance per party on its own control account, in one grouped query
+    (GROUP BY voucher party, control account nature).
+    """
+    lines_qs = VoucherLine.objects.filter(
+        voucher__company_id=company_id,
+        voucher__status=TransactionStatus.POSTED.value,
+        voucher__party__isnull=False,
+        account_id=F('voucher__party__control_account_id'),
+    )
+    if party_ids is not None:
+        lines_qs = lines_qs.filter(voucher__party_id__in=list(party_ids))
+    if date_upto:
+        lines_qs = lines_qs.filter(voucher__date__lte=date_upto)
+    rows = lines_qs.values('voucher__party_id', 'account__account_nature').annotate(
+        total_debit=Coalesce(Sum('amount', filter=Q(dr_cr=DrCrType.DEBIT.value)), ZERO_DECIMAL,
+                             output_field=models.DecimalField()),
+        total_credit=Coalesce(Sum('amount', filter=Q(dr_cr=DrCrType.CREDIT.value)), ZERO_DECIMAL,
+                              output_field=models.DecimalField()),
+    ).order_by()
+    return {
+        row['voucher__party_id']: _signed_balance(row['account__account_nature'], row['total_debit'], row['total_credit'])
+        for row in rows
+    }
+
+
+def aggregate_unposted_documents(company_id: Any, party_ids: Optional[Iterable[Any]] = None) -> Dict[Any, Decimal]:
+    """
+    Amount due per party on issued invoices and approved bills that have no GL voucher yet.
+    Uses the unfiltered managers (explicit company filter) so it also works from tasks without a company context.
+    """
+    party_ids = list(party_ids) if party_ids is not None else None
+    totals: Dict[Any, Decimal] = defaultdict(lambda: ZERO_DECIMAL)
+
+    invoices_qs = CustomerInvoice.global_objects.filter(
+        company_id=company_id, related_gl_voucher__isnull=True, status__in=UNPOSTED_INVOICE_STATUSES)
+    bills_qs = VendorBill.global_objects.filter(
+        company_id=company_id, related_gl_voucher__isnull=True, status__in=UNPOSTED_BILL_STATUSES)
+    if party_ids is not None:
+        invoices_qs = invoices_qs.filter(customer_id__in=party_ids)
+        bills_qs = bills_qs.filter(supplier_id__in=party_ids)
+
+    for party_field, qs in (('customer_id', invoices_qs), ('supplier_id', bills_qs)):
+        for row in qs.values(party_field).annotate(due=Sum('amount_due')).order_by():
+            totals[row[party_field]] += row['due'] or ZERO_DECIMAL
+    return dict(totals)
+
+
+def refresh_unposted_documents_amounts(company_id: Any, party_ids: Iterable[Any]) -> int:
+    """
+    Set-based Party.recalculate_unposted_documents_amount for several parties (one grouped read,
+    one bulk update). Returns parties changed.
+    """
+    party_ids = list(party_ids)
+    if not party_ids:
+        return 0
+    unposted = aggregate_unposted_documents(company_id, party_ids=party_ids)
+    now = timezone.now()
+
+    parties_to_update = []
+    for party in Party.global_objects.filter(company_id=company_id, pk__in=party_ids).only(
+            'id', 'unposted_documents_amount', 'exposure_updated_at'):
+        new_unposted = unposted.get(party.pk, ZERO_DECIMAL)
+        if party.unposted_documents_amount != new_unposted:
+            party.unposted_documents_amount = new_unposted
+            party.exposure_updated_at = now
+            parties_to_update.append(party)
+
+    Party._base_manager.bulk_update(parties_to_update, ['unposted_documents_amount', 'exposure_updated_at'],
+                                    batch_size=1000)
+    return len(parties_to_update)
+
+
+@transaction.atomic
+def rebuild_party_exposure(company_id: Any) -> int:
+    """Recomputes the maintained exposure columns of every party of a company. Returns parties changed."""
+    log_prefix = f"[PartyExposureRebuild][Co:{company_id}]"
+    posted = aggregate_posted_balances(company_id)
+    unposted = aggregate_unposted_documents(company_id)
+    now = timezone.now()
+
+    parties_to_update = []
+    for party in Party.global_objects.select_for_update().filter(company_id=company_id).only(
+            'id', 'posted_balance', 'unposted_documents_amount', 'exposure_updated_at'):
+        new_posted = posted.get(party.pk, ZERO_DECIMAL)
+        new_unposted = unposted.get(party.pk, ZERO_DECIMAL)
+        if party.posted_balance != new_posted or party.unposted_documents_amount != new_unposted:
+            party.posted_balance = new_posted
+            party.unposted_documents_amount = new_unposted
+            party.exposure_updated_at = now
+            parties_to_update.append(party)
+
+    Party._base_manager.bulk_update(
+        parties_to_update, ['posted_balance', 'unposted_documents_amount', 'exposure_updated_at'], batch_size=1000)
+    logger.info(f"{log_prefix} Rebuilt exposure; {len(parties_to_update)} parties changed.")
+    return len(parties_to_update)
+
+
+def _overdue_subquery(model, party_field: str, statuses, as_of_date: date):
+    """Correlated SUM(amount_due) of a party's documents past due on `as_of_date`."""
+    return Coalesce(Subquery(
+        model.global_objects.filter(
+            # company correlation lets the (company, party, due_date) partial open-item indexes be used
+            company_id=OuterRef('company_id'), **{party_field: OuterRef('pk')},
+            status__in=statuses, due_date__lt=as_of_date, amount_due__gt=ZERO_DECIMAL
+        ).order_by().values(party_field).annotate(total=Sum('amount_due')).values('total')[:1],
+        output_field=models.DecimalField(max_digits=20, decimal_places=2)
+    ), ZERO_DECIMAL, output_field=models.DecimalField(max_digits=20, decimal_places=2))
+
+
+def annotate_party_balances(queryset, as_of_date: date):
+    """
+    Annotates a Party queryset (one GROUP BY party over its vouchers' control-account lines) with:
+      balance          - posted balance on the party's control account as of `as_of_date`
+      overdue_amount   - amount due on its invoices (customers) / bills (suppliers) past due on that date
+      credit_utilization - balance as a percentage of credit_limit (NULL when no limit is set)
+    """
+    decimal_field = models.DecimalField(max_digits=20, decimal_places=2)
+    line_filter = Q(
+        vouchers__status=TransactionStatus.POSTED.value,
+        vouchers__date__lte=as_of_date,
+        vouchers__lines__account_id=F('control_account_id'),
+    )
+    total_debit = Coalesce(
+        Sum('vouchers__lines__amount', filter=line_filter & Q(vouchers__lines__dr_cr=DrCrType.DEBIT.value)),
+        ZERO_DECIMAL, output_field=decimal_field)
+    total_credit = Coalesce(
+        Sum('vouchers__lines__amount', filter=line_filter & Q(vouchers__lines__dr_cr=DrCrType.CREDIT.value)),
+        ZERO_DECIMAL, output_field=decimal_field)
+
+    queryset = queryset.annotate(
+        balance=Case(
+            When(control_account__isnull=True, then=Value(ZERO_DECIMAL)),
+            When(control_account__account_nature=AccountNature.CREDIT.value, then=total_credit - total_debit),
+            default=total_debit - total_credit,
+            output_field=decimal_field,
+        ),
+    ).annotate(
+        overdue_amount=_overdue_subquery(CustomerInvoice, 'customer', OPEN_INVOICE_STATUSES, as_of_date) +
+                       _overdue_subquery(VendorBill, 'supplier', OPEN_BILL_STATUSES, as_of_date),
+        credit_utilization=Case(
+            When(credit_limit__gt=ZERO_DECIMAL, then=ExpressionWrapper(
+                F('balance') * Value(Decimal('100')) / F('credit_limit'), output_field=decimal_field)),
+            default=Value(None),
+            output_field=decimal_field,
+        ),
+    )
+    return queryset
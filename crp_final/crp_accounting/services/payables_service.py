@@ -35,7 +35,7 @@ from crp_accounting.models.payables import (
 )
 from crp_accounting.models.party import Party
 from crp_accounting.models.coa import Account
-from crp_accounting.models.period import AccountingPeriod # Ensure this model is correctly imported
+from crp_accounting.models.deferred_recalc import deferred_parent_recalculation
 from crp_accounting.models.journal import Voucher, TransactionStatus, DrCrType, VoucherType as JournalVoucherType
 
 # --- Core/Enum Imports ---
@@ -43,6 +43,7 @@ from crp_core.enums import PartyType, AccountType
 
 # --- Service Imports ---
 from . import voucher_service  # Assuming voucher_service provides create_and_post_voucher & create_reversing_voucher
+from .period_calendar_service import get_period_calendar
 
 logger = logging.getLogger("crp_accounting.services.payables")
 User = get_user_model()  # Standard way to get the User model
@@ -84,13 +85,17 @@ class GLPostingError(PayablesServiceError):
 # Sequence Generation Helpers
 # =============================================================================
 @transaction.atomic
-def _generate_next_document_number(
+def _reserve_document_numbers(
         company: Company,
         sequence_model: Union[type[BillSequence], type[PaymentSequence]],
         default_prefix: str,
-        target_date: date
-) -> str:
+        target_date: date,
+        count: int = 1
+) -> List[str]:
+    """Reserves `count` consecutive document numbers with one sequence row lock and one save."""
     log_prefix = f"[GenDocNum][Co:{company.pk}][Prefix:{default_prefix}][Model:{sequence_model.__name__}]"
+    if count < 1:
+        return []
     sequence_config, created = sequence_model.objects.select_for_update().get_or_create(
         company=company,
         prefix=default_prefix,
@@ -119,25 +124,26 @@ def _generate_next_document_number(
         )
         sequence_config.current_number = 0
         sequence_config.current_period_key = calculated_period_key_for_date
-    next_number_val = sequence_config.current_number + 1
-    sequence_config.current_number = next_number_val
-    formatted_number = sequence_config.format_number(next_number_val)
-    conflict_exists = False
+    first_number_val = sequence_config.current_number + 1
+    sequence_config.current_number += count
+    formatted_numbers = [sequence_config.format_number(number_val)
+                         for number_val in range(first_number_val, sequence_config.current_number + 1)]
+    conflicting = []
     if sequence_model == BillSequence:
-        if VendorBill.objects.filter(company=company, bill_number=formatted_number).exists():
-            conflict_exists = True
+        conflicting = list(VendorBill.objects.filter(
+            company=company, bill_number__in=formatted_numbers).values_list('bill_number', flat=True)[:1])
     elif sequence_model == PaymentSequence:
-        if VendorPayment.objects.filter(company=company, payment_number=formatted_number).exists():
-            conflict_exists = True
-    if conflict_exists:
+        conflicting = list(VendorPayment.objects.filter(
+            company=company, payment_number__in=formatted_numbers).values_list('payment_number', flat=True)[:1])
+    if conflicting:
         logger.error(
-            f"{log_prefix} CRITICAL: Generated number {formatted_number} already exists in "
+            f"{log_prefix} CRITICAL: Generated number {conflicting[0]} already exists in "
             f"{'VendorBill' if sequence_model == BillSequence else 'VendorPayment'}! "
-            f"Sequence PK={sequence_config.pk}, Current DB No={sequence_config.current_number} (before save)."
+            f"Sequence PK={sequence_config.pk}, Current DB No={first_number_val - 1} (before save)."
         )
         raise SequenceGenerationError(
             _("Generated document number '%(num)s' conflicts with an existing document. Please try again.") % {
-                'num': formatted_number}
+                'num': conflicting[0]}
         )
     fields_to_update = ['current_number', 'updated_at']
     if sequence_config.period_format_for_reset or created:
@@ -148,10 +154,19 @@ def _generate_next_document_number(
         logger.error(f"{log_prefix} IntegrityError saving sequence {sequence_config.pk}: {e}", exc_info=True)
         raise SequenceGenerationError(_("Failed to save sequence due to a database integrity issue."))
     logger.info(
-        f"{log_prefix} Generated number: {formatted_number} (Raw SeqNo: {next_number_val}) "
+        f"{log_prefix} Reserved {count} number(s): {formatted_numbers[0]}..{formatted_numbers[-1]} "
         f"from Sequence PK {sequence_config.pk}."
     )
-    return formatted_number
+    return formatted_numbers
+
+
+def _generate_next_document_number(
+        company: Company,
+        sequence_model: Union[type[BillSequence], type[PaymentSequence]],
+        default_prefix: str,
+        target_date: date
+) -> str:
+    return _reserve_document_numbers(company, sequence_model, default_prefix, target_date)[0]
 
 def get_next_bill_number(company: Company, bill_date: date, prefix_override: Optional[str] = None) -> str:
     default_prefix = prefix_override or getattr(company, 'default_bill_prefix', 'BILL-')
@@ -161,6 +176,12 @@ def get_next_payment_number(company: Company, payment_date: date, prefix_overrid
     default_prefix = prefix_override or getattr(company, 'default_vendor_payment_prefix', 'VPAY-')
     return _generate_next_document_number(company, PaymentSequence, default_prefix, payment_date)
 
+def reserve_payment_numbers(company: Company, payment_date: date, count: int,
+                            prefix_override: Optional[str] = None) -> List[str]:
+    """`count` consecutive payment numbers, reserved in one sequence update (batch writers, e.g. payment runs)."""
+    default_prefix = prefix_override or getattr(company, 'default_vendor_payment_prefix', 'VPAY-')
+    return _reserve_document_numbers(company, PaymentSequence, default_prefix, payment_date, count)
+
 # =============================================================================
 # Vendor Bill Services
 # =============================================================================
@@ -200,30 +221,31 @@ def create_vendor_bill(
         logger.error(f"{log_prefix} Validation error for bill header: {e.message_dict}", exc_info=True)
         raise BillProcessingError(e.message_dict)
     vendor_bill.save()
-    for line_data in lines_data:
-        try:
-            expense_acc_id = line_data.get('expense_account_id')
-            if not expense_acc_id:
-                raise DjangoValidationError({'expense_account_id': _("Expense account ID is missing for a line item.")})
-            expense_account = Account.objects.get(pk=expense_acc_id, company=company, is_active=True, allow_direct_posting=True)
-            if expense_account.account_type in [AccountType.INCOME.value, AccountType.EQUITY.value] or \
-               (expense_account.is_control_account and expense_account.control_account_party_type in [PartyType.CUSTOMER.value, PartyType.SUPPLIER.value]):
-                raise DjangoValidationError({'expense_account_id': _("Invalid account type ('%(type)s') for bill line expense. Account: %(acc)s.") %
-                                              {'type': expense_account.get_account_type_display(), 'acc': expense_account.account_name}})
-            line = BillLine(
-                company=company, vendor_bill=vendor_bill, expense_account=expense_account,
-                description=line_data.get('description', ''),
-                quantity=Decimal(str(line_data.get('quantity', '1'))),
-                unit_price=Decimal(str(line_data.get('unit_price', '0'))),
-                tax_amount_on_line=Decimal(str(line_data.get('tax_amount_on_line', '0'))),
-                created_by=created_by_user, updated_by=created_by_user
-            )
-            line.full_clean(); line.save()
-        except (Account.DoesNotExist, DjangoValidationError, ValueError, TypeError) as e_line:
-            err_msg = e_line.message_dict if hasattr(e_line, 'message_dict') else str(e_line)
-            logger.error(f"{log_prefix} Error processing bill line: {err_msg}. Data: {line_data}", exc_info=True)
-            raise BillProcessingError(_("Error in bill line: %(error)s. Line Data: %(data)s") % {'error': err_msg, 'data': line_data})
-    vendor_bill._recalculate_derived_fields(perform_save=True)
+    # Bill totals are recalculated once when the block exits, not once per line
+    with deferred_parent_recalculation():
+        for line_data in lines_data:
+            try:
+                expense_acc_id = line_data.get('expense_account_id')
+                if not expense_acc_id:
+                    raise DjangoValidationError({'expense_account_id': _("Expense account ID is missing for a line item.")})
+                expense_account = Account.objects.get(pk=expense_acc_id, company=company, is_active=True, allow_direct_posting=True)
+                if expense_account.account_type in [AccountType.INCOME.value, AccountType.EQUITY.value] or \
+                   (expense_account.is_control_account and expense_account.control_account_party_type in [PartyType.CUSTOMER.value, PartyType.SUPPLIER.value]):
+                    raise DjangoValidationError({'expense_account_id': _("Invalid account type ('%(type)s') for bill line expense. Account: %(acc)s.") %
+                                                  {'type': expense_account.get_account_type_display(), 'acc': expense_account.account_name}})
+                line = BillLine(
+                    company=company, vendor_bill=vendor_bill, expense_account=expense_account,
+                    description=line_data.get('description', ''),
+                    quantity=Decimal(str(line_data.get('quantity', '1'))),
+                    unit_price=Decimal(str(line_data.get('unit_price', '0'))),
+                    tax_amount_on_line=Decimal(str(line_data.get('tax_amount_on_line', '0'))),
+                    created_by=created_by_user, updated_by=created_by_user
+                )
+                line.full_clean(); line.save()
+            except (Account.DoesNotExist, DjangoValidationError, ValueError, TypeError) as e_line:
+                err_msg = e_line.message_dict if hasattr(e_line, 'message_dict') else str(e_line)
+                logger.error(f"{log_prefix} Error processing bill line: {err_msg}. Data: {line_data}", exc_info=True)
+                raise BillProcessingError(_("Error in bill line: %(error)s. Line Data: %(data)s") % {'error': err_msg, 'data': line_data})
     logger.info(f"{log_prefix} Vendor Bill {vendor_bill.bill_number or vendor_bill.pk} created successfully. Status: '{vendor_bill.get_status_display()}'.")
     return vendor_bill
 
@@ -504,17 +526,8 @@ def post_vendor_bill_to_gl(
 
 
     # Pre-check for accounting period
-    try:
-        AccountingPeriod.objects.get(
-            company=bill.company,
-            start_date__lte=final_posting_date,
-            end_date__gte=final_posting_date,
-            locked=False
-        )
-    except AccountingPeriod.DoesNotExist:
+    if get_period_calendar(bill.company_id).open_period_for(final_posting_date) is None:
         raise GLPostingError(_("No open accounting period found for posting date: %(date)s for company '%(company_name)s'.") % {'date': final_posting_date, 'company_name': bill.company.name})
-    except AccountingPeriod.MultipleObjectsReturned:
-        raise GLPostingError(_("Multiple open accounting periods found for posting date: %(date)s for company '%(company_name)s'. Please check period configuration.") % {'date': final_posting_date, 'company_name': bill.company.name})
 
     voucher_lines_data = []
     # ... (voucher_lines_data population remains the same) ...
@@ -849,27 +862,13 @@ def post_vendor_payment_to_gl(
         )
 
     # Pre-check for accounting period
-    try:
-        AccountingPeriod.objects.get(
-            company=payment.company,
-            start_date__lte=final_posting_date,
-            end_date__gte=final_posting_date,
-            locked=False
-        )
-    except AccountingPeriod.DoesNotExist:
+    if get_period_calendar(payment.company_id).open_period_for(final_posting_date) is None:
         logger.error(
             f"{log_prefix} No open accounting period found for posting date {final_posting_date} for company {payment.company.name}.")
         raise GLPostingError(
             _("No open accounting period found for posting date: %(date)s for company '%(company_name)s'.") %
             {'date': final_posting_date, 'company_name': payment.company.name}
         )
-    except AccountingPeriod.MultipleObjectsReturned:
-        logger.error(
-            f"{log_prefix} Multiple open accounting periods found for posting date {final_posting_date} for company {payment.company.name}.")
-        raise GLPostingError(
-            _("Multiple open accounting periods found for posting date: %(date)s for company '%(company_name)s'. Please check period configuration.") %
-            {'date': final_posting_date, 'company_name': payment.company.name}
-        )
 
     # GL Entries:
     # Debit: Accounts Payable (Liability) - Reducing what is owed to supplier
@@ -0,0 +1,310 @@
+# crp_accounting/services/payment_run_service.py
+"""
+Vendor payment runs: pay every approved bill due by a date in one batch.
+
+`propose_payment_run` selects the open bills with a single query (served by the partial
+open-bill index) and groups them into one proposed payment per supplier and currency.
+`execute_payment_run` writes a proposal chunk by chunk. Each chunk is one transaction that
+creates the payments (numbered, allocated, PAID_COMPLETED), their allocations and their POSTED
+GL vouchers with bulk inserts (voucher numbers reserved as one block, vouchers posted through
+voucher_service.bulk_insert_posted_vouchers) and marks the bills paid with one bulk update.
+
+This replaces, for a run, the per-payment create -> approve -> allocate -> post sequence of
+payables_service; the resulting rows are the same as that sequence produces.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from company.models import Company
+
+# --- Model Imports ---
+from ..models.payables import VendorBill, VendorPayment, VendorPaymentAllocation
+from ..models.coa import Account
+from ..models.period import AccountingPeriod
+from ..models.journal import Voucher, VoucherLine, TransactionStatus, DrCrType
+from crp_core.enums import AccountType, VoucherType
+
+# --- Service Imports ---
+from . import sequence_service, voucher_service
+from .party_exposure_service import refresh_unposted_documents_amounts
+from .payables_service import reserve_payment_numbers, PaymentProcessingError, GLPostingError
+from .period_calendar_service import get_period_calendar
+
+logger = logging.getLogger("crp_accounting.services.payment_run")
+
+ZERO_DECIMAL = Decimal('0.00')
+
+# Same status set (and amount_due > 0) as the partial open-bill index on VendorBill
+PAYABLE_BILL_STATUSES = [VendorBill.BillStatus.APPROVED.value, VendorBill.BillStatus.PARTIALLY_PAID.value]
+
+
+@dataclass
+class PaymentRunBill:
+    bill_id: Any
+    bill_number: str
+    due_date: date
+    amount: Decimal
+
+
+@dataclass
+class SupplierPaymentProposal:
+    supplier_id: Any
+    supplier_name: str
+    currency: str
+    bills: List[PaymentRunBill] = field(default_factory=list)
+
+    @property
+    def total(self) -> Decimal:
+        return sum((bill.amount for bill in self.bills), ZERO_DECIMAL)
+
+
+@dataclass
+class PaymentRunResult:
+    dry_run: bool
+    due_by: date
+    proposals: List[SupplierPaymentProposal] = field(default_factory=list)
+    payment_ids: List[Any] = field(default_factory=list)
+    voucher_ids: List[Any] = field(default_factory=list)
+    skipped_bill_ids: List[Any] = field(default_factory=list)  # Paid or changed since the proposal was made
+    # Set when a chunk failed after earlier chunks were committed; the failed chunk and the ones
+    # after it are left unpaid (unpaid_proposals), the committed payments stay in payment_ids.
+    error: Optional[str] = None
+    unpaid_proposals: List[SupplierPaymentProposal] = field(default_factory=list)
+
+    @property
+    def bill_count(self) -> int:
+        return sum(len(proposal.bills) for proposal in self.proposals)
+
+    @property
+    def total_amount(self) -> Decimal:
+        return sum((proposal.total for proposal in self.proposals), ZERO_DECIMAL)
+
+
+def propose_payment_run(company_id: Any, due_by: date, supplier_ids: Optional[Iterable[Any]] = None,
+                        currency: Optional[str] = None) -> List[SupplierPaymentProposal]:
+    """
+    Open bills (approved / partially paid, amount due > 0) due on or before `due_by`, grouped into
+    one proposed payment per (supplier, currency). Bills without a due date are not selected.
+    """
+    bills_qs = VendorBill.global_objects.filter(
+        company_id=company_id, status__in=PAYABLE_BILL_STATUSES, amount_due__gt=ZERO_DECIMAL, due_date__lte=due_by
+    )
+    if supplier_ids is not None:
+        bills_qs = bills_qs.filter(supplier_id__in=list(supplier_ids))
+    if currency:
+        bills_qs = bills_qs.filter(currency=currency)
+
+    proposals: Dict[Tuple[Any, str], SupplierPaymentProposal] = {}
+    for row in bills_qs.values(
+            'id', 'bill_number', 'supplier_bill_reference', 'supplier_id', 'supplier__name', 'currency',
+            'due_date', 'amount_due'
+    ).order_by('supplier__name', 'supplier_id', 'currency', 'due_date', 'issue_date'):
+        key = (row['supplier_id'], row['currency'])
+        proposal = proposals.get(key)
+        if proposal is None:
+            proposal = proposals[key] = SupplierPaymentProposal(
+                supplier_id=row['supplier_id'], supplier_name=row['supplier__name'], currency=row['currency'])
+        proposal.bills.append(PaymentRunBill(
+            bill_id=row['id'], bill_number=row['bill_number'] or row['supplier_bill_reference'] or str(row['id']),
+            due_date=row['due_date'], amount=row['amount_due']))
+    return list(proposals.values())
+
+
+def _resolve_posting_accounts(company: Company, payment_account_id: Any) -> Tuple[Account, Account]:
+    """(AP control account, payment account), validated the same way as post_vendor_payment_to_gl."""
+    try:
+        payment_account = Account.global_objects.get(
+            pk=payment_account_id, company=company, account_type=AccountType.ASSET.value, is_active=True,
+            allow_direct_posting=True)
+    except Account.DoesNotExist:
+        raise PaymentProcessingError(
+            _("Payment account (ID: %(acc_id)s) is invalid. It must be an active, direct-posting Asset account "
+              "(e.g., Bank/Cash).") % {'acc_id': payment_account_id})
+
+    acc_settings = getattr(company, 'accounting_settings', None)
+    ap_control_account = getattr(acc_settings, 'default_accounts_payable_control', None) if acc_settings else None
+    if not ap_control_account:
+        raise GLPostingError(
+            _("Default Accounts Payable (AP) Control Account is not set for company '%(company_name)s'.") %
+            {'company_name': company.name})
+    if ap_control_account.company_id != company.pk or ap_control_account.account_type != AccountType.LIABILITY.value \
+            or not ap_control_account.allow_direct_posting:
+        raise GLPostingError(
+            _("The configured AP Control Account ('%(acc_name)s') must be a direct-posting Liability account of "
+              "company '%(company_name)s'.") % {'acc_name': ap_control_account.account_name,
+                                                'company_name': company.name})
+    return ap_control_account, payment_account
+
+
+def _get_open_period(company: Company, posting_date: date) -> AccountingPeriod:
+    calendar = get_period_calendar(company.pk)
+    period = calendar.open_period_for(posting_date)
+    if period is None:
+        raise GLPostingError(
+            _("No open accounting period found for posting date: %(date)s for company '%(company_name)s'.") %
+            {'date': posting_date, 'company_name': company.name})
+    return calendar.as_model_instance(period)
+
+
+def _execute_chunk(company: Company, proposals: List[SupplierPaymentProposal], payment_date: date, due_by: date,
+                   period: AccountingPeriod, ap_control_account: Account, payment_account: Account,
+                   payment_method: str, user: settings.AUTH_USER_MODEL, batch_size: int,
+                   result: PaymentRunResult) -> None:
+    """Writes one chunk of supplier payments. Runs inside the caller's transaction."""
+    bill_ids = [bill.bill_id for proposal in proposals for bill in proposal.bills]
+    locked_bills = {bill.pk: bill for bill in VendorBill.global_objects.select_for_update().filter(
+        company_id=company.pk, pk__in=bill_ids, status__in=PAYABLE_BILL_STATUSES, amount_due__gt=ZERO_DECIMAL
+    ).order_by('pk')}  # Stable lock order
+
+    payable: List[Tuple[SupplierPaymentProposal, List[VendorBill]]] = []
+    for proposal in proposals:
+        bills = []
+        for run_bill in proposal.bills:
+            bill = locked_bills.get(run_bill.bill_id)
+            if bill is None or bill.supplier_id != proposal.supplier_id or bill.currency != proposal.currency:
+                result.skipped_bill_ids.append(run_bill.bill_id)
+                continue
+            bills.append(bill)
+        if bills:
+            payable.append((proposal, bills))
+    if not payable:
+        return
+
+    now = timezone.now()
+    voucher_numbers = sequence_service.reserve_voucher_numbers(
+        company_id=company.pk, voucher_type_value=VoucherType.PAYMENT.value, period_id=period.pk, count=len(payable))
+    payment_numbers = reserve_payment_numbers(company, payment_date, len(payable))
+    vouchers, lines, payments, allocations, bills_to_update = [], [], [], [], []
+    for (proposal, bills), voucher_number, payment_number in zip(payable, voucher_numbers, payment_numbers):
+        amount = sum((bill.amount_due for bill in bills), ZERO_DECIMAL)
+        voucher = Voucher(
+            company=company, voucher_type=VoucherType.PAYMENT.value, voucher_number=voucher_number,
+            date=payment_date, effective_date=payment_date,
+            narration=f"Vendor Payment {payment_number} to {proposal.supplier_name}",
+            status=TransactionStatus.POSTED.value, accounting_period=period, party_id=proposal.supplier_id,
+            reference=payment_number, created_by=user, updated_by=user, approved_by=user, approved_at=now,
+            posted_by=user, posted_at=now,
+            balances_updated=True,  # Applied by the batched posting path
+        )
+        vouchers.append(voucher)
+        lines.extend([
+            VoucherLine(voucher=voucher, account=ap_control_account, dr_cr=DrCrType.DEBIT.value, amount=amount,
+                        narration=f"Payment to {proposal.supplier_name} - Ref: {payment_number}"),
+            VoucherLine(voucher=voucher, account=payment_account, dr_cr=DrCrType.CREDIT.value, amount=amount,
+                        narration=f"Payment made to {proposal.supplier_name} - Ref: {payment_number}"),
+        ])
+
+        payment = VendorPayment(
+            company=company, supplier_id=proposal.supplier_id, payment_number=payment_number,
+            payment_date=payment_date, payment_method=payment_method, payment_account=payment_account,
+            currency=proposal.currency, payment_amount=amount, allocated_amount=amount,
+            unallocated_amount=ZERO_DECIMAL, status=VendorPayment.PaymentStatus.PAID_COMPLETED.value,
+            notes=f"Payment run for bills due by {due_by}.", related_gl_voucher=voucher,
+            created_by=user, updated_by=user,
+        )
+        payments.append(payment)
+        for bill in bills:
+            allocations.append(VendorPaymentAllocation(
+                company=company, vendor_payment=payment, vendor_bill=bill, allocated_amount=bill.amount_due,
+                allocation_date=payment_date, created_by=user, updated_by=user))
+            bill.amount_paid = (bill.amount_paid or ZERO_DECIMAL) + bill.amount_due
+            bill.amount_due = (bill.total_amount or ZERO_DECIMAL) - bill.amount_paid
+            bill.status = VendorBill.BillStatus.PAID.value
+            bill.updated_at = now
+            bill.updated_by = user
+            bills_to_update.append(bill)
+
+    voucher_service.bulk_insert_posted_vouchers(
+        vouchers, lines, user, comments=f"Approved and posted by vendor payment run (bills due by {due_by}).",
+        batch_size=batch_size)
+    bulk_create_with_history(payments, VendorPayment, batch_size=batch_size, default_user=user)
+    bulk_create_with_history(allocations, VendorPaymentAllocation, batch_size=batch_size, default_user=user)
+    bulk_update_with_history(bills_to_update, VendorBill, ['amount_paid', 'amount_due', 'status', 'updated_at',
+                                                           'updated_by'], batch_size=batch_size, default_user=user)
+
+    # Paid bills drop out of the suppliers' unposted documents amount
+    refresh_unposted_documents_amounts(company.pk, {proposal.supplier_id for proposal, _bills in payable})
+
+    result.payment_ids.extend(payment.pk for payment in payments)
+    result.voucher_ids.extend(voucher.pk for voucher in vouchers)
+
+
+def execute_payment_run(
+        company_id: Any, due_by: date, payment_account_id: Any, user: Optional[settings.AUTH_USER_MODEL] = None,
+        payment_date: Optional[date] = None, supplier_ids: Optional[Iterable[Any]] = None,
+        currency: Optional[str] = None, payment_method: Optional[str] = None, dry_run: bool = True,
+        chunk_size: int = 100, batch_size: int = 1000
+) -> PaymentRunResult:
+    """
+    Pays all open bills due by `due_by`: one payment (and one posted GL voucher) per supplier and currency.
+
+    Args:
+        company_id: Company whose bills are paid. Needs the company context (voucher numbering).
+        due_by: Bills with a due date on or before this date are selected.
+        payment_account_id: Bank/Cash account the payments are made from.
+        user: Recorded as creator/approver/poster. Required unless `dry_run`.
+        payment_date: Payment and GL posting date. Defaults to today.
+        supplier_ids / currency: Optional filters on the selected bills.
+        dry_run: If True (default), only the proposal is returned; nothing is written.
+        chunk_size: Suppliers per transaction. A failing chunk rolls back only itself.
+
+    Returns:
+        PaymentRunResult with the proposal and, when executed, the created payment and voucher PKs.
+        If a chunk fails after earlier chunks were committed, the run stops there and returns the
+        committed results with `error` and `unpaid_proposals` set; a failure in the first chunk
+        (nothing written) is raised.
+    """
+    log_prefix = f"[PaymentRun][Co:{company_id}][DueBy:{due_by}]"
+    proposals = propose_payment_run(company_id, due_by, supplier_ids=supplier_ids, currency=currency)
+    result = PaymentRunResult(dry_run=dry_run, due_by=due_by, proposals=proposals)
+    logger.info(f"{log_prefix} {len(proposals)} supplier payments proposed for {result.bill_count} bills, "
+                f"total {result.total_amount}{' (dry run)' if dry_run else ''}.")
+    if dry_run or not proposals:
+        return result
+    if user is None:
+        raise PaymentProcessingError(_("A user is required to execute a payment run."))
+
+    payment_date = payment_date or timezone.now().date()
+    try:
+        company = Company.objects.select_related('accounting_settings__default_accounts_payable_control').get(
+            pk=company_id)
+    except Company.DoesNotExist:
+        raise PaymentProcessingError(_("Invalid company ID provided for the payment run."))
+    ap_control_account, payment_account = _resolve_posting_accounts(company, payment_account_id)
+    period = _get_open_period(company, payment_date)
+    payment_method = payment_method or VendorPayment.PaymentMethod.BANK_TRANSFER.value
+
+    for start in range(0, len(proposals), chunk_size):
+        chunk = proposals[start:start + chunk_size]
+        committed = (len(result.payment_ids), len(result.voucher_ids), len(result.skipped_bill_ids))
+        try:
+            with transaction.atomic():
+                _execute_chunk(company, chunk, payment_date, due_by, period, ap_control_account, payment_account,
+                               payment_method, user, batch_size, result)
+        except Exception as e:
+            if start == 0:
+                raise
+            # The chunk was rolled back: drop what it appended and report the committed chunks
+            del result.payment_ids[committed[0]:], result.voucher_ids[committed[1]:]
+            del result.skipped_bill_ids[committed[2]:]
+            result.error = str(e)
+            result.unpaid_proposals = proposals[start:]
+            logger.error(f"{log_prefix} Chunk {start // chunk_size + 1} failed; {len(result.payment_ids)} payments "
+                         f"were already posted, {len(result.unpaid_proposals)} supplier payments left unpaid: {e}",
+                         exc_info=True)
+            break
+        logger.info(f"{log_prefix} Chunk {start // chunk_size + 1}: {len(result.payment_ids)} payments posted so far.")
+
+    if result.skipped_bill_ids:
+        logger.warning(f"{log_prefix} {len(result.skipped_bill_ids)} bills changed since the proposal and were skipped.")
+    return result
@@ -0,0 +1,116 @@
+# crp_accounting/services/period_calendar_service.py
+"""
+Per-company accounting period calendar for date -> period resolution without a query per date.
+
+A PeriodCalendar holds a company's periods sorted by start date and resolves a date with a
+bisect over the start dates. `get_period_calendar` loads it once per company and keeps it in
+the Django cache; saving or deleting an AccountingPeriod (which includes locking and unlocking
+it) invalidates the company's entry (receivers in crp_accounting/signals.py).
+
+All date -> period resolution (voucher creation and posting, invoice / payment / bill GL posting,
+voucher serializer validation, bulk paths) goes through this module.
+"""
+
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from crp_core.instrumentation import record_cache_lookup
+
+from ..models.period import AccountingPeriod
+
+logger = logging.getLogger("crp_accounting.services.period_calendar")
+
+PERIOD_CALENDAR_CACHE_TIMEOUT = 60 * 60  # Seconds; invalidated on every period change anyway
+
+
+@dataclass(frozen=True)
+class CalendarPeriod:
+    pk: Any
+    name: str
+    start_date: date
+    end_date: date
+    locked: bool
+    fiscal_year_id: Any
+
+
+class PeriodCalendar:
+    """Sorted, non-overlapping accounting periods of one company."""
+
+    def __init__(self, company_id: Any, periods: List[CalendarPeriod]):
+        self.company_id = company_id
+        self.periods = sorted(periods, key=lambda period: period.start_date)
+        self._start_dates = [period.start_date for period in self.periods]
+
+    def period_for(self, for_date: date) -> Optional[CalendarPeriod]:
+        """The period containing `for_date` (locked or not), or None if no period covers it."""
+        index = bisect_right(self._start_dates, for_date) - 1
+        if index < 0:
+            return None
+        period = self.periods[index]
+        return period if period.end_date >= for_date else None
+
+    def open_period_for(self, for_date: date) -> Optional[CalendarPeriod]:
+        """The period containing `for_date` if it is not locked, else None."""
+        period = self.period_for(for_date)
+        return period if period and not period.locked else None
+
+    def as_model_instance(self, period: CalendarPeriod) -> AccountingPeriod:
+        """
+        An AccountingPeriod built from the cached row (no query), for assigning to foreign keys.
+        Fields not held by the calendar are deferred and load on access.
+        """
+        known = {AccountingPeriod._meta.pk.attname: period.pk, 'company_id': self.company_id,
+                 'fiscal_year_id': period.fiscal_year_id, 'name': period.name, 'start_date': period.start_date,
+                 'end_date': period.end_date, 'locked': period.locked}
+        # from_db() expects the values in concrete field order
+        field_names = [f.attname for f in AccountingPeriod._meta.concrete_fields if f.attname in known]
+        return AccountingPeriod.from_db('default', field_names, [known[name] for name in field_names])
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+
+def _calendar_cache_key(company_id: Any) -> str:
+    return f"acc_period_calendar_{company_id}"
+
+
+def load_period_calendar(company_id: Any) -> PeriodCalendar:
+    """Reads all periods of a company in one query (uncached)."""
+    periods = [
+        CalendarPeriod(**row) for row in AccountingPeriod.global_objects.filter(company_id=company_id).values(
+            'pk', 'name', 'start_date', 'end_date', 'locked', 'fiscal_year_id')
+    ]
+    logger.debug(f"[PeriodCalendar][Co:{company_id}] Loaded {len(periods)} periods.")
+    return PeriodCalendar(company_id, periods)
+
+
+def get_period_calendar(company_id: Any) -> PeriodCalendar:
+    """The company's period calendar from the cache, loading it on a miss."""
+    cache_key = _calendar_cache_key(company_id)
+    calendar = cache.get(cache_key)
+    record_cache_lookup(hit=calendar is not None)
+    if calendar is None:
+        calendar = load_period_calendar(company_id)
+        try:
+            cache.set(cache_key, calendar, timeout=PERIOD_CALENDAR_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.error(f"[PeriodCalendar][Co:{company_id}] Failed to cache period calendar: {e}", exc_info=True)
+    return calendar
+
+
+def invalidate_period_calendar(company_id: Any) -> None:
+    """
+    Drops the cached calendar now and again after commit, so a reader that reloads it
+    before the period change commits cannot leave a stale calendar in the cache.
+    """
+    cache_key = _calendar_cache_key(company_id)
+    cache.delete(cache_key)
+    transaction.on_commit(lambda: cache.delete(cache_key))
+    logger.debug(f"[PeriodCalendar][Co:{company_id}] Cache invalidated.")
+
@@ -20,8 +20,8 @@ from ..models.receivables import (
 )
 from ..models.party import Party
 from ..models.coa import Account
-from ..models.period import AccountingPeriod
 from ..models.journal import Voucher, VoucherType, DrCrType, TransactionStatus  # For GL posting
+from ..models.deferred_recalc import deferred_parent_recalculation
 from company.models import Company
 
 # --- Enum Imports from crp_core ---
@@ -29,6 +29,7 @@ from crp_core.enums import PartyType as CorePartyType, AccountType as CoreAccoun
 
 # --- Service Imports ---
 from . import voucher_service
+from .period_calendar_service import get_period_calendar
 
 
 # --- Custom Exceptions ---
@@ -162,30 +163,28 @@ def create_customer_invoice(
     invoice.save()  # Save header
 
     if not lines_data: raise InvoiceProcessingError(_("Invoice must have at least one line item."))
-    for line_data in lines_data:
-        try:
-            revenue_acc_id = line_data.get('revenue_account_id')
-            if not revenue_acc_id: raise DjangoValidationError({'revenue_account_id': _("Revenue account ID missing.")})
-            revenue_account = Account.objects.get(pk=revenue_acc_id, company=company,
-                                                  account_type=CoreAccountType.INCOME.value, is_active=True,
-                                                  allow_direct_posting=True)
-            line = InvoiceLine(
-                invoice=invoice, description=line_data.get('description', ''),
-                quantity=Decimal(str(line_data.get('quantity', '1'))),
-                unit_price=Decimal(str(line_data.get('unit_price', '0'))),
-                revenue_account=revenue_account,
-                tax_amount_on_line=Decimal(str(line_data.get('tax_amount_on_line', '0')))
-            )
-            line.save()  # This calls line.full_clean() and calculates line.line_total
-        except (Account.DoesNotExist, DjangoValidationError, ValueError, TypeError) as e_line:
-            err_msg = e_line.message_dict if hasattr(e_line, 'message_dict') else str(e_line)
-            raise InvoiceProcessingError(
-                _("Error in invoice line: %(e)s. Data: %(d)s") % {'e': err_msg, 'd': line_data})
-
-    # After all lines are saved, explicitly trigger recalculation on the invoice object in memory
-    # and then save it. This is better than InvoiceLine.save() triggering parent save.
-    invoice._recalculate_totals_and_due(perform_save=True)  # This will save the invoice with updated totals.
-    # Note: _recalculate_totals_and_due also calls update_payment_status.
+    # Lines schedule an invoice recalculation on save; the block runs it once, on this in-memory
+    # invoice, when it exits (also saves totals and calls update_payment_status).
+    with deferred_parent_recalculation():
+        for line_data in lines_data:
+            try:
+                revenue_acc_id = line_data.get('revenue_account_id')
+                if not revenue_acc_id: raise DjangoValidationError({'revenue_account_id': _("Revenue account ID missing.")})
+                revenue_account = Account.objects.get(pk=revenue_acc_id, company=company,
+                                                      account_type=CoreAccountType.INCOME.value, is_active=True,
+                                                      allow_direct_posting=True)
+                line = InvoiceLine(
+                    invoice=invoice, description=line_data.get('description', ''),
+                    quantity=Decimal(str(line_data.get('quantity', '1'))),
+                    unit_price=Decimal(str(line_data.get('unit_price', '0'))),
+                    revenue_account=revenue_account,
+                    tax_amount_on_line=Decimal(str(line_data.get('tax_amount_on_line', '0')))
+                )
+                line.save()  # This calls line.full_clean() and calculates line.line_total
+            except (Account.DoesNotExist, DjangoValidationError, ValueError, TypeError) as e_line:
+                err_msg = e_line.message_dict if hasattr(e_line, 'message_dict') else str(e_line)
+                raise InvoiceProcessingError(
+                    _("Error in invoice line: %(e)s. Data: %(d)s") % {'e': err_msg, 'd': line_data})
 
     if invoice.status != InvoiceStatus.DRAFT.value and post_to_gl_on_finalize:
         try:
@@ -410,14 +409,8 @@ def _post_invoice_to_gl_internal(company: Company, user: settings.AUTH_USER_MODE
     invoice.refresh_from_db(fields=['total_amount', 'subtotal_amount', 'tax_amount'])  # Get saved values
 
     ar_control_account = Account.objects.get(pk=invoice.customer.control_account_id, company=company)
-    try:
-        accounting_period = AccountingPeriod.objects.get(company=company, start_date__lte=invoice.invoice_date,
-                                                         end_date__gte=invoice.invoice_date, locked=False)
-    except AccountingPeriod.DoesNotExist:
+    if get_period_calendar(company.pk).open_period_for(invoice.invoice_date) is None:
         raise GLPostingError(_("No open accounting period for invoice date %(d)s.") % {'d': invoice.invoice_date})
-    except AccountingPeriod.MultipleObjectsReturned:
-        raise GLPostingError(
-            _("Multiple open accounting periods for invoice date %(d)s.") % {'d': invoice.invoice_date})
 
     lines_gl_data = [
         {'account_id': ar_control_account.pk, 'dr_cr': DrCrType.DEBIT.value, 'amount': invoice.total_amount,
@@ -571,8 +564,8 @@ def _allocate_payment_to_invoice_internal(payment: CustomerPayment, invoice_id:
             'p': payment.reference_number or payment.pk, 'ta': current_payment_total_applied, 'na': amount_to_apply,
             'r': payment.amount_received})
 
-    allocation = PaymentAllocation(payment=payment, invoice=invoice, amount_applied=amount_to_apply,
-                                   allocation_date=allocation_date)
+    allocation = PaymentAllocation(company=payment.company, payment=payment, invoice=invoice,
+                                   amount_applied=amount_to_apply, allocation_date=allocation_date)
     try:
         allocation.full_clean()
     except DjangoValidationError as e:
@@ -608,13 +601,8 @@ def _post_payment_to_gl_internal(company: Company, user: settings.AUTH_USER_MODE
 
     ar_ctrl_acct = Account.objects.get(pk=payment.customer.control_account_id, company=company);
     bank_acct = payment.bank_account_credited
-    try:
-        acc_period = AccountingPeriod.objects.get(company=company, start_date__lte=payment.payment_date,
-                                                  end_date__gte=payment.payment_date, locked=False)
-    except AccountingPeriod.DoesNotExist:
+    if get_period_calendar(company.pk).open_period_for(payment.payment_date) is None:
         raise GLPostingError(_("No open period for pmt date %(d)s.") % {'d': payment.payment_date})
-    except AccountingPeriod.MultipleObjectsReturned:
-        raise GLPostingError(_("Multiple open periods for pmt date %(d)s.") % {'d': payment.payment_date})
 
     # GL for Payment: Debit Bank, Credit A/R for the amount_received.
     # The allocation of this payment against specific invoices is an AR sub-ledger detail.
@@ -0,0 +1,194 @@
+# crp_accounting/services/recurring_voucher_service.py
+"""
+Generation of vouchers from recurring voucher templates.
+
+`generate_recurring_vouchers` creates every due occurrence of a company's active templates in
+one pass: due templates are locked and read with their lines in two queries, existing
+occurrences are read in one query (a template/occurrence pair is generated once, also enforced
+by a unique constraint on Voucher), dates are resolved against the company's period calendar
+and vouchers are written with bulk inserts. Auto-post templates get their numbers reserved as
+one block per (voucher type, period) and go through voucher_service.bulk_insert_posted_vouchers;
+the others are created as DRAFT vouchers.
+
+An occurrence whose date has no open accounting period is not generated; the template stays
+due at that occurrence and is retried on the next run. Likewise, an auto-post template whose
+accounts can no longer be posted to (deleted, inactive or closed to direct posting since the
+template was saved) is skipped until they are fixed. Once the next occurrence would fall after
+the template's end_date, next_run_date is cleared and the template is no longer selected.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+# --- Model Imports ---
+from ..models.recurring import RecurringVoucherTemplate, RecurringVoucherTemplateLine
+from ..models.journal import Voucher, VoucherLine, TransactionStatus, DrCrType
+
+# --- Service Imports ---
+from . import sequence_service, voucher_service
+from .period_calendar_service import get_period_calendar
+
+logger = logging.getLogger("crp_accounting.services.recurring_voucher")
+
+ZERO_DECIMAL = Decimal('0.00')
+
+
+@dataclass
+class RecurringGenerationResult:
+    company_id: Any
+    drafts_created: int = 0
+    vouchers_posted: int = 0
+    voucher_ids: List[Any] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def vouchers_created(self) -> int:
+        return self.drafts_created + self.vouchers_posted
+
+
+def companies_with_due_templates(as_of: date) -> List[Any]:
+    """IDs of companies having at least one active template due on or before `as_of`."""
+    return list(RecurringVoucherTemplate.global_objects.filter(
+        is_active=True, next_run_date__lte=as_of
+    ).order_by().values_list('company_id', flat=True).distinct())
+
+
+def _is_balanced(template: RecurringVoucherTemplate) -> bool:
+    lines = list(template.lines.all())
+    debit = sum((line.amount for line in lines if line.dr_cr == DrCrType.DEBIT.value), ZERO_DECIMAL)
+    credit = sum((line.amount for line in lines if line.dr_cr == DrCrType.CREDIT.value), ZERO_DECIMAL)
+    return bool(lines) and debit == credit and debit > ZERO_DECIMAL
+
+
+@transaction.atomic
+def generate_recurring_vouchers(company_id: Any, as_of: Optional[date] = None,
+                                user: Optional[settings.AUTH_USER_MODEL] = None,
+                                batch_size: int = 1000) -> RecurringGenerationResult:
+    """
+    Generates all occurrences due on or before `as_of` (default today) for one company.
+    `user` is recorded as creator/poster; defaults to the user who last edited each template.
+    Needs the company as current company (voucher numbering goes through the tenant managers).
+    """
+    as_of = as_of or timezone.now().date()
+    log_prefix = f"[RecurVch][Co:{company_id}][AsOf:{as_of}]"
+    result = RecurringGenerationResult(company_id=company_id)
+
+    # skip_locked: templates locked by a concurrent run are generated by that run
+    templates = list(RecurringVoucherTemplate.global_objects.select_for_update(skip_locked=True, of=('self',)).filter(
+        company_id=company_id, is_active=True, next_run_date__lte=as_of
+    ).select_related('created_by', 'updated_by').prefetch_related(
+        Prefetch('lines', queryset=RecurringVoucherTemplateLine.objects.select_related('account'))
+    ).order_by('pk'))
+    if not templates:
+        return result
+
+    existing = set(Voucher._base_manager.filter(
+        recurring_template_id__in=[template.pk for template in templates],
+        recurring_occurrence_date__gte=min(template.next_run_date for template in templates),
+    ).values_list('recurring_template_id', 'recurring_occurrence_date'))
+    calendar = get_period_calendar(company_id)
+    now = timezone.now()
+
+    drafts: List[Voucher] = []
+    draft_lines: List[VoucherLine] = []
+    to_post: Dict[Tuple[Any, str, Any], List[Tuple[Voucher, List[VoucherLine]]]] = defaultdict(list)
+    templates_to_update: List[RecurringVoucherTemplate] = []
+
+    for template in templates:
+        if not _is_balanced(template):
+            result.skipped.append(f"{template.name}: lines are empty or not balanced.")
+            logger.warning(f"{log_prefix} Template {template.pk} '{template.name}' skipped: unbalanced or no lines.")
+            continue
+        poster = user or template.updated_by or template.created_by
+        post = template.auto_post and poster is not None
+        if template.auto_post and poster is None:
+            logger.warning(f"{log_prefix} Template {template.pk} has no user to post as; generating DRAFT vouchers.")
+        if post:
+            # Accounts may have changed since the template was saved; DRAFT vouchers are checked when submitted
+            problems = [problem for line in template.lines.all()
+                        for problem in voucher_service.account_posting_problems(company_id, line.account)]
+            if problems:
+                result.skipped.append(f"{template.name}: {' '.join(str(problem) for problem in problems)}")
+                logger.warning(f"{log_prefix} Template {template.pk} '{template.name}' skipped: accounts cannot "
+                               f"be posted to.")
+                continue
+
+        last_done = None
+        for occurrence in template.occurrences_between(template.next_run_date, as_of):
+            if (template.pk, occurrence) in existing:
+                last_done = occurrence
+                continue
+            period = calendar.open_period_for(occurrence)
+            if period is None:
+                result.skipped.append(f"{template.name} {occurrence}: no open accounting period.")
+                logger.warning(f"{log_prefix} Template {template.pk} occurrence {occurrence} has no open period; "
+                               f"stopping catch-up for this template.")
+                break
+            voucher = Voucher(
+                company_id=company_id, voucher_type=template.voucher_type, date=occurrence,
+                effective_date=occurrence, narration=template.narration, reference=template.reference,
+                party_id=template.party_id, accounting_period_id=period.pk, recurring_template=template,
+                recurring_occurrence_date=occurrence, created_by=poster, updated_by=poster,
+            )
+            lines = [VoucherLine(voucher=voucher, account_id=line.account_id, dr_cr=line.dr_cr, amount=line.amount,
+                                 narration=line.narration or template.narration)
+                     for line in template.lines.all()]
+            if post:
+                voucher.status = TransactionStatus.POSTED.value
+                voucher.approved_by = voucher.posted_by = poster
+                voucher.approved_at = voucher.posted_at = now
+                voucher.balances_updated = True  # Applied by the batched posting path
+                to_post[(poster.pk, template.voucher_type, period.pk)].append((voucher, lines))
+            else:
+                drafts.append(voucher)
+                draft_lines.extend(lines)
+            last_done = occurrence
+
+        if last_done is not None:
+            template.last_generated_date = last_done
+            template.next_run_date = template.next_occurrence_after(last_done)
+            template.updated_at = now
+            templates_to_update.append(template)
+        elif template.end_date and template.next_run_date > template.end_date:
+            # Left due past end_date by an earlier run: nothing more to generate
+            template.next_run_date = None
+            template.updated_at = now
+            templates_to_update.append(template)
+
+    if drafts:
+        bulk_create_with_history(drafts, Voucher, batch_size=batch_size, default_user=user)
+        VoucherLine.objects.bulk_create(draft_lines, batch_size=batch_size)
+        result.drafts_created = len(drafts)
+        result.voucher_ids.extend(voucher.pk for voucher in drafts)
+
+    for (_poster_pk, voucher_type, period_pk), items in to_post.items():
+        numbers = sequence_service.reserve_voucher_numbers(
+            company_id=company_id, voucher_type_value=voucher_type, period_id=period_pk, count=len(items))
+        vouchers = []
+        for (voucher, _lines), number in zip(items, numbers):
+            voucher.voucher_number = number
+            vouchers.append(voucher)
+        voucher_service.bulk_insert_posted_vouchers(
+            vouchers, [line for _voucher, lines in items for line in lines], items[0][0].posted_by,
+            comments="Posted by recurring voucher generation.", batch_size=batch_size)
+        result.vouchers_posted += len(vouchers)
+        result.voucher_ids.extend(voucher.pk for voucher in vouchers)
+
+    if templates_to_update:
+        bulk_update_with_history(templates_to_update, RecurringVoucherTemplate,
+                                 ['last_generated_date', 'next_run_date', 'updated_at'],
+                                 batch_size=batch_size, default_user=user)
+
+    logger.info(f"{log_prefix} {len(templates)} due templates: {result.drafts_created} drafts created, "
+                f"{result.vouchers_posted} vouchers posted, {len(result.skipped)} skipped.")
+    return result
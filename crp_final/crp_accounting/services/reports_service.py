@@ -1,10 +1,10 @@
 # crp_accounting/services/reports_service.py
 
-import logging
 from collections import defaultdict
+from itertools import chain
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import date # timedelta wasn't used but can be kept if future use is planned
-from typing import List, Dict, Tuple, Optional, Any, DefaultDict, TypedDict
+from typing import List, Dict, Tuple, Optional, Any, DefaultDict, Iterable, TypedDict
 
 from django.utils.translation import gettext_lazy as _
 from django.db import models
@@ -13,12 +13,17 @@ from django.db.models.functions import Coalesce
 # from django.core.exceptions import ObjectDoesNotExist # Not directly used, but good for ORM interactions
 # from django.utils import timezone # Not directly used, but good for date/time operations
 
-logger = logging.getLogger("crp_accounting.services.reports")
+from crp_core.logging_utils import get_hot_path_logger
+
+# Report loops run per account/document: per-item detail is sampled DEBUG
+logger = get_hot_path_logger("crp_accounting.services.reports")
 
 # --- Model Imports ---
 from ..models.coa import Account, AccountGroup, PLSection
 from ..models.journal import VoucherLine, TransactionStatus, DrCrType
-from ..models.receivables import CustomerInvoice, InvoiceStatus, CustomerPayment, PaymentAllocation, SMALL_TOLERANCE
+from ..models.period import FiscalYear
+from ..models.receivables import CustomerInvoice, InvoiceStatus, CustomerPayment, PaymentAllocation, SMALL_TOLERANCE, \
+    AR_AGING_INVOICE_STATUSES
 from ..models.party import Party
 from ..models.payables import (
     VendorBill,
@@ -45,6 +50,11 @@ except ImportError:
 from crp_core.enums import AccountNature, AccountType, PartyType as CorePartyType, \
     PaymentStatus as CorePaymentStatus
 
+# --- Service Imports ---
+from .year_end_service import get_opening_fiscal_year, get_opening_totals
+from crp_core.db_routers import use_reporting_replica
+from crp_core.instrumentation import span
+
 
 # --- Custom Exceptions ---
 class ReportGenerationError(Exception):
@@ -71,6 +81,7 @@ class DataIntegrityWarning(Warning):
 ZERO_DECIMAL = Decimal('0.00')
 RETAINED_EARNINGS_ACCOUNT_NAME_DISPLAY = _("Retained Earnings (Calculated)")
 RETAINED_EARNINGS_ACCOUNT_ID_PLACEHOLDER = "RETAINED_EARNINGS_CALCULATED"
+CURRENT_YEAR_EARNINGS_NAME_DISPLAY = _("Current Year Earnings (Calculated)")
 DEFAULT_FX_RATE_PRECISION = 8
 DEFAULT_AMOUNT_PRECISION = 2
 DEFAULT_AR_AGING_BUCKETS_DAYS = [0, 30, 60, 90]
@@ -187,6 +198,7 @@ class CustomerStatementData(TypedDict):
 # =============================================================================
 # Currency Conversion Utility
 # =============================================================================
+@span('fx')
 def _get_exchange_rate(company_id: Optional[PK_TYPE], from_currency: str, to_currency: str,
                        conversion_date: date) -> Decimal:
     if not ExchangeRate:
@@ -222,8 +234,9 @@ def _get_exchange_rate(company_id: Optional[PK_TYPE], from_currency: str, to_cur
             Decimal(f'1e-{DEFAULT_FX_RATE_PRECISION}'), rounding=ROUND_HALF_UP
         )
 
-    logger.error(
-        f"No exchange rate found for Co {company_id or 'Global'} from {from_currency} to {to_currency} on or before {conversion_date}.")
+    # Callers log one warning per currency pair; this runs per converted balance
+    logger.sampled("No exchange rate found for Co %s from %s to %s on or before %s.",
+                   company_id or 'Global', from_currency, to_currency, conversion_date)
     raise CurrencyConversionError(
         f"Exchange rate missing: {from_currency} to {to_currency} for {conversion_date} (Co: {company_id or 'Global'}).")
 
@@ -249,24 +262,30 @@ def _convert_currency(company_id: Optional[PK_TYPE], amount: Decimal, from_curre
 # =============================================================================
 # Core Balance Calculation Helper
 # =============================================================================
-def _calculate_account_balances(company_id: PK_TYPE, as_of_date: date, target_report_currency: str) -> \
-        Dict[PK_TYPE, ProcessedAccountBalance]:
+def _calculate_account_balances(company_id: PK_TYPE, as_of_date: date, target_report_currency: str,
+                                opening_year: Optional[FiscalYear]) -> Dict[PK_TYPE, ProcessedAccountBalance]:
     if not Company: raise ReportGenerationError("Company model not available.")
     if not company_id: raise ValueError("company_id must be provided for balance calculation.")
 
-    logger.debug(
-        f"Calculating account balances for Company ID {company_id} as of {as_of_date}, target currency {target_report_currency}...")
+    logger.debug("Calculating account balances for Company ID %s as of %s, target currency %s...",
+                 company_id, as_of_date, target_report_currency)
     account_balances: Dict[PK_TYPE, ProcessedAccountBalance] = {}
     conversion_errors_logged = set()
 
     try:
-        aggregation = VoucherLine.objects.filter(
+        # After a year-end close (opening_year from get_opening_fiscal_year) only the current
+        # year's lines are aggregated, on top of one carried-forward opening row per account.
+        opening_totals = get_opening_totals(opening_year)
+        lines_qs = VoucherLine.objects.filter(
             voucher__company_id=company_id,
             voucher__status=TransactionStatus.POSTED.value,
             voucher__date__lte=as_of_date,
             account__company_id=company_id,
             account__is_active=True
-        ).values(
+        )
+        if opening_year:
+            lines_qs = lines_qs.filter(voucher__date__gte=opening_year.start_date)
+        aggregation = lines_qs.values(
             'account'
         ).annotate(
             total_debit=Coalesce(Sum('amount', filter=Q(dr_cr=DrCrType.DEBIT.value)), ZERO_DECIMAL,
@@ -280,13 +299,18 @@ def _calculate_account_balances(company_id: PK_TYPE, as_of_date: date, target_re
             'total_debit', 'total_credit'
         )
 
+        with span('aggregate'):
+            aggregation = list(aggregation)
         for item in aggregation:
             pk = item['account__id']
             acc_currency = item['account__currency']
             nature = item['account__account_nature']
+            opening_debit, opening_credit = opening_totals.get(pk, (ZERO_DECIMAL, ZERO_DECIMAL))
+            total_debit = item['total_debit'] + opening_debit
+            total_credit = item['total_credit'] + opening_credit
 
-            original_balance = (item['total_debit'] - item['total_credit']) \
-                if nature == AccountNature.DEBIT.value else (item['total_credit'] - item['total_debit'])
+            original_balance = (total_debit - total_credit) \
+                if nature == AccountNature.DEBIT.value else (total_credit - total_debit)
 
             converted_balance: Decimal
             try:
@@ -318,15 +342,31 @@ def _calculate_account_balances(company_id: PK_TYPE, as_of_date: date, target_re
             'account_group')
         for acc in all_company_active_accounts:
             if acc.pk not in account_balances:
+                # Accounts with no movement this year may still carry an opening balance
+                opening_debit, opening_credit = opening_totals.get(acc.pk, (ZERO_DECIMAL, ZERO_DECIMAL))
+                original_balance = (opening_debit - opening_credit) \
+                    if acc.account_nature == AccountNature.DEBIT.value else (opening_credit - opening_debit)
+                converted_balance = original_balance
+                if original_balance != ZERO_DECIMAL:
+                    try:
+                        converted_balance = _convert_currency(company_id, original_balance, acc.currency,
+                                                              target_report_currency, as_of_date)
+                    except CurrencyConversionError as cce:
+                        rate_key = (acc.currency, target_report_currency)
+                        if rate_key not in conversion_errors_logged:
+                            logger.warning("Co %s: Opening balance currency conversion error: %s for Account %s. "
+                                           "Using original balance.", company_id, cce, acc.pk)
+                            conversion_errors_logged.add(rate_key)
                 account_balances[acc.pk] = ProcessedAccountBalance(
                     account_pk=acc.pk, account_number=acc.account_number, account_name=str(acc.account_name),
                     account_type=acc.account_type, account_nature=acc.account_nature,
                     account_group_pk=acc.account_group_id,
-                    original_currency=acc.currency, original_balance=ZERO_DECIMAL, converted_balance=ZERO_DECIMAL,
+                    original_currency=acc.currency, original_balance=original_balance,
+                    converted_balance=converted_balance,
                     pl_section=acc.pl_section
                 )
-        logger.debug(
-            f"Successfully calculated balances for {len(account_balances)} accounts for Company ID {company_id}.")
+        logger.debug("Successfully calculated balances for %d accounts for Company ID %s.",
+                     len(account_balances), company_id)
         return account_balances
     except Exception as e:
         logger.exception(f"Unexpected error in _calculate_account_balances for Company ID {company_id}.")
@@ -336,20 +376,48 @@ def _calculate_account_balances(company_id: PK_TYPE, as_of_date: date, target_re
 # =============================================================================
 # Hierarchy Building Helpers
 # =============================================================================
+GroupChildren = Dict[Optional[PK_TYPE], List[AccountGroup]]
+GroupAccounts = Dict[Optional[PK_TYPE], List[Tuple[PK_TYPE, ProcessedAccountBalance]]]
+
+
+def _index_group_tree(groups: Iterable[AccountGroup]) -> GroupChildren:
+    """Sub-groups per parent group PK (None for top-level groups), each in name order; one pass."""
+    children: GroupChildren = defaultdict(list)
+    for group in groups:
+        children[group.parent_group_id].append(group)
+    for siblings in children.values():
+        siblings.sort(key=lambda g: g.name)
+    return children
+
+
+def _index_accounts_by_group(account_data_map: Dict[PK_TYPE, ProcessedAccountBalance]) -> GroupAccounts:
+    """Account balances per group PK, each in account number order; one pass."""
+    accounts: GroupAccounts = defaultdict(list)
+    for acc_pk, acc_data in account_data_map.items():
+        accounts[acc_data.get('account_group_pk')].append((acc_pk, acc_data))
+    for group_accounts in accounts.values():
+        group_accounts.sort(key=lambda item: item[1].get('account_number', ''))
+    return accounts
+
+
+def _company_group_tree(company_id: PK_TYPE) -> GroupChildren:
+    """The company's group tree, from one query of the fields the report hierarchies read."""
+    return _index_group_tree(AccountGroup.objects.filter(company_id=company_id).only('id', 'name', 'parent_group'))
+
+
 def _build_group_hierarchy_recursive(
         parent_group_id: Optional[PK_TYPE],
-        all_groups: Dict[PK_TYPE, AccountGroup],
-        account_data_map: Dict[PK_TYPE, ProcessedAccountBalance],
+        group_children: GroupChildren,
+        group_accounts: GroupAccounts,
         level: int
 ) -> Tuple[List[Dict[str, Any]], Decimal, Decimal]:
     current_level_nodes: List[Dict[str, Any]] = []
     current_level_total_debit = ZERO_DECIMAL
     current_level_total_credit = ZERO_DECIMAL
 
-    child_groups = [group for pk, group in all_groups.items() if group.parent_group_id == parent_group_id]
-    for group in sorted(child_groups, key=lambda g: g.name):
+    for group in group_children.get(parent_group_id, ()):
         child_nodes, child_debit, child_credit = _build_group_hierarchy_recursive(
-            group.pk, all_groups, account_data_map, level + 1
+            group.pk, group_children, group_accounts, level + 1
         )
         group_node = {
             'id': group.pk, 'name': str(group.name), 'type': 'group', 'level': level,
@@ -360,53 +428,47 @@ def _build_group_hierarchy_recursive(
             current_level_total_debit += child_debit
             current_level_total_credit += child_credit
 
-    direct_accounts_nodes = []
-    for acc_pk, acc_data in account_data_map.items():
-        if acc_data.get('account_group_pk') == parent_group_id:
-            balance_in_report_curr = acc_data['converted_balance']
-            nature = acc_data['account_nature']
-            account_debit, account_credit = ZERO_DECIMAL, ZERO_DECIMAL
-
-            if nature == AccountNature.DEBIT.value:
-                account_debit = balance_in_report_curr if balance_in_report_curr >= ZERO_DECIMAL else ZERO_DECIMAL
-                account_credit = -balance_in_report_curr if balance_in_report_curr < ZERO_DECIMAL else ZERO_DECIMAL
-            elif nature == AccountNature.CREDIT.value:
-                account_credit = balance_in_report_curr if balance_in_report_curr >= ZERO_DECIMAL else ZERO_DECIMAL
-                account_debit = -balance_in_report_curr if balance_in_report_curr < ZERO_DECIMAL else ZERO_DECIMAL
-            else:
-                logger.warning(
-                    f"Account {acc_pk} ({acc_data.get('account_number')}) has unknown nature '{nature}'. Balance signs might be incorrect on Trial Balance.")
-
-            if account_debit != ZERO_DECIMAL or account_credit != ZERO_DECIMAL:
-                account_node = {
-                    'id': acc_pk,
-                    'name': f"{acc_data.get('account_number', 'N/A')} - {str(acc_data.get('account_name', 'N/A'))}",
-                    'type': 'account', 'level': level,
-                    'debit': account_debit, 'credit': account_credit, 'children': []
-                }
-                direct_accounts_nodes.append(account_node)
-                current_level_total_debit += account_debit
-                current_level_total_credit += account_credit
+    for acc_pk, acc_data in group_accounts.get(parent_group_id, ()):
+        balance_in_report_curr = acc_data['converted_balance']
+        nature = acc_data['account_nature']
+        account_debit, account_credit = ZERO_DECIMAL, ZERO_DECIMAL
 
-    direct_accounts_nodes.sort(key=lambda item: account_data_map.get(item['id'], {}).get('account_number', ''))
-    current_level_nodes.extend(direct_accounts_nodes)
+        if nature == AccountNature.DEBIT.value:
+            account_debit = balance_in_report_curr if balance_in_report_curr >= ZERO_DECIMAL else ZERO_DECIMAL
+            account_credit = -balance_in_report_curr if balance_in_report_curr < ZERO_DECIMAL else ZERO_DECIMAL
+        elif nature == AccountNature.CREDIT.value:
+            account_credit = balance_in_report_curr if balance_in_report_curr >= ZERO_DECIMAL else ZERO_DECIMAL
+            account_debit = -balance_in_report_curr if balance_in_report_curr < ZERO_DECIMAL else ZERO_DECIMAL
+        else:
+            logger.warning(
+                f"Account {acc_pk} ({acc_data.get('account_number')}) has unknown nature '{nature}'. Balance signs might be incorrect on Trial Balance.")
+
+        if account_debit != ZERO_DECIMAL or account_credit != ZERO_DECIMAL:
+            account_node = {
+                'id': acc_pk,
+                'name': f"{acc_data.get('account_number', 'N/A')} - {str(acc_data.get('account_name', 'N/A'))}",
+                'type': 'account', 'level': level,
+                'debit': account_debit, 'credit': account_credit, 'children': []
+            }
+            current_level_nodes.append(account_node)
+            current_level_total_debit += account_debit
+            current_level_total_credit += account_credit
 
     return current_level_nodes, current_level_total_debit, current_level_total_credit
 
 
 def _build_balance_sheet_hierarchy(
         parent_group_id: Optional[PK_TYPE],
-        all_groups: Dict[PK_TYPE, AccountGroup],
-        account_balances_bs: Dict[PK_TYPE, ProcessedAccountBalance],
+        group_children: GroupChildren,
+        group_accounts: GroupAccounts,
         level: int
 ) -> Tuple[List[BalanceSheetNode], Decimal]:
     current_level_nodes: List[BalanceSheetNode] = []
     current_level_total_balance = ZERO_DECIMAL
 
-    child_groups = [group for pk, group in all_groups.items() if group.parent_group_id == parent_group_id]
-    for group in sorted(child_groups, key=lambda g: g.name):
+    for group in group_children.get(parent_group_id, ()):
         child_hierarchy_nodes, child_total_balance = _build_balance_sheet_hierarchy(
-            group.pk, all_groups, account_balances_bs, level + 1
+            group.pk, group_children, group_accounts, level + 1
         )
         group_node: BalanceSheetNode = {
             'id': group.pk, 'name': str(group.name), 'type': 'group', 'level': level,
@@ -419,25 +481,20 @@ def _build_balance_sheet_hierarchy(
             current_level_nodes.append(group_node)
             current_level_total_balance += child_total_balance
 
-    direct_accounts_nodes: List[BalanceSheetNode] = []
-    for acc_pk, acc_data in account_balances_bs.items():
-        if acc_data['account_group_pk'] == parent_group_id:
-            account_balance_in_report_curr = acc_data['converted_balance']
-            if account_balance_in_report_curr != ZERO_DECIMAL:
-                account_node: BalanceSheetNode = {
-                    'id': acc_pk,
-                    'name': f"{acc_data['account_number']} - {str(acc_data['account_name'])}",
-                    'type': 'account', 'level': level,
-                    'balance': account_balance_in_report_curr,
-                    'currency': acc_data['original_currency'],
-                    'account_number': acc_data['account_number'],
-                    'children': []
-                }
-                direct_accounts_nodes.append(account_node)
-                current_level_total_balance += account_balance_in_report_curr
-
-    direct_accounts_nodes.sort(key=lambda item: account_balances_bs.get(item['id'], {}).get('account_number', ''))
-    current_level_nodes.extend(direct_accounts_nodes)
+    for acc_pk, acc_data in group_accounts.get(parent_group_id, ()):
+        account_balance_in_report_curr = acc_data['converted_balance']
+        if account_balance_in_report_curr != ZERO_DECIMAL:
+            account_node: BalanceSheetNode = {
+                'id': acc_pk,
+                'name': f"{acc_data['account_number']} - {str(acc_data['account_name'])}",
+                'type': 'account', 'level': level,
+                'balance': account_balance_in_report_curr,
+                'currency': acc_data['original_currency'],
+                'account_number': acc_data['account_number'],
+                'children': []
+            }
+            current_level_nodes.append(account_node)
+            current_level_total_balance += account_balance_in_report_curr
 
     return current_level_nodes, current_level_total_balance
 
@@ -445,6 +502,8 @@ def _build_balance_sheet_hierarchy(
 # =============================================================================
 # Public Report Generation Functions (Trial Balance, P&L, Balance Sheet)
 # =============================================================================
+@span('reports.trial_balance')
+@use_reporting_replica()
 def generate_trial_balance_structured(company_id: PK_TYPE, as_of_date: date, report_currency: Optional[str] = None) -> \
         Dict[str, Any]:
     if not Company: raise ReportGenerationError("Company model not available.")
@@ -459,10 +518,11 @@ def generate_trial_balance_structured(company_id: PK_TYPE, as_of_date: date, rep
         logger.warning(
             f"TB Gen for Co ID {company_id}: No report_currency provided and company has no default. Defaulting to USD.")
 
-    logger.info(
-        f"Generating Trial Balance for Company ID {company_id} (Currency: {effective_report_currency}) as of {as_of_date}")
+    logger.info("Generating Trial Balance for Company ID %s (Currency: %s) as of %s",
+                company_id, effective_report_currency, as_of_date)
 
-    processed_balances_map = _calculate_account_balances(company_id, as_of_date, effective_report_currency)
+    processed_balances_map = _calculate_account_balances(company_id, as_of_date, effective_report_currency,
+                                                         get_opening_fiscal_year(company_id, as_of_date))
     flat_entries_list: List[Dict[str, Any]] = []
     grand_total_debit, grand_total_credit = ZERO_DECIMAL, ZERO_DECIMAL
 
@@ -491,9 +551,9 @@ def generate_trial_balance_structured(company_id: PK_TYPE, as_of_date: date, rep
         grand_total_credit += credit_amount
     flat_entries_list.sort(key=lambda x: x['account_number'])
 
-    company_groups_qs = AccountGroup.objects.filter(company_id=company_id).order_by('name')
-    group_dict = {group.pk: group for group in company_groups_qs}
-    hierarchy, _, _ = _build_group_hierarchy_recursive(None, group_dict, processed_balances_map, 0)
+    with span('hierarchy'):
+        hierarchy, _, _ = _build_group_hierarchy_recursive(
+            None, _company_group_tree(company_id), _index_accounts_by_group(processed_balances_map), 0)
 
     is_balanced = abs(grand_total_debit - grand_total_credit) < Decimal('0.01')
     if not is_balanced:
@@ -544,6 +604,8 @@ DEFAULT_PL_STRUCTURE_DEFINITION = [
 ]
 
 
+@span('reports.profit_loss')
+@use_reporting_replica()
 def generate_profit_loss(company_id: PK_TYPE, start_date: date, end_date: date,
                          report_currency: Optional[str] = None) -> Dict[str, Any]:
     if not Company: raise ReportGenerationError("Company model not available.")
@@ -557,8 +619,8 @@ def generate_profit_loss(company_id: PK_TYPE, start_date: date, end_date: date,
         effective_report_currency = 'USD'
         logger.warning(f"P&L Gen for Co ID {company_id}: No report_currency and no company default. Defaulting to USD.")
 
-    logger.info(
-        f"Generating P&L for Company ID {company_id} (Currency: {effective_report_currency}) from {start_date} to {end_date}")
+    logger.info("Generating P&L for Company ID %s (Currency: %s) from %s to %s",
+                company_id, effective_report_currency, start_date, end_date)
     if start_date > end_date:
         raise ValueError("Start date cannot be after end date for Profit & Loss report.")
 
@@ -575,6 +637,7 @@ def generate_profit_loss(company_id: PK_TYPE, start_date: date, end_date: date,
         voucher__status=TransactionStatus.POSTED.value,
         voucher__date__gte=start_date,
         voucher__date__lte=end_date,
+        voucher__is_year_end_closing=False,  # Closing entries would zero out the year's P&L
         account__company_id=company_id,
         account__account_type__in=pl_account_types,
         account__is_active=True
@@ -589,6 +652,8 @@ def generate_profit_loss(company_id: PK_TYPE, start_date: date, end_date: date,
         'period_debit', 'period_credit'
     )
 
+    with span('aggregate'):
+        account_movements = list(account_movements)
     for item in account_movements:
         acc_pk = item['account__id']
         acc_currency = item['account__currency']
@@ -596,8 +661,8 @@ def generate_profit_loss(company_id: PK_TYPE, start_date: date, end_date: date,
         pl_section_str = item['account__pl_section']
 
         if not pl_section_str or pl_section_str == PLSection.NONE.value:
-            logger.debug(
-                f"P&L Co {company_id}: Account {acc_pk} ({item['account__account_number']}) has no PLSection or is 'NONE'. Skipping.")
+            logger.sampled("P&L Co %s: Account %s (%s) has no PLSection or is 'NONE'. Skipping.",
+                           company_id, acc_pk, item['account__account_number'])
             continue
 
         movement_in_acc_currency = (item['period_credit'] - item['period_debit']) \
@@ -686,6 +751,8 @@ def generate_profit_loss(company_id: PK_TYPE, start_date: date, end_date: date,
     }
 
 
+@span('reports.balance_sheet')
+@use_reporting_replica()
 def generate_balance_sheet(company_id: PK_TYPE, as_of_date: date, report_currency: Optional[str] = None) -> Dict[
     str, Any]:
     if not Company: raise ReportGenerationError("Company model not available.")
@@ -699,10 +766,12 @@ def generate_balance_sheet(company_id: PK_TYPE, as_of_date: date, report_currenc
         effective_report_currency = 'USD'
         logger.warning(f"BS Gen for Co ID {company_id}: No report_currency and no company default. Defaulting to USD.")
 
-    logger.info(
-        f"Generating Balance Sheet for Company ID {company_id} (Currency: {effective_report_currency}) as of {as_of_date}")
+    logger.info("Generating Balance Sheet for Company ID %s (Currency: %s) as of %s",
+                company_id, effective_report_currency, as_of_date)
 
-    all_account_balances = _calculate_account_balances(company_id, as_of_date, effective_report_currency)
+    opening_year = get_opening_fiscal_year(company_id, as_of_date)
+    all_account_balances = _calculate_account_balances(company_id, as_of_date, effective_report_currency,
+                                                       opening_year)
 
     retained_earnings_from_pl_accounts = ZERO_DECIMAL
     pl_types_for_retained_earnings = {AccountType.INCOME.value, AccountType.EXPENSE.value,
@@ -727,15 +796,23 @@ def generate_balance_sheet(company_id: PK_TYPE, as_of_date: date, report_currenc
         elif data['account_type'] == AccountType.EQUITY.value:
             equity_balances_map[pk] = data
 
-    company_groups = {group.pk: group for group in AccountGroup.objects.filter(company_id=company_id)}
+    with span('hierarchy'):
+        company_groups = _company_group_tree(company_id)
 
-    asset_hierarchy_nodes, total_assets_val = _build_balance_sheet_hierarchy(None, company_groups, asset_balances_map, 0)
-    liability_hierarchy_nodes, total_liabilities_val = _build_balance_sheet_hierarchy(None, company_groups, liability_balances_map, 0)
-    equity_hierarchy_nodes, total_explicit_equity_val = _build_balance_sheet_hierarchy(None, company_groups, equity_balances_map, 0)
+        asset_hierarchy_nodes, total_assets_val = _build_balance_sheet_hierarchy(
+            None, company_groups, _index_accounts_by_group(asset_balances_map), 0)
+        liability_hierarchy_nodes, total_liabilities_val = _build_balance_sheet_hierarchy(
+            None, company_groups, _index_accounts_by_group(liability_balances_map), 0)
+        equity_hierarchy_nodes, total_explicit_equity_val = _build_balance_sheet_hierarchy(
+            None, company_groups, _index_accounts_by_group(equity_balances_map), 0)
 
+    # Once a year has been closed, prior years' results sit in the retained earnings account
+    # itself and the P&L accounts only hold the current year's movement.
+    earnings_display_name = CURRENT_YEAR_EARNINGS_NAME_DISPLAY \
+        if opening_year else RETAINED_EARNINGS_ACCOUNT_NAME_DISPLAY
     retained_earnings_node_data: BalanceSheetNode = {
         'id': RETAINED_EARNINGS_ACCOUNT_ID_PLACEHOLDER,
-        'name': str(RETAINED_EARNINGS_ACCOUNT_NAME_DISPLAY),
+        'name': str(earnings_display_name),
         'type': 'account', 'level': 0,
         'balance': retained_earnings_from_pl_accounts,
         'currency': effective_report_currency,
@@ -770,6 +847,8 @@ def generate_balance_sheet(company_id: PK_TYPE, as_of_date: date, report_currenc
 # =============================================================================
 # Accounts Receivable (AR) Specific Report Functions
 # =============================================================================
+@span('reports.ar_aging')
+@use_reporting_replica()
 def generate_ar_aging_report(
         company_id: PK_TYPE,
         as_of_date: date,
@@ -788,8 +867,8 @@ def generate_ar_aging_report(
         logger.warning(
             f"AR Aging Gen for Co ID {company_id}: No report_currency and no company default. Defaulting to USD.")
 
-    logger.info(
-        f"Generating AR Aging for Company ID {company_id} (Currency: {effective_report_currency}) as of {as_of_date}")
+    logger.info("Generating AR Aging for Company ID %s (Currency: %s) as of %s",
+                company_id, effective_report_currency, as_of_date)
 
     current_buckets_definition = aging_buckets_days if aging_buckets_days is not None else DEFAULT_AR_AGING_BUCKETS_DAYS
     effective_buckets_definition = sorted(list(set([0] + current_buckets_definition)))
@@ -805,14 +884,32 @@ def generate_ar_aging_report(
             bucket_labels_list.append(f"{lower_b}-{upper_b} {str(_('Days'))}")
         bucket_labels_list.append(f"{effective_buckets_definition[-1] + 1}+ {str(_('Days'))}")
 
-    potentially_outstanding_invoices = CustomerInvoice.objects.filter(
+    # Unpaid invoices come from the partial aging index (live, not-yet-paid rows only). PAID invoices can
+    # only be outstanding on a past as-of date, i.e. when a payment applied to them is dated after it.
+    unpaid_invoices = CustomerInvoice.objects.filter(
         company_id=company_id,
         invoice_date__lte=as_of_date,
-        status__in=[
-            InvoiceStatus.DRAFT.value, InvoiceStatus.SENT.value, InvoiceStatus.PARTIALLY_PAID.value,
-            InvoiceStatus.PAID.value, InvoiceStatus.OVERDUE.value
-        ]
+        status__in=AR_AGING_INVOICE_STATUSES
+    ).select_related('customer')
+    paid_after_as_of_invoices = CustomerInvoice.objects.filter(
+        company_id=company_id,
+        invoice_date__lte=as_of_date,
+        status=InvoiceStatus.PAID.value,
+        pk__in=PaymentAllocation.objects.filter(
+            company_id=company_id, payment__payment_date__gt=as_of_date
+        ).values('invoice_id')
     ).select_related('customer')
+    potentially_outstanding_invoices = chain(unpaid_invoices, paid_after_as_of_invoices)
+    # Amount applied to each of those invoices by payments dated up to the as-of date, in one grouped query
+    applied_as_of_by_invoice: Dict[PK_TYPE, Decimal] = dict(PaymentAllocation.objects.filter(
+        Q(invoice_id__in=unpaid_invoices.values('pk')) | Q(invoice_id__in=paid_after_as_of_invoices.values('pk')),
+        payment__payment_date__lte=as_of_date,
+        payment__status__in=[
+            CorePaymentStatus.APPLIED.value,
+            CorePaymentStatus.COMPLETED.value,
+        ]
+    ).values('invoice_id').annotate(total_applied=Sum('amount_applied')).order_by().values_list(
+        'invoice_id', 'total_applied'))
 
     ar_aging_data_map: DefaultDict[PK_TYPE, ARAgingEntry] = defaultdict(
         lambda: ARAgingEntry(customer_pk=None, customer_name="", currency=effective_report_currency, # type: ignore
@@ -828,16 +925,7 @@ def generate_ar_aging_report(
                 f"AR Aging Co {company_id}: Invoice {invoice.invoice_number or invoice.pk} is missing a customer. Skipping.")
             continue
 
-        amount_paid_for_invoice_as_of_report_date = PaymentAllocation.objects.filter(
-            invoice=invoice,
-            payment__payment_date__lte=as_of_date,
-            payment__status__in=[
-                CorePaymentStatus.APPLIED.value,
-                CorePaymentStatus.COMPLETED.value,
-            ]
-        ).aggregate(
-            total_applied_specific_date=Coalesce(Sum('amount_applied'), ZERO_DECIMAL)
-        )['total_applied_specific_date']
+        amount_paid_for_invoice_as_of_report_date = applied_as_of_by_invoice.get(invoice.pk, ZERO_DECIMAL)
 
         invoice_outstanding_for_report = invoice.total_amount - amount_paid_for_invoice_as_of_report_date
 
@@ -905,6 +993,8 @@ def generate_ar_aging_report(
     }
 
 
+@span('reports.customer_statement')
+@use_reporting_replica()
 def generate_customer_statement(
         company_id: PK_TYPE,
         customer_id: PK_TYPE,
@@ -933,8 +1023,8 @@ def generate_customer_statement(
         logger.warning(
             f"Customer Stmt Gen for Co ID {company_id}, Cust {customer_id}: No report_currency and no company default. Defaulting to USD.")
 
-    logger.info(
-        f"Generating Customer Statement for Co ID {company_id}, Customer {customer_id} (Currency: {effective_report_currency}) from {start_date} to {end_date}")
+    logger.info("Generating Customer Statement for Co ID %s, Customer %s (Currency: %s) from %s to %s",
+                company_id, customer_id, effective_report_currency, start_date, end_date)
 
     statement_transactions_raw: List[Dict[str, Any]] = []
     conversion_errors_logged_cust_stmt = set()
@@ -988,7 +1078,7 @@ def generate_customer_statement(
                 converted_ob_amount = _convert_currency(company_id, amount_for_ob, item['orig_currency'],
                                                         effective_report_currency, item['date'])
             except CurrencyConversionError as cce:
-                rate_key = (item['orig_currency'], effective_report_currency, item['date'])
+                rate_key = (item['orig_currency'], effective_report_currency)
                 if rate_key not in conversion_errors_logged_cust_stmt:
                     logger.warning(
                         f"Cust Stmt Co {company_id} Cust {customer_id}: OB conversion error for {item['ref']} on {item['date']}. Using unconverted. Error: {cce}")
@@ -1008,7 +1098,7 @@ def generate_customer_statement(
                                                           item['orig_currency'],
                                                           effective_report_currency, item['date'])
             except CurrencyConversionError as cce:
-                rate_key = (item['orig_currency'], effective_report_currency, item['date'])
+                rate_key = (item['orig_currency'], effective_report_currency)
                 if rate_key not in conversion_errors_logged_cust_stmt:
                     logger.warning(
                         f"Cust Stmt Co {company_id} Cust {customer_id}: Line item conversion error for {item['ref']} on {item['date']}. Using unconverted. Error: {cce}")
@@ -1042,6 +1132,8 @@ def generate_customer_statement(
 # =============================================================================
 # Accounts Payable (AP) Specific Report Functions
 # =============================================================================
+@span('reports.ap_aging')
+@use_reporting_replica()
 def generate_ap_aging_report(company_id: PK_TYPE, as_of_date: date, report_currency: Optional[str] = None,
                              aging_buckets_days: Optional[List[int]] = None) -> Dict[str, Any]:
     if not Company: raise ReportGenerationError("Company model not available.")
@@ -1051,7 +1143,7 @@ def generate_ap_aging_report(company_id: PK_TYPE, as_of_date: date, report_curre
         raise ReportGenerationError(f"Company ID {company_id} not found.")
 
     effective_report_currency = report_currency or company_instance.default_currency_code or 'USD'
-    logger.info(f"AP Aging Gen: Co ID {company_id} ({effective_report_currency}) as of {as_of_date}")
+    logger.info("AP Aging Gen: Co ID %s (%s) as of %s", company_id, effective_report_currency, as_of_date)
 
     # Using DEFAULT_AP_AGING_BUCKETS_DAYS for AP
     current_buckets_def = aging_buckets_days if aging_buckets_days is not None else DEFAULT_AP_AGING_BUCKETS_DAYS
@@ -1127,6 +1219,8 @@ def generate_ap_aging_report(company_id: PK_TYPE, as_of_date: date, report_curre
     }
 
 
+@span('reports.vendor_statement')
+@use_reporting_replica()
 def generate_vendor_statement(company_id: PK_TYPE, supplier_id: PK_TYPE, start_date: date, end_date: date,
                               report_currency: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -1144,8 +1238,8 @@ def generate_vendor_statement(company_id: PK_TYPE, supplier_id: PK_TYPE, start_d
         raise ReportGenerationError(f"Supplier ID {supplier_id} (Type: Supplier) not found for company {company_id}.")
 
     effective_report_currency = report_currency or company_instance.default_currency_code or 'USD'
-    logger.info(
-        f"Vendor Stmt Gen: Co ID {company_id}, Supp {supplier_id} ({effective_report_currency}) from {start_date} to {end_date}")
+    logger.info("Vendor Stmt Gen: Co ID %s, Supp %s (%s) from %s to %s",
+                company_id, supplier_id, effective_report_currency, start_date, end_date)
 
     raw_lines: List[Dict[str, Any]] = []
     conversion_errors_logged_stmt_ven = set()
@@ -1192,7 +1286,7 @@ def generate_vendor_statement(company_id: PK_TYPE, supplier_id: PK_TYPE, start_d
                 conv_amt = _convert_currency(company_id, item['orig_amount'], item['orig_currency'],
                                              effective_report_currency, item['date'])
             except CurrencyConversionError as e:
-                rate_key = (item['orig_currency'], effective_report_currency, item['date'])
+                rate_key = (item['orig_currency'], effective_report_currency)
                 if rate_key not in conversion_errors_logged_stmt_ven:
                     logger.warning(f"Vendor Stmt OB Calc - Co {company_id}: {e}. Defaulting to original amount.")
                     conversion_errors_logged_stmt_ven.add(rate_key)
@@ -1209,7 +1303,7 @@ def generate_vendor_statement(company_id: PK_TYPE, supplier_id: PK_TYPE, start_d
                 conv_amt = _convert_currency(company_id, item['orig_amount'], item['orig_currency'],
                                              effective_report_currency, item['date'])
             except CurrencyConversionError as e:
-                rate_key = (item['orig_currency'], effective_report_currency, item['date'])
+                rate_key = (item['orig_currency'], effective_report_currency)
                 if rate_key not in conversion_errors_logged_stmt_ven:
                     logger.warning(f"Vendor Stmt Line Item - Co {company_id}: {e}. Defaulting to original amount.")
                     conversion_errors_logged_stmt_ven.add(rate_key)
@@ -1248,6 +1342,8 @@ def generate_vendor_statement(company_id: PK_TYPE, supplier_id: PK_TYPE, start_d
 # =============================================================================
 # Placeholder function from the second file (UNCHANGED)
 # =============================================================================
+@span('reports.customer_refunds')
+@use_reporting_replica()
 def list_customer_refunds(
         company_id: PK_TYPE,
         customer_id: Optional[PK_TYPE] = None,
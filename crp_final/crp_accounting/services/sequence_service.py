@@ -2,8 +2,9 @@
 
 import logging
 import math
-from typing import Optional
+from typing import List, Optional
 
+from dateutil.relativedelta import relativedelta
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
 from django.db import transaction, IntegrityError
@@ -31,6 +32,20 @@ def _calculate_quarter(date_obj) -> int:
     return math.ceil(date_obj.month / 3.0)
 
 
+def _get_period_code(period: AccountingPeriod) -> str:
+    """
+    Code of a period that is unique among the company's periods (sequences, and therefore voucher
+    number prefixes, are per period): '2024Q1' for a calendar quarter, '2024M03' for a calendar
+    month, otherwise the start date ('20240315').
+    """
+    start, end = period.start_date, period.end_date
+    if end and start.day == 1 and end == start + relativedelta(months=1, days=-1):
+        return f"{start:%Y}M{start:%m}"
+    if end and start.day == 1 and start.month % 3 == 1 and end == start + relativedelta(months=3, days=-1):
+        return f"{start:%Y}Q{_calculate_quarter(start)}"
+    return start.strftime('%Y%m%d')
+
+
 def _get_default_prefix(
         company: Optional[Company],  # Company instance for potential prefix customization
         voucher_type_value: str,
@@ -38,7 +53,7 @@ def _get_default_prefix(
 ) -> str:
     """
     Generates a default prefix for a voucher sequence.
-    Example: {COMSHORT}-JV-2024Q1-
+    Example: {COMSHORT}-JV-2024Q1- (quarterly period), {COMSHORT}-JV-2024M03- (monthly period)
     """
     if not period or not period.start_date:
         logger.error(
@@ -48,9 +63,7 @@ def _get_default_prefix(
         # Fallback prefix, consider making this more unique or raising an error
         return f"{voucher_type_value[:3].upper()}-DEF-"
 
-    year_str = period.start_date.strftime('%Y')
-    quarter = _calculate_quarter(period.start_date)
-    period_code = f"{year_str}Q{quarter}"
+    period_code = _get_period_code(period)
 
     # Company-specific part of the prefix (optional)
     company_prefix_part = ""
@@ -223,6 +236,38 @@ def get_next_voucher_number(
         raise ValueError(
             f"Failed to generate next voucher number for {voucher_type_value} due to an internal error."
         ) from e
+
+
+@transaction.atomic
+def reserve_voucher_numbers(
+        company_id: int,
+        voucher_type_value: str,
+        period_id: int,
+        count: int
+) -> List[str]:
+    """
+    Reserves a block of `count` consecutive voucher numbers with a single locked increment
+    (instead of one `get_next_voucher_number` round trip per voucher). Used by bulk
+    generation/posting paths. Numbers of a rolled-back block are not reused, same as
+    for single numbers.
+    """
+    if count <= 0:
+        return []
+    sequence_config_initial = get_or_create_sequence_config(company_id, voucher_type_value, period_id)
+    sequence_locked = VoucherSequence.objects.select_for_update().get(
+        pk=sequence_config_initial.pk, company_id=company_id)
+
+    first_number_val = sequence_locked.last_number + 1
+    sequence_locked.last_number += count
+    sequence_locked.save(update_fields=['last_number', 'updated_at'])
+
+    numbers = [f"{sequence_locked.prefix}{str(number_val).zfill(sequence_locked.padding_digits)}"
+               for number_val in range(first_number_val, sequence_locked.last_number + 1)]
+    logger.info(
+        f"Reserved {count} voucher numbers for Co ID {company_id}, Type '{voucher_type_value}', "
+        f"Period ID {period_id}: '{numbers[0]}' .. '{numbers[-1]}'."
+    )
+    return numbers
 # import logging
 # import math
 # from django.utils.translation import gettext_lazy as _
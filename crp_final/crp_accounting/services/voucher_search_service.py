@@ -0,0 +1,50 @@
+# crp_accounting/services/voucher_search_service.py
+"""
+Voucher text search (the voucher list's `?search=` and the VoucherFilterSet *_contains filters).
+
+On PostgreSQL every voucher has a VoucherSearchDocument (voucher number, reference, narration,
+party name and line narrations) that triggers keep current, indexed with pg_trgm on
+UPPER(document) (migration 0008). So:
+  - `search_vouchers` matches each term with `icontains` on that one indexed column, with no
+    join to the lines and no DISTINCT, and ranks the matches by trigram word similarity,
+  - `filter_contains` first narrows with the index, then checks the requested column.
+Other databases (tests, local SQLite) have no documents and match on the columns directly,
+with the same results and no ranking.
+"""
+
+import logging
+from typing import Sequence
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import FloatField, QuerySet
+from django.db.models.functions import Cast
+
+logger = logging.getLogger("crp_accounting.services.voucher_search")
+
+SEARCH_RANK = 'search_rank'
+
+
+def uses_search_documents(queryset: QuerySet) -> bool:
+    """True where the trigger-maintained, trigram-indexed search documents exist."""
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def search_vouchers(queryset: QuerySet, terms: Sequence[str]) -> QuerySet:
+    """
+    Vouchers whose search document contains every term (case-insensitive), annotated with
+    `search_rank` (word similarity to the whole search, as double precision so keyset cursors
+    compare it exactly). PostgreSQL only, see `uses_search_documents`.
+    """
+    for term in terms:
+        queryset = queryset.filter(search_document__document__icontains=term)
+    rank = TrigramWordSimilarity(' '.join(terms), 'search_document__document')
+    return queryset.annotate(**{SEARCH_RANK: Cast(rank, output_field=FloatField())})
+
+
+def filter_contains(queryset: QuerySet, field_name: str, value: str) -> QuerySet:
+    """`<field_name>__icontains=value`, narrowed through the search document index on PostgreSQL."""
+    queryset = queryset.filter(**{f'{field_name}__icontains': value})
+    if uses_search_documents(queryset):
+        queryset = queryset.filter(search_document__document__icontains=value)
+    return queryset
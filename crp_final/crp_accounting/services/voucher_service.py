@@ -4,14 +4,18 @@ import logging
 from datetime import date
 from decimal import Decimal
 from django.db import transaction, IntegrityError
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError as DjangoValidationError, ObjectDoesNotExist
 from django.conf import settings
-from typing import Optional, Dict, Any, List, Set, Union
+from typing import Optional, Dict, Any, Iterable, List, Set, Tuple, Union
+from collections import defaultdict
 
 from rest_framework.exceptions import PermissionDenied  # Using DRF's PermissionDenied for RBAC checks
 from django.shortcuts import get_object_or_404  # Good for fetching Company
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 logger = logging.getLogger("crp_accounting.services.voucher")  # Specific logger
 
@@ -20,7 +24,7 @@ from ..models.journal import (
     Voucher, VoucherLine, VoucherApproval,
     VoucherType, TransactionStatus, DrCrType, ApprovalActionType
 )
-from ..models.coa import Account
+from ..models.coa import Account, AccountNature
 from ..models.party import Party
 from ..models.period import AccountingPeriod
 
@@ -36,9 +40,11 @@ except ImportError:
 
 # --- Service Imports ---
 from . import sequence_service  # Assumed fully tenant-aware and expects company_id, voucher_type_value, period_id
+from .period_calendar_service import get_period_calendar
 
 # --- Task Imports ---
 from ..tasks import update_account_balances_task  # Assumed task is tenant-aware and expects voucher_id, company_id
+from .party_exposure_service import apply_posted_voucher_to_party_exposure
 
 # --- Custom Exception Imports ---
 from ..exceptions import (
@@ -567,20 +573,20 @@ def create_reversing_voucher(
 # INTERNAL HELPER & VALIDATION FUNCTIONS
 # =============================================
 def _get_valid_accounting_period(company: Company, for_date: timezone.datetime.date) -> AccountingPeriod:
-    try:
-        period = AccountingPeriod.objects.get(company=company, start_date__lte=for_date, end_date__gte=for_date)
-        if period.locked:
-            logger.warning(
-                f"Attempt to use locked Accounting Period '{period.name}' for Co '{company.name}', Date {for_date}.")
-            raise PeriodLockedError(period_name=str(period))
-        return period
-    except AccountingPeriod.DoesNotExist:
+    calendar = get_period_calendar(company.pk)
+    period = calendar.period_for(for_date)
+    if period is None:
         logger.error(f"No open/valid Accounting Period found for Co '{company.name}' for Date {for_date}.")
         raise DjangoValidationError(
             {'accounting_period': _(
                 "No open accounting period found for company '%(company_name)s' for date %(date)s.") %
                                   {'company_name': company.name, 'date': for_date}}
         )
+    if period.locked:
+        logger.warning(
+            f"Attempt to use locked Accounting Period '{period.name}' for Co '{company.name}', Date {for_date}.")
+        raise PeriodLockedError(period_name=period.name)
+    return calendar.as_model_instance(period)
 
 
 def _get_valid_party(company: Company, party_pk: Optional[Union[int, str]]) -> Optional[Party]:
@@ -761,6 +767,70 @@ def _trigger_balance_updates(voucher: Voucher, company: Company):
         logger.critical(f"{log_prefix} CRITICAL - FAILED TO ENQUEUE balance update task. Error: {e}", exc_info=True)
 
 
+def apply_posted_lines_to_account_balances(lines: Iterable[VoucherLine], current_time=None) -> None:
+    """
+    Applies the net balance effect of many POSTED voucher lines with one UPDATE per account
+    (same sign rules as the voucher post_save balance signal). Accounts are updated in pk order, so
+    concurrent batches lock shared accounts (bank, control accounts) in the same order.
+    """
+    totals: Dict[Any, List[Decimal]] = defaultdict(lambda: [Decimal('0.00'), Decimal('0.00')])  # [Dr, Cr]
+    for line in lines:
+        totals[line.account_id][0 if line.dr_cr == DrCrType.DEBIT.value else 1] += line.amount
+    if not totals:
+        return
+    current_time = current_time or timezone.now()
+    natures = dict(Account._base_manager.filter(pk__in=list(totals)).values_list('pk', 'account_nature'))
+    for account_id in sorted(totals):
+        total_debit, total_credit = totals[account_id]
+        delta = total_debit - total_credit if natures.get(account_id) == AccountNature.DEBIT.value \
+            else total_credit - total_debit
+        Account._base_manager.filter(pk=account_id).update(
+            current_balance=Coalesce(F('current_balance'), Decimal('0.00')) + delta, balance_last_updated=current_time)
+
+
+def _apply_posted_voucher_effects(vouchers: List[Voucher], lines: List[VoucherLine], current_time=None) -> None:
+    """Balance effects of newly POSTED vouchers: once per account, then per party voucher."""
+    current_time = current_time or timezone.now()
+    apply_posted_lines_to_account_balances(lines, current_time)
+    lines_by_voucher: Dict[Any, List[VoucherLine]] = defaultdict(list)
+    for line in lines:
+        lines_by_voucher[line.voucher_id].append(line)
+    for voucher in vouchers:
+        if voucher.party_id:
+            apply_posted_voucher_to_party_exposure(voucher, lines_by_voucher[voucher.pk], current_time)
+
+
+def _bulk_log_approval_actions(vouchers_with_from_status: List[Any], user: settings.AUTH_USER_MODEL,
+                               action_type: str, to_status: str, comments: str, batch_size: int = 1000) -> None:
+    """One VoucherApproval row per (voucher, from_status) pair, inserted in bulk."""
+    approvals = [
+        VoucherApproval(company_id=voucher.company_id, voucher=voucher, user=user, action_type=action_type,
+                        from_status=from_status, to_status=to_status, comments=comments)
+        for voucher, from_status in vouchers_with_from_status
+    ]
+    bulk_create_with_history(approvals, VoucherApproval, batch_size=batch_size, default_user=user)
+
+
+def bulk_insert_posted_vouchers(vouchers: List[Voucher], lines: List[VoucherLine],
+                                user: settings.AUTH_USER_MODEL, comments: str, batch_size: int = 1000) -> None:
+    """
+    Batched posting path. Inserts already numbered POSTED vouchers (with `balances_updated=True`)
+    and their lines in bulk, logs one APPROVED row per voucher, then applies the balance effects
+    once per account and per party. Bulk inserts bypass the post_save balance signal, which is
+    why balances are applied here. Runs in the caller's transaction.
+    """
+    if not vouchers:
+        return
+    bulk_create_with_history(vouchers, Voucher, batch_size=batch_size, default_user=user)
+    VoucherLine.objects.bulk_create(lines, batch_size=batch_size)
+    _bulk_log_approval_actions([(voucher, TransactionStatus.DRAFT.value) for voucher in vouchers], user,
+                               ApprovalActionType.APPROVED.value, TransactionStatus.POSTED.value, comments,
+                               batch_size=batch_size)
+    _apply_posted_voucher_effects(vouchers, lines)
+    logger.info(f"[VchBulkPost][Co:{vouchers[0].company_id}] Inserted {len(vouchers)} POSTED vouchers "
+                f"with {len(lines)} lines.")
+
+
 def _log_approval_action(voucher: Voucher, user: settings.AUTH_USER_MODEL, action_type: str, from_status: str,
                          to_status: str, comments: str):
     try:
@@ -982,4 +1052,284 @@ def create_reversing_voucher(
     logger.info(
         f"{log_prefix} Original Voucher {original_voucher.voucher_number} marked as reversed by {reversing_voucher.voucher_number or reversing_voucher.pk}.")
 
-    return reversing_voucher
\ No newline at end of file
+    return reversing_voucher
+
+
+# =============================================================================
+# Batch Workflow Service Functions
+# =============================================================================
+# Each batch function checks permissions once, locks all target vouchers with one ordered
+# SELECT ... FOR UPDATE, validates them with batched queries and writes status changes and
+# approval rows in bulk. Vouchers failing validation are skipped and reported; the others are
+# processed. Results are returned like receivables_service.post_selected_invoices_to_gl:
+# (success_count, error_count, errors_detail).
+
+def _lock_vouchers_for_batch(company: Company, voucher_ids: List[Any], allowed_statuses: List[str],
+                             errors_detail: List[str]) -> List[Voucher]:
+    """Locks the company's vouchers in PK order; reports missing ones and those in another status."""
+    locked = list(Voucher.objects.select_for_update(of=('self',)).filter(
+        company=company, pk__in=voucher_ids).order_by('pk'))
+    found_pks = {str(voucher.pk) for voucher in locked}
+    for voucher_id in voucher_ids:
+        if str(voucher_id) not in found_pks:
+            errors_detail.append(_("Vch ID %(id)s: Not found for company.") % {'id': voucher_id})
+    eligible = []
+    for voucher in locked:
+        if voucher.status in allowed_statuses:
+            eligible.append(voucher)
+        else:
+            errors_detail.append(_("Vch %(n)s: Not %(expected)s (is %(s)s). Skipped.") % {
+                'n': voucher.voucher_number or voucher.pk, 'expected': "/".join(allowed_statuses),
+                's': voucher.get_status_display()})
+    return eligible
+
+
+def _lines_by_voucher(vouchers: List[Voucher]) -> Dict[Any, List[VoucherLine]]:
+    lines_by_voucher: Dict[Any, List[VoucherLine]] = defaultdict(list)
+    for line in VoucherLine.objects.filter(voucher_id__in=[voucher.pk for voucher in vouchers]).select_related(
+            'account'):
+        lines_by_voucher[line.voucher_id].append(line)
+    return lines_by_voucher
+
+
+def account_posting_problems(company_id: Any, account: Account) -> List[str]:
+    """Why a voucher line of `company_id` cannot be posted to `account` (empty when it can)."""
+    problems = []
+    if account.company_id != company_id:
+        problems.append(_("Account '%(acc)s' does not belong to the voucher's company.") % {
+            'acc': account.account_name})
+    if account.deleted:
+        problems.append(_("Account '%(acc)s' is deleted.") % {'acc': account.account_name})
+    if not account.is_active:
+        problems.append(_("Account '%(acc)s' is inactive.") % {'acc': account.account_name})
+    if not account.allow_direct_posting:
+        problems.append(_("Account '%(acc)s' does not allow direct posting.") % {'acc': account.account_name})
+    return problems
+
+
+def _batch_validation_errors(company: Company, vouchers: List[Voucher],
+                             lines_by_voucher: Dict[Any, List[VoucherLine]],
+                             require_voucher_number: bool) -> Dict[Any, str]:
+    """
+    Same checks as _validate_voucher_essentials (and _validate_voucher_for_posting when
+    `require_voucher_number`), with one period calendar and one lines query for the whole batch.
+    """
+    calendar = get_period_calendar(company.pk)
+    errors: Dict[Any, str] = {}
+    for voucher in vouchers:
+        problems = []
+        period = calendar.period_for(voucher.date)
+        if period is None:
+            problems.append(_("No open accounting period found for date %(date)s.") % {'date': voucher.date})
+        elif period.locked:
+            problems.append(_("Accounting period '%(period)s' is locked.") % {'period': period.name})
+        lines = lines_by_voucher.get(voucher.pk, [])
+        if not lines:
+            problems.append(_("A non-Draft voucher must have at least one line item."))
+        for line in lines:
+            problems.extend(account_posting_problems(company.pk, line.account))
+        total_debit = sum((line.amount for line in lines if line.dr_cr == DrCrType.DEBIT.value), Decimal('0.00'))
+        total_credit = sum((line.amount for line in lines if line.dr_cr == DrCrType.CREDIT.value), Decimal('0.00'))
+        if abs(total_debit - total_credit) >= Decimal('0.01'):
+            problems.append(_("Voucher is imbalanced. Debits: %(dr)s, Credits: %(cr)s.") % {
+                'dr': total_debit, 'cr': total_credit})
+        if require_voucher_number and not voucher.voucher_number:
+            problems.append(_("Voucher number is missing. Please submit the voucher first to assign a number."))
+        if problems:
+            errors[voucher.pk] = _("Vch %(n)s: %(problems)s") % {
+                'n': voucher.voucher_number or voucher.pk, 'problems': " ".join(str(p) for p in problems)}
+    return errors
+
+
+def _reserve_numbers_for_vouchers(company: Company, vouchers: List[Voucher]) -> None:
+    """Numbers the unnumbered vouchers with one reserved block per (voucher type, period)."""
+    unnumbered: Dict[Tuple[str, Any], List[Voucher]] = defaultdict(list)
+    for voucher in vouchers:
+        if not voucher.voucher_number:
+            unnumbered[(voucher.voucher_type, voucher.accounting_period_id)].append(voucher)
+    for (voucher_type_value, period_id), group in unnumbered.items():
+        numbers = sequence_service.reserve_voucher_numbers(
+            company_id=company.pk, voucher_type_value=voucher_type_value, period_id=period_id, count=len(group))
+        for voucher, number in zip(group, numbers):
+            voucher.voucher_number = number
+
+
+@transaction.atomic
+def bulk_submit_vouchers(
+        company_id: int, voucher_ids: List[Any], submitted_by_user: settings.AUTH_USER_MODEL
+) -> Tuple[int, int, List[str]]:
+    company_instance = get_object_or_404(Company, pk=company_id)
+    _check_role_permission(submitted_by_user, company_instance, 'submit_voucher')
+    log_prefix = f"[VchBulkSubmit][Co:{company_instance.name}][User:{submitted_by_user.get_username()}]"
+    logger.info(f"{log_prefix} Submitting {len(voucher_ids)} vouchers.")
+
+    errors_detail: List[str] = []
+    vouchers = _lock_vouchers_for_batch(company_instance, voucher_ids, [TransactionStatus.DRAFT.value], errors_detail)
+    invalid = _batch_validation_errors(company_instance, vouchers, _lines_by_voucher(vouchers),
+                                       require_voucher_number=False)
+    errors_detail.extend(invalid.values())
+    to_submit = [voucher for voucher in vouchers if voucher.pk not in invalid]
+
+    if to_submit:
+        _reserve_numbers_for_vouchers(company_instance, to_submit)
+        current_time = timezone.now()
+        for voucher in to_submit:
+            voucher.status = TransactionStatus.PENDING_APPROVAL.value
+            voucher.updated_by = submitted_by_user
+            voucher.updated_at = current_time
+        bulk_update_with_history(to_submit, Voucher, ['status', 'voucher_number', 'updated_by', 'updated_at'],
+                                 default_user=submitted_by_user)
+        _bulk_log_approval_actions([(voucher, TransactionStatus.DRAFT.value) for voucher in to_submit],
+                                   submitted_by_user, ApprovalActionType.SUBMITTED.value,
+                                   TransactionStatus.PENDING_APPROVAL.value, _("Submitted for approval."))
+
+    logger.info(f"{log_prefix} Result: Success={len(to_submit)}, Errors/Skipped={len(errors_detail)}.")
+    return len(to_submit), len(errors_detail), errors_detail
+
+
+@transaction.atomic
+def bulk_approve_and_post_vouchers(
+        company_id: int, voucher_ids: List[Any], approver_user: settings.AUTH_USER_MODEL, comments: str = ""
+) -> Tuple[int, int, List[str]]:
+    company_instance = get_object_or_404(Company, pk=company_id)
+    _check_role_permission(approver_user, company_instance, 'approve_voucher')
+    _check_role_permission(approver_user, company_instance, 'post_voucher')
+    log_prefix = f"[VchBulkApprovePost][Co:{company_instance.name}][User:{approver_user.get_username()}]"
+    logger.info(f"{log_prefix} Approving & posting {len(voucher_ids)} vouchers.")
+
+    errors_detail: List[str] = []
+    vouchers = _lock_vouchers_for_batch(
+        company_instance, voucher_ids,
+        [TransactionStatus.PENDING_APPROVAL.value, TransactionStatus.REJECTED.value], errors_detail)
+    lines_by_voucher = _lines_by_voucher(vouchers)
+    invalid = _batch_validation_errors(company_instance, vouchers, lines_by_voucher, require_voucher_number=True)
+    errors_detail.extend(invalid.values())
+    to_post = [voucher for voucher in vouchers if voucher.pk not in invalid]
+
+    if to_post:
+        current_time = timezone.now()
+        from_statuses = [(voucher, voucher.status) for voucher in to_post]
+        for voucher in to_post:
+            voucher.status = TransactionStatus.POSTED.value
+            voucher.posted_by = voucher.approved_by = voucher.updated_by = approver_user
+            voucher.posted_at = voucher.approved_at = voucher.updated_at = current_time
+            voucher.balances_updated = True  # bulk_update bypasses the post_save balance signal
+        bulk_update_with_history(to_post, Voucher, ['status', 'posted_by', 'posted_at', 'approved_by', 'approved_at',
+                                                    'updated_by', 'updated_at', 'balances_updated'],
+                                 default_user=approver_user)
+        _bulk_log_approval_actions(from_statuses, approver_user, ApprovalActionType.APPROVED.value,
+                                   TransactionStatus.POSTED.value, comments or _("Approved and Posted."))
+        _apply_posted_voucher_effects(
+            to_post, [line for voucher in to_post for line in lines_by_voucher[voucher.pk]], current_time)
+
+    logger.info(f"{log_prefix} Result: Success={len(to_post)}, Errors/Skipped={len(errors_detail)}.")
+    return len(to_post), len(errors_detail), errors_detail
+
+
+@transaction.atomic
+def bulk_reject_vouchers(
+        company_id: int, voucher_ids: List[Any], rejecting_user: settings.AUTH_USER_MODEL, comments: str
+) -> Tuple[int, int, List[str]]:
+    company_instance = get_object_or_404(Company, pk=company_id)
+    _check_role_permission(rejecting_user, company_instance, 'reject_voucher')
+    if not comments or not comments.strip():
+        raise DjangoValidationError({'comments': _("Rejection comments are mandatory for audit trail and clarity.")})
+    log_prefix = f"[VchBulkReject][Co:{company_instance.name}][User:{rejecting_user.get_username()}]"
+
+    errors_detail: List[str] = []
+    to_reject = _lock_vouchers_for_batch(company_instance, voucher_ids, [TransactionStatus.PENDING_APPROVAL.value],
+                                         errors_detail)
+    if to_reject:
+        current_time = timezone.now()
+        for voucher in to_reject:
+            voucher.status = TransactionStatus.REJECTED.value
+            voucher.updated_by = rejecting_user
+            voucher.updated_at = current_time
+        bulk_update_with_history(to_reject, Voucher, ['status', 'updated_by', 'updated_at'],
+                                 default_user=rejecting_user)
+        _bulk_log_approval_actions([(voucher, TransactionStatus.PENDING_APPROVAL.value) for voucher in to_reject],
+                                   rejecting_user, ApprovalActionType.REJECTED.value,
+                                   TransactionStatus.REJECTED.value, comments)
+
+    logger.warning(f"{log_prefix} {len(to_reject)} vouchers REJECTED ({len(errors_detail)} skipped). "
+                   f"Reason: {comments}")
+    return len(to_reject), len(errors_detail), errors_detail
+
+
+@transaction.atomic
+def bulk_reverse_vouchers(
+        company_id: int, voucher_ids: List[Any], user: settings.AUTH_USER_MODEL,
+        reversal_date: Optional[date] = None,
+        reversal_voucher_type_value: str = VoucherType.GENERAL.value,
+        post_immediately: bool = False
+) -> Tuple[int, int, List[str]]:
+    company_instance = get_object_or_404(Company, pk=company_id)
+    _check_role_permission(user, company_instance, 'create_reversal_voucher')
+    if post_immediately:
+        _check_role_permission(user, company_instance, 'approve_voucher')
+        _check_role_permission(user, company_instance, 'post_voucher')
+    log_prefix = f"[VchBulkReversal][Co:{company_instance.name}][User:{user.get_username()}]"
+    logger.info(f"{log_prefix} Reversing {len(voucher_ids)} vouchers. Post immediately: {post_immediately}")
+
+    effective_reversal_date = reversal_date or timezone.now().date()
+    reversal_period = _get_valid_accounting_period(company_instance, effective_reversal_date)
+
+    errors_detail: List[str] = []
+    originals = _lock_vouchers_for_batch(company_instance, voucher_ids, [TransactionStatus.POSTED.value],
+                                         errors_detail)
+    lines_by_voucher = _lines_by_voucher(originals)
+    current_time = timezone.now()
+    reversed_originals, reversals, reversal_lines = [], [], []
+    for original in originals:
+        original_num = original.voucher_number or original.pk
+        if original.is_reversed:
+            errors_detail.append(_("Vch %(n)s: Already reversed. Skipped.") % {'n': original_num})
+            continue
+        original_lines = lines_by_voucher.get(original.pk, [])
+        unusable = [line.account.account_name for line in original_lines
+                    if not line.account.is_active or not line.account.allow_direct_posting]
+        if not original_lines or unusable:
+            errors_detail.append(_("Vch %(n)s: Cannot reverse, no lines or accounts inactive/disallowing posting "
+                                   "(%(accs)s).") % {'n': original_num, 'accs': ", ".join(unusable)})
+            continue
+
+        reversal = Voucher(
+            company=company_instance, date=effective_reversal_date, effective_date=effective_reversal_date,
+            narration=f"Reversal of: {original_num}. Orig.Narr: {original.narration or ''}",
+            voucher_type=reversal_voucher_type_value, status=TransactionStatus.DRAFT.value,
+            party_id=original.party_id, accounting_period=reversal_period,
+            reference=f"REV-{original_num}"[:Voucher._meta.get_field('reference').max_length],
+            created_by=user, updated_by=user, is_reversal_for=original,
+        )
+        reversals.append(reversal)
+        reversal_lines.extend(
+            VoucherLine(voucher=reversal, account_id=line.account_id,
+                        dr_cr=DrCrType.CREDIT.value if line.dr_cr == DrCrType.DEBIT.value else DrCrType.DEBIT.value,
+                        amount=line.amount, narration=f"Reversal - {line.narration or ''}")
+            for line in original_lines)
+        original.is_reversed = True
+        original.updated_by = user
+        original.updated_at = current_time
+        reversed_originals.append(original)
+
+    if reversals:
+        if post_immediately:
+            _reserve_numbers_for_vouchers(company_instance, reversals)
+            for reversal in reversals:
+                reversal.status = TransactionStatus.POSTED.value
+                reversal.posted_by = reversal.approved_by = user
+                reversal.posted_at = reversal.approved_at = current_time
+                reversal.balances_updated = True  # Applied by the batched posting path
+            bulk_insert_posted_vouchers(reversals, reversal_lines, user,
+                                        comments=_("Reversing voucher auto-approved and posted."))
+        else:
+            bulk_create_with_history(reversals, Voucher, default_user=user)
+            VoucherLine.objects.bulk_create(reversal_lines)
+            _bulk_log_approval_actions([(reversal, TransactionStatus.DRAFT.value) for reversal in reversals], user,
+                                       ApprovalActionType.COMMENTED.value, TransactionStatus.DRAFT.value,
+                                       _("Reversing voucher (Draft) created."))
+        bulk_update_with_history(reversed_originals, Voucher, ['is_reversed', 'updated_by', 'updated_at'],
+                                 default_user=user)
+
+    logger.info(f"{log_prefix} Result: Success={len(reversals)}, Errors/Skipped={len(errors_detail)}.")
+    return len(reversals), len(errors_detail), errors_detail
@@ -0,0 +1,242 @@
+# crp_accounting/services/year_end_service.py
+
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Tuple, Any
+
+from django.conf import settings
+from django.db import transaction, models
+from django.db.models import Sum, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.core.exceptions import ValidationError as DjangoValidationError
+
+logger = logging.getLogger("crp_accounting.services.year_end")
+
+# --- Model Imports ---
+from ..models.period import FiscalYear, AccountingPeriod, AccountOpeningBalance
+from ..models.journal import Voucher, VoucherLine, VoucherType, TransactionStatus, DrCrType, ApprovalActionType
+from ..models.coa import Account
+from crp_core.enums import AccountType
+
+# --- Service Imports ---
+from . import voucher_service
+
+ZERO_DECIMAL = Decimal('0.00')
+PL_ACCOUNT_TYPES = [AccountType.INCOME.value, AccountType.EXPENSE.value, AccountType.COST_OF_GOODS_SOLD.value]
+BALANCE_SHEET_ACCOUNT_TYPES = [AccountType.ASSET.value, AccountType.LIABILITY.value, AccountType.EQUITY.value]
+
+AccountTotals = Dict[Any, Tuple[Decimal, Decimal]]  # account_pk -> (total_debit, total_credit)
+
+
+# =============================================================================
+# Opening Balance Helpers (used by reports)
+# =============================================================================
+def get_opening_fiscal_year(company_id: Any, as_of_date: date) -> Optional[FiscalYear]:
+    """
+    Returns the latest fiscal year starting on/before `as_of_date` whose opening
+    balances have been carried forward, or None if no year-end close applies.
+    """
+    return FiscalYear.objects.filter(
+        company_id=company_id, start_date__lte=as_of_date, opening_balances_posted=True
+    ).order_by('-start_date').first()
+
+
+def get_opening_totals(fiscal_year: Optional[FiscalYear]) -> AccountTotals:
+    """Opening (debit, credit) per account for a fiscal year; empty if none were posted."""
+    if not fiscal_year:
+        return {}
+    return {
+        row['account_id']: (row['debit_amount'], row['credit_amount'])
+        for row in AccountOpeningBalance.objects.filter(
+            company_id=fiscal_year.company_id, fiscal_year=fiscal_year
+        ).values('account_id', 'debit_amount', 'credit_amount')
+    }
+
+
+def _aggregate_account_totals(company_id: Any, as_of_date: date,
+                              account_types: Optional[list] = None) -> AccountTotals:
+    """
+    (debit, credit) per account as of a date: opening rows of the latest rolled-forward
+    year plus posted voucher lines dated inside that year, or all posted lines if no
+    year has been closed yet.
+    """
+    opening_year = get_opening_fiscal_year(company_id, as_of_date)
+    totals: AccountTotals = dict(get_opening_totals(opening_year))
+
+    lines_qs = VoucherLine.objects.filter(
+        voucher__company_id=company_id,
+        voucher__status=TransactionStatus.POSTED.value,
+        voucher__date__lte=as_of_date,
+        account__company_id=company_id,
+    )
+    if opening_year:
+        lines_qs = lines_qs.filter(voucher__date__gte=opening_year.start_date)
+    if account_types:
+        lines_qs = lines_qs.filter(account__account_type__in=account_types)
+
+    aggregation = lines_qs.values('account_id').annotate(
+        total_debit=Coalesce(Sum('amount', filter=Q(dr_cr=DrCrType.DEBIT.value)), ZERO_DECIMAL,
+                             output_field=models.DecimalField()),
+        total_credit=Coalesce(Sum('amount', filter=Q(dr_cr=DrCrType.CREDIT.value)), ZERO_DECIMAL,
+                              output_field=models.DecimalField())
+    )
+    for item in aggregation:
+        opening_dr, opening_cr = totals.get(item['account_id'], (ZERO_DECIMAL, ZERO_DECIMAL))
+        totals[item['account_id']] = (opening_dr + item['total_debit'], opening_cr + item['total_credit'])
+    return totals
+
+
+# =============================================================================
+# Year-End Close
+# =============================================================================
+def _get_retained_earnings_account(fiscal_year: FiscalYear) -> Account:
+    company = fiscal_year.company
+    try:
+        re_account = company.accounting_settings.default_retained_earnings_account
+    except company.__class__.accounting_settings.RelatedObjectDoesNotExist:
+        re_account = None
+    if not re_account:
+        raise DjangoValidationError(
+            _("Cannot close fiscal year. Set a Default Retained Earnings Account in the Company Accounting Settings for '%(co)s'.")
+            % {'co': company.name})
+    if re_account.company_id != company.pk or re_account.account_type != AccountType.EQUITY.value:
+        raise DjangoValidationError(
+            _("Configured Retained Earnings Account '%(acc)s' must be an Equity account of '%(co)s'.")
+            % {'acc': re_account.account_number, 'co': company.name})
+    return re_account
+
+
+def _post_closing_voucher(fiscal_year: FiscalYear, closing_period: AccountingPeriod, re_account: Account,
+                          user: Optional[settings.AUTH_USER_MODEL], log_prefix: str) -> Optional[Voucher]:
+    """Posts one voucher zeroing every P&L account into the retained earnings account."""
+    pl_totals = _aggregate_account_totals(fiscal_year.company_id, fiscal_year.end_date, PL_ACCOUNT_TYPES)
+
+    closing_lines = []
+    net_to_retained_earnings = ZERO_DECIMAL  # Positive = credit (profit), negative = debit (loss)
+    for account_pk, (total_dr, total_cr) in pl_totals.items():
+        net_balance = total_dr - total_cr
+        if net_balance == ZERO_DECIMAL:
+            continue
+        # Reverse the account's net balance so it ends the year at zero
+        closing_lines.append(VoucherLine(
+            account_id=account_pk,
+            dr_cr=DrCrType.CREDIT.value if net_balance > ZERO_DECIMAL else DrCrType.DEBIT.value,
+            amount=abs(net_balance),
+            narration=str(_("Year-end close %(fy)s") % {'fy': fiscal_year.name}),
+        ))
+        net_to_retained_earnings -= net_balance
+
+    if not closing_lines:
+        logger.info(f"{log_prefix} No P&L balances to close. Skipping closing voucher.")
+        return None
+
+    if net_to_retained_earnings != ZERO_DECIMAL:
+        closing_lines.append(VoucherLine(
+            account_id=re_account.pk,
+            dr_cr=DrCrType.CREDIT.value if net_to_retained_earnings > ZERO_DECIMAL else DrCrType.DEBIT.value,
+            amount=abs(net_to_retained_earnings),
+            narration=str(_("Net result for %(fy)s") % {'fy': fiscal_year.name}),
+        ))
+
+    now = timezone.now()
+    voucher = Voucher(
+        company=fiscal_year.company, date=fiscal_year.end_date, effective_date=fiscal_year.end_date,
+        narration=_("Year-end closing entry for fiscal year %(fy)s") % {'fy': fiscal_year.name},
+        voucher_type=VoucherType.GENERAL.value, status=TransactionStatus.DRAFT.value,
+        accounting_period=closing_period, is_year_end_closing=True,
+        created_by=user, updated_by=user,
+    )
+    voucher_service.assign_voucher_number(voucher, fiscal_year.company)
+    voucher.save()
+    for line in closing_lines:
+        line.voucher = voucher
+    VoucherLine.objects.bulk_create(closing_lines)
+
+    # Posting via status change lets the post_save signal update account balances on commit
+    voucher.status = TransactionStatus.POSTED.value
+    voucher.approved_by = voucher.posted_by = user
+    voucher.approved_at = voucher.posted_at = now
+    voucher.save(update_fields=['status', 'approved_by', 'approved_at', 'posted_by', 'posted_at', 'updated_at'])
+    if user:
+        voucher_service._log_approval_action(voucher, user, ApprovalActionType.APPROVED.value,
+                                             TransactionStatus.DRAFT.value, voucher.status,
+                                             _("System: year-end closing entry."))
+    logger.info(f"{log_prefix} Posted closing voucher {voucher.voucher_number} with {len(closing_lines)} lines. "
+                f"Net to retained earnings: {net_to_retained_earnings}.")
+    return voucher
+
+
+def _carry_forward_opening_balances(fiscal_year: FiscalYear, next_year: FiscalYear, log_prefix: str) -> int:
+    """Writes one opening row per balance sheet account into `next_year`."""
+    bs_totals = _aggregate_account_totals(fiscal_year.company_id, fiscal_year.end_date, BALANCE_SHEET_ACCOUNT_TYPES)
+
+    AccountOpeningBalance.objects.filter(company_id=fiscal_year.company_id, fiscal_year=next_year).delete()
+    opening_rows = []
+    for account_pk, (total_dr, total_cr) in bs_totals.items():
+        net_balance = total_dr - total_cr
+        if net_balance == ZERO_DECIMAL:
+            continue
+        opening_rows.append(AccountOpeningBalance(
+            company_id=fiscal_year.company_id, fiscal_year=next_year, account_id=account_pk,
+            debit_amount=net_balance if net_balance > ZERO_DECIMAL else ZERO_DECIMAL,
+            credit_amount=-net_balance if net_balance < ZERO_DECIMAL else ZERO_DECIMAL,
+        ))
+    AccountOpeningBalance.objects.bulk_create(opening_rows)
+
+    next_year.opening_balances_posted = True
+    next_year.save(update_fields=['opening_balances_posted', 'updated_at'])
+    logger.info(f"{log_prefix} Carried {len(opening_rows)} opening balances into FY '{next_year.name}'.")
+    return len(opening_rows)
+
+
+@transaction.atomic
+def close_fiscal_year(fiscal_year: FiscalYear, user: Optional[settings.AUTH_USER_MODEL] = None) -> FiscalYear:
+    """
+    Performs the year-end close for a fiscal year:
+      1. Posts a closing voucher moving all P&L balances into the retained earnings account.
+      2. Writes opening balances for every balance sheet account into the following fiscal year.
+      3. Marks the year Closed.
+    The following fiscal year must already exist.
+    """
+    fiscal_year = FiscalYear.objects.select_for_update().select_related('company').get(
+        pk=fiscal_year.pk, company_id=fiscal_year.company_id)
+    log_prefix = f"[YearEndClose][Co:{fiscal_year.company.name}][FY:{fiscal_year.name}]"
+
+    if fiscal_year.status == "Closed":
+        logger.info(f"{log_prefix} Already closed.")
+        return fiscal_year
+    if fiscal_year.periods.filter(locked=False).exists():
+        raise DjangoValidationError(
+            _("Cannot close fiscal year. All accounting periods within it must be locked first."))
+
+    closing_period = fiscal_year.periods.filter(
+        start_date__lte=fiscal_year.end_date, end_date__gte=fiscal_year.end_date).first()
+    if not closing_period:
+        raise DjangoValidationError(
+            _("Cannot close fiscal year. No accounting period covers the year-end date %(d)s.")
+            % {'d': fiscal_year.end_date})
+
+    next_year = FiscalYear.objects.filter(
+        company_id=fiscal_year.company_id, start_date__gt=fiscal_year.end_date
+    ).order_by('start_date').first()
+    if not next_year:
+        raise DjangoValidationError(
+            _("Cannot close fiscal year. Create the following fiscal year first so opening balances can be carried forward."))
+
+    re_account = _get_retained_earnings_account(fiscal_year)
+    logger.info(f"{log_prefix} Closing into '{re_account.account_number}', opening balances -> FY '{next_year.name}'.")
+
+    closing_voucher = _post_closing_voucher(fiscal_year, closing_period, re_account, user, log_prefix)
+    _carry_forward_opening_balances(fiscal_year, next_year, log_prefix)
+
+    fiscal_year.status = "Closed"
+    fiscal_year.is_active = False  # A closed year cannot be the active year
+    fiscal_year.closed_by = user
+    fiscal_year.closed_at = timezone.now()
+    fiscal_year.closing_voucher = closing_voucher
+    fiscal_year.save(update_fields=['status', 'is_active', 'closed_by', 'closed_at', 'closing_voucher', 'updated_at'])
+    logger.info(f"{log_prefix} Closed by user {user.pk if user else 'System'}.")
+    return fiscal_year
@@ -5,7 +5,7 @@ from decimal import Decimal
 from typing import Any, Optional, Dict, Set
 
 from django.db import transaction, OperationalError
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_save, pre_delete, post_delete
 from django.dispatch import receiver
 # from django.conf import settings # Not used directly in this snippet
 from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
@@ -16,13 +16,18 @@ from django.utils.translation import gettext_lazy as _
 try:
     from .models.journal import Voucher, VoucherLine, TransactionStatus, DrCrType
     from .models.coa import Account, AccountType, AccountNature
-    # from .models.period import AccountingPeriod # Not used directly in this signals file
+    from .models.period import AccountingPeriod
     # from company.models import Company # Not used directly in this signals file
 except ImportError as e:
     logging.critical(f"CRP Signals: CRITICAL - Failed to import models: {e}", exc_info=True)
     raise
 
-logger = logging.getLogger("crp_accounting.signals_DEBUG")  # Your chosen logger name
+from .services.party_exposure_service import apply_posted_voucher_to_party_exposure
+from .services.period_calendar_service import invalidate_period_calendar
+from crp_core.logging_utils import get_hot_path_logger, HOT_PATH_MAX_DETAIL_RECORDS
+
+# One summary record per voucher; per-line detail is sampled DEBUG, capped per voucher
+logger = get_hot_path_logger("crp_accounting.signals_DEBUG")  # Your chosen logger name
 
 ZERO_DECIMAL = Decimal('0.00')
 
@@ -38,18 +43,18 @@ def _get_account_for_update_with_lock(account_pk: Any, company_pk: Any, log_pref
     try:
         # Lock the account row to prevent race conditions during balance updates.
         account = Account.objects.select_for_update().get(pk=account_pk, company_id=company_pk)
-        logger.debug(f"{log_prefix} Fetched & LOCKED Account {account.account_number} (PK: {account_pk}) for update.")
         return account
     except Account.DoesNotExist:
-        logger.error(
-            f"{log_prefix} Account PK {account_pk} NOT FOUND in Company PK {company_pk} while attempting to lock.")
+        logger.error("%s Account PK %s NOT FOUND in Company PK %s while attempting to lock.",
+                     log_prefix, account_pk, company_pk)
         return None
     except OperationalError as oe:  # Could be due to lock contention or DB issues
-        logger.error(f"{log_prefix} OperationalError fetching/locking Account PK {account_pk}: {oe}", exc_info=True)
+        logger.error("%s OperationalError fetching/locking Account PK %s: %s", log_prefix, account_pk, oe,
+                     exc_info=True)
         raise  # Re-raise to ensure transaction rollback
     except Exception as e:
-        logger.exception(
-            f"{log_prefix} Unexpected error fetching/locking Account PK {account_pk} for Company PK {company_pk}: {e}")
+        logger.exception("%s Unexpected error fetching/locking Account PK %s for Company PK %s: %s",
+                         log_prefix, account_pk, company_pk, e)
         raise  # Re-raise to ensure transaction rollback
 
 
@@ -58,16 +63,18 @@ def _apply_balance_adjustment_to_account(
         line_amount: Decimal,
         line_was_debit_entry: bool,
         is_reversal_of_original_entry: bool,  # Renamed for clarity
-        log_prefix: str
+        log_prefix: str,
+        log_detail: bool = True
 ):
     """
     Applies an adjustment to the account's current_balance synchronously.
     Handles account nature and reversal logic.
     Assumes 'account' was fetched with select_for_update() if called within a transaction.
+    `log_detail` allows a (sampled) DEBUG record of the change; callers turn it off past the per-voucher cap.
     """
     if account.current_balance is None:
-        logger.warning(
-            f"{log_prefix} Account {account.pk} ('{account.account_name}') had NULL balance. Initializing to 0 before adjustment.")
+        logger.warning("%s Account %s ('%s') had NULL balance. Initializing to 0 before adjustment.",
+                       log_prefix, account.pk, account.account_name)
         account.current_balance = ZERO_DECIMAL
 
     original_balance = account.current_balance
@@ -80,7 +87,6 @@ def _apply_balance_adjustment_to_account(
     # If the operation is a reversal of the original line entry, flip the sign of the change.
     if is_reversal_of_original_entry:
         change_amount = -change_amount
-        logger.debug(f"{log_prefix} Reversal operation: Effective change amount for line is {change_amount}.")
 
     # Apply the change based on the account's nature.
     if account.account_nature == AccountNature.DEBIT.value:  # Asset, Expense, COGS
@@ -88,8 +94,8 @@ def _apply_balance_adjustment_to_account(
     elif account.account_nature == AccountNature.CREDIT.value:  # Liability, Equity, Income
         account.current_balance += change_amount if not line_was_debit_entry else -change_amount
     else:
-        logger.error(
-            f"{log_prefix} Account {account.pk} ('{account.account_name}') has UNKNOWN nature '{account.account_nature}'. Cannot adjust balance.")
+        logger.error("%s Account %s ('%s') has UNKNOWN nature '%s'. Cannot adjust balance.",
+                     log_prefix, account.pk, account.account_name, account.account_nature)
         return  # Do not modify if nature is unknown
 
     account.balance_last_updated = timezone.now()
@@ -98,14 +104,15 @@ def _apply_balance_adjustment_to_account(
         # We only update these two fields. The Account instance might have other changes
         # from elsewhere if not careful, but select_for_update helps.
         account.save(update_fields=['current_balance', 'balance_last_updated'])
-        logger.info(
-            f"{log_prefix} Synced balance Account {account.account_number} (PK: {account.pk}, Nature: {account.account_nature}): "
-            f"OriginalBal: {original_balance}, LineAmt: {line_amount}, LineWasDr: {line_was_debit_entry}, "
-            f"IsReversal: {is_reversal_of_original_entry}, EffectiveChange: {change_amount}, NewBal: {account.current_balance}"
-        )
+        if log_detail:
+            logger.sampled(
+                "%s Synced balance Account %s (PK: %s, Nature: %s): OriginalBal: %s, LineAmt: %s, LineWasDr: %s, "
+                "IsReversal: %s, EffectiveChange: %s, NewBal: %s",
+                log_prefix, account.account_number, account.pk, account.account_nature, original_balance, line_amount,
+                line_was_debit_entry, is_reversal_of_original_entry, change_amount, account.current_balance)
     except Exception as e:
-        logger.exception(
-            f"{log_prefix} FAILED to save synced balance for Account {account.pk} ('{account.account_name}'). OriginalBal: {original_balance}. Error: {e}")
+        logger.exception("%s FAILED to save synced balance for Account %s ('%s'). OriginalBal: %s. Error: %s",
+                         log_prefix, account.pk, account.account_name, original_balance, e)
         # Important: If save fails, the in-memory 'account.current_balance' is changed,
         # but DB is not. The transaction should roll back.
         raise  # Re-raise to ensure the calling transaction rolls back.
@@ -117,54 +124,52 @@ def _synchronously_update_balances_for_voucher_transaction(voucher_pk: Any, comp
     This function is wrapped by `_handle_voucher_balance_update_on_commit` which runs it in `on_commit`.
     It itself runs within its own atomic block to ensure all account updates for the voucher are one unit.
     """
-    log_prefix = f"[SYNC_BAL_CORE][Co:{company_pk}][Vch:{voucher_pk}]"
-    logger.info(f"{log_prefix} --- CORE LOGIC START --- Reversal Mode: {is_reversal}")
+    log_prefix = "[SYNC_BAL_CORE][Co:%s][Vch:%s]" % (company_pk, voucher_pk)
 
     try:
         voucher = Voucher.objects.prefetch_related(
             'lines__account'  # Account object needed for its nature
         ).get(pk=voucher_pk, company_id=company_pk)
-        logger.debug(
-            f"{log_prefix} Fetched Voucher: '{voucher.voucher_number or voucher.pk}', Status: '{voucher.status}'")
 
         # This atomic block ensures all account updates for THIS voucher are a single unit.
         with transaction.atomic():
             lines_to_process = list(voucher.lines.all())
             if not lines_to_process:
-                logger.warning(f"{log_prefix} Voucher has no lines. No balance changes to apply.")
+                logger.warning("%s Voucher has no lines. No balance changes to apply.", log_prefix)
                 # If not a reversal and it's a POSTED voucher, still mark balances_updated
                 # This part is tricky if balances_updated is managed here vs. in the signal handler.
                 # Let's assume the flag update happens outside this core logic, closer to the signal.
                 return
 
-            logger.info(
-                f"{log_prefix} Processing {len(lines_to_process)} lines. Mode: {'Reversal' if is_reversal else 'Update'}.")
-
             # Keep track of accounts already fetched and locked in this operation to avoid re-locking
             locked_accounts_in_operation: Dict[Any, Account] = {}
+            skipped_lines = 0
+            detail_enabled = logger.isEnabledFor(logging.DEBUG)
 
             for line_idx, line in enumerate(lines_to_process):
-                line_log_prefix = f"{log_prefix}[LinePK:{line.pk},Idx:{line_idx + 1}]"
-                logger.debug(f"{line_log_prefix} AccID:{line.account_id}, Amt:{line.amount}, DrCr:{line.dr_cr}")
+                log_detail = detail_enabled and line_idx < HOT_PATH_MAX_DETAIL_RECORDS
+                line_log_prefix = "%s[LinePK:%s,Idx:%s]" % (log_prefix, line.pk, line_idx + 1) if log_detail \
+                    else log_prefix
 
                 if not line.account_id or line.amount is None or line.amount == ZERO_DECIMAL:
-                    logger.warning(f"{line_log_prefix} Skipping line (missing account_id or zero/null amount).")
+                    skipped_lines += 1
                     continue
 
                 account = locked_accounts_in_operation.get(line.account_id)
                 if not account:
                     account = _get_account_for_update_with_lock(line.account_id, company_pk, line_log_prefix)
                     if not account:
-                        logger.critical(
-                            f"{line_log_prefix} CRITICAL: Account ID {line.account_id} NOT FOUND in Co {company_pk}. Balance impact MISSED for this line!")
+                        logger.critical("%s CRITICAL: Account ID %s NOT FOUND in Co %s. Balance impact MISSED for this line!",
+                                        line_log_prefix, line.account_id, company_pk)
                         # FAIL LOUDLY: If an account for a line is missing, it's a severe data integrity issue.
                         raise ObjectDoesNotExist(
                             f"Account ID {line.account_id} referenced by VoucherLine PK {line.pk} not found in Company PK {company_pk}.")
                     locked_accounts_in_operation[line.account_id] = account
 
                 if account.account_nature not in [AccountNature.DEBIT.value, AccountNature.CREDIT.value]:
-                    logger.error(
-                        f"{line_log_prefix} Account {account.pk} ('{account.account_name}') has invalid nature '{account.account_nature}'. Skipping balance adjustment.")
+                    logger.error("%s Account %s ('%s') has invalid nature '%s'. Skipping balance adjustment.",
+                                 line_log_prefix, account.pk, account.account_name, account.account_nature)
+                    skipped_lines += 1
                     continue
 
                 _apply_balance_adjustment_to_account(
@@ -172,23 +177,29 @@ def _synchronously_update_balances_for_voucher_transaction(voucher_pk: Any, comp
                     line_amount=line.amount,
                     line_was_debit_entry=(line.dr_cr == DrCrType.DEBIT.value),
                     is_reversal_of_original_entry=is_reversal,
-                    log_prefix=line_log_prefix
+                    log_prefix=line_log_prefix,
+                    log_detail=log_detail
                 )
             # End of for loop (all lines processed for this voucher)
+
+            # Same unit of work: keep the party's maintained posted balance in step with the GL
+            apply_posted_voucher_to_party_exposure(voucher, lines_to_process, is_reversal=is_reversal)
         # End of with transaction.atomic() for this voucher's lines
-        logger.info(f"{log_prefix} --- CORE LOGIC FINISHED SUCCESSFULLY ---")
+        logger.info("%s %s balances: %d lines applied to %d accounts, %d skipped.",
+                    log_prefix, 'Reversed' if is_reversal else 'Synced', len(lines_to_process) - skipped_lines,
+                    len(locked_accounts_in_operation), skipped_lines)
 
     except Voucher.DoesNotExist:
-        logger.error(f"{log_prefix} Voucher PK {voucher_pk} not found for Co {company_pk}. Cannot update balances.")
+        logger.error("%s Voucher PK %s not found for Co %s. Cannot update balances.", log_prefix, voucher_pk, company_pk)
     except ObjectDoesNotExist as odne:  # Specifically from _get_account_for_update_with_lock or line check
-        logger.critical(f"{log_prefix} Data integrity error: {odne}", exc_info=True)
+        logger.critical("%s Data integrity error: %s", log_prefix, odne, exc_info=True)
         raise  # Re-raise to ensure outer transaction (if any) rolls back
     except OperationalError as oe:
-        logger.error(f"{log_prefix} OperationalError during balance update: {oe}. This often requires retry.",
+        logger.error("%s OperationalError during balance update: %s. This often requires retry.", log_prefix, oe,
                      exc_info=True)
         raise
     except Exception as e:
-        logger.exception(f"{log_prefix} Unexpected error during balance update for voucher: {e}")
+        logger.exception("%s Unexpected error during balance update for voucher: %s", log_prefix, e)
         raise
 
 
@@ -197,8 +208,7 @@ def _handle_voucher_balance_update_on_commit(voucher_pk: Any, company_pk: Any, i
     Wrapper to be called via transaction.on_commit.
     This ensures the main DB operation (voucher save/delete) is complete before trying to update balances.
     """
-    log_prefix = f"[ON_COMMIT_BAL_HANDLER][Co:{company_pk}][Vch:{voucher_pk}]"
-    logger.info(f"{log_prefix} Triggered. Reversal Mode: {is_reversal}")
+    log_prefix = "[ON_COMMIT_BAL_HANDLER][Co:%s][Vch:%s]" % (company_pk, voucher_pk)
     try:
         _synchronously_update_balances_for_voucher_transaction(voucher_pk, company_pk, is_reversal)
 
@@ -209,17 +219,15 @@ def _handle_voucher_balance_update_on_commit(voucher_pk: Any, company_pk: Any, i
                     balances_updated=True,
                     updated_at=timezone.now()
                 )
-                if rows > 0:
-                    logger.info(f"{log_prefix} Marked Voucher balances_updated=True.")
-                else:
-                    logger.warning(
-                        f"{log_prefix} Failed to mark Voucher balances_updated=True (voucher not found or already True).")
+                if rows == 0:
+                    logger.warning("%s Failed to mark Voucher balances_updated=True (voucher not found or already True).",
+                                   log_prefix)
     except Exception as e:
         # CRITICAL: Balance update failed AFTER parent transaction committed.
         # Data might be inconsistent. This requires manual intervention or a reconciliation process.
         logger.critical(
-            f"{log_prefix} --- CRITICAL FAILURE IN ON_COMMIT --- Balance update/reversal for Voucher PK {voucher_pk} FAILED. "
-            f"Main transaction was already committed. Error: {e}", exc_info=True
+            "%s --- CRITICAL FAILURE IN ON_COMMIT --- Balance update/reversal for Voucher PK %s FAILED. "
+            "Main transaction was already committed. Error: %s", log_prefix, voucher_pk, e, exc_info=True
         )
         # What to do here? Re-raising won't roll back the outer commit.
         # Options: Log to Sentry, send admin email, flag voucher for review.
@@ -228,22 +236,22 @@ def _handle_voucher_balance_update_on_commit(voucher_pk: Any, company_pk: Any, i
 def _reset_balances_updated_flag_on_commit_transaction(voucher_pk: Any, company_pk: Any):
     """Sets balances_updated=False. Called via on_commit."""
     if not voucher_pk or not company_pk:
-        logger.warning(f"[RESET_FLAG_ON_COMMIT] Missing voucher_pk ({voucher_pk}) or company_pk ({company_pk}).")
+        logger.warning("[RESET_FLAG_ON_COMMIT] Missing voucher_pk (%s) or company_pk (%s).", voucher_pk, company_pk)
         return
     log_prefix = f"[RESET_FLAG_ON_COMMIT][Co:{company_pk}][Vch:{voucher_pk}]"
     try:
         if not hasattr(Voucher, 'balances_updated'):
-            logger.error(f"{log_prefix} Voucher model missing 'balances_updated' field.")
+            logger.error("%s Voucher model missing 'balances_updated' field.", log_prefix)
             return
         rows = Voucher.objects.filter(pk=voucher_pk, company_id=company_pk).update(
             balances_updated=False, updated_at=timezone.now()
         )
         if rows > 0:
-            logger.info(f"{log_prefix} Balances_updated flag reset to False.")
+            logger.debug("%s Balances_updated flag reset to False.", log_prefix)
         else:
-            logger.warning(f"{log_prefix} Could not reset flag (voucher not found or flag already False).")
+            logger.warning("%s Could not reset flag (voucher not found or flag already False).", log_prefix)
     except Exception as e:
-        logger.error(f"{log_prefix} Error resetting balances_updated flag: {e}", exc_info=True)
+        logger.error("%s Error resetting balances_updated flag: %s", log_prefix, e, exc_info=True)
 
 
 # --- Signal Handlers ---
@@ -256,19 +264,16 @@ def handle_posted_voucher_deletion_sync_reversal(sender, instance: Voucher, **kw
     raises an unhandled exception, the entire transaction (including the delete) should roll back.
     """
     voucher_to_delete = instance
-    log_prefix = f"[PRE_DELETE_VCH_SIGNAL][Co:{voucher_to_delete.company_id}][Vch:{voucher_to_delete.pk}]"
-    logger.info(
-        f"{log_prefix} --- PRE_DELETE SIGNAL START --- Voucher: '{voucher_to_delete.voucher_number or voucher_to_delete.pk}'")
+    log_prefix = "[PRE_DELETE_VCH_SIGNAL][Co:%s][Vch:%s]" % (voucher_to_delete.company_id, voucher_to_delete.pk)
 
     if not voucher_to_delete.company_id:
-        logger.error(
-            f"{log_prefix} Voucher missing company_id! Balance reversal ABORTED. Deletion may proceed without balance adjustment if not halted.")
+        logger.error("%s Voucher missing company_id! Balance reversal ABORTED. Deletion may proceed without "
+                     "balance adjustment if not halted.", log_prefix)
         # Consider raising an error if company_id is critical for all operations
         # raise DjangoValidationError("Cannot process voucher deletion: Company ID is missing.")
         return
 
     if hasattr(voucher_to_delete, 'status') and voucher_to_delete.status == TransactionStatus.POSTED.value:
-        logger.info(f"{log_prefix} Voucher IS POSTED. Attempting synchronous balance reversal.")
         try:
             # This is called directly (not on_commit) because pre_delete runs before commit.
             # If this fails, the exception will propagate and should roll back the delete.
@@ -277,11 +282,10 @@ def handle_posted_voucher_deletion_sync_reversal(sender, instance: Voucher, **kw
                 company_pk=voucher_to_delete.company_id,
                 is_reversal=True  # CRITICAL: Reverse the impacts
             )
-            logger.info(f"{log_prefix} Synchronous balance reversal call completed successfully.")
         except Exception as e:
             logger.critical(
-                f"{log_prefix} --- CRITICAL FAILURE --- during synchronous balance reversal. "
-                f"Error: {e}. Deletion transaction SHOULD ROLL BACK.", exc_info=True
+                "%s --- CRITICAL FAILURE --- during synchronous balance reversal. "
+                "Error: %s. Deletion transaction SHOULD ROLL BACK.", log_prefix, e, exc_info=True
             )
             # Re-raise to ensure the delete transaction is rolled back.
             # DjangoValidationError might be caught by admin and displayed.
@@ -291,9 +295,8 @@ def handle_posted_voucher_deletion_sync_reversal(sender, instance: Voucher, **kw
                 {'voucher_pk': voucher_to_delete.pk, 'error_detail': str(e)}
             ) from e
     else:
-        status_val = getattr(voucher_to_delete, 'status', 'AttributeMissing')
-        logger.info(f"{log_prefix} Voucher status is '{status_val}' (not POSTED). No balance reversal needed.")
-    logger.info(f"{log_prefix} --- PRE_DELETE SIGNAL END ---")
+        logger.debug("%s Voucher status is '%s' (not POSTED). No balance reversal needed.",
+                     log_prefix, getattr(voucher_to_delete, 'status', 'AttributeMissing'))
 
 
 @receiver(post_save, sender=Voucher, dispatch_uid="crp_accounting_voucher_post_save_sync_update_v2")
@@ -304,15 +307,14 @@ def handle_voucher_post_save_sync_balances_update(sender, instance: Voucher, cre
     - If status becomes POSTED and balances_updated is False: schedule balance update on_commit.
     - If status changes FROM POSTED and balances_updated was True: schedule flag reset on_commit.
     """
-    log_prefix = f"[POST_SAVE_VCH_SIGNAL][Co:{instance.company_id}][Vch:{instance.pk}]"
-    logger.info(f"{log_prefix} --- POST_SAVE SIGNAL START --- Created: {created}, UpdateFields: {update_fields}")
+    log_prefix = "[POST_SAVE_VCH_SIGNAL][Co:%s][Vch:%s]" % (instance.company_id, instance.pk)
 
     if not instance.company_id:
-        logger.error(f"{log_prefix} Voucher saved without company_id! Cannot process balance updates.")
+        logger.error("%s Voucher saved without company_id! Cannot process balance updates.", log_prefix)
         return
     if not hasattr(instance, 'status') or not hasattr(Voucher, 'balances_updated'):  # Check model attribute presence
-        logger.error(
-            f"{log_prefix} Voucher instance/model missing 'status' or 'balances_updated' attributes. Signal aborted.")
+        logger.error("%s Voucher instance/model missing 'status' or 'balances_updated' attributes. Signal aborted.",
+                     log_prefix)
         return
 
     # Determine if the 'status' field was part of this save operation.
@@ -323,8 +325,8 @@ def handle_voucher_post_save_sync_balances_update(sender, instance: Voucher, cre
     if instance.status == TransactionStatus.POSTED.value:
         if not instance.balances_updated:  # Balances need update
             if status_was_potentially_changed:  # And status is newly POSTED or save implies it could be
-                logger.info(
-                    f"{log_prefix} Voucher '{instance.voucher_number or instance.pk}' is POSTED & balances_updated=False. Scheduling balance update on_commit.")
+                logger.debug("%s Voucher '%s' is POSTED & balances_updated=False. Scheduling balance update on_commit.",
+                             log_prefix, instance.voucher_number or instance.pk)
                 try:
                     transaction.on_commit(
                         lambda: _handle_voucher_balance_update_on_commit(
@@ -334,24 +336,25 @@ def handle_voucher_post_save_sync_balances_update(sender, instance: Voucher, cre
                         )
                     )
                 except Exception as e:
-                    logger.critical(f"{log_prefix} CRITICAL: Error scheduling on_commit balance update: {e}",
+                    logger.critical("%s CRITICAL: Error scheduling on_commit balance update: %s", log_prefix, e,
                                     exc_info=True)
             else:  # Status is POSTED, balances_updated=False, but 'status' field was not in update_fields.
                 # This case implies an update to other fields of an already POSTED (but not balance-updated) voucher.
                 # We might still want to trigger balance update if something critical changed.
                 # For now, assuming only explicit status changes to POSTED trigger the update.
-                logger.debug(
-                    f"{log_prefix} Voucher POSTED, balances_updated=False, but 'status' not in update_fields. No immediate update scheduled by this save.")
+                logger.sampled("%s Voucher POSTED, balances_updated=False, but 'status' not in update_fields. "
+                               "No immediate update scheduled by this save.", log_prefix)
         else:  # Voucher is POSTED and balances_updated is True.
-            logger.debug(f"{log_prefix} Voucher POSTED & balances_updated=True. Balances assumed current.")
+            logger.sampled("%s Voucher POSTED & balances_updated=True. Balances assumed current.", log_prefix)
 
     # Case: Status changed AWAY FROM POSTED or was never POSTED, but balances_updated is True.
     # This indicates balances might be stale or flag needs reset.
     elif instance.balances_updated:  # (implies instance.status != TransactionStatus.POSTED.value here)
         if status_was_potentially_changed:  # Only if status field was part of the save.
             logger.warning(
-                f"{log_prefix} Voucher status '{instance.get_status_display()}' (not POSTED) but balances_updated=True. "
-                f"Scheduling flag reset for '{instance.voucher_number or instance.pk}' on_commit."
+                "%s Voucher status '%s' (not POSTED) but balances_updated=True. "
+                "Scheduling flag reset for '%s' on_commit.",
+                log_prefix, instance.get_status_display(), instance.voucher_number or instance.pk
             )
             try:
                 transaction.on_commit(
@@ -361,11 +364,11 @@ def handle_voucher_post_save_sync_balances_update(sender, instance: Voucher, cre
                     )
                 )
             except Exception as e:
-                logger.critical(f"{log_prefix} CRITICAL: Error scheduling on_commit flag reset: {e}", exc_info=True)
+                logger.critical("%s CRITICAL: Error scheduling on_commit flag reset: %s", log_prefix, e,
+                                exc_info=True)
         else:
-            logger.debug(
-                f"{log_prefix} Voucher status not POSTED, balances_updated=True, but 'status' not in update_fields. No flag reset by this save.")
-    logger.info(f"{log_prefix} --- POST_SAVE SIGNAL END ---")
+            logger.sampled("%s Voucher status not POSTED, balances_updated=True, but 'status' not in update_fields. "
+                           "No flag reset by this save.", log_prefix)
 
 
 @receiver(post_save, sender=VoucherLine, dispatch_uid="crp_accounting_voucherline_post_save_invalidate_v2")
@@ -382,21 +385,19 @@ def handle_voucher_line_change_for_posted_voucher(sender, instance: VoucherLine,
         # However, here we are scheduling an on_commit task to modify it, so direct access is okay for reading.
         voucher = instance.voucher
         if not voucher or not voucher.pk:
-            logger.debug(f"[VCHLINE_CHANGE_SIGNAL][Line:{instance.pk}] Line has no valid parent voucher. Skipping.")
+            logger.sampled("[VCHLINE_CHANGE_SIGNAL][Line:%s] Line has no valid parent voucher. Skipping.", instance.pk)
             return
     except ObjectDoesNotExist:
-        logger.warning(f"[VCHLINE_CHANGE_SIGNAL][Line:{instance.pk}] Parent voucher for Line does not exist. Skipping.")
+        logger.warning("[VCHLINE_CHANGE_SIGNAL][Line:%s] Parent voucher for Line does not exist. Skipping.", instance.pk)
         return
 
-    log_prefix = f"[VCHLINE_CHANGE_SIGNAL][Co:{voucher.company_id}][Vch:{voucher.pk}][Line:{instance.pk}]"
-    logger.info(
-        f"{log_prefix} --- VOUCHER_LINE CHANGE SIGNAL START --- Action: {'pre_delete' if kwargs.get('signal') == pre_delete else 'post_save'}")
+    log_prefix = "[VCHLINE_CHANGE_SIGNAL][Co:%s][Vch:%s][Line:%s]" % (voucher.company_id, voucher.pk, instance.pk)
 
     if not voucher.company_id:
-        logger.error(f"{log_prefix} Parent voucher missing company_id. Cannot process.")
+        logger.error("%s Parent voucher missing company_id. Cannot process.", log_prefix)
         return
     if not hasattr(Voucher, 'balances_updated'):  # Check on the model class
-        logger.error(f"{log_prefix} Voucher model missing 'balances_updated' attribute. Signal aborted.")
+        logger.error("%s Voucher model missing 'balances_updated' attribute. Signal aborted.", log_prefix)
         return
 
     if hasattr(voucher, 'status') and voucher.status == TransactionStatus.POSTED.value:
@@ -407,8 +408,9 @@ def handle_voucher_line_change_for_posted_voucher(sender, instance: VoucherLine,
                                                                                company_id=voucher.company_id)
             if live_voucher_data['balances_updated']:  # Only reset if it was True
                 logger.info(
-                    f"{log_prefix} Line changed/deleted for POSTED voucher '{voucher.voucher_number or voucher.pk}' whose balances_updated=True. "
-                    f"Scheduling reset of parent voucher's balances_updated flag on_commit."
+                    "%s Line changed/deleted for POSTED voucher '%s' whose balances_updated=True. "
+                    "Scheduling reset of parent voucher's balances_updated flag on_commit.",
+                    log_prefix, voucher.voucher_number or voucher.pk
                 )
                 try:
                     transaction.on_commit(
@@ -419,20 +421,29 @@ def handle_voucher_line_change_for_posted_voucher(sender, instance: VoucherLine,
                     )
                 except Exception as e:
                     logger.critical(
-                        f"{log_prefix} CRITICAL: Error scheduling on_commit flag reset due to line change: {e}",
+                        "%s CRITICAL: Error scheduling on_commit flag reset due to line change: %s", log_prefix, e,
                         exc_info=True)
             else:
-                logger.debug(
-                    f"{log_prefix} Line changed for POSTED voucher, but its balances_updated was already False. No flag reset needed.")
+                logger.sampled("%s Line changed for POSTED voucher, but its balances_updated was already False. "
+                               "No flag reset needed.", log_prefix)
         except Voucher.DoesNotExist:
-            logger.error(f"{log_prefix} Parent voucher PK {voucher.pk} not found when re-checking for flag reset. Odd.")
+            logger.error("%s Parent voucher PK %s not found when re-checking for flag reset. Odd.", log_prefix, voucher.pk)
     else:
-        status_display = voucher.get_status_display() if hasattr(voucher, 'get_status_display') else getattr(voucher,
-                                                                                                             'status',
-                                                                                                             'Unknown')
-        logger.debug(
-            f"{log_prefix} Line changed, but parent voucher status is '{status_display}' (not POSTED). No action by this signal.")
-    logger.info(f"{log_prefix} --- VOUCHER_LINE CHANGE SIGNAL END ---")
+        logger.sampled("%s Line changed, but parent voucher status is '%s' (not POSTED). No action by this signal.",
+                       log_prefix, getattr(voucher, 'status', 'Unknown'))
+
+
+@receiver(post_save, sender=AccountingPeriod, dispatch_uid="crp_accounting_period_post_save_invalidate_calendar")
+@receiver(post_delete, sender=AccountingPeriod, dispatch_uid="crp_accounting_period_post_delete_invalidate_calendar")
+def handle_accounting_period_change_invalidate_calendar(sender, instance: AccountingPeriod, **kwargs):
+    """
+    Drops the company's cached period calendar when a period is created, edited, locked,
+    unlocked (lock_period()/unlock_period() save the period) or deleted.
+    """
+    if instance.company_id:
+        invalidate_period_calendar(instance.company_id)
+
+
 # # crp_accounting/signals.py
 #
 # import logging
@@ -1,5 +1,7 @@
 # crp_accounting/tasks.py
 import logging
+from dataclasses import asdict
+from datetime import date
 from decimal import Decimal
 from typing import Optional, Any  # For type hinting voucher_id and company_id
 
@@ -23,7 +25,13 @@ except ImportError as e:
     # However, fixing the import is the real solution.
     raise ImportError(f"Could not import necessary models for tasks.py. Check paths and dependencies: {e}")
 
-logger = logging.getLogger("crp_accounting.tasks")  # Specific logger for tasks
+from .services.party_exposure_service import apply_posted_voucher_to_party_exposure
+from .services.document_status_service import sweep_document_statuses
+from .services.coa_seeding_service import seed_coa_for_company
+from crp_core.logging_utils import get_hot_path_logger, HOT_PATH_MAX_DETAIL_RECORDS
+
+# One summary record per voucher; per-line detail is sampled DEBUG, capped per voucher
+logger = get_hot_path_logger("crp_accounting.tasks")  # Specific logger for tasks
 
 # --- Constants ---
 MAX_RETRIES_BAL_UPDATE = getattr(settings, 'CELERY_TASK_BALANCE_UPDATE_MAX_RETRIES', 3)
@@ -68,15 +76,13 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
     Handles retries for operational database errors.
     """
     task_id = self.request.id or "sync_run"
-    log_prefix = f"[Task:{task_id}][Co:{company_id}][Vch:{voucher_id}]"
+    log_prefix = "[Task:%s][Co:%s][Vch:%s]" % (task_id, company_id, voucher_id)
 
     if not company_id:
-        logger.error(f"{log_prefix} CRITICAL: Task called without company_id. Aborting.")
+        logger.error("%s CRITICAL: Task called without company_id. Aborting.", log_prefix)
         # This is a programming error, do not retry.
         return  # Or raise a non-retryable exception
 
-    logger.info(f"{log_prefix} Starting balance update check.")
-
     # --- Idempotency Check (Tenant-Aware) ---
     # CRITICAL: Assumes Voucher model has a BooleanField named `balances_updated`.
     if not hasattr(Voucher, 'balances_updated'):
@@ -86,7 +92,7 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
     try:
         # Check the flag within the specific company context
         if Voucher.objects.filter(pk=voucher_id, company_id=company_id, balances_updated=True).exists():
-            logger.info(f"{log_prefix} Skipping: Balances already marked as updated.")
+            logger.debug("%s Skipping: Balances already marked as updated.", log_prefix)
             return
     except OperationalError as oe_check:
         logger.warning(
@@ -111,15 +117,15 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
                                                                                     updated_at=timezone.now())
             return
 
-        logger.info(f"{log_prefix} Processing POSTED voucher '{voucher.voucher_number or voucher_id}'.")
         current_time = timezone.now()  # Use a consistent timestamp for all updates in this run
+        detail_enabled = logger.isEnabledFor(logging.DEBUG)
 
         with transaction.atomic():
             processed_accounts_pks = set()
-            for line in voucher.lines.all():  # lines are already related to this voucher
+            skipped_lines = 0
+            for line_idx, line in enumerate(voucher.lines.all()):  # lines are already related to this voucher
                 if not line.account_id or line.amount is None or line.amount == ZERO_DECIMAL:
-                    logger.warning(
-                        f"{log_prefix} Skipping invalid VoucherLine {line.pk} (Account: {line.account_id}, Amount: {line.amount})")
+                    skipped_lines += 1
                     continue
 
                 account_pk_to_update = line.account_id
@@ -129,8 +135,8 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
                                                                             company_id=company_id)
 
                     if acc_to_update.current_balance is None:
-                        logger.warning(
-                            f"{log_prefix} Account {account_pk_to_update} had NULL balance. Initializing to 0.")
+                        logger.warning("%s Account %s had NULL balance. Initializing to 0.",
+                                       log_prefix, account_pk_to_update)
                         acc_to_update.current_balance = ZERO_DECIMAL
 
                     original_balance = acc_to_update.current_balance
@@ -143,16 +149,18 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
                         acc_to_update.current_balance += adjustment if _account_affects_balance_positively_on_credit(
                             acc_to_update.account_type) else -adjustment
                     else:
-                        logger.error(
-                            f"{log_prefix} Invalid DrCrType '{line.dr_cr}' on VoucherLine {line.pk}. Skipping line.")
+                        logger.error("%s Invalid DrCrType '%s' on VoucherLine %s. Skipping line.",
+                                     log_prefix, line.dr_cr, line.pk)
+                        skipped_lines += 1
                         continue
 
                     acc_to_update.balance_last_updated = current_time
                     acc_to_update.save(update_fields=['current_balance', 'balance_last_updated'])
 
                     processed_accounts_pks.add(account_pk_to_update)
-                    logger.debug(
-                        f"{log_prefix} Updated balance Account {account_pk_to_update}: {original_balance} -> {acc_to_update.current_balance} (Line {line.pk})")
+                    if detail_enabled and line_idx < HOT_PATH_MAX_DETAIL_RECORDS:
+                        logger.sampled("%s Updated balance Account %s: %s -> %s (Line %s)", log_prefix,
+                                       account_pk_to_update, original_balance, acc_to_update.current_balance, line.pk)
 
                 except Account.DoesNotExist:
                     logger.error(
@@ -168,9 +176,9 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
                         f"{log_prefix} Unexpected error updating Account {account_pk_to_update} (Line {line.pk}): {e_acct}")
                     raise  # Reraise to roll back the atomic transaction and potentially retry task
 
-            # If all lines processed successfully within the atomic block:
-            logger.debug(
-                f"{log_prefix} Atomic balance update transaction committed for {len(processed_accounts_pks)} accounts.")
+            # Party exposure moves in the same transaction as the control account balance
+            apply_posted_voucher_to_party_exposure(voucher, voucher.lines.all(), current_time)
+
 
         # Mark Voucher as Updated (AFTER successful transaction commit for lines)
         # This is outside the atomic block for lines, as it's a separate concern.
@@ -179,9 +187,7 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
                 balances_updated=True,
                 updated_at=current_time  # Update voucher's own updated_at
             )
-            if rows_updated > 0:
-                logger.info(f"{log_prefix} Successfully marked Voucher balances as updated.")
-            else:
+            if rows_updated == 0:
                 # Could happen if voucher was deleted/changed concurrently after line processing.
                 logger.warning(
                     f"{log_prefix} Could not mark Voucher as updated (affected 0 rows). State might be inconsistent.")
@@ -194,8 +200,8 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
                 f"{log_prefix} ALERT: Balances updated, BUT MARKING VOUCHER FAILED: {e_mark}. Manual check needed for flag.",
                 exc_info=True)
 
-        logger.info(
-            f"{log_prefix} Finished balance update task successfully. Accounts processed: {len(processed_accounts_pks)}")
+        logger.info("%s Updated balances of %d accounts (%d lines skipped).",
+                    log_prefix, len(processed_accounts_pks), skipped_lines)
 
     except Voucher.DoesNotExist:
         logger.error(f"{log_prefix} Voucher not found. Cannot update balances.")
@@ -221,3 +227,74 @@ def update_account_balances_task(self, voucher_id: Any, company_id: Any):
             logger.error(f"{log_prefix} Error attempting to retry task: {retry_e}")
             # If retry itself fails, nothing more can be done automatically here.
 
+
+# --- Periodic Task (All Companies) ---
+
+@shared_task(
+    name="crp_accounting.tasks.sweep_document_statuses",
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=MAX_RETRIES_BAL_UPDATE,
+)
+def sweep_document_statuses_task(today: Optional[str] = None):
+    """
+    Nightly (see CELERY_BEAT_SCHEDULE): marks past-due invoices OVERDUE and syncs paid / partially
+    paid statuses of invoices and bills for all active companies with set-based UPDATEs.
+    Returns the per-company counts keyed by company PK (as strings, for the result backend).
+    """
+    sweep_date = date.fromisoformat(today) if today else None
+    company_ids = list(Company.objects.filter(is_active=True).values_list('pk', flat=True))
+    counts = sweep_document_statuses(company_ids=company_ids, today=sweep_date)
+    logger.info(f"[StatusSweepTask] Swept {len(company_ids)} companies; {len(counts)} had status changes.")
+    return {str(company_id): company_counts for company_id, company_counts in counts.items()}
+
+
+@shared_task(
+    name="crp_accounting.tasks.generate_recurring_vouchers",
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=MAX_RETRIES_BAL_UPDATE,
+)
+def generate_recurring_vouchers_task(as_of: Optional[str] = None):
+    """
+    Daily (see CELERY_BEAT_SCHEDULE): generates the due occurrences of all active recurring voucher
+    templates, one bulk pass per company that has due templates. Idempotent per template occurrence.
+    Returns the number of vouchers created per company PK.
+    """
+    # Imported here: voucher_service imports this module
+    from company.utils import override_current_company
+    from .services.recurring_voucher_service import generate_recurring_vouchers, companies_with_due_templates
+
+    as_of_date = date.fromisoformat(as_of) if as_of else timezone.now().date()
+    created = {}
+    for company in Company.objects.filter(pk__in=companies_with_due_templates(as_of_date), is_active=True):
+        with override_current_company(company):
+            result = generate_recurring_vouchers(company.pk, as_of=as_of_date)
+        created[str(company.pk)] = result.vouchers_created
+    logger.info(f"[RecurVchTask][AsOf:{as_of_date}] Generated {sum(created.values())} vouchers "
+                f"for {len(created)} companies.")
+    return created
+
+
+# --- Company Onboarding Task ---
+
+@shared_task(
+    name="crp_accounting.tasks.seed_coa_for_company",
+    autoretry_for=(OperationalError,),
+    retry_backoff=True,
+    max_retries=MAX_RETRIES_BAL_UPDATE,
+    acks_late=True,
+)
+def seed_coa_for_company_task(company_id: Any):
+    """
+    Seeds the default Chart of Accounts of a new company outside the sign-up request
+    (enqueued on commit by the company signal when settings.COA_SEEDING_ASYNC is on).
+    Progress is recorded in Company.coa_seeding_status; returns the seeding counts.
+    """
+    try:
+        company = Company.objects.select_related('created_by_user').get(pk=company_id)
+    except Company.DoesNotExist:
+        logger.error(f"[CoaSeedTask][Co:{company_id}] Company not found. Nothing to seed.")
+        return None
+    result = seed_coa_for_company(company, user=company.created_by_user)
+    return asdict(result)
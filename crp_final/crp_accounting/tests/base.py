@@ -0,0 +1,60 @@
+# crp_accounting/tests/base.py
+"""
+Shared fixture for the service and model tests: one small company generated with
+benchmarks.generator (seeded chart of accounts, settings, monthly periods, parties and,
+depending on `dataset_spec`, posted documents), loaded once per test class.
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from company.models import Company
+from company.utils import override_current_company
+
+from ..benchmarks.generator import DatasetSpec, generate_dataset
+from ..benchmarks.runner import build_company_context
+from ..models.coa import Account
+from ..models.journal import TransactionStatus, Voucher, VoucherLine, VoucherType
+from ..models.period import AccountingPeriod
+from ..services import sequence_service, voucher_service
+
+
+class GeneratedCompanyTestCase(TestCase):
+    # No documents by default: tests create the ones they assert on
+    dataset_spec = DatasetSpec(companies=1, customers=3, suppliers=3, invoices=0, paid_invoice_ratio=0, bills=0,
+                               vouchers=0, months=6, seed=11, prefix='svctest', batch_size=50)
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(cls.dataset_spec)
+        cls.company = Company.objects.get(subdomain_prefix=cls.dataset_spec.subdomain(1))
+        cls.ctx = build_company_context(cls.company)
+        cls.user = cls.ctx.user
+
+    def setUp(self):
+        cache.clear()  # Cached period calendars / opening balances must not leak between tests
+        self.enterContext(override_current_company(self.company))
+
+    def account(self, account_number):
+        return Account.objects.get(account_number=account_number)
+
+    @classmethod
+    def post_journal_voucher(cls, voucher_date, lines, narration="Test posting", party=None):
+        """
+        One POSTED general voucher through the batched posting path.
+        `lines` are (account, DrCrType value, amount) tuples.
+        """
+        period = AccountingPeriod.global_objects.get(company=cls.company, start_date__lte=voucher_date,
+                                                     end_date__gte=voucher_date)
+        number, = sequence_service.reserve_voucher_numbers(cls.company.pk, VoucherType.GENERAL.value, period.pk, 1)
+        now = timezone.now()
+        voucher = Voucher(
+            company=cls.company, voucher_type=VoucherType.GENERAL.value, voucher_number=number, date=voucher_date,
+            effective_date=voucher_date, narration=narration, accounting_period=period, party=party,
+            status=TransactionStatus.POSTED.value, approved_by=cls.user, posted_by=cls.user, approved_at=now,
+            posted_at=now, balances_updated=True, created_by=cls.user, updated_by=cls.user)
+        voucher_lines = [VoucherLine(voucher=voucher, account=account, dr_cr=dr_cr, amount=amount)
+                         for account, dr_cr, amount in lines]
+        voucher_service.bulk_insert_posted_vouchers([voucher], voucher_lines, cls.user, comments=narration)
+        return voucher
@@ -0,0 +1,52 @@
+# crp_accounting/tests/test_account_groups.py
+"""Materialized-path hierarchy of AccountGroup (tree_path / depth / full_path)."""
+
+from ..models.coa import Account, AccountGroup
+from .base import GeneratedCompanyTestCase
+
+
+def _walk_child_accounts(group):
+    """Reference order: the group's own accounts by number, then each sub-group by name, recursively."""
+    accounts = list(Account.objects.filter(account_group=group).order_by('account_number'))
+    for sub_group in AccountGroup.objects.filter(parent_group=group).order_by('name'):
+        accounts.extend(_walk_child_accounts(sub_group))
+    return accounts
+
+
+class AccountGroupTreeTests(GeneratedCompanyTestCase):
+
+    def test_get_all_child_accounts_keeps_tree_walk_order(self):
+        top_groups = AccountGroup.objects.filter(parent_group__isnull=True)
+        self.assertTrue(top_groups.exists())
+        for group in top_groups:
+            with self.subTest(group=group.name):
+                self.assertEqual(group.get_all_child_accounts(), _walk_child_accounts(group))
+
+    def test_get_all_child_accounts_orders_sub_groups_by_name(self):
+        root = AccountGroup.objects.create(company=self.company, name="Test Root")
+        # Created in reverse name order, so pk / tree path order differs from name order
+        zulu = AccountGroup.objects.create(company=self.company, name="Zulu", parent_group=root)
+        alpha = AccountGroup.objects.create(company=self.company, name="Alpha", parent_group=root)
+        template = self.account('1011_bank_account_checking')
+        for number, group in (('T-300', zulu), ('T-200', alpha), ('T-100', root)):
+            Account.objects.create(company=self.company, account_number=number, account_name=number,
+                                   account_group=group, account_type=template.account_type,
+                                   account_nature=template.account_nature, currency=template.currency)
+
+        self.assertEqual([account.account_number for account in root.get_all_child_accounts()],
+                         ['T-100', 'T-200', 'T-300'])
+
+    def test_moving_a_group_rewrites_descendant_paths(self):
+        source = AccountGroup.objects.create(company=self.company, name="Source")
+        target = AccountGroup.objects.create(company=self.company, name="Target")
+        child = AccountGroup.objects.create(company=self.company, name="Child", parent_group=source)
+        leaf = AccountGroup.objects.create(company=self.company, name="Leaf", parent_group=child)
+
+        child.parent_group = target
+        child.save()
+
+        leaf.refresh_from_db()
+        self.assertEqual(leaf.full_path, "Target > Child > Leaf")
+        self.assertEqual(leaf.depth, 2)
+        self.assertTrue(leaf.tree_path.startswith(target.tree_path))
+        self.assertEqual(list(source.get_descendants()), [])
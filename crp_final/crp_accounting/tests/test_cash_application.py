@@ -0,0 +1,170 @@
+# crp_accounting/tests/test_cash_application.py
+"""Automatic cash application (cash_application_service.auto_match_customer_payments)."""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from crp_core.enums import PartyType
+
+from ..benchmarks.generator import SALES_REVENUE_ACCOUNT
+from ..models.party import Party
+from ..models.receivables import CustomerInvoice, CustomerPayment, InvoiceStatus, PaymentAllocation, PaymentStatus
+from ..services import receivables_service
+from ..services.cash_application_service import (
+    RULE_EXACT_AMOUNT, RULE_FIFO, RULE_REFERENCE, auto_match_customer_payments
+)
+from .base import GeneratedCompanyTestCase
+
+# Maximum queries of one applying run, whatever the number of payments and invoices (includes the
+# customers' unposted documents refresh)
+AUTO_MATCH_QUERY_BUDGET = 15
+
+
+class AutoMatchCustomerPaymentsTests(GeneratedCompanyTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        self.customer, self.other_customer, _third = Party.objects.filter(
+            party_type=PartyType.CUSTOMER.value).order_by('name')
+        # Oldest due first: 100.00, 250.00, 80.00
+        self.invoices = [self._invoice(self.customer, amount, due_in_days=days)
+                         for amount, days in (('100.00', 10), ('250.00', 20), ('80.00', 30))]
+
+    def _invoice(self, customer, amount, due_in_days=30, currency=None):
+        return receivables_service.create_customer_invoice(
+            company_id=self.company.pk, created_by_user=self.user, customer_id=customer.pk,
+            invoice_date=self.today, due_date=self.today + timedelta(days=due_in_days), currency=currency,
+            lines_data=[{'description': "Services", 'unit_price': amount,
+                         'revenue_account_id': self.account(SALES_REVENUE_ACCOUNT).pk}],
+            initial_status=InvoiceStatus.SENT.value, post_to_gl_on_finalize=False)
+
+    def _payment(self, customer, amount, reference="", currency=None, allocations=None):
+        return receivables_service.record_customer_payment(
+            company_id=self.company.pk, created_by_user=self.user, customer_id=customer.pk,
+            payment_date=self.today, amount_received=Decimal(amount),
+            currency=currency or self.company.default_currency_code,
+            bank_account_credited_id=self.ctx.ledger_account.pk, reference_number=reference,
+            allocations_data=allocations, post_to_gl_immediately=False)
+
+    def _applied(self, result):
+        return [(proposal.invoice_id, proposal.amount, proposal.rule) for proposal in result.proposals]
+
+    def test_reference_rule_matches_the_invoice_number_in_the_reference(self):
+        last = self.invoices[2]
+        self._payment(self.customer, '80.00', reference=f"Remittance {last.invoice_number.lower()}, thanks")
+
+        result = auto_match_customer_payments(self.company.pk, self.user, dry_run=False)
+
+        self.assertEqual(self._applied(result), [(last.pk, Decimal('80.00'), RULE_REFERENCE)])
+        last.refresh_from_db()
+        self.assertEqual((last.amount_due, last.status), (Decimal('0.00'), InvoiceStatus.PAID.value))
+
+    def test_exact_amount_rule_matches_a_single_invoice_due_for_the_amount(self):
+        payment = self._payment(self.customer, '250.00')
+
+        result = auto_match_customer_payments(self.company.pk, self.user, dry_run=False)
+
+        self.assertEqual(self._applied(result), [(self.invoices[1].pk, Decimal('250.00'), RULE_EXACT_AMOUNT)])
+        payment.refresh_from_db()
+        self.assertEqual((payment.amount_applied, payment.amount_unapplied, payment.status),
+                         (Decimal('250.00'), Decimal('0.00'), PaymentStatus.APPLIED.value))
+
+    def test_fifo_rule_pays_the_oldest_due_invoices_first(self):
+        payment = self._payment(self.customer, '150.00')
+
+        result = auto_match_customer_payments(self.company.pk, self.user, dry_run=False)
+
+        self.assertEqual(self._applied(result), [(self.invoices[0].pk, Decimal('100.00'), RULE_FIFO),
+                                                 (self.invoices[1].pk, Decimal('50.00'), RULE_FIFO)])
+        invoices = CustomerInvoice.objects.in_bulk([invoice.pk for invoice in self.invoices])
+        self.assertEqual(invoices[self.invoices[0].pk].status, InvoiceStatus.PAID.value)
+        self.assertEqual((invoices[self.invoices[1].pk].amount_due, invoices[self.invoices[1].pk].status),
+                         (Decimal('200.00'), InvoiceStatus.PARTIALLY_PAID.value))
+        self.assertEqual(PaymentAllocation.objects.filter(payment=payment).count(), 2)
+
+    def test_applying_run_refreshes_the_customers_unposted_documents_amount(self):
+        self._payment(self.customer, '150.00')
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.unposted_documents_amount, Decimal('430.00'))
+
+        auto_match_customer_payments(self.company.pk, self.user, dry_run=False)
+
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.unposted_documents_amount, Decimal('280.00'))
+
+    def test_rules_can_be_restricted(self):
+        self._payment(self.customer, '150.00')
+
+        result = auto_match_customer_payments(self.company.pk, self.user, rules=(RULE_REFERENCE, RULE_EXACT_AMOUNT))
+
+        self.assertEqual((result.payments_considered, result.payments_matched), (1, 0))
+        with self.assertRaises(ValueError):
+            auto_match_customer_payments(self.company.pk, self.user, rules=('NEAREST',))
+
+    def test_dry_run_writes_nothing(self):
+        payment = self._payment(self.customer, '150.00')
+
+        result = auto_match_customer_payments(self.company.pk, self.user)
+
+        self.assertTrue(result.dry_run)
+        self.assertEqual(result.total_applied, Decimal('150.00'))
+        self.assertFalse(PaymentAllocation.objects.filter(payment=payment).exists())
+        payment.refresh_from_db()
+        self.assertEqual((payment.amount_unapplied, payment.status), (Decimal('150.00'), PaymentStatus.UNAPPLIED.value))
+        self.assertEqual([invoice.amount_due for invoice in CustomerInvoice.objects.filter(
+            pk__in=[invoice.pk for invoice in self.invoices]).order_by('due_date')],
+            [Decimal('100.00'), Decimal('250.00'), Decimal('80.00')])
+
+    def test_payments_only_match_invoices_in_their_currency(self):
+        eur_invoice = self._invoice(self.other_customer, '60.00', currency='EUR')
+        self._payment(self.other_customer, '60.00')
+
+        result = auto_match_customer_payments(self.company.pk, self.user, dry_run=False,
+                                              customer_ids=[self.other_customer.pk])
+
+        self.assertEqual((result.payments_considered, result.payments_matched), (1, 0))
+        eur_invoice.refresh_from_db()
+        self.assertEqual(eur_invoice.amount_due, Decimal('60.00'))
+
+        eur_payment = self._payment(self.other_customer, '60.00', currency='EUR')
+        result = auto_match_customer_payments(self.company.pk, self.user, dry_run=False,
+                                              payment_ids=[eur_payment.pk])
+        self.assertEqual(self._applied(result), [(eur_invoice.pk, Decimal('60.00'), RULE_EXACT_AMOUNT)])
+
+    def test_existing_payment_invoice_pairs_are_skipped(self):
+        first = self.invoices[0]
+        payment = self._payment(self.customer, '150.00', allocations=[{'invoice_id': first.pk,
+                                                                       'amount_applied': '40.00'}])
+
+        result = auto_match_customer_payments(self.company.pk, self.user, dry_run=False)
+
+        # The 60.00 still due on the first invoice is left for a manual edit of the existing allocation
+        self.assertEqual(self._applied(result), [(self.invoices[1].pk, Decimal('110.00'), RULE_FIFO)])
+        self.assertEqual(PaymentAllocation.objects.filter(payment=payment, invoice=first).count(), 1)
+        payment.refresh_from_db()
+        self.assertEqual((payment.amount_applied, payment.status), (Decimal('150.00'), PaymentStatus.APPLIED.value))
+
+    def _queries_of_applying_run(self):
+        with CaptureQueriesContext(connection) as captured:
+            result = auto_match_customer_payments(self.company.pk, self.user, dry_run=False)
+        self.assertTrue(result.proposals)
+        return len(captured.captured_queries)
+
+    def test_query_count_does_not_grow_with_the_number_of_payments(self):
+        self._payment(self.customer, '100.00')
+        single = self._queries_of_applying_run()
+
+        for amount in ('250.00', '30.00', '20.00'):
+            self._payment(self.customer, amount)
+        self._invoice(self.other_customer, '75.00')
+        self._payment(self.other_customer, '75.00')
+        several = self._queries_of_applying_run()
+
+        self.assertEqual(CustomerPayment.objects.filter(amount_unapplied__gt=0).count(), 0)
+        self.assertEqual(several, single)
+        self.assertLessEqual(several, AUTO_MATCH_QUERY_BUDGET)
@@ -0,0 +1,34 @@
+# crp_accounting/tests/test_coa_seeding.py
+"""Re-seeding an existing chart of accounts (coa_seeding_service._seed_existing_coa)."""
+
+from ..models.coa import Account, AccountGroup
+from ..services.coa_seeding_service import seed_coa_for_company
+from .base import GeneratedCompanyTestCase
+
+
+class CoaReseedingTests(GeneratedCompanyTestCase):
+
+    def test_reseeding_an_unchanged_chart_writes_nothing(self):
+        result = seed_coa_for_company(self.company)
+
+        self.assertEqual((result.groups_created, result.groups_updated, result.accounts_created,
+                          result.accounts_updated, result.accounts_failed), (0, 0, 0, 0, 0))
+
+    def test_reseeding_restores_soft_deleted_template_groups_and_accounts(self):
+        group = self.account('4100_interest_income').account_group
+        accounts = list(Account.objects.filter(account_group=group))
+        account_numbers = {account.account_number for account in accounts}
+        for account in accounts:  # Accounts protect their group, so they go first
+            account.delete()
+        group.delete()
+        self.assertFalse(AccountGroup.objects.filter(pk=group.pk).exists())
+        self.assertFalse(Account.objects.filter(account_number__in=account_numbers).exists())
+
+        result = seed_coa_for_company(self.company)
+
+        self.assertEqual(result.groups_created, 0)
+        self.assertEqual(result.accounts_created, 0)
+        self.assertGreaterEqual(result.groups_updated, 1)
+        restored = AccountGroup.objects.get(pk=group.pk)
+        self.assertEqual(set(Account.objects.filter(account_group=restored).values_list('account_number', flat=True)),
+                         account_numbers)
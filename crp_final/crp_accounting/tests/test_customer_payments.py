@@ -0,0 +1,60 @@
+# crp_accounting/tests/test_customer_payments.py
+"""Recording customer payments with allocations (receivables_service.record_customer_payment)."""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from crp_core.enums import PartyType
+
+from ..benchmarks.generator import SALES_REVENUE_ACCOUNT
+from ..models.party import Party
+from ..models.receivables import InvoiceStatus, PaymentAllocation, PaymentStatus
+from ..services import receivables_service
+from .base import GeneratedCompanyTestCase
+
+
+class RecordCustomerPaymentTests(GeneratedCompanyTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        self.customer = Party.objects.filter(party_type=PartyType.CUSTOMER.value).order_by('name').first()
+        self.invoice = receivables_service.create_customer_invoice(
+            company_id=self.company.pk, created_by_user=self.user, customer_id=self.customer.pk,
+            invoice_date=self.today, due_date=self.today + timedelta(days=30),
+            lines_data=[{'description': "Services", 'unit_price': '120.00',
+                         'revenue_account_id': self.account(SALES_REVENUE_ACCOUNT).pk}],
+            initial_status=InvoiceStatus.SENT.value, post_to_gl_on_finalize=False)
+
+    def _pay(self, amount, allocated, post_to_gl=False):
+        return receivables_service.record_customer_payment(
+            company_id=self.company.pk, created_by_user=self.user, customer_id=self.customer.pk,
+            payment_date=self.today, amount_received=Decimal(amount), currency=self.company.default_currency_code,
+            bank_account_credited_id=self.ctx.ledger_account.pk,
+            allocations_data=[{'invoice_id': self.invoice.pk, 'amount_applied': allocated}],
+            post_to_gl_immediately=post_to_gl)
+
+    def test_allocations_belong_to_the_payment_company(self):
+        payment = self._pay('50.00', '50.00')
+
+        allocation = PaymentAllocation.objects.get(payment=payment)
+        self.assertEqual((allocation.company_id, allocation.invoice_id, allocation.amount_applied),
+                         (self.company.pk, self.invoice.pk, Decimal('50.00')))
+        self.invoice.refresh_from_db()
+        self.assertEqual((self.invoice.amount_paid, self.invoice.amount_due, self.invoice.status),
+                         (Decimal('50.00'), Decimal('70.00'), InvoiceStatus.PARTIALLY_PAID.value))
+        payment.refresh_from_db()
+        self.assertEqual((payment.amount_applied, payment.amount_unapplied, payment.status),
+                         (Decimal('50.00'), Decimal('0.00'), PaymentStatus.APPLIED.value))
+
+    def test_overpayment_pays_the_invoice_and_keeps_the_rest_unapplied(self):
+        payment = self._pay('150.00', '120.00', post_to_gl=True)
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.status, InvoiceStatus.PAID.value)
+        payment.refresh_from_db()
+        self.assertEqual((payment.amount_unapplied, payment.status),
+                         (Decimal('30.00'), PaymentStatus.PARTIALLY_APPLIED.value))
+        self.assertIsNotNone(payment.related_gl_voucher_id)
@@ -0,0 +1,107 @@
+# crp_accounting/tests/test_deferred_recalc.py
+"""Parent totals after batched line edits (models.deferred_recalc)."""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.db import transaction
+from django.utils import timezone
+
+from crp_core.enums import PartyType
+
+from ..benchmarks.generator import SALES_REVENUE_ACCOUNT
+from ..models.deferred_recalc import deferred_parent_recalculation
+from ..models.party import Party
+from ..models.payables import BillLine, VendorBill
+from ..models.receivables import CustomerInvoice, InvoiceLine, InvoiceStatus
+from ..services import payables_service, receivables_service
+from .base import GeneratedCompanyTestCase
+
+
+class DeferredRecalculationTests(GeneratedCompanyTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        self.supplier = Party.objects.filter(party_type=PartyType.SUPPLIER.value).order_by('name').first()
+        self.customer = Party.objects.filter(party_type=PartyType.CUSTOMER.value).order_by('name').first()
+
+    def _bill(self, *unit_prices):
+        return payables_service.create_vendor_bill(
+            self.company.pk, self.supplier.pk, self.today, self.company.default_currency_code,
+            [{'description': "Line", 'expense_account_id': self.ctx.debit_account.pk, 'unit_price': price}
+             for price in unit_prices],
+            self.user)
+
+    def _invoice(self, *unit_prices):
+        revenue = self.account(SALES_REVENUE_ACCOUNT)
+        return receivables_service.create_customer_invoice(
+            company_id=self.company.pk, created_by_user=self.user, customer_id=self.customer.pk,
+            invoice_date=self.today, due_date=self.today,
+            lines_data=[{'description': "Line", 'unit_price': price, 'revenue_account_id': revenue.pk}
+                        for price in unit_prices],
+            initial_status=InvoiceStatus.SENT.value, post_to_gl_on_finalize=False)
+
+    def test_create_vendor_bill_totals_its_lines(self):
+        bill = VendorBill.objects.get(pk=self._bill('100.00', '50.00').pk)
+
+        self.assertEqual((bill.subtotal_amount, bill.total_amount, bill.amount_due),
+                         (Decimal('150.00'), Decimal('150.00'), Decimal('150.00')))
+
+    def test_batched_bill_line_edit_recalculates_once_before_commit(self):
+        bill = self._bill('100.00', '50.00')
+        first, second = bill.lines.order_by('unit_price')
+        recalculate = VendorBill._recalculate_derived_fields
+
+        with mock.patch.object(VendorBill, '_recalculate_derived_fields', autospec=True,
+                               side_effect=recalculate) as recalc_spy:
+            with transaction.atomic():
+                with deferred_parent_recalculation():
+                    first.unit_price = Decimal('70.00')
+                    first.save()
+                    BillLine(vendor_bill=bill, expense_account=self.ctx.debit_account, description="Extra", quantity=2,
+                             unit_price=Decimal('10.00')).save()
+                    second.delete()
+                # Still inside the transaction: the stored totals already match the lines
+                stored = VendorBill.objects.get(pk=bill.pk)
+                self.assertEqual((stored.total_amount, stored.amount_due), (Decimal('90.00'), Decimal('90.00')))
+
+        self.assertEqual(recalc_spy.call_count, 1)
+        self.assertEqual(bill.total_amount, Decimal('90.00'))  # The caller's instance is updated in place
+
+    def test_line_edit_without_a_block_recalculates_immediately(self):
+        bill = self._bill('100.00')
+        line = bill.lines.get()
+
+        with transaction.atomic():
+            line.unit_price = Decimal('40.00')
+            line.save()
+            self.assertEqual(VendorBill.objects.get(pk=bill.pk).amount_due, Decimal('40.00'))
+
+    def test_failed_recalculation_rolls_the_line_edits_back(self):
+        bill = self._bill('100.00')
+        line = bill.lines.get()
+
+        with mock.patch.object(VendorBill, '_recalculate_derived_fields', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic(), deferred_parent_recalculation():
+                    line.unit_price = Decimal('40.00')
+                    line.save()
+
+        self.assertEqual(BillLine.objects.get(pk=line.pk).unit_price, Decimal('100.00'))
+        self.assertEqual(VendorBill.objects.get(pk=bill.pk).amount_due, Decimal('100.00'))
+
+    def test_batched_invoice_line_edit_recalculates_totals(self):
+        invoice = self._invoice('200.00', '25.00')
+        self.assertEqual(CustomerInvoice.objects.get(pk=invoice.pk).total_amount, Decimal('225.00'))
+
+        with transaction.atomic(), deferred_parent_recalculation():
+            for line in invoice.lines.all():
+                line.quantity = 2
+                line.save()
+            InvoiceLine(invoice=invoice, revenue_account=self.account(SALES_REVENUE_ACCOUNT), description="Extra",
+                        quantity=1, unit_price=Decimal('5.00')).save()
+
+        stored = CustomerInvoice.objects.get(pk=invoice.pk)
+        self.assertEqual((stored.subtotal_amount, stored.total_amount, stored.amount_due),
+                         (Decimal('455.00'), Decimal('455.00'), Decimal('455.00')))
@@ -0,0 +1,86 @@
+# crp_accounting/tests/test_party_balances.py
+"""Party balances listing (PartyViewSet.balances) under keyset pagination."""
+
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from crp_core.enums import DrCrType, PartyType
+
+from ..benchmarks.generator import AP_CONTROL_ACCOUNT, AR_CONTROL_ACCOUNT, BANK_ACCOUNT
+from ..models.coa import Account
+from ..models.party import Party
+from .base import GeneratedCompanyTestCase
+
+DEBIT, CREDIT = DrCrType.DEBIT.value, DrCrType.CREDIT.value
+
+
+class PartyBalancesOrderingTests(GeneratedCompanyTestCase):
+    # Balance and credit limit per party, by party type and name order; a limit of 0 means no utilization
+    CUSTOMER_FIGURES = [(Decimal('300.00'), Decimal('1000.00')), (Decimal('100.00'), Decimal('200.00')),
+                        (Decimal('200.00'), Decimal('0.00'))]
+    SUPPLIER_FIGURES = [(Decimal('50.00'), Decimal('0.00')), (Decimal('400.00'), Decimal('0.00')),
+                        (Decimal('0.00'), Decimal('0.00'))]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        accounts = Account.global_objects.filter(company=cls.company)
+        ar, ap, bank = (accounts.get(account_number=number)
+                        for number in (AR_CONTROL_ACCOUNT, AP_CONTROL_ACCOUNT, BANK_ACCOUNT))
+        today = timezone.now().date()
+        parties = Party.global_objects.filter(company=cls.company).order_by('name')
+        cls.expected = {}  # party pk -> (name, balance, utilization or None)
+        for party_type, figures, control, dr_cr in (
+                (PartyType.CUSTOMER.value, cls.CUSTOMER_FIGURES, ar, DEBIT),
+                (PartyType.SUPPLIER.value, cls.SUPPLIER_FIGURES, ap, CREDIT)):
+            for party, (balance, credit_limit) in zip(parties.filter(party_type=party_type), figures):
+                if balance:
+                    other_side = CREDIT if dr_cr == DEBIT else DEBIT
+                    cls.post_journal_voucher(today, [(control, dr_cr, balance), (bank, other_side, balance)],
+                                             party=party)
+                Party.global_objects.filter(pk=party.pk).update(credit_limit=credit_limit)
+                utilization = balance * 100 / credit_limit if credit_limit else None
+                cls.expected[party.pk] = (party.name, balance, utilization)
+
+    def setUp(self):
+        super().setUp()
+        self.api_client = APIClient()
+        self.api_client.force_login(self.user)
+        self.api_client.force_authenticate(self.user)
+
+    def _all_pages(self, ordering, page_size=2):
+        """Walks the `next` links; returns the party ids in the order served."""
+        url = reverse('crp_accounting_api:party-api-balances')
+        params = {'ordering': ordering, 'page_size': page_size}
+        served = []
+        while url:
+            response = self.api_client.get(url, params)
+            self.assertEqual(response.status_code, 200, getattr(response, 'data', response.content[:500]))
+            self.assertLessEqual(len(response.data['results']), page_size)
+            served.extend(row['id'] for row in response.data['results'])
+            url, params = response.data['next'], None
+        return [str(pk) for pk in served]
+
+    def _expected_order(self, key):
+        return [str(pk) for pk in sorted(self.expected, key=lambda pk: key(*self.expected[pk]) + (str(pk),))]
+
+    def test_descending_balance(self):
+        self.assertEqual(self._all_pages('-balance'),
+                         self._expected_order(lambda name, balance, _util: (-balance, name)))
+
+    def test_ascending_balance(self):
+        self.assertEqual(self._all_pages('balance'),
+                         self._expected_order(lambda name, balance, _util: (balance, name)))
+
+    def test_credit_utilization_keeps_parties_without_limit_last(self):
+        self.assertEqual(self._all_pages('-credit_utilization'), self._expected_order(
+            lambda name, _balance, util: (util is None, -(util or 0), name)))
+        self.assertEqual(self._all_pages('credit_utilization'), self._expected_order(
+            lambda name, _balance, util: (util is None, util or 0, name)))
+
+    def test_unknown_ordering_is_rejected(self):
+        response = self.api_client.get(reverse('crp_accounting_api:party-api-balances'), {'ordering': 'exposure'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,113 @@
+# crp_accounting/tests/test_payment_run.py
+"""Vendor payment runs (payment_run_service.execute_payment_run)."""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.utils import timezone
+
+from crp_core.enums import PartyType
+
+from ..models.journal import TransactionStatus, Voucher
+from ..models.party import Party
+from ..models.payables import VendorBill, VendorPayment
+from ..services import payables_service, payment_run_service
+from ..services.payables_service import SequenceGenerationError
+from ..services.payment_run_service import execute_payment_run
+from .base import GeneratedCompanyTestCase
+
+
+class PaymentRunTests(GeneratedCompanyTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        self.suppliers = list(Party.objects.filter(party_type=PartyType.SUPPLIER.value).order_by('name'))
+        # Two bills for the first supplier, one for each of the others; all due by today
+        self.bills = {supplier.pk: [self._approved_bill(supplier, amount) for amount in amounts]
+                      for supplier, amounts in zip(self.suppliers, (('100.00', '50.00'), ('70.00',), ('30.00',)))}
+
+    def _approved_bill(self, supplier, amount):
+        bill = payables_service.create_vendor_bill(
+            self.company.pk, supplier.pk, self.today - timedelta(days=30), self.company.default_currency_code,
+            [{'description': "Supplies", 'expense_account_id': self.ctx.debit_account.pk, 'unit_price': amount}],
+            self.user, due_date=self.today - timedelta(days=1))
+        payables_service.submit_vendor_bill_for_approval(bill.pk, self.company.pk, self.user)
+        return payables_service.approve_vendor_bill(bill.pk, self.company.pk, self.user)
+
+    def _run(self, **kwargs):
+        return execute_payment_run(self.company.pk, due_by=self.today, payment_account_id=self.ctx.ledger_account.pk,
+                                   user=self.user, payment_date=self.today, **kwargs)
+
+    def _bill_statuses(self, supplier):
+        return set(VendorBill.objects.filter(supplier=supplier).values_list('status', flat=True))
+
+    def test_dry_run_proposes_one_payment_per_supplier_and_writes_nothing(self):
+        result = self._run()
+
+        self.assertTrue(result.dry_run)
+        self.assertEqual([(proposal.supplier_id, len(proposal.bills), proposal.total) for proposal in result.proposals],
+                         [(self.suppliers[0].pk, 2, Decimal('150.00')), (self.suppliers[1].pk, 1, Decimal('70.00')),
+                          (self.suppliers[2].pk, 1, Decimal('30.00'))])
+        self.assertFalse(VendorPayment.objects.exists())
+
+    def test_payment_run_pays_and_posts_every_due_bill(self):
+        result = self._run(dry_run=False)
+
+        self.assertIsNone(result.error)
+        payments = {payment.supplier_id: payment for payment in VendorPayment.objects.filter(pk__in=result.payment_ids)}
+        self.assertEqual(len(payments), 3)
+        self.assertEqual(payments[self.suppliers[0].pk].payment_amount, Decimal('150.00'))
+        self.assertTrue(all(self._bill_statuses(supplier) == {VendorBill.BillStatus.PAID.value}
+                            for supplier in self.suppliers))
+        vouchers = Voucher.objects.filter(pk__in=result.voucher_ids)
+        self.assertEqual({voucher.status for voucher in vouchers}, {TransactionStatus.POSTED.value})
+
+    def test_payment_numbers_are_reserved_once_per_chunk(self):
+        with mock.patch.object(payment_run_service, 'reserve_payment_numbers',
+                               wraps=payables_service.reserve_payment_numbers) as reserve_spy:
+            result = self._run(dry_run=False, chunk_size=2)
+
+        self.assertEqual([call.args[2] for call in reserve_spy.call_args_list], [2, 1])
+        numbers = sorted(VendorPayment.objects.filter(pk__in=result.payment_ids).values_list('payment_number',
+                                                                                              flat=True))
+        sequence = [int(number[len('VPAY-'):]) for number in numbers]
+        self.assertEqual(sequence, list(range(sequence[0], sequence[0] + 3)))
+        # Numbers handed out singly afterwards continue the sequence
+        self.assertEqual(payables_service.get_next_payment_number(self.company, self.today),
+                         f"VPAY-{sequence[-1] + 1:05d}")
+
+    def test_failed_later_chunk_keeps_the_committed_payments(self):
+        reserve = payables_service.reserve_payment_numbers
+        calls = []
+
+        def fail_second_chunk(*args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise SequenceGenerationError("Sequence locked")
+            return reserve(*args, **kwargs)
+
+        with mock.patch.object(payment_run_service, 'reserve_payment_numbers', side_effect=fail_second_chunk):
+            result = self._run(dry_run=False, chunk_size=1)
+
+        self.assertEqual(result.error, "Sequence locked")
+        self.assertEqual(len(result.payment_ids), 1)
+        self.assertEqual(len(result.voucher_ids), 1)
+        self.assertEqual([proposal.supplier_id for proposal in result.unpaid_proposals],
+                         [supplier.pk for supplier in self.suppliers[1:]])
+        self.assertEqual(list(VendorPayment.objects.values_list('pk', flat=True)), result.payment_ids)
+        self.assertEqual(self._bill_statuses(self.suppliers[0]), {VendorBill.BillStatus.PAID.value})
+        for supplier in self.suppliers[1:]:
+            self.assertEqual(self._bill_statuses(supplier), {VendorBill.BillStatus.APPROVED.value})
+
+        # The unpaid suppliers are picked up by the next run
+        rerun = self._run(dry_run=False)
+        self.assertEqual(len(rerun.payment_ids), 2)
+
+    def test_failed_first_chunk_raises(self):
+        with mock.patch.object(payment_run_service, 'reserve_payment_numbers',
+                               side_effect=SequenceGenerationError("Sequence locked")):
+            with self.assertRaises(SequenceGenerationError):
+                self._run(dry_run=False, chunk_size=1)
+        self.assertFalse(VendorPayment.objects.exists())
@@ -0,0 +1,57 @@
+# crp_accounting/tests/test_period_calendar.py
+"""Cached per-company period calendar (period_calendar_service) and its invalidation."""
+
+from django.core.cache import cache
+
+from ..models.period import AccountingPeriod
+from ..services.period_calendar_service import _calendar_cache_key, get_period_calendar
+from .base import GeneratedCompanyTestCase
+
+
+class PeriodCalendarCacheTests(GeneratedCompanyTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.period = AccountingPeriod.objects.order_by('start_date').first()
+        self.cache_key = _calendar_cache_key(self.company.pk)
+
+    def _cached_calendar(self):
+        get_period_calendar(self.company.pk)
+        self.assertIsNotNone(cache.get(self.cache_key))
+
+    def test_calendar_is_cached(self):
+        calendar = get_period_calendar(self.company.pk)
+        self.assertEqual(len(calendar), AccountingPeriod.objects.count())
+        with self.assertNumQueries(0):
+            self.assertEqual(get_period_calendar(self.company.pk).period_for(self.period.start_date).pk,
+                             self.period.pk)
+
+    def test_period_save_invalidates_the_calendar(self):
+        self._cached_calendar()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.period.lock_period()
+        self.assertTrue(callbacks)  # Dropped again after commit
+        self.assertIsNone(cache.get(self.cache_key))
+
+        calendar = get_period_calendar(self.company.pk)
+        self.assertTrue(calendar.period_for(self.period.start_date).locked)
+        self.assertIsNone(calendar.open_period_for(self.period.start_date))
+
+    def test_period_delete_invalidates_the_calendar(self):
+        self._cached_calendar()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.period.delete()
+        self.assertIsNone(cache.get(self.cache_key))
+
+        self.assertIsNone(get_period_calendar(self.company.pk).period_for(self.period.start_date))
+
+    def test_period_undelete_invalidates_the_calendar(self):
+        self.period.delete()
+        self._cached_calendar()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.period.undelete()
+
+        self.assertEqual(get_period_calendar(self.company.pk).period_for(self.period.start_date).pk, self.period.pk)
@@ -0,0 +1,250 @@
+# crp_accounting/tests/test_query_budgets.py
+"""
+Query budgets for the hot endpoints and services.
+
+A fixed synthetic dataset (benchmarks.generator, fixed seed) is loaded once; each test runs one
+endpoint or service and fails when it executes more queries than its entry in QUERY_BUDGETS.
+The failure lists every executed statement, so a new N+1 shows up as a diff against the budget.
+Budgets are maxima for this dataset: most of them must not grow with it either, which is why
+list and report pages cover several rows per page. Lower a budget when a change saves queries;
+raise one only when the added queries are intended.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from company.models import Company
+from company.utils import override_current_company
+
+from ..benchmarks.generator import SALES_REVENUE_ACCOUNT, DatasetSpec, generate_dataset
+from ..benchmarks.runner import build_company_context, post_vouchers_in_bulk
+from ..models.coa import Account
+from ..models.journal import Voucher
+from ..models.receivables import InvoiceStatus
+from ..services import receivables_service
+from ..services.payment_run_service import execute_payment_run
+
+BUDGET_DATASET = DatasetSpec(companies=2, customers=6, suppliers=4, invoices=12, paid_invoice_ratio=0.5, bills=8,
+                             vouchers=120, months=6, seed=7, prefix='qbudget', batch_size=50)
+
+# Maximum queries per request / service call on BUDGET_DATASET
+QUERY_BUDGETS = {
+    # REST API
+    'api.voucher_list': 4,  # One keyset page of headers (no COUNT), totals annotated
+    'api.voucher_search': 4,  # Search document lookup on PostgreSQL, EXISTS over the columns elsewhere
+    'api.voucher_detail': 6,
+    'api.account_ledger': 9,
+    'api.trial_balance': 9,
+    'api.trial_balance_not_modified': 4,  # 304 from the ledger validator, report not run
+    'api.profit_loss': 6,
+    'api.balance_sheet': 10,
+    'api.party_list': 4,
+    'api.party_balances': 4,  # One page of parties, all figures from one grouped query
+    # Admin report views
+    'admin.trial_balance': 10,
+    'admin.profit_loss': 7,
+    'admin.balance_sheet': 11,
+    'admin.account_ledger': 10,
+    'admin.ar_aging': 9,  # Allocations applied as of the date in one grouped query
+    'admin.ap_aging': 7,
+    'admin.customer_statement': 10,
+    'admin.vendor_statement': 13,
+    # Bulk GL posting services
+    'services.bulk_insert_posted_vouchers': 42,  # Same budget for 10 and 200 vouchers
+    'services.payment_run': 68,  # Includes the suppliers' unposted-documents refresh (3 queries)
+    # Invoices are posted one by one, each in its own savepoint: first invoice, then each further one
+    'services.post_selected_invoices_to_gl': 114,
+    'services.post_selected_invoices_to_gl.per_extra_invoice': 110,
+    # Company onboarding (settings row + bulk CoA seeding in the company signal)
+    'services.company_onboarding': 25,
+}
+
+
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(BUDGET_DATASET)
+        cls.company = Company.objects.get(subdomain_prefix=BUDGET_DATASET.subdomain(1))
+        cls.ctx = build_company_context(cls.company)
+        cls.user = cls.ctx.user
+        cls.voucher = (Voucher.global_objects.filter(company=cls.company).order_by('-date', 'voucher_number')
+                       .first())
+
+    def setUp(self):
+        cache.clear()  # Cached opening balances / period calendars would make counts depend on test order
+        self.api_client = APIClient()
+        self.api_client.force_login(self.user)  # Session: CompanyMiddleware resolves the company from membership
+        self.api_client.force_authenticate(self.user)
+        self.client.force_login(self.user)
+
+    def assertWithinQueryBudget(self, budget_name, func, budget=None):
+        budget = QUERY_BUDGETS[budget_name] if budget is None else budget
+        with CaptureQueriesContext(connection) as captured:
+            result = func()
+        executed = len(captured.captured_queries)
+        if executed > budget:
+            statements = "\n".join(f"{number:>4}. {query['sql']}"
+                                   for number, query in enumerate(captured.captured_queries, start=1))
+            self.fail(f"'{budget_name}' executed {executed} queries, budget is {budget} "
+                      f"(+{executed - budget}).\n{statements}")
+        return result
+
+    def _get(self, client, url, params=None):
+        response = client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', response.content[:500]))
+        return response
+
+    def _date_range(self, **extra):
+        return {'start_date': self.ctx.start_date.isoformat(), 'end_date': self.ctx.end_date.isoformat(), **extra}
+
+    # --- REST API ---
+
+    def test_api_voucher_list(self):
+        url = reverse('crp_accounting_api:voucher-api-list')
+        self.assertWithinQueryBudget('api.voucher_list', lambda: self._get(self.api_client, url))
+
+    def test_api_voucher_search(self):
+        url = reverse('crp_accounting_api:voucher-api-list')
+        self.assertWithinQueryBudget('api.voucher_search', lambda: self._get(
+            self.api_client, url, {'search': 'e', 'narration_contains': 'e'}))
+
+    def test_api_voucher_detail(self):
+        url = reverse('crp_accounting_api:voucher-api-detail', kwargs={'pk': self.voucher.pk})
+        self.assertWithinQueryBudget('api.voucher_detail', lambda: self._get(self.api_client, url))
+
+    def test_api_account_ledger(self):
+        url = reverse('crp_accounting_api:account-ledger-api', kwargs={'account_pk': self.ctx.ledger_account.pk})
+        self.assertWithinQueryBudget('api.account_ledger',
+                                     lambda: self._get(self.api_client, url, self._date_range()))
+
+    def test_api_trial_balance(self):
+        url = reverse('crp_accounting_api:api_report_trial_balance')
+        self.assertWithinQueryBudget('api.trial_balance', lambda: self._get(
+            self.api_client, url, {'as_of_date': self.ctx.end_date.isoformat()}))
+
+    def test_api_trial_balance_not_modified(self):
+        url = reverse('crp_accounting_api:api_report_trial_balance')
+        params = {'as_of_date': self.ctx.end_date.isoformat()}
+        etag = self._get(self.api_client, url, params)['ETag']
+        response = self.assertWithinQueryBudget('api.trial_balance_not_modified', lambda: self.api_client.get(
+            url, params, HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+
+    def test_api_profit_loss(self):
+        url = reverse('crp_accounting_api:api_report_profit_loss')
+        self.assertWithinQueryBudget('api.profit_loss', lambda: self._get(
+            self.api_client, url, self._date_range(currency=self.company.default_currency_code)))
+
+    def test_api_balance_sheet(self):
+        url = reverse('crp_accounting_api:api_report_balance_sheet')
+        self.assertWithinQueryBudget('api.balance_sheet', lambda: self._get(
+            self.api_client, url,
+            {'as_of_date': self.ctx.end_date.isoformat(), 'currency': self.company.default_currency_code}))
+
+    def test_api_party_list(self):
+        url = reverse('crp_accounting_api:party-api-list')
+        self.assertWithinQueryBudget('api.party_list', lambda: self._get(self.api_client, url))
+
+    def test_api_party_balances(self):
+        url = reverse('crp_accounting_api:party-api-balances')
+        response = self.assertWithinQueryBudget('api.party_balances', lambda: self._get(
+            self.api_client, url, {'date': self.ctx.end_date.isoformat()}))
+        self.assertEqual(len(response.data['results']), BUDGET_DATASET.customers + BUDGET_DATASET.suppliers)
+
+    # --- Admin report views ---
+
+    def test_admin_trial_balance(self):
+        url = reverse('crp_accounting_api:admin-view-trial-balance')
+        self.assertWithinQueryBudget('admin.trial_balance', lambda: self._get(
+            self.client, url, {'as_of_date': self.ctx.end_date.isoformat()}))
+
+    def test_admin_profit_loss(self):
+        url = reverse('crp_accounting_api:admin-view-profit-loss')
+        self.assertWithinQueryBudget('admin.profit_loss', lambda: self._get(self.client, url, self._date_range()))
+
+    def test_admin_balance_sheet(self):
+        url = reverse('crp_accounting_api:admin-view-balance-sheet')
+        self.assertWithinQueryBudget('admin.balance_sheet', lambda: self._get(
+            self.client, url, {'as_of_date': self.ctx.end_date.isoformat()}))
+
+    def test_admin_account_ledger(self):
+        url = reverse('crp_accounting_api:admin-view-account-ledger',
+                      kwargs={'account_pk': self.ctx.ledger_account.pk})
+        self.assertWithinQueryBudget('admin.account_ledger', lambda: self._get(self.client, url, self._date_range()))
+
+    def test_admin_ar_aging(self):
+        url = reverse('crp_accounting_api:admin-view-ar-aging')
+        self.assertWithinQueryBudget('admin.ar_aging', lambda: self._get(
+            self.client, url, {'as_of_date': self.ctx.end_date.isoformat()}))
+
+    def test_admin_ap_aging(self):
+        url = reverse('crp_accounting_api:admin-view-ap-aging')
+        self.assertWithinQueryBudget('admin.ap_aging', lambda: self._get(
+            self.client, url, {'as_of_date': self.ctx.end_date.isoformat()}))
+
+    def test_admin_customer_statement(self):
+        url = reverse('crp_accounting_api:admin-view-customer-statement-detail',
+                      kwargs={'customer_pk': self.ctx.customer.pk})
+        self.assertWithinQueryBudget('admin.customer_statement',
+                                     lambda: self._get(self.client, url, self._date_range()))
+
+    def test_admin_vendor_statement(self):
+        url = reverse('crp_accounting_api:admin-view-vendor-statement-detail',
+                      kwargs={'supplier_pk': self.ctx.supplier.pk})
+        self.assertWithinQueryBudget('admin.vendor_statement',
+                                     lambda: self._get(self.client, url, self._date_range()))
+
+    # --- Bulk GL posting services ---
+
+    def test_bulk_insert_posted_vouchers(self):
+        # The batched path must not scale with the number of vouchers
+        with override_current_company(self.company):
+            for count in (10, 200):
+                with self.subTest(vouchers=count):
+                    self.assertWithinQueryBudget('services.bulk_insert_posted_vouchers',
+                                                 lambda: post_vouchers_in_bulk(self.ctx, count))
+
+    def test_payment_run(self):
+        with override_current_company(self.company):
+            result = self.assertWithinQueryBudget('services.payment_run', lambda: execute_payment_run(
+                self.company.pk, due_by=self.ctx.end_date, payment_account_id=self.ctx.ledger_account.pk,
+                user=self.user, payment_date=self.ctx.end_date, dry_run=False))
+        self.assertTrue(result.payment_ids, "The budget dataset should leave bills open for the payment run.")
+
+    def test_post_selected_invoices_to_gl(self):
+        # The cost of each further invoice is fixed: one budget for one invoice and for three
+        per_extra_invoice = QUERY_BUDGETS['services.post_selected_invoices_to_gl.per_extra_invoice']
+        with override_current_company(self.company):
+            revenue_account = Account.objects.get(company=self.company, account_number=SALES_REVENUE_ACCOUNT)
+            for count in (1, 3):
+                with self.subTest(invoices=count):
+                    invoice_ids = [receivables_service.create_customer_invoice(
+                        company_id=self.company.pk, created_by_user=self.user, customer_id=self.ctx.customer.pk,
+                        invoice_date=self.ctx.end_date, due_date=self.ctx.end_date + timedelta(days=30),
+                        lines_data=[{'description': "Services", 'unit_price': '100.00',
+                                     'revenue_account_id': revenue_account.pk}],
+                        initial_status=InvoiceStatus.SENT.value, post_to_gl_on_finalize=False).pk
+                        for _ in range(count)]
+                    cache.clear()
+                    posted, failed, errors = self.assertWithinQueryBudget(
+                        'services.post_selected_invoices_to_gl',
+                        lambda: receivables_service.post_selected_invoices_to_gl(self.company.pk, self.user,
+                                                                                 invoice_ids),
+                        budget=(QUERY_BUDGETS['services.post_selected_invoices_to_gl']
+                                + (count - 1) * per_extra_invoice))
+                    self.assertEqual((posted, failed), (count, 0), errors)
+
+    # --- Company onboarding ---
+
+    def test_company_onboarding(self):
+        company = self.assertWithinQueryBudget('services.company_onboarding', lambda: Company.objects.create(
+            subdomain_prefix='qbudget-onboard', name='Onboarding Budget Co', default_currency_code='USD'))
+        company.refresh_from_db()
+        self.assertEqual(company.coa_seeding_status, Company.CoaSeedingStatus.COMPLETED)
@@ -0,0 +1,79 @@
+# crp_accounting/tests/test_recurring_vouchers.py
+"""Recurring voucher generation (recurring_voucher_service.generate_recurring_vouchers)."""
+
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+
+from ..models.coa import Account
+from ..models.journal import DrCrType, TransactionStatus, Voucher
+from ..models.recurring import RecurringVoucherTemplate, RecurringVoucherTemplateLine
+from ..services.recurring_voucher_service import companies_with_due_templates, generate_recurring_vouchers
+from .base import GeneratedCompanyTestCase
+
+
+class GenerateRecurringVouchersTests(GeneratedCompanyTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Three monthly occurrences, all within the generated periods
+        self.template = RecurringVoucherTemplate(
+            company=self.company, name="Monthly rent", narration="Rent", start_date=self.ctx.start_date,
+            end_date=self.ctx.start_date + relativedelta(months=2), auto_post=True,
+            created_by=self.user, updated_by=self.user)
+        self.template.save()
+        for account, dr_cr in ((self.ctx.debit_account, DrCrType.DEBIT), (self.ctx.ledger_account, DrCrType.CREDIT)):
+            RecurringVoucherTemplateLine.objects.create(template=self.template, account=account, dr_cr=dr_cr.value,
+                                                        amount=Decimal('500.00'))
+
+    def _generate(self):
+        return generate_recurring_vouchers(self.company.pk, as_of=self.ctx.end_date, user=self.user)
+
+    def test_last_occurrence_clears_the_next_run_date(self):
+        result = self._generate()
+
+        self.assertEqual((result.vouchers_posted, result.skipped), (3, []))
+        self.assertEqual(set(Voucher.objects.filter(recurring_template=self.template).values_list('status', flat=True)),
+                         {TransactionStatus.POSTED.value})
+        self.template.refresh_from_db()
+        self.assertEqual(self.template.last_generated_date, self.template.end_date)
+        self.assertIsNone(self.template.next_run_date)
+        self.assertNotIn(self.company.pk, companies_with_due_templates(self.ctx.end_date))
+        self.assertEqual(self._generate().vouchers_created, 0)
+
+    def test_extending_the_end_date_resumes_a_finished_template(self):
+        self._generate()
+        self.template.refresh_from_db()
+
+        self.template.end_date += relativedelta(months=1)
+        self.template.save()
+
+        self.assertEqual(self.template.next_run_date, self.template.end_date)
+        self.assertEqual(self._generate().vouchers_posted, 1)
+
+    def test_template_left_due_past_its_end_date_is_cleared(self):
+        RecurringVoucherTemplate.global_objects.filter(pk=self.template.pk).update(
+            last_generated_date=self.template.end_date, next_run_date=self.template.end_date + relativedelta(months=1))
+
+        result = self._generate()
+
+        self.assertEqual(result.vouchers_created, 0)
+        self.template.refresh_from_db()
+        self.assertIsNone(self.template.next_run_date)
+
+    def test_auto_post_template_with_unpostable_account_is_skipped(self):
+        for change in ({'is_active': False}, {'allow_direct_posting': False}):
+            with self.subTest(**change):
+                Account.global_objects.filter(pk=self.ctx.debit_account.pk).update(**change)
+
+                result = self._generate()
+
+                self.assertEqual(result.vouchers_created, 0)
+                self.assertEqual(len(result.skipped), 1)
+                self.assertIn(self.ctx.debit_account.account_name, result.skipped[0])
+                self.template.refresh_from_db()
+                self.assertEqual(self.template.next_run_date, self.template.start_date)  # Retried once fixed
+                Account.global_objects.filter(pk=self.ctx.debit_account.pk).update(
+                    is_active=True, allow_direct_posting=True)
+
+        self.assertEqual(self._generate().vouchers_posted, 3)
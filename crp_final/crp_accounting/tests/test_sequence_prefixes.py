@@ -0,0 +1,34 @@
+# crp_accounting/tests/test_sequence_prefixes.py
+"""Default voucher number prefixes (sequence_service._get_default_prefix) are unique per period."""
+
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from company.models import Company
+
+from ..models.journal import VoucherType
+from ..models.period import AccountingPeriod
+from ..services.sequence_service import _get_default_prefix
+
+
+class DefaultPrefixTests(SimpleTestCase):
+
+    def setUp(self):
+        self.company = Company(subdomain_prefix='acme-west', name="Acme")
+
+    def _prefix(self, start, end):
+        return _get_default_prefix(self.company, VoucherType.GENERAL.value,
+                                   AccountingPeriod(start_date=start, end_date=end))
+
+    def test_calendar_quarter_keeps_the_quarter_code(self):
+        self.assertEqual(self._prefix(date(2024, 4, 1), date(2024, 6, 30)), "ACME--GEN-2024Q2-")
+
+    def test_calendar_months_of_one_quarter_get_distinct_prefixes(self):
+        prefixes = [self._prefix(date(2024, month, 1), end)
+                    for month, end in ((1, date(2024, 1, 31)), (2, date(2024, 2, 29)), (3, date(2024, 3, 31)))]
+        self.assertEqual(prefixes, ["ACME--GEN-2024M01-", "ACME--GEN-2024M02-", "ACME--GEN-2024M03-"])
+
+    def test_other_periods_use_their_start_date(self):
+        self.assertEqual(self._prefix(date(2024, 1, 15), date(2024, 2, 14)), "ACME--GEN-20240115-")
+        self.assertEqual(self._prefix(date(2024, 1, 1), date(2024, 12, 31)), "ACME--GEN-20240101-")
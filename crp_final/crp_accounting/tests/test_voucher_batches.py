@@ -0,0 +1,147 @@
+# crp_accounting/tests/test_voucher_batches.py
+"""Batched voucher workflow (voucher_service.bulk_submit/approve/reject/reverse_vouchers)."""
+
+import uuid
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from crp_core.enums import DrCrType
+
+from ..models.journal import TransactionStatus, Voucher, VoucherApproval, VoucherType
+from ..services import voucher_service
+from .base import GeneratedCompanyTestCase
+
+DEBIT, CREDIT = DrCrType.DEBIT.value, DrCrType.CREDIT.value
+
+
+class VoucherBatchTests(GeneratedCompanyTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.now().date()
+        self.bank = self.ctx.ledger_account
+        self.expense = self.ctx.debit_account
+
+    def _draft(self, amount=Decimal('100.00')):
+        return voucher_service.create_draft_voucher(
+            self.company.pk, self.user, VoucherType.GENERAL.value, self.today, "Batch test", [
+                {'account_id': self.expense.pk, 'dr_cr': DEBIT, 'amount': amount},
+                {'account_id': self.bank.pk, 'dr_cr': CREDIT, 'amount': amount},
+            ])
+
+    def _pending(self, count):
+        drafts = [self._draft() for _ in range(count)]
+        voucher_service.bulk_submit_vouchers(self.company.pk, [draft.pk for draft in drafts], self.user)
+        return list(self._refreshed(drafts).values())
+
+    def _posted(self, count):
+        pending = self._pending(count)
+        voucher_service.bulk_approve_and_post_vouchers(self.company.pk, [voucher.pk for voucher in pending],
+                                                       self.user)
+        return list(self._refreshed(pending).values())
+
+    def _refreshed(self, vouchers):
+        return {voucher.pk: voucher for voucher in Voucher.objects.filter(pk__in=[v.pk for v in vouchers])}
+
+    def assertContiguousNumbers(self, numbers):
+        prefixes = {number.rsplit('-', 1)[0] for number in numbers}
+        self.assertEqual(len(prefixes), 1, numbers)
+        sequence = sorted(int(number.rsplit('-', 1)[1]) for number in numbers)
+        self.assertEqual(sequence, list(range(sequence[0], sequence[0] + len(numbers))), numbers)
+
+    def test_bulk_submit_reports_each_skipped_voucher_and_numbers_the_rest_contiguously(self):
+        drafts = [self._draft() for _ in range(3)]
+        imbalanced = self._draft()
+        imbalanced.lines.filter(dr_cr=CREDIT).update(amount=Decimal('90.00'))
+        already_pending, = self._pending(1)
+        missing_id = uuid.uuid4()
+
+        success, failed, errors = voucher_service.bulk_submit_vouchers(
+            self.company.pk, [draft.pk for draft in drafts] + [imbalanced.pk, already_pending.pk, missing_id],
+            self.user)
+
+        self.assertEqual((success, failed), (3, 3))
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(any(str(missing_id) in str(error) and "Not found" in str(error) for error in errors))
+        self.assertTrue(any("imbalanced" in str(error) for error in errors))
+        self.assertTrue(any(already_pending.voucher_number in str(error) for error in errors))
+
+        vouchers = self._refreshed(drafts + [imbalanced])
+        submitted = [vouchers[draft.pk] for draft in drafts]
+        self.assertTrue(all(v.status == TransactionStatus.PENDING_APPROVAL.value for v in submitted))
+        self.assertContiguousNumbers([v.voucher_number for v in submitted])
+        self.assertEqual(vouchers[imbalanced.pk].status, TransactionStatus.DRAFT.value)
+        self.assertFalse(vouchers[imbalanced.pk].voucher_number)
+        self.assertEqual(VoucherApproval.objects.filter(voucher__in=submitted).count(), 3)
+
+    def test_bulk_approve_posts_pending_vouchers_and_updates_balances(self):
+        pending = self._pending(2)
+        draft = self._draft()
+        bank_balance = self.bank.current_balance
+
+        success, failed, errors = voucher_service.bulk_approve_and_post_vouchers(
+            self.company.pk, [voucher.pk for voucher in pending] + [draft.pk], self.user, comments="Batch")
+
+        self.assertEqual((success, failed), (2, 1))
+        self.assertIn("Not", str(errors[0]))
+        vouchers = self._refreshed(pending + [draft])
+        for voucher in pending:
+            posted = vouchers[voucher.pk]
+            self.assertEqual(posted.status, TransactionStatus.POSTED.value)
+            self.assertTrue(posted.balances_updated)
+            self.assertEqual((posted.approved_by, posted.posted_by), (self.user, self.user))
+        self.assertEqual(vouchers[draft.pk].status, TransactionStatus.DRAFT.value)
+        self.bank.refresh_from_db()
+        self.assertEqual(bank_balance - self.bank.current_balance, Decimal('200.00'))  # Credited twice
+
+    def test_bulk_reject_requires_comments_and_skips_other_statuses(self):
+        pending = self._pending(2)
+        posted, = self._posted(1)
+        ids = [voucher.pk for voucher in pending] + [posted.pk]
+
+        with self.assertRaises(ValidationError):
+            voucher_service.bulk_reject_vouchers(self.company.pk, ids, self.user, comments=" ")
+
+        success, failed, errors = voucher_service.bulk_reject_vouchers(self.company.pk, ids, self.user,
+                                                                       comments="Wrong account")
+        self.assertEqual((success, failed), (2, 1))
+        self.assertIn(posted.voucher_number, str(errors[0]))
+        vouchers = self._refreshed(pending + [posted])
+        self.assertTrue(all(vouchers[v.pk].status == TransactionStatus.REJECTED.value for v in pending))
+        self.assertEqual(vouchers[posted.pk].status, TransactionStatus.POSTED.value)
+
+    def test_bulk_reverse_creates_linked_drafts_and_skips_reversed_vouchers(self):
+        originals = self._posted(2)
+        voucher_service.bulk_reverse_vouchers(self.company.pk, [originals[0].pk], self.user)
+        pending, = self._pending(1)
+
+        success, failed, errors = voucher_service.bulk_reverse_vouchers(
+            self.company.pk, [voucher.pk for voucher in originals] + [pending.pk], self.user)
+
+        self.assertEqual((success, failed), (1, 2))
+        self.assertTrue(any("Already reversed" in str(error) for error in errors))
+        original = Voucher.objects.get(pk=originals[1].pk)
+        self.assertTrue(original.is_reversed)
+        reversal = original.reversed_by_voucher
+        self.assertEqual(reversal.status, TransactionStatus.DRAFT.value)
+        self.assertEqual(sorted((line.account_id, line.dr_cr, line.amount) for line in reversal.lines.all()),
+                         sorted([(self.expense.pk, CREDIT, Decimal('100.00')),
+                                 (self.bank.pk, DEBIT, Decimal('100.00'))]))
+
+    def test_bulk_reverse_post_immediately_numbers_reversals_contiguously(self):
+        originals = self._posted(3)
+        self.bank.refresh_from_db()
+        bank_balance = self.bank.current_balance
+
+        success, failed, _errors = voucher_service.bulk_reverse_vouchers(
+            self.company.pk, [voucher.pk for voucher in originals], self.user, post_immediately=True)
+
+        self.assertEqual((success, failed), (3, 0))
+        reversals = list(Voucher.objects.filter(is_reversal_for__in=[voucher.pk for voucher in originals]))
+        self.assertEqual(len(reversals), 3)
+        self.assertTrue(all(reversal.status == TransactionStatus.POSTED.value for reversal in reversals))
+        self.assertContiguousNumbers([reversal.voucher_number for reversal in reversals])
+        self.bank.refresh_from_db()
+        self.assertEqual(self.bank.current_balance - bank_balance, Decimal('300.00'))
@@ -0,0 +1,118 @@
+# crp_accounting/tests/test_year_end.py
+"""Year-end close (FiscalYear.close_year -> year_end_service.close_fiscal_year)."""
+
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+
+from crp_core.enums import DrCrType
+
+from ..models.journal import TransactionStatus
+from ..models.period import AccountingPeriod, AccountOpeningBalance, FiscalYear
+from ..services.reports_service import generate_balance_sheet
+from .base import GeneratedCompanyTestCase
+
+DEBIT, CREDIT = DrCrType.DEBIT.value, DrCrType.CREDIT.value
+
+
+class CloseYearTests(GeneratedCompanyTestCase):
+    """Closes a past year of its own (2020, one period) into 2021."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fiscal_year = FiscalYear(company=cls.company, name="FY 2020", start_date=date(2020, 1, 1),
+                                     end_date=date(2020, 12, 31))
+        cls.fiscal_year.save()
+        cls.period = AccountingPeriod(company=cls.company, fiscal_year=cls.fiscal_year, name="2020",
+                                      start_date=date(2020, 1, 1), end_date=date(2020, 12, 31))
+        cls.period.save()
+        cls.next_year = FiscalYear(company=cls.company, name="FY 2021", start_date=date(2021, 1, 1),
+                                   end_date=date(2021, 12, 31))
+        cls.next_year.save()
+        AccountingPeriod(company=cls.company, fiscal_year=cls.next_year, name="2021",
+                         start_date=date(2021, 1, 1), end_date=date(2021, 12, 31)).save()
+
+    def setUp(self):
+        super().setUp()
+        self.bank = self.account('1011_bank_account_checking')
+        self.revenue = self.account('4000_sales_revenue')
+        self.expense = self.ctx.debit_account
+        self.retained_earnings = self.account('3200_retained_earnings')
+
+    def _post_year(self):
+        self.post_journal_voucher(date(2020, 3, 1), [(self.bank, DEBIT, Decimal('1000.00')),
+                                                     (self.revenue, CREDIT, Decimal('1000.00'))])
+        self.post_journal_voucher(date(2020, 6, 1), [(self.expense, DEBIT, Decimal('300.00')),
+                                                     (self.bank, CREDIT, Decimal('300.00'))])
+        self.period.lock_period()
+
+    def test_close_year_posts_closing_entry_into_retained_earnings(self):
+        self._post_year()
+
+        self.fiscal_year.close_year(user=self.user)
+
+        self.assertEqual(self.fiscal_year.status, "Closed")
+        self.assertFalse(self.fiscal_year.is_active)
+        voucher = self.fiscal_year.closing_voucher
+        self.assertTrue(voucher.is_year_end_closing)
+        self.assertEqual(voucher.status, TransactionStatus.POSTED.value)
+        self.assertEqual((voucher.date, voucher.accounting_period_id), (date(2020, 12, 31), self.period.pk))
+        self.assertEqual(
+            sorted((line.account_id, line.dr_cr, line.amount) for line in voucher.lines.all()),
+            sorted([(self.revenue.pk, DEBIT, Decimal('1000.00')), (self.expense.pk, CREDIT, Decimal('300.00')),
+                    (self.retained_earnings.pk, CREDIT, Decimal('700.00'))]))
+
+    def test_close_year_carries_balance_sheet_balances_forward(self):
+        self._post_year()
+
+        self.fiscal_year.close_year(user=self.user)
+
+        self.next_year.refresh_from_db()
+        self.assertTrue(self.next_year.opening_balances_posted)
+        openings = {row.account_id: (row.debit_amount, row.credit_amount)
+                    for row in AccountOpeningBalance.objects.filter(fiscal_year=self.next_year)}
+        self.assertEqual(openings, {self.bank.pk: (Decimal('700.00'), Decimal('0.00')),
+                                    self.retained_earnings.pk: (Decimal('0.00'), Decimal('700.00'))})
+
+        # Reports of the next year start from the opening rows; the P&L accounts start at zero
+        balance_sheet = generate_balance_sheet(self.company.pk, date(2021, 1, 31))
+        self.assertTrue(balance_sheet['is_balanced'])
+        self.assertEqual(balance_sheet['assets']['total'], Decimal('700.00'))
+        self.assertEqual(balance_sheet['equity']['total'], Decimal('700.00'))
+        current_year_earnings = balance_sheet['equity']['hierarchy'][-1]
+        self.assertEqual(current_year_earnings['balance'], Decimal('0.00'))
+
+    def test_close_year_requires_locked_periods(self):
+        with self.assertRaises(ValidationError):
+            self.fiscal_year.close_year(user=self.user)
+        self.fiscal_year.refresh_from_db()
+        self.assertNotEqual(self.fiscal_year.status, "Closed")
+
+    def test_close_year_requires_the_next_fiscal_year(self):
+        self._post_year()
+        for later_year in FiscalYear.objects.filter(start_date__gt=self.fiscal_year.end_date):
+            later_year.periods.all().delete()
+            later_year.delete()
+
+        with self.assertRaisesMessage(ValidationError, "Create the following fiscal year first"):
+            self.fiscal_year.close_year(user=self.user)
+
+    def test_close_year_requires_a_period_covering_the_year_end(self):
+        self._post_year()
+        self.period.end_date = date(2020, 11, 30)
+        self.period.save(update_fields=['end_date', 'updated_at'])
+
+        with self.assertRaisesMessage(ValidationError, "No accounting period covers the year-end date"):
+            self.fiscal_year.close_year(user=self.user)
+
+    def test_close_year_requires_a_retained_earnings_account(self):
+        self._post_year()
+        acc_settings = self.company.accounting_settings
+        acc_settings.default_retained_earnings_account = None
+        acc_settings.save(update_fields=['default_retained_earnings_account'])
+
+        with self.assertRaisesMessage(ValidationError, "Set a Default Retained Earnings Account"):
+            self.fiscal_year.close_year(user=self.user)
+        self.assertFalse(AccountOpeningBalance.objects.filter(fiscal_year=self.next_year).exists())
@@ -0,0 +1,189 @@
+# crp_accounting/utils/charts.py
+"""
+Report charts rendered in-process with Pillow (no browser / kaleido subprocess).
+
+Rendered images are cached by a hash of what is drawn (the chart steps, title and size), so an
+unchanged P&L (same company, dates and posted ledger) is rendered once and afterwards served from
+the Django cache. New postings change the report lines and therefore the key; stale entries simply
+expire.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import logging
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+
+from crp_core.instrumentation import record_cache_lookup
+
+from ..models.coa import PLSection
+from .export_backends import ExportBackendUnavailable, load_export_backend
+
+logger = logging.getLogger("crp_accounting.utils.charts")
+
+CHART_CACHE_TIMEOUT = 60 * 60 * 24 * 7  # Seconds; keys are content hashes, so entries never go stale
+CHART_RENDERER_VERSION = 1  # Bump when the drawing changes, to invalidate cached images
+
+# P&L sections that reduce profit (drawn as decreases)
+PL_DECREASE_SECTIONS = frozenset({
+    PLSection.COGS.value, PLSection.OPERATING_EXPENSE.value, PLSection.DEPRECIATION_AMORTIZATION.value,
+    PLSection.OTHER_EXPENSE.value, PLSection.TAX_EXPENSE.value,
+})
+
+INCREASE_COLOR = (46, 139, 87)
+DECREASE_COLOR = (192, 57, 43)
+TOTAL_COLOR = (44, 111, 187)
+TEXT_COLOR = (51, 51, 51)
+GRID_COLOR = (221, 221, 221)
+CONNECTOR_COLOR = (120, 120, 120)
+
+
+@dataclass(frozen=True)
+class WaterfallStep:
+    label: str
+    value: Decimal  # Change for relative steps, level for totals
+    is_total: bool
+
+
+def pl_waterfall_steps(report_lines: List[Dict[str, Any]]) -> List[WaterfallStep]:
+    """Waterfall steps of a P&L: section amounts as increases/decreases, subtotals as totals."""
+    steps = []
+    for line in report_lines:
+        amount = line.get('amount')
+        if amount is None:
+            continue
+        if line.get('is_subtotal'):
+            steps.append(WaterfallStep(str(line['title']), amount, True))
+        else:
+            sign = -1 if line['section_key'] in PL_DECREASE_SECTIONS else 1
+            steps.append(WaterfallStep(str(line['title']), sign * amount, False))
+    return steps
+
+
+def _chart_cache_key(kind: str, steps: List[WaterfallStep], title: str, width: int, height: int) -> str:
+    payload = json.dumps([CHART_RENDERER_VERSION, title, width, height,
+                          [[step.label, str(step.value), step.is_total] for step in steps]])
+    return f"acc_chart_{kind}_{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _load_font(PIL, size: int):
+    try:
+        return PIL.ImageFont.load_default(size=size)
+    except (TypeError, OSError):  # Pillow without FreeType / before 10.1: fixed-size bitmap font
+        return PIL.ImageFont.load_default()
+
+
+def _wrap_label(draw, text: str, font, max_width: int) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and draw.textlength(candidate, font=font) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines[:3]
+
+
+def _nice_tick(raw_step: Decimal) -> Decimal:
+    """Rounds a grid step up to 1, 2 or 5 times a power of ten."""
+    if raw_step <= 0:
+        return Decimal('1')
+    magnitude = Decimal(10) ** (raw_step.adjusted())
+    for multiple in (1, 2, 5, 10):
+        if raw_step <= magnitude * multiple:
+            return magnitude * multiple
+    return magnitude * 10
+
+
+def render_waterfall_png(steps: List[WaterfallStep], title: str, width: int = 1000, height: int = 520) -> bytes:
+    """Draws a waterfall chart of `steps` and returns it as PNG bytes."""
+    PIL = load_export_backend('png')
+    image = PIL.Image.new('RGB', (width, height), 'white')
+    draw = PIL.ImageDraw.Draw(image)
+    title_font, font = _load_font(PIL, 20), _load_font(PIL, 12)
+
+    # Bar start/end levels
+    bars, running = [], Decimal('0')
+    for step in steps:
+        start, end = (Decimal('0'), step.value) if step.is_total else (running, running + step.value)
+        bars.append((step, start, end))
+        running = end
+    levels = [Decimal('0')] + [level for _step, start, end in bars for level in (start, end)]
+    tick = _nice_tick((max(levels) - min(levels)) / 5)
+    low = (min(levels) / tick).to_integral_value(rounding=ROUND_FLOOR) * tick
+    high = (max(levels) / tick).to_integral_value(rounding=ROUND_CEILING) * tick + tick
+
+    left, right, top, bottom = 100, width - 30, 60, height - 70
+
+    def y_of(level: Decimal) -> float:
+        return bottom - float((level - low) / (high - low)) * (bottom - top)
+
+    draw.text((width / 2, 25), title, fill=TEXT_COLOR, font=title_font, anchor='mm')
+    level = low
+    while level <= high:  # Horizontal grid with value labels
+        y = y_of(level)
+        draw.line([(left, y), (right, y)], fill=GRID_COLOR)
+        draw.text((left - 8, y), f"{level:,.0f}", fill=TEXT_COLOR, font=font, anchor='rm')
+        level += tick
+    draw.line([(left, y_of(Decimal('0'))), (right, y_of(Decimal('0')))], fill=CONNECTOR_COLOR)
+
+    slot = (right - left) / max(len(bars), 1)
+    bar_width = slot * 0.6
+    previous_right = previous_level = None
+    for index, (step, start, end) in enumerate(bars):
+        x0 = left + slot * index + (slot - bar_width) / 2
+        x1 = x0 + bar_width
+        color = TOTAL_COLOR if step.is_total else (INCREASE_COLOR if step.value >= 0 else DECREASE_COLOR)
+        y_top, y_bottom = sorted((y_of(start), y_of(end)))
+        draw.rectangle([(x0, y_top), (x1, max(y_bottom, y_top + 1))], fill=color)
+        if previous_right is not None:
+            draw.line([(previous_right, y_of(previous_level)), (x0, y_of(previous_level))], fill=CONNECTOR_COLOR)
+        previous_right, previous_level = x1, end
+
+        value_text = f"{step.value:,.2f}" if step.is_total else f"{step.value:+,.2f}"
+        above = end >= start
+        draw.text(((x0 + x1) / 2, y_top - 4 if above else y_bottom + 4), value_text, fill=TEXT_COLOR, font=font,
+                  anchor='md' if above else 'ma')
+        for line_no, label_line in enumerate(_wrap_label(draw, step.label, font, int(slot) - 6)):
+            draw.text(((x0 + x1) / 2, bottom + 10 + line_no * 15), label_line, fill=TEXT_COLOR, font=font,
+                      anchor='ma')
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def pl_waterfall_png(report_lines: List[Dict[str, Any]], title: str = "Profit & Loss Waterfall",
+                     width: int = 1000, height: int = 520) -> Optional[bytes]:
+    """The P&L waterfall as PNG bytes, rendered once per distinct content. None if there is nothing to draw."""
+    steps = pl_waterfall_steps(report_lines)
+    if not steps:
+        return None
+    cache_key = _chart_cache_key('pl_waterfall', steps, title, width, height)
+    png = cache.get(cache_key)
+    record_cache_lookup(hit=png is not None)
+    if png is not None:
+        return png
+    try:
+        png = render_waterfall_png(steps, title, width, height)
+    except ExportBackendUnavailable as e:
+        logger.error(f"Cannot render P&L waterfall chart: {e}")
+        return None
+    try:
+        cache.set(cache_key, png, timeout=CHART_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Failed to cache P&L waterfall chart: {e}", exc_info=True)
+    return png
+
+
+def png_data_uri(png: Optional[bytes]) -> Optional[str]:
+    """`data:` URI for embedding a PNG in HTML / PDF templates."""
+    return f"data:image/png;base64,{base64.b64encode(png).decode('ascii')}" if png else None
@@ -0,0 +1,76 @@
+# crp_accounting/utils/export_backends.py
+"""
+Lazily loaded libraries behind the report exports (Excel, PDF, chart images).
+
+openpyxl, xhtml2pdf (reportlab, pyhanko, ...) and Pillow take a noticeable share of process
+start-up time and memory, while most web workers and Celery processes never export anything.
+Each export format is registered here with the modules it needs; the modules are imported the
+first time the format is used (`load_export_backend`). Availability checks
+(`is_export_backend_available`) only look the package up on sys.path and import nothing.
+
+Startup cost can be measured with `manage.py benchmark_startup`.
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+from types import ModuleType
+from typing import Dict, Tuple
+
+logger = logging.getLogger("crp_accounting.utils.export_backends")
+
+
+class ExportBackendUnavailable(ImportError):
+    """The library needed for an export format is not installed."""
+
+
+# format -> (module returned to the caller, submodules loaded with it)
+_EXPORT_BACKENDS: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+_loaded_backends: Dict[str, ModuleType] = {}
+_load_lock = threading.Lock()
+
+
+def register_export_backend(export_format: str, module_path: str, *submodules: str) -> None:
+    """Registers the module behind an export format. Nothing is imported until first use."""
+    _EXPORT_BACKENDS[export_format] = (module_path, submodules)
+    _loaded_backends.pop(export_format, None)
+
+
+def is_export_backend_available(export_format: str) -> bool:
+    """True if the format's library is installed. Does not import it."""
+    registered = _EXPORT_BACKENDS.get(export_format)
+    if registered is None:
+        return False
+    top_level_package = registered[0].split('.', 1)[0]
+    return importlib.util.find_spec(top_level_package) is not None
+
+
+def load_export_backend(export_format: str) -> ModuleType:
+    """Imports (once per process) and returns the module registered for `export_format`."""
+    module = _loaded_backends.get(export_format)
+    if module is not None:
+        return module
+    try:
+        module_path, submodules = _EXPORT_BACKENDS[export_format]
+    except KeyError:
+        raise ValueError(f"No export backend registered for format '{export_format}'.")
+    with _load_lock:
+        module = _loaded_backends.get(export_format)
+        if module is None:
+            try:
+                module = importlib.import_module(module_path)
+                for submodule in submodules:
+                    importlib.import_module(submodule)
+            except ImportError as e:
+                logger.error(f"Export backend '{export_format}' ({module_path}) could not be imported: {e}")
+                raise ExportBackendUnavailable(
+                    f"'{module_path}' is required for {export_format} export. Please install it.") from e
+            _loaded_backends[export_format] = module
+            logger.debug(f"Export backend '{export_format}' loaded ({module_path}).")
+    return module
+
+
+register_export_backend('xlsx', 'openpyxl', 'openpyxl.styles', 'openpyxl.utils')
+register_export_backend('pdf', 'xhtml2pdf.pisa')
+register_export_backend('png', 'PIL', 'PIL.Image', 'PIL.ImageDraw', 'PIL.ImageFont')
@@ -4,28 +4,23 @@ import io
 import logging
 from datetime import date
 from decimal import Decimal
+from functools import lru_cache
+from types import SimpleNamespace
 from typing import List, Dict, Any, Optional, Tuple
 
-# --- Excel ---
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils import get_column_letter
-
 # --- PDF ---
 from django.template.loader import render_to_string # To render HTML templates
-from xhtml2pdf import pisa                  # To generate PDF from HTML
 # from django.conf import settings # Optional: To locate templates
 
-# --- Graphs ---
-import plotly.graph_objects as go
+# --- Export libraries (openpyxl, xhtml2pdf, Pillow) are imported on first use ---
+from .charts import pl_waterfall_png, png_data_uri
+from .export_backends import load_export_backend
 
-from ..models.coa import PLSection
-# import plotly.io as pio # Not strictly needed if only writing bytes
 
 # --- Local Type Imports (Adapt if your types are elsewhere) ---
 # Assuming these are defined in services or a types file
 from ..services.reports_service import (
-    ProfitLossLineItem, ProfitLossAccountDetail,
+    ProfitLossAccountDetail,
     BalanceSheetNode
 )
 
@@ -34,14 +29,26 @@ logger = logging.getLogger(__name__)
 # =============================================================================
 # General Styling Constants (Excel)
 # =============================================================================
-HEADER_FONT = Font(bold=True, size=14)
-SECTION_FONT = Font(bold=True, size=12)
-BOLD_FONT = Font(bold=True)
 ACCOUNTING_FORMAT = '#,##0.00_);(#,##0.00)'
-WRAP_ALIGNMENT = Alignment(wrap_text=True, vertical='top')
-CENTER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
-RIGHT_ALIGNMENT = Alignment(horizontal='right', vertical='center')
-THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+
+
+@lru_cache(maxsize=None)
+def _excel_styles() -> SimpleNamespace:
+    """Shared openpyxl styles, built on the first Excel export (loads openpyxl)."""
+    openpyxl = load_export_backend('xlsx')
+    Font, Alignment = openpyxl.styles.Font, openpyxl.styles.Alignment
+    Border, Side = openpyxl.styles.Border, openpyxl.styles.Side
+    thin = Side(style='thin')
+    return SimpleNamespace(
+        Font=Font, Alignment=Alignment,
+        HEADER_FONT=Font(bold=True, size=14),
+        SECTION_FONT=Font(bold=True, size=12),
+        BOLD_FONT=Font(bold=True),
+        WRAP_ALIGNMENT=Alignment(wrap_text=True, vertical='top'),
+        CENTER_ALIGNMENT=Alignment(horizontal='center', vertical='center'),
+        RIGHT_ALIGNMENT=Alignment(horizontal='right', vertical='center'),
+        THIN_BORDER=Border(left=thin, right=thin, top=thin, bottom=thin),
+    )
 
 # =============================================================================
 # Excel Generation Helpers
@@ -49,15 +56,16 @@ THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side
 
 def _format_excel_header(sheet, report_title: str, report_info: Dict[str, Any]):
     """Adds standard header rows to an Excel sheet."""
-    sheet.cell(row=1, column=1, value=report_title).font = HEADER_FONT
+    xl = _excel_styles()
+    sheet.cell(row=1, column=1, value=report_title).font = xl.HEADER_FONT
     row = 2
     for key, value in report_info.items():
-        sheet.cell(row=row, column=1, value=f"{key}:").font = BOLD_FONT
+        sheet.cell(row=row, column=1, value=f"{key}:").font = xl.BOLD_FONT
         sheet.cell(row=row, column=2, value=value)
         row += 1
     # Add currency warning if applicable
     if 'report_currency' in report_info:
-        sheet.cell(row=row-1, column=3, value="(Totals may mix currencies)").font = Font(italic=True, size=9)
+        sheet.cell(row=row-1, column=3, value="(Totals may mix currencies)").font = xl.Font(italic=True, size=9)
 
     return row + 1 # Return next available row
 
@@ -71,6 +79,7 @@ def _add_excel_hierarchy_rows(
     level_indent_size: int = 2 # Spaces per indent level
 ) -> int:
     """Recursively adds hierarchical data to Excel rows."""
+    xl = _excel_styles()
     current_row = start_row
     base_indent = " " * (indent_level * level_indent_size)
 
@@ -80,20 +89,20 @@ def _add_excel_hierarchy_rows(
 
         # Column 1: Name (indented)
         name_cell = sheet.cell(row=current_row, column=1, value=f"{indent}{node['name']}")
-        name_cell.alignment = Alignment(wrap_text=False, indent=node.get('level', indent_level)) # Use openpyxl indent
-        if is_group: name_cell.font = BOLD_FONT
+        name_cell.alignment = xl.Alignment(wrap_text=False, indent=node.get('level', indent_level)) # Use openpyxl indent
+        if is_group: name_cell.font = xl.BOLD_FONT
 
         # Column for Balance
         balance = node.get('balance', node.get('amount')) # Handle BS 'balance' or P&L 'amount'
         if balance is not None:
             balance_cell = sheet.cell(row=current_row, column=balance_col_idx, value=balance)
             balance_cell.number_format = ACCOUNTING_FORMAT
-            balance_cell.alignment = RIGHT_ALIGNMENT
-            if is_group: balance_cell.font = BOLD_FONT
+            balance_cell.alignment = xl.RIGHT_ALIGNMENT
+            if is_group: balance_cell.font = xl.BOLD_FONT
 
         # Column for Currency (optional)
         if currency_col_idx and not is_group and node.get('currency'):
-             sheet.cell(row=current_row, column=currency_col_idx, value=node['currency']).alignment = CENTER_ALIGNMENT
+             sheet.cell(row=current_row, column=currency_col_idx, value=node['currency']).alignment = xl.CENTER_ALIGNMENT
 
         current_row += 1
         # Recursively add children
@@ -108,14 +117,14 @@ def _add_excel_hierarchy_rows(
              account_indent = " " * ((indent_level + 1) * level_indent_size)
              for acc in node['accounts']:
                   acc_name_cell = sheet.cell(row=current_row, column=1, value=f"{account_indent}{acc['account_number']} - {acc['account_name']}")
-                  acc_name_cell.alignment = Alignment(wrap_text=False, indent=indent_level+1)
+                  acc_name_cell.alignment = xl.Alignment(wrap_text=False, indent=indent_level+1)
 
                   acc_amount_cell = sheet.cell(row=current_row, column=balance_col_idx, value=acc['amount'])
                   acc_amount_cell.number_format = ACCOUNTING_FORMAT
-                  acc_amount_cell.alignment = RIGHT_ALIGNMENT
+                  acc_amount_cell.alignment = xl.RIGHT_ALIGNMENT
 
                   if currency_col_idx and acc.get('currency'):
-                       sheet.cell(row=current_row, column=currency_col_idx, value=acc['currency']).alignment = CENTER_ALIGNMENT
+                       sheet.cell(row=current_row, column=currency_col_idx, value=acc['currency']).alignment = xl.CENTER_ALIGNMENT
                   current_row += 1
 
     return current_row
@@ -141,7 +150,8 @@ def _auto_adjust_excel_columns(sheet, min_width=10, max_width=60):
 
 def generate_balance_sheet_excel(report_data: Dict[str, Any]) -> bytes:
     """Generates a Balance Sheet report as an Excel file (.xlsx) in memory."""
-    workbook = Workbook()
+    xl = _excel_styles()
+    workbook = load_export_backend('xlsx').Workbook()
     sheet = workbook.active
     sheet.title = f"Balance Sheet {report_data.get('as_of_date')}"
 
@@ -157,42 +167,42 @@ def generate_balance_sheet_excel(report_data: Dict[str, Any]) -> bytes:
     COL_CURRENCY = 3
 
     # Assets
-    sheet.cell(row=current_row, column=COL_NAME, value="ASSETS").font = SECTION_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="ASSETS").font = xl.SECTION_FONT
     current_row += 1
     assets_data = report_data.get('assets', {})
     current_row = _add_excel_hierarchy_rows(sheet, assets_data.get('hierarchy', []), current_row, COL_BALANCE, COL_CURRENCY)
-    sheet.cell(row=current_row, column=COL_NAME, value="Total Assets").font = BOLD_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="Total Assets").font = xl.BOLD_FONT
     cell = sheet.cell(row=current_row, column=COL_BALANCE, value=assets_data.get('total', 0))
-    cell.font = BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = RIGHT_ALIGNMENT
+    cell.font = xl.BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = xl.RIGHT_ALIGNMENT
     current_row += 2
 
     # Liabilities
-    sheet.cell(row=current_row, column=COL_NAME, value="LIABILITIES").font = SECTION_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="LIABILITIES").font = xl.SECTION_FONT
     current_row += 1
     liabilities_data = report_data.get('liabilities', {})
     current_row = _add_excel_hierarchy_rows(sheet, liabilities_data.get('hierarchy', []), current_row, COL_BALANCE, COL_CURRENCY)
-    sheet.cell(row=current_row, column=COL_NAME, value="Total Liabilities").font = BOLD_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="Total Liabilities").font = xl.BOLD_FONT
     cell = sheet.cell(row=current_row, column=COL_BALANCE, value=liabilities_data.get('total', 0))
-    cell.font = BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = RIGHT_ALIGNMENT
+    cell.font = xl.BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = xl.RIGHT_ALIGNMENT
     current_row += 2
 
     # Equity
-    sheet.cell(row=current_row, column=COL_NAME, value="EQUITY").font = SECTION_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="EQUITY").font = xl.SECTION_FONT
     current_row += 1
     equity_data = report_data.get('equity', {})
     current_row = _add_excel_hierarchy_rows(sheet, equity_data.get('hierarchy', []), current_row, COL_BALANCE, COL_CURRENCY) # Includes RE
-    sheet.cell(row=current_row, column=COL_NAME, value="Total Equity").font = BOLD_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="Total Equity").font = xl.BOLD_FONT
     cell = sheet.cell(row=current_row, column=COL_BALANCE, value=equity_data.get('total', 0))
-    cell.font = BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = RIGHT_ALIGNMENT
+    cell.font = xl.BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = xl.RIGHT_ALIGNMENT
     current_row += 2
 
     # Balance Check Summary
-    sheet.cell(row=current_row, column=COL_NAME, value="Total Liabilities + Equity").font = BOLD_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="Total Liabilities + Equity").font = xl.BOLD_FONT
     cell = sheet.cell(row=current_row, column=COL_BALANCE, value=liabilities_data.get('total', 0) + equity_data.get('total', 0))
-    cell.font = BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = RIGHT_ALIGNMENT
+    cell.font = xl.BOLD_FONT; cell.number_format = ACCOUNTING_FORMAT; cell.alignment = xl.RIGHT_ALIGNMENT
     current_row += 1
-    sheet.cell(row=current_row, column=COL_NAME, value="Balanced Check").font = BOLD_FONT
-    sheet.cell(row=current_row, column=COL_BALANCE, value="Balanced" if report_data.get('is_balanced') else "OUT OF BALANCE").font = BOLD_FONT
+    sheet.cell(row=current_row, column=COL_NAME, value="Balanced Check").font = xl.BOLD_FONT
+    sheet.cell(row=current_row, column=COL_BALANCE, value="Balanced" if report_data.get('is_balanced') else "OUT OF BALANCE").font = xl.BOLD_FONT
 
     _auto_adjust_excel_columns(sheet, max_width=70) # Adjust after adding all data
 
@@ -218,7 +228,7 @@ def generate_balance_sheet_pdf(report_data: Dict[str, Any]) -> bytes:
 
         buffer = io.BytesIO()
         # Generate PDF
-        pisa_status = pisa.CreatePDF(
+        pisa_status = load_export_backend('pdf').CreatePDF(
             src=html,                # Source HTML
             dest=buffer,             # File handle to recieve result
             # link_callback=link_callback # Optional handler for images/static files if needed
@@ -243,7 +253,7 @@ def generate_balance_sheet_pdf(report_data: Dict[str, Any]) -> bytes:
 
 def generate_profit_loss_excel(report_data: Dict[str, Any]) -> bytes:
     """Generates a Profit & Loss report as an Excel file (.xlsx) in memory."""
-    workbook = Workbook()
+    workbook = load_export_backend('xlsx').Workbook()
     sheet = workbook.active
     sheet.title = f"Profit & Loss {report_data.get('start_date')} to {report_data.get('end_date')}"
 
@@ -285,11 +295,12 @@ def generate_profit_loss_excel(report_data: Dict[str, Any]) -> bytes:
 def generate_profit_loss_pdf(report_data: Dict[str, Any]) -> bytes:
     """Generates a Profit & Loss report as a PDF file in memory using HTML templates."""
     template_path = 'reports/profit_loss_pdf.html' # Example path
-    context = {'report': report_data}
+    context = {'report': report_data,
+               'pl_waterfall_chart': png_data_uri(generate_profit_loss_waterfall_png(report_data))}
     try:
         html = render_to_string(template_path, context)
         buffer = io.BytesIO()
-        pisa_status = pisa.CreatePDF(src=html, dest=buffer)
+        pisa_status = load_export_backend('pdf').CreatePDF(src=html, dest=buffer)
         if pisa_status.err:
             logger.error(f"PDF generation error for P&L {report_data.get('start_date')}-{report_data.get('end_date')}: {pisa_status.err}")
             raise RuntimeError(f"PDF generation failed: {pisa_status.err}")
@@ -301,78 +312,12 @@ def generate_profit_loss_pdf(report_data: Dict[str, Any]) -> bytes:
 
 
 # =============================================================================
-# Graph Generation (Plotly - Returning Image Bytes)
+# Graph Generation (Pillow via utils/charts.py - Returning Image Bytes)
 # =============================================================================
 
-def _create_pl_waterfall_figure(report_lines: List[ProfitLossLineItem]) -> Optional[go.Figure]:
-    """Creates a Plotly Waterfall chart figure for P&L."""
-    measures = []
-    values = []
-    texts = []
-    y_labels = []
-
-    # Extract relevant data - adjust based on how detailed you want it
-    # This example uses major sections/subtotals
-    keys_to_include = [
-        PLSection.REVENUE.value, PLSection.COGS.value, 'GROSS_PROFIT',
-        PLSection.OPERATING_EXPENSE.value, 'OPERATING_PROFIT', # Add others as needed
-        'NET_INCOME'
-    ]
-    section_map = {line['section_key']: line for line in report_lines}
-    last_value = 0
-
-    for key in keys_to_include:
-        if key in section_map:
-            line = section_map[key]
-            value = line['amount']
-            y_labels.append(line['title'])
-
-            if line['is_subtotal']:
-                measures.append("total")
-                values.append(value)
-                texts.append(f"{value:,.2f}")
-                last_value = value
-            else:
-                # Calculate change from last subtotal/value
-                delta = value
-                # Adjust delta sign based on impact (Expenses/COGS reduce profit)
-                if key in [PLSection.COGS.value, PLSection.OPERATING_EXPENSE.value, PLSection.TAX_EXPENSE.value, PLSection.OTHER_EXPENSE.value]:
-                    delta = -value # Waterfall expects negative for decreases
-
-                measures.append("relative")
-                values.append(delta)
-                texts.append(f"{delta:+,.2f}") # Show sign for relative changes
-                last_value += delta # This is conceptually wrong for waterfall value calc, need to fix waterfall logic if used.
-                                    # Waterfall values usually represent the change. Totals are automatic.
-
-    # Basic Waterfall - Needs refinement for accurate value progression
-    if not y_labels: return None
-    fig = go.Figure(go.Waterfall(
-        name = "P&L", orientation = "v",
-        measure = measures, # ["relative", "relative", "total", "relative", "total", ...]
-        x = y_labels,
-        textposition = "outside",
-        # text = texts, # Let Plotly calculate text from y
-        y = values, # Should contain the delta values for relative, absolute for total
-        connector = {"line":{"color":"rgb(63, 63, 63)"}},
-    ))
-    fig.update_layout(title="Profit & Loss Waterfall", showlegend=False)
-    return fig
-
-
 def generate_profit_loss_waterfall_png(report_data: Dict[str, Any]) -> Optional[bytes]:
-    """Generates a P&L Waterfall chart as PNG bytes."""
-    fig = _create_pl_waterfall_figure(report_data.get('report_lines', []))
-    if fig:
-        try:
-            buffer = io.BytesIO()
-            fig.write_image(buffer, format="png", scale=2) # Use Kaleido
-            buffer.seek(0)
-            return buffer.getvalue()
-        except Exception as e:
-            logger.error(f"Failed to generate P&L waterfall image: {e}")
-            # This might happen if Kaleido is not installed or configured correctly
-    return None
+    """Generates a P&L Waterfall chart as PNG bytes (cached per distinct report content)."""
+    return pl_waterfall_png(report_data.get('report_lines', []))
 
 # --- Add more graph functions as needed (e.g., BS composition pie charts) ---
 # def generate_asset_composition_pie_png(report_data: ...) -> Optional[bytes]:
@@ -389,7 +334,7 @@ def generate_trial_balance_excel(report_data: Dict[str, Any]) -> bytes:
     # You would adapt the _add_excel_hierarchy_rows or write a specific one
     # Use the 'hierarchy' data from generate_trial_balance_structured
     # Columns: Account Number, Account Name, Debit, Credit
-    workbook = Workbook()
+    workbook = load_export_backend('xlsx').Workbook()
     sheet = workbook.active
     # ... add headers, iterate hierarchy, format ...
     buffer = io.BytesIO()
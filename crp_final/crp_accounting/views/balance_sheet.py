@@ -16,7 +16,10 @@ from rest_framework.exceptions import ParseError, PermissionDenied
 from company.models import Company  # For type hinting and direct use
 
 # --- Local Imports ---
+from crp_core.instrumentation import span
+
 from ..services import reports_service
+from .coa import LedgerConditionalGetMixin, REPORT_RENDERER_CLASSES
 from ..serializers.balance_sheet import BalanceSheetResponseSerializer
 
 logger = logging.getLogger(__name__)
@@ -74,11 +77,12 @@ Checks if Assets = Liabilities + Equity.
     },
     tags=['Reports (API)']
 )
-class BalanceSheetView(CompanyScopedAPIViewMixin):  # Inherits from your mixin
+class BalanceSheetView(LedgerConditionalGetMixin, CompanyScopedAPIViewMixin):  # Inherits from your mixin
     """
     API endpoint to generate the Balance Sheet report.
     Company context is determined from request.company (middleware) or company_id GET param for SUs.
     """
+    renderer_classes = REPORT_RENDERER_CLASSES
 
     def _get_target_company_for_report(self, request) -> Company:
         """
@@ -139,6 +143,13 @@ class BalanceSheetView(CompanyScopedAPIViewMixin):  # Inherits from your mixin
             logger.info(f"{log_prefix} Non-SU using request.company '{non_su_company.name}' (PK:{non_su_company.pk}).")
             return non_su_company
 
+    def get_report_company_id(self, request):
+        # Superusers may pick the company with ?company_id=; errors are reported by get()
+        try:
+            return self._get_target_company_for_report(request).pk
+        except (ParseError, PermissionDenied, Http404):
+            return None
+
     def get(self, request, *args, **kwargs):
         # --- Determine Target Company ---
         try:
@@ -197,4 +208,6 @@ class BalanceSheetView(CompanyScopedAPIViewMixin):  # Inherits from your mixin
         # Pass request and target_company to serializer context if needed by serializer fields
         serializer_context = {'request': request, 'company': target_company}
         serializer = BalanceSheetResponseSerializer(report_data, context=serializer_context)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        with span('serialize'):
+            data = serializer.data
+        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
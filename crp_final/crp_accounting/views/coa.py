@@ -13,6 +13,7 @@ from rest_framework.generics import get_object_or_404  # Correct import
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import BrowsableAPIRenderer
 from django_filters.rest_framework import DjangoFilterBackend
 
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiTypes, inline_serializer
@@ -31,9 +32,13 @@ from ..serializers.coa import (
 )
 # --- Service Imports ---
 from ..services import ledger_service
+from ..services.ledger_version_service import get_ledger_last_modified
 
 # --- Core Mixin Imports ---
-from crp_core.mixins import CompanyScopedViewSetMixin, CompanyScopedAPIViewMixin  # Ensure this path is correct
+from crp_core.mixins import CompanyScopedViewSetMixin, CompanyScopedAPIViewMixin, ConditionalGetMixin  # Ensure this path is correct
+from crp_core.instrumentation import span
+from crp_core.pagination import KeysetCursorPagination
+from crp_core.renderers import FastJSONRenderer
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +50,26 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 1000
 
 
+# --- Conditional GET for report endpoints ---
+class LedgerConditionalGetMixin(ConditionalGetMixin):
+    """
+    ETag / Last-Modified from the company's latest ledger change (ledger_version_service), so
+    unchanged reports are answered with 304 without being recomputed. Put it before the
+    CompanyScoped mixin in the bases.
+    """
+
+    def get_report_company_id(self, request):
+        return self.current_company.pk if self.current_company else None
+
+    def get_last_modified(self, request):
+        company_id = self.get_report_company_id(request)
+        return get_ledger_last_modified(company_id) if company_id else None
+
+
+# --- Report rendering (amounts are serialized as strings, see crp_core.renderers) ---
+REPORT_RENDERER_CLASSES = [FastJSONRenderer, BrowsableAPIRenderer]
+
+
 # =============================================================================
 # AccountGroup ViewSet
 # =============================================================================
@@ -155,7 +180,7 @@ class AccountBulkActionResponseSerializer(serializers.Serializer):
 )
 class AccountViewSet(CompanyScopedViewSetMixin):
     queryset = Account.objects.all()  # CompanyManager handles scoping
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetCursorPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = {
         'account_group__id': ['exact'], 'account_group__name': ['exact', 'icontains'],
@@ -166,7 +191,7 @@ class AccountViewSet(CompanyScopedViewSetMixin):
     search_fields = ['account_number', 'account_name', 'description', 'account_group__name']
     ordering_fields = ('account_number', 'account_name', 'account_group__name', 'account_type',
                        'is_active', 'created_at', 'current_balance', 'updated_at')
-    ordering = ['account_group__name', 'account_number']
+    ordering = ['account_number']  # Unique per company: keyset pages on the (company, account_number) index
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -321,8 +346,9 @@ class AccountBalanceAPIView(CompanyScopedAPIViewMixin):
         responses={200: AccountLedgerResponseSerializer}
     )
 )
-class AccountLedgerAPIView(CompanyScopedAPIViewMixin, generics.GenericAPIView):
+class AccountLedgerAPIView(LedgerConditionalGetMixin, CompanyScopedAPIViewMixin, generics.GenericAPIView):
     serializer_class = AccountLedgerEntrySerializer  # For paginating the 'entries'
+    renderer_classes = REPORT_RENDERER_CLASSES
     pagination_class = StandardResultsSetPagination
 
     def _parse_ledger_dates(self, request_params):
@@ -367,8 +393,10 @@ class AccountLedgerAPIView(CompanyScopedAPIViewMixin, generics.GenericAPIView):
             if page_entries is not None:
                 # Serializer for the 'entries' part of the paginated response
                 entries_page_serializer = self.get_serializer(page_entries, many=True)
+                with span('serialize'):
+                    entries_page_data = entries_page_serializer.data
                 # Get the paginated structure (with count, next, previous)
-                paginated_response_shell = self.get_paginated_response(entries_page_serializer.data)
+                paginated_response_shell = self.get_paginated_response(entries_page_data)
 
                 # Now, merge the summary data into the paginated response shell
                 # The AccountLedgerResponseSerializer is not used to serialize the *entire* paginated response object,
@@ -392,7 +420,9 @@ class AccountLedgerAPIView(CompanyScopedAPIViewMixin, generics.GenericAPIView):
                 # No pagination, or empty entries list. Serialize the whole thing with AccountLedgerResponseSerializer.
                 response_data_for_main_serializer['entries'] = ledger_data_from_service.get('entries', [])
                 full_response_serializer = AccountLedgerResponseSerializer(response_data_for_main_serializer)
-                return Response(full_response_serializer.data)
+                with span('serialize'):
+                    data = full_response_serializer.data
+                return Response(data)
 
         except ledger_service.LedgerGenerationError as lge:
             logger.warning(f"Ledger service error for Co {self.current_company.id}, Acc {account_pk}: {lge}")
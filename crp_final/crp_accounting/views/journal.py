@@ -12,7 +12,6 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied, \
     ValidationError as DRFValidationError  # Use DRF's ValidationError for consistency
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters
 
 # Assuming crp_core.enums is directly importable
 from crp_core.enums import TransactionStatus, VoucherType
@@ -24,7 +23,7 @@ from ..models.period import AccountingPeriod  # For filtering in serializer if n
 from ..models.party import Party  # For filtering in serializer if needed
 
 # --- Serializer Imports (Tenant-Aware) ---
-from ..serializers.journal import VoucherSerializer
+from ..serializers.journal import VoucherSerializer, VoucherListSerializer, VoucherBulkActionSerializer
 
 # --- Service Function Imports (Tenant-Aware) ---
 from ..services import voucher_service
@@ -35,7 +34,7 @@ from ..exceptions import (
     BalanceError, InsufficientPermissionError
 )
 # --- FilterSet Import (Needs to be Tenant-Aware) ---
-from ..filters import VoucherFilterSet
+from ..filters import VoucherFilterSet, VoucherSearchFilter, SearchRankOrderingFilter
 
 # --- Permission Class Imports (RBAC) ---
 # from ..permissions import ... # Your RBAC permission classes
@@ -43,6 +42,7 @@ from ..filters import VoucherFilterSet
 # --- Base Mixin Import ---
 # Ensure this path is correct and the Mixin is as defined previously
 from .coa import CompanyScopedViewSetMixin  # If coa.py contains the mixin
+from crp_core.pagination import KeysetCursorPagination
 
 # Or from crp_core.mixins import CompanyScopedViewSetMixin # If it's in a core app
 
@@ -59,21 +59,44 @@ class VoucherViewSet(CompanyScopedViewSetMixin, viewsets.ModelViewSet):
     # If CompanyScopedViewSetMixin sets self.queryset = self.model.objects.all(),
     # it's good practice to define a base queryset here for clarity, even if overridden.
     queryset = Voucher.objects.all()  # Base queryset, will be filtered by Mixin
+    pagination_class = KeysetCursorPagination  # Keyset on the ordering, backed by voucher_co_date_num_idx
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= uses the trigram-indexed search documents on PostgreSQL (ranked), search_fields elsewhere
+    filter_backends = [DjangoFilterBackend, VoucherSearchFilter, SearchRankOrderingFilter]
     filterset_class = VoucherFilterSet
     search_fields = ['voucher_number', 'narration', 'reference', 'lines__narration', 'party__name']
     ordering_fields = ['date', 'voucher_number', 'status', 'updated_at', 'created_at']
     ordering = ['-date', '-voucher_number']
 
+    # Actions accepting the `fields` / `expand` query parameters (sparse fieldsets)
+    SPARSE_FIELDSET_ACTIONS = ('list', 'retrieve')
+
+    def _query_param_list(self, name: str) -> list:
+        """Comma-separated query parameter as a list of names (`?fields=id,date,total_debit`)."""
+        if self.action not in self.SPARSE_FIELDSET_ACTIONS or self.request is None:
+            return []
+        raw_value = self.request.query_params.get(name) or ''
+        return [item.strip() for item in raw_value.split(',') if item.strip()]
+
+    def _lines_requested(self) -> bool:
+        return 'lines' in self._query_param_list('expand') or 'lines' in self._query_param_list('fields')
+
     def get_queryset(self):
         """
         Extends the company-scoped queryset from the mixin with necessary
         select_related and prefetch_related for optimization.
+        List pages load headers only (one query plus the pagination count), with line totals
+        annotated in SQL; lines are prefetched only when expanded.
         """
         # `super().get_queryset()` calls CompanyScopedViewSetMixin.get_queryset(),
         # which relies on Voucher.objects (CompanyManager) for tenant filtering.
         qs = super().get_queryset()
+        if self.action == 'list':
+            qs = qs.select_related('party').annotate(**Voucher.line_totals_annotations())
+            return qs.prefetch_related('lines__account') if self._lines_requested() else qs
+        if self.action == 'retrieve':
+            # Totals annotated for reads only: after an update they would be stale
+            qs = qs.annotate(**Voucher.line_totals_annotations())
         return qs.select_related(
             'company',  # Already on Voucher, often useful
             'accounting_period__fiscal_year',  # Efficiently get period and its year
@@ -84,9 +107,13 @@ class VoucherViewSet(CompanyScopedViewSetMixin, viewsets.ModelViewSet):
             'approved_by'
         ).prefetch_related(
             'lines__account',  # Prefetch lines and their related accounts
-            'approvals__user'  # Prefetch approval logs and their users
         )
 
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return VoucherListSerializer
+        return VoucherSerializer
+
     # `get_serializer_context` is inherited from CompanyScopedViewSetMixin.
     # It already adds `request` and `company_context` (which is `self.current_company`).
     # We need to ensure `VoucherSerializer` uses `company_context` as `company_from_voucher_context`.
@@ -115,6 +142,10 @@ class VoucherViewSet(CompanyScopedViewSetMixin, viewsets.ModelViewSet):
             # Potentially raise an error or ensure context key is None if company is truly optional.
             context['company_from_voucher_context'] = None
 
+        # Sparse fieldsets for read actions (see SparseFieldsetMixin)
+        context['sparse_fields'] = self._query_param_list('fields')
+        context['expand'] = self._query_param_list('expand')
+
         kwargs['context'] = context  # Pass the augmented context to the serializer
 
         # Instantiate the serializer with the new context FIRST
@@ -255,6 +286,72 @@ class VoucherViewSet(CompanyScopedViewSetMixin, viewsets.ModelViewSet):
             return Response({"detail": _("An unexpected server error occurred.")},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _call_batch_service_for_action(self, service_function, user_param_name: str, extra_params_func=None):
+        """
+        Runs a voucher_service bulk_* function on `voucher_ids` from the request body. Permissions
+        are checked once by the service; per-voucher errors come back in the response, not as a 4xx.
+        """
+        input_serializer = VoucherBulkActionSerializer(data=self.request.data)
+        input_serializer.is_valid(raise_exception=True)
+        data = input_serializer.validated_data
+        if not self.current_company:
+            raise PermissionDenied(_("Operation not allowed without a company context."))
+
+        log_prefix = f"[VoucherViewSet BulkAction:{service_function.__name__}][User:{self.request.user.get_username()}][Co:{self.current_company.id}]"
+        service_kwargs = {
+            'company_id': self.current_company.id,
+            'voucher_ids': data['voucher_ids'],
+            user_param_name: self.request.user,
+        }
+        if extra_params_func: service_kwargs.update(extra_params_func(data))
+
+        try:
+            success_count, error_count, errors_detail = service_function(**service_kwargs)
+        except (PeriodLockedError, VoucherWorkflowError, DjangoValidationError, ObjectDoesNotExist) as e:
+            error_detail = getattr(e, 'message_dict', None) or getattr(e, 'messages', [str(e)])
+            if isinstance(error_detail, list): error_detail = ", ".join(error_detail)
+            logger.warning(f"{log_prefix} Batch service call failed: {error_detail}")
+            return Response({"detail": error_detail}, status=status.HTTP_400_BAD_REQUEST)
+        except InsufficientPermissionError as e:
+            logger.warning(f"{log_prefix} Permission denied by service: {e}")
+            raise PermissionDenied(str(e))
+        return Response({
+            "success_count": success_count,
+            "error_count": error_count,
+            "errors": [str(detail) for detail in errors_detail],
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-submit')
+    def bulk_submit(self, request):
+        return self._call_batch_service_for_action(
+            voucher_service.bulk_submit_vouchers, user_param_name='submitted_by_user')
+
+    @action(detail=False, methods=['post'], url_path='bulk-approve')
+    def bulk_approve(self, request):
+        return self._call_batch_service_for_action(
+            voucher_service.bulk_approve_and_post_vouchers, user_param_name='approver_user',
+            extra_params_func=lambda data: {
+                'comments': data['comments'] or f"Approved via API by {request.user.get_username()}"})
+
+    @action(detail=False, methods=['post'], url_path='bulk-reject')
+    def bulk_reject(self, request):
+        comments = str(request.data.get('comments') or '').strip()
+        if not comments:
+            raise DRFValidationError({"comments": [_("Rejection comments are mandatory.")]}, code='comments_required')
+        return self._call_batch_service_for_action(
+            voucher_service.bulk_reject_vouchers, user_param_name='rejecting_user',
+            extra_params_func=lambda data: {'comments': comments})
+
+    @action(detail=False, methods=['post'], url_path='bulk-reverse')
+    def bulk_reverse(self, request):
+        return self._call_batch_service_for_action(
+            voucher_service.bulk_reverse_vouchers, user_param_name='user',
+            extra_params_func=lambda data: {
+                'reversal_date': data['reversal_date'],
+                'reversal_voucher_type_value': data['reversal_voucher_type'],
+                'post_immediately': data['post_immediately'],
+            })
+
     @action(detail=True, methods=['post'], url_path='submit')
     def submit(self, request, pk=None):
         return self._call_service_for_action(
@@ -4,7 +4,7 @@ import logging
 from decimal import Decimal, InvalidOperation
 from datetime import date
 
-from django.db.models import ProtectedError
+from django.db.models import ProtectedError, Case, IntegerField, Value, When
 from django.shortcuts import get_object_or_404 # Use this for single object fetches
 from django.http import Http404 # Use this for 404 errors
 from django.utils import timezone
@@ -15,7 +15,6 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.exceptions import ValidationError, ParseError, PermissionDenied # Added PermissionDenied
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from django_filters.rest_framework import DjangoFilterBackend
 
 # --- Swagger/Spectacular Imports ---
@@ -27,7 +26,12 @@ from drf_spectacular.utils import (
 from ..models.party import Party
 from ..models.coa import Account # Needed for queryset filtering
 from ..models.journal import Voucher # Needed for deletion check
-from ..serializers.party import PartyReadSerializer, PartyWriteSerializer
+from ..serializers.party import PartyReadSerializer, PartyWriteSerializer, PartyBalanceSerializer
+
+# --- Service Imports ---
+from ..services.party_exposure_service import annotate_party_balances
+from crp_core.db_routers import use_reporting_replica
+from crp_core.pagination import KeysetCursorPagination
 
 # --- Enum Imports ---
 from crp_core.enums import PartyType
@@ -38,14 +42,6 @@ from .coa import CompanyScopedViewSetMixin # Import the tenant scoping mixin
 logger = logging.getLogger(__name__)
 
 
-# --- Standard Pagination ---
-# Assuming this is defined elsewhere or keep it here
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 25
-    page_size_query_param = 'page_size'
-    max_page_size = 1000
-
-
 # =============================================================================
 # Party ViewSet (Tenant Aware)
 # =============================================================================
@@ -59,6 +55,7 @@ class StandardResultsSetPagination(PageNumberPagination):
     destroy=extend_schema(summary="Delete Party (Company Scoped)"),
     balance_as_of=extend_schema(summary="Party Balance As Of Date (Company Scoped)"),
     check_credit_limit=extend_schema(summary="Check Party Credit Limit (Company Scoped)"),
+    balances=extend_schema(summary="Party Balances As Of Date (Company Scoped)"),
     bulk_activate=extend_schema(summary="Bulk Activate Parties (Company Scoped)"),
     bulk_deactivate=extend_schema(summary="Bulk Deactivate Parties (Company Scoped)"),
 )
@@ -71,7 +68,7 @@ class PartyViewSet(CompanyScopedViewSetMixin, viewsets.ModelViewSet):
     # queryset uses CompanyManager via inheritance/model definition
     queryset = Party.objects.select_related('control_account', 'company').all()
     # permission_classes inherited from Mixin
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetCursorPagination  # Keyset on the (company, name) index
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
 
     # Filters operate on company-scoped data
@@ -87,9 +84,21 @@ class PartyViewSet(CompanyScopedViewSetMixin, viewsets.ModelViewSet):
         'name', 'contact_email', 'contact_phone',
         'control_account__account_number', 'control_account__account_name'
     ] # Company search implicit
-    ordering_fields = ['name', 'party_type', 'is_active', 'created_at', 'control_account__name']
+    ordering_fields = ['name', 'party_type', 'is_active', 'created_at', 'control_account__name',
+                       'posted_balance', 'exposure', 'credit_limit']
     ordering = ['name']
 
+    def get_pagination_ordering(self):
+        """Ordering for KeysetCursorPagination when an action orders by annotations (see balances)."""
+        return getattr(self, 'pagination_ordering', None)
+
+    def get_queryset(self):
+        # Maintained exposure is a column sum, so list pages get credit status without per-row aggregates
+        qs = super().get_queryset()
+        if not getattr(self, 'swagger_fake_view', False):
+            qs = qs.annotate(exposure=Party.exposure_expression())
+        return qs
+
     def get_serializer_class(self):
         """Switch between Read and Write serializers."""
         if self.action in ['list', 'retrieve']:
@@ -169,6 +178,83 @@ class PartyViewSet(CompanyScopedViewSetMixin, viewsets.ModelViewSet):
         except ValueError as e: return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e: logger.exception(f"Error in balance_as_of for Party {pk} (Co {party.company_id}): {e}"); return Response({"detail": _("An unexpected error occurred.")}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    BALANCES_ORDERING_FIELDS = {'name', 'party_type', 'balance', 'overdue_amount', 'credit_utilization', 'credit_limit'}
+
+    @extend_schema(
+        summary="Party Balances As Of Date (Company Scoped)",
+        parameters=[
+            OpenApiParameter('date', OpenApiTypes.DATE, description=_("As-of date (YYYY-MM-DD). Defaults to today.")),
+            OpenApiParameter('party_type', OpenApiTypes.STR),
+            OpenApiParameter('is_active', OpenApiTypes.BOOL),
+            OpenApiParameter('search', OpenApiTypes.STR, description=_("Party name contains.")),
+            OpenApiParameter('min_balance', OpenApiTypes.NUMBER),
+            OpenApiParameter('max_balance', OpenApiTypes.NUMBER),
+            OpenApiParameter('min_utilization', OpenApiTypes.NUMBER, description=_("Credit utilization % at least.")),
+            OpenApiParameter('overdue_only', OpenApiTypes.BOOL),
+            OpenApiParameter('ordering', OpenApiTypes.STR,
+                             description=_("One of name, party_type, balance, overdue_amount, credit_utilization, "
+                                           "credit_limit; prefix with '-' for descending. Default: -balance.")),
+        ],
+        responses={200: PartyBalanceSerializer(many=True)},
+    )
+    @action(detail=False, methods=['get'], url_path='balances')
+    @use_reporting_replica()
+    def balances(self, request):
+        """
+        Lists every party of the company with its balance, overdue amount and credit utilization
+        as of a date. All figures come from one grouped query; filters and ordering run in the database.
+        """
+        params = request.query_params
+        date_str = params.get('date')
+        try:
+            as_of_date = date.fromisoformat(date_str) if date_str else timezone.now().date()
+        except ValueError:
+            raise ParseError(detail=_("Invalid date format for 'date'. Use YYYY-MM-DD."))
+
+        qs = Party.objects.select_related('control_account')
+        if self.current_company:
+            # Explicit: Party.objects is not reliably narrowed to the request's company
+            qs = qs.filter(company=self.current_company)
+        if params.get('party_type'):
+            qs = qs.filter(party_type=params['party_type'])
+        if params.get('is_active') is not None:
+            qs = qs.filter(is_active=params['is_active'].lower() in ('1', 'true', 'yes'))
+        if params.get('search'):
+            qs = qs.filter(name__icontains=params['search'])
+        qs = annotate_party_balances(qs, as_of_date)
+
+        try:
+            if params.get('min_balance'):
+                qs = qs.filter(balance__gte=Decimal(params['min_balance']))
+            if params.get('max_balance'):
+                qs = qs.filter(balance__lte=Decimal(params['max_balance']))
+            if params.get('min_utilization'):
+                qs = qs.filter(credit_utilization__gte=Decimal(params['min_utilization']))
+        except InvalidOperation:
+            raise ParseError(detail=_("Balance and utilization filters must be numbers."))
+        if params.get('overdue_only', '').lower() in ('1', 'true', 'yes'):
+            qs = qs.filter(overdue_amount__gt=Decimal('0.00'))
+
+        ordering = params.get('ordering', '-balance')
+        ordering_field = ordering.lstrip('-')
+        if ordering_field not in self.BALANCES_ORDERING_FIELDS:
+            raise ParseError(detail=_("Invalid 'ordering' value."))
+        # The keyset paginator re-orders on this (OrderingFilter does not know the annotations)
+        self.pagination_ordering = (ordering, 'name', 'pk')
+        if ordering_field == 'credit_utilization':
+            # Parties without a credit limit have no utilization; keep them at the end either way
+            qs = qs.annotate(has_utilization=Case(When(credit_utilization__isnull=True, then=Value(0)),
+                                                  default=Value(1), output_field=IntegerField()))
+            self.pagination_ordering = ('-has_utilization',) + self.pagination_ordering
+        qs = qs.order_by(*self.pagination_ordering)
+
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            response = self.get_paginated_response(PartyBalanceSerializer(page, many=True).data)
+            response.data['date_as_of'] = as_of_date
+            return response
+        return Response({'date_as_of': as_of_date, 'results': PartyBalanceSerializer(qs, many=True).data})
+
     @extend_schema(summary="Check Party Credit Limit (Company Scoped)") # Keep details
     @action(detail=True, methods=['get'], url_path='check-credit')
     def check_credit_limit(self, request, pk=None):
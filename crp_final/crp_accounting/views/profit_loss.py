@@ -13,7 +13,10 @@ from rest_framework.exceptions import ParseError, PermissionDenied # Keep Permis
 
 # --- Local Imports ---
 # Service needs to be tenant-aware
+from crp_core.instrumentation import span
+
 from ..services import reports_service
+from .coa import LedgerConditionalGetMixin, REPORT_RENDERER_CLASSES
 # Serializer needs to handle tenant-aware response format
 from ..serializers.profit_loss import ProfitLossResponseSerializer
 # --- Import the Tenant-Aware Mixin ---
@@ -63,18 +66,19 @@ Calculates revenue, expenses, and profit based on posted transactions.
     tags=['Reports']
 )
 # --- Inherit from CompanyScopedAPIViewMixin ---
-class ProfitLossView(CompanyScopedAPIViewMixin):
+class ProfitLossView(LedgerConditionalGetMixin, CompanyScopedAPIViewMixin):
     """
     API endpoint to generate the Profit and Loss statement for the user's company context.
     """
+    renderer_classes = REPORT_RENDERER_CLASSES
     # --- Optional: Define Specific RBAC Permissions ---
     # Override permission_classes from the mixin if needed
     # permission_classes = [permissions.IsAuthenticated, CanViewFinancialReportsRBAC] # Example
 
     def get(self, request, *args, **kwargs):
         """Handles GET requests to generate and return the P&L statement."""
-        # --- Company Context is available via self.company (from Mixin) ---
-        company_id = self.company.id # Get the ID for service call & logging
+        # --- Company Context is available via self.current_company (from Mixin) ---
+        company_id = self.current_company.id # Get the ID for service call & logging
 
         # --- 1. Input Validation ---
         start_date_str = request.query_params.get('start_date')
@@ -118,10 +122,12 @@ class ProfitLossView(CompanyScopedAPIViewMixin):
             raise
 
         # --- 4. Serialization and Response ---
-        context = {'request': request, 'company': self.company}
+        context = {'request': request, 'company': self.current_company}
         # Use the tenant-aware serializer (which includes company_id)
         serializer = ProfitLossResponseSerializer(report_data, context=context)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        with span('serialize'):
+            data = serializer.data
+        return Response(data, status=status.HTTP_200_OK)
 
 # =============================================================================
 # --- End of File ---
@@ -17,7 +17,10 @@ from rest_framework.exceptions import ParseError, PermissionDenied
 
 # --- Local Imports ---
 # Service needs to be tenant-aware
+from crp_core.instrumentation import span
+
 from ..services import reports_service
+from .coa import LedgerConditionalGetMixin, REPORT_RENDERER_CLASSES
 # Serializer needs to handle tenant-aware response format
 from ..serializers.trial_balance import TrialBalanceStructuredResponseSerializer
 
@@ -82,20 +85,21 @@ set to 'false' or '0' to exclude accounts with a zero balance on the report date
     tags=['Reports']
 )
 # --- Inherit from CompanyScopedAPIViewMixin ---
-class TrialBalanceView(CompanyScopedAPIViewMixin):
+class TrialBalanceView(LedgerConditionalGetMixin, CompanyScopedAPIViewMixin):
     """
     Provides the Trial Balance report for the user's company context.
     Inherits authentication and company checks from CompanyScopedAPIViewMixin.
     Requires appropriate RBAC permissions for viewing reports.
     """
+    renderer_classes = REPORT_RENDERER_CLASSES
     # --- Optional: Define Specific RBAC Permissions ---
     # Override permission_classes from the mixin if needed
     # permission_classes = [permissions.IsAuthenticated, CanViewFinancialReportsRBAC] # Example
 
     def get(self, request, *args, **kwargs):
         """Handles GET requests to generate and return the Trial Balance."""
-        # --- Company Context is available via self.company (from Mixin) ---
-        company_id = self.company.id # Get the ID for service call & logging
+        # --- Company Context is available via self.current_company (from Mixin) ---
+        company_id = self.current_company.id # Get the ID for service call & logging
 
         # --- 1. Input Validation ---
         date_str = request.query_params.get('as_of_date')
@@ -133,10 +137,12 @@ class TrialBalanceView(CompanyScopedAPIViewMixin):
 
         # --- 4. Serialization and Response ---
         # Pass context (including company) to serializer if it needs it
-        context = {'request': request, 'company': self.company}
+        context = {'request': request, 'company': self.current_company}
         # Use the updated serializer which expects company_id in response data
         serializer = TrialBalanceStructuredResponseSerializer(report_data, context=context)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        with span('serialize'):
+            data = serializer.data
+        return Response(data, status=status.HTTP_200_OK)
 # import logging
 # from datetime import date
 # from decimal import Decimal # Needed for ZERO_DECIMAL comparison
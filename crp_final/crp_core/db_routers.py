@@ -0,0 +1,129 @@
+# crp_core/db_routers.py
+"""
+Read-replica routing for reporting workloads.
+
+Reports, ledgers and exports opt in with `use_reporting_replica` (decorator or
+context manager). Inside that scope, reads go to `settings.REPORTING_REPLICA_ALIAS`
+unless:
+  - no replica alias is configured in `settings.DATABASES`,
+  - the code is already inside a transaction on the primary, or
+  - the current user wrote something in the last `REPLICA_STICKY_SECONDS`
+    (see `pin_user_to_primary`, called by `ReplicaFreshnessMiddleware`), so they
+    never see a report that is missing the voucher they just posted.
+Writes always go to the primary.
+"""
+
+import contextvars
+import logging
+from contextlib import ContextDecorator
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger("crp_core.db_routers")
+
+REPORTING_REPLICA_ALIAS = getattr(settings, 'REPORTING_REPLICA_ALIAS', 'replica')
+REPLICA_STICKY_SECONDS = getattr(settings, 'REPLICA_STICKY_SECONDS', 30)
+
+# Alias reads should be routed to for the current execution flow (None = primary)
+current_read_alias_context_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_read_alias_context_var",
+    default=None
+)
+
+
+def _primary_pin_cache_key(user_pk) -> str:
+    return f"db_replica_pin_user_{user_pk}"
+
+
+def pin_user_to_primary(user, seconds: Optional[int] = None) -> None:
+    """Sends the user's reporting reads to the primary for the next few seconds."""
+    if not user or not getattr(user, 'is_authenticated', False):
+        return
+    cache.set(_primary_pin_cache_key(user.pk), True, seconds or REPLICA_STICKY_SECONDS)
+
+
+def is_user_pinned_to_primary(user) -> bool:
+    if not user or not getattr(user, 'is_authenticated', False):
+        return False
+    return bool(cache.get(_primary_pin_cache_key(user.pk)))
+
+
+def replica_is_configured() -> bool:
+    return REPORTING_REPLICA_ALIAS in settings.DATABASES
+
+
+def _get_current_user():
+    try:
+        from crum import get_current_user
+    except ImportError:
+        return None
+    return get_current_user()
+
+
+class use_reporting_replica(ContextDecorator):
+    """
+    Routes read queries in the wrapped function/block to the reporting replica,
+    subject to the freshness guard described in the module docstring.
+
+    Usage:
+        @use_reporting_replica()
+        def generate_trial_balance_structured(...): ...
+
+        with use_reporting_replica():
+            ...
+    """
+
+    def __init__(self, user=None):
+        """
+        Args:
+            user: User whose freshness marker is checked. Defaults to the current request user.
+        """
+        self.user = user
+        self._token = None
+
+    def _recreate_cm(self):
+        # Fresh instance per decorated call so concurrent calls never share the reset token
+        return self.__class__(user=self.user)
+
+    def _resolve_alias(self) -> Optional[str]:
+        if not replica_is_configured():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads inside a write transaction must see that transaction's data
+            return None
+        if is_user_pinned_to_primary(self.user or _get_current_user()):
+            logger.debug("use_reporting_replica: user recently wrote data, reading from primary.")
+            return None
+        return REPORTING_REPLICA_ALIAS
+
+    def __enter__(self) -> Optional[str]:
+        alias = self._resolve_alias()
+        self._token = current_read_alias_context_var.set(alias)
+        return alias
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        current_read_alias_context_var.reset(self._token)
+        return False
+
+
+class ReportingReplicaRouter:
+    """
+    Database router: reads inside a `use_reporting_replica` scope go to the replica,
+    everything else (including all writes and migrations) stays on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_read_alias_context_var.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica mirrors the primary, so objects from either alias may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
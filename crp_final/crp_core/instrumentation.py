@@ -0,0 +1,239 @@
+# crp_core/instrumentation.py
+"""
+Per-request performance instrumentation.
+
+`collect_metrics()` opens a collection scope (one per request, see
+`PerformanceMiddleware`) that records, for the current execution flow:
+  - DB query count and total DB time, on every configured database alias,
+  - cache hits / misses reported by the services with `record_cache_lookup`,
+  - wall time per named `span` (service functions such as "reports.trial_balance"
+    and phases such as "aggregate", "fx", "hierarchy", "serialize").
+Outside a scope, `span` and `record_cache_lookup` are no-ops apart from one
+context-variable lookup, so service code can stay instrumented in Celery tasks
+and management commands.
+
+Finished scopes can be rendered as a `Server-Timing` header and are added to
+process-local, Prometheus-style counters served by `crp_core.views.metrics_view`.
+Counters are per process: with several workers, scrape each one (or aggregate
+from the structured logs instead).
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ContextDecorator, ExitStack
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from django.db import connections
+
+logger = logging.getLogger("crp_core.instrumentation")
+
+# Metrics of the current request / task (None = not collecting)
+current_metrics_context_var: contextvars.ContextVar[Optional['RequestMetrics']] = contextvars.ContextVar(
+    "current_metrics_context_var",
+    default=None
+)
+
+
+@dataclass
+class SpanTiming:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    spans: Dict[str, SpanTiming] = field(default_factory=lambda: defaultdict(SpanTiming))
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def as_dict(self) -> Dict:
+        """Flat, JSON-serialisable summary for structured log records."""
+        return {
+            'wall_ms': round(self.wall_seconds * 1000, 2),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_seconds * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'spans': {name: {'calls': timing.calls, 'ms': round(timing.seconds * 1000, 2)}
+                      for name, timing in self.spans.items()},
+        }
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value (durations in milliseconds)."""
+        entries = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        entries.extend(f'{name};dur={timing.seconds * 1000:.1f};desc="{timing.calls} calls"'
+                       for name, timing in self.spans.items())
+        entries.append(f'total;dur={self.wall_seconds * 1000:.1f}')
+        return ", ".join(entries)
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = current_metrics_context_var.get()
+    if metrics is None:  # Connection shared with a flow that is not collecting
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_seconds += time.perf_counter() - start
+
+
+class collect_metrics:
+    """
+    Collects metrics for the wrapped block and yields the `RequestMetrics`.
+
+    Usage:
+        with collect_metrics() as metrics:
+            response = get_response(request)
+        response['Server-Timing'] = metrics.server_timing()
+    """
+
+    def __init__(self, record_totals: bool = True, label: str = ''):
+        """
+        Args:
+            record_totals: Add the scope to the process-wide counters when it ends.
+            label: Counter label (e.g. the resolved URL name) for `requests_total`.
+        """
+        self.record_totals = record_totals
+        self.label = label
+        self.metrics: Optional[RequestMetrics] = None
+        self._token = None
+        self._stack: Optional[ExitStack] = None
+
+    def __enter__(self) -> RequestMetrics:
+        self.metrics = RequestMetrics()
+        self._token = current_metrics_context_var.set(self.metrics)
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(_record_query))
+        return self.metrics
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stack.close()
+        current_metrics_context_var.reset(self._token)
+        self.metrics.finished = time.perf_counter()
+        if self.record_totals:
+            process_metrics.add(self.metrics, self.label)
+        return False
+
+
+class span(ContextDecorator):
+    """
+    Times the wrapped function/block under `name` in the current collection scope.
+    Repeated and nested spans accumulate per name.
+
+    Usage:
+        @span('reports.trial_balance')
+        def generate_trial_balance_structured(...): ...
+
+        with span('hierarchy'):
+            ...
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._metrics = None
+        self._start = 0.0
+
+    def _recreate_cm(self):
+        # Fresh instance per decorated call so recursive/concurrent calls keep their own start time
+        return self.__class__(self.name)
+
+    def __enter__(self):
+        self._metrics = current_metrics_context_var.get()
+        if self._metrics is not None:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._metrics is not None:
+            timing = self._metrics.spans[self.name]
+            timing.calls += 1
+            timing.seconds += time.perf_counter() - self._start
+        return False
+
+
+def record_cache_lookup(hit: bool) -> None:
+    """Counts a cache hit/miss in the current collection scope."""
+    metrics = current_metrics_context_var.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+class ProcessMetrics:
+    """Process-wide counters accumulated from finished collection scopes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: Dict[str, int] = defaultdict(int)
+            self.wall_seconds: Dict[str, float] = defaultdict(float)
+            self.db_queries = 0
+            self.db_seconds = 0.0
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.span_calls: Dict[str, int] = defaultdict(int)
+            self.span_seconds: Dict[str, float] = defaultdict(float)
+
+    def add(self, metrics: RequestMetrics, label: str = '') -> None:
+        with self._lock:
+            self.requests[label] += 1
+            self.wall_seconds[label] += metrics.wall_seconds
+            self.db_queries += metrics.db_queries
+            self.db_seconds += metrics.db_seconds
+            self.cache_hits += metrics.cache_hits
+            self.cache_misses += metrics.cache_misses
+            for name, timing in metrics.spans.items():
+                self.span_calls[name] += timing.calls
+                self.span_seconds[name] += timing.seconds
+
+    def render_prometheus(self) -> str:
+        """Counters in the Prometheus text exposition format."""
+
+        def labelled(metric: str, label_name: str, values: Dict) -> List[str]:
+            return [f'{metric}{{{label_name}="{_escape_label(key)}"}} {value}' for key, value in sorted(values.items())]
+
+        with self._lock:
+            lines = [
+                "# TYPE crp_requests_total counter", *labelled('crp_requests_total', 'view', self.requests),
+                "# TYPE crp_request_seconds_total counter",
+                *labelled('crp_request_seconds_total', 'view', self.wall_seconds),
+                "# TYPE crp_db_queries_total counter", f"crp_db_queries_total {self.db_queries}",
+                "# TYPE crp_db_seconds_total counter", f"crp_db_seconds_total {self.db_seconds}",
+                "# TYPE crp_cache_hits_total counter", f"crp_cache_hits_total {self.cache_hits}",
+                "# TYPE crp_cache_misses_total counter", f"crp_cache_misses_total {self.cache_misses}",
+                "# TYPE crp_span_calls_total counter", *labelled('crp_span_calls_total', 'span', self.span_calls),
+                "# TYPE crp_span_seconds_total counter",
+                *labelled('crp_span_seconds_total', 'span', self.span_seconds),
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+process_metrics = ProcessMetrics()
@@ -0,0 +1,48 @@
+# crp_core/logging_utils.py
+"""
+Logging for hot paths (balance posting signals/tasks, report loops, tenant managers).
+
+These paths run once per voucher line, report row or queryset, so they:
+  - log with lazy %-style arguments (formatted only if a handler emits the record),
+  - emit one summary record per voucher/report instead of one per line,
+  - route per-item DEBUG detail through `SampledLogger.sampled`, which emits roughly
+    `HOT_PATH_DEBUG_SAMPLE_RATE` of the calls and nothing unless DEBUG is enabled,
+  - cap per-voucher detail at `HOT_PATH_MAX_DETAIL_RECORDS`, so the records logged
+    per posted voucher are bounded by a constant whatever its line count.
+Their verbosity is set with `HOT_PATH_LOG_LEVEL` (see `LOGGING` in settings).
+"""
+
+import logging
+import random
+
+from django.conf import settings
+
+HOT_PATH_DEBUG_SAMPLE_RATE = getattr(settings, 'HOT_PATH_DEBUG_SAMPLE_RATE', 0.01)
+HOT_PATH_MAX_DETAIL_RECORDS = getattr(settings, 'HOT_PATH_MAX_DETAIL_RECORDS', 20)
+
+
+class SampledLogger(logging.LoggerAdapter):
+    """
+    Logger adapter adding `sampled()` for per-item DEBUG detail. All other methods
+    behave as on the wrapped logger (including caller-supplied `extra`).
+    """
+
+    def __init__(self, logger: logging.Logger, sample_rate: float = None):
+        super().__init__(logger, {})
+        self.sample_rate = HOT_PATH_DEBUG_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    def process(self, msg, kwargs):
+        return msg, kwargs
+
+    def sampled(self, msg, *args, **kwargs) -> None:
+        """Logs at DEBUG for about `sample_rate` of the calls."""
+        if self.sample_rate <= 0 or not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        kwargs.setdefault('stacklevel', 2)
+        self.logger.debug(msg, *args, **kwargs)
+
+
+def get_hot_path_logger(name: str, sample_rate: float = None) -> SampledLogger:
+    return SampledLogger(logging.getLogger(name), sample_rate)
@@ -0,0 +1,79 @@
+# crp_core/middleware.py
+
+import logging
+
+from django.conf import settings
+
+from .db_routers import pin_user_to_primary
+from .instrumentation import collect_metrics, process_metrics
+
+logger = logging.getLogger("crp_core.middleware")
+perf_logger = logging.getLogger("crp_core.performance")
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaFreshnessMiddleware:
+    """
+    After a successful write request (POST/PUT/PATCH/DELETE), pins the user's
+    reporting reads to the primary database for `REPLICA_STICKY_SECONDS`, so a
+    report opened right after posting a voucher is not served from a lagging replica.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            # For DRF/JWT views request.user is the authenticated user by the time the response returns
+            user = getattr(request, 'user', None)
+            pin_user_to_primary(user)
+        return response
+
+
+class PerformanceMiddleware:
+    """
+    Collects per-request metrics (see `crp_core.instrumentation`): DB queries and time,
+    cache hits/misses and named service spans. Each request is logged to
+    `crp_core.performance` with the metrics under `extra['perf']` (WARNING above
+    `PERF_SLOW_REQUEST_MS`), added to the process counters and, depending on
+    `PERF_SERVER_TIMING` ('all', 'staff', 'off'), reported in a `Server-Timing` header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERF_INSTRUMENTATION_ENABLED', True)
+        self.server_timing = getattr(settings, 'PERF_SERVER_TIMING', 'staff')
+        self.slow_request_ms = getattr(settings, 'PERF_SLOW_REQUEST_MS', 1000)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        with collect_metrics(record_totals=False) as metrics:
+            response = self.get_response(request)
+        # Label by URL name rather than path so counters stay bounded
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else 'unresolved'
+        process_metrics.add(metrics, view_name)
+
+        if self._wants_server_timing(request):
+            response['Server-Timing'] = metrics.server_timing()
+        perf = {'view': view_name, 'method': request.method, 'status': response.status_code, **metrics.as_dict()}
+        company = getattr(request, 'company', None)
+        if company is not None:
+            perf['company_id'] = str(company.pk)
+        level = logging.WARNING if perf['wall_ms'] >= self.slow_request_ms else logging.INFO
+        if perf_logger.isEnabledFor(level):
+            perf_logger.log(level, "%s %s %s: %.1fms, %d queries (%.1fms), cache %d/%d",
+                            request.method, view_name, response.status_code, perf['wall_ms'], perf['db_queries'],
+                            perf['db_ms'], perf['cache_hits'], perf['cache_misses'], extra={'perf': perf})
+        return response
+
+    def _wants_server_timing(self, request) -> bool:
+        if self.server_timing == 'all':
+            return True
+        if self.server_timing == 'staff':
+            user = getattr(request, 'user', None)
+            return bool(user and getattr(user, 'is_staff', False))
+        return False
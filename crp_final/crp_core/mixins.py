@@ -1,10 +1,15 @@
 # crp_core/mixins.py
+import datetime
+import hashlib
 import logging
 from typing import Optional, Any, Type
 
 from django.core.exceptions import ImproperlyConfigured, FieldDoesNotExist
 from django.db import models
 from django.http import HttpRequest
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
 from rest_framework import permissions, viewsets, generics, status, serializers # ✅ ADDED serializers
 from rest_framework.views import APIView
@@ -37,11 +42,10 @@ class CompanyContextMixin:
 
     def initial(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
         """
-        Sets `self.current_company` based on `request.company`.
+        Sets `self.current_company` based on `request.company`, before the parent's initial()
+        runs the permission checks (BaseCompanyAccessPermission reads it).
         Logs warnings if context is not as expected.
         """
-        super().initial(request, *args, **kwargs)  # Call parent's initial
-
         company_from_request = getattr(request, 'company', None)
         user_for_log = request.user.name if request.user and request.user.is_authenticated else "AnonymousUser"
         view_name = self.__class__.__name__
@@ -76,6 +80,8 @@ class CompanyContextMixin:
             else:
                 logger.info(log_message)  # Informational for Anonymous or SU without specific context
 
+        super().initial(request, *args, **kwargs)  # Authentication, permissions, throttling
+
     def get_serializer_context(self) -> dict:
         """
         Adds `request` and `company_context` (which is `self.current_company`)
@@ -254,4 +260,70 @@ class CompanyScopedAPIViewMixin(CompanyContextMixin, APIView):
 
 
 class CompanyScopedGenericAPIViewMixin(CompanyContextMixin, generics.GenericAPIView):
-    permission_classes = [permissions.IsAuthenticated, BaseCompanyAccessPermission]
\ No newline at end of file
+    permission_classes = [permissions.IsAuthenticated, BaseCompanyAccessPermission]
+
+# --- Conditional GET (ETag / Last-Modified) ---
+class _NotModified(Exception):
+    """Carries the 304/412 response from `ConditionalGetMixin.initial` past the view handler."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET/HEAD with 304 Not Modified, without running the handler, when the client's
+    If-None-Match / If-Modified-Since still match. The validator is `get_last_modified()`
+    (e.g. the latest ledger change) combined with the view, company, query parameters and
+    negotiated media type, so every distinct report request has its own ETag.
+    Validators are checked after authentication and permissions (in `initial`).
+    """
+
+    def get_last_modified(self, request) -> Optional[datetime.datetime]:
+        """Latest change to the data behind the response; None disables conditional handling."""
+        raise NotImplementedError(f"{self.__class__.__name__} must implement get_last_modified().")
+
+    def get_etag_parts(self, request, last_modified: datetime.datetime) -> list:
+        company = getattr(self, 'current_company', None)
+        return [
+            self.__class__.__name__, getattr(company, 'pk', ''), last_modified.isoformat(),
+            sorted(request.query_params.lists()), getattr(request, 'accepted_media_type', ''),
+            getattr(request, 'LANGUAGE_CODE', ''),
+            timezone.localdate().isoformat(),  # Date parameters may default to "today"
+        ]
+
+    def initial(self, request, *args: Any, **kwargs: Any) -> None:
+        super().initial(request, *args, **kwargs)
+        self._conditional_etag, self._conditional_last_modified = None, None
+        if request.method not in ('GET', 'HEAD'):
+            return
+        last_modified = self.get_last_modified(request)
+        if last_modified is None:
+            return
+        digest = hashlib.sha1(repr(self.get_etag_parts(request, last_modified)).encode('utf-8')).hexdigest()
+        self._conditional_etag = f'W/"{digest}"'  # Weak: same data, not necessarily the same bytes
+        self._conditional_last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(request._request, etag=self._conditional_etag,
+                                             last_modified=self._conditional_last_modified)
+        if response is not None:
+            raise _NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _NotModified):
+            self._set_validator_headers(exc.response)
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self._set_validator_headers(response)
+        return response
+
+    def _set_validator_headers(self, response) -> None:
+        if not getattr(self, '_conditional_etag', None):
+            return
+        response['ETag'] = self._conditional_etag
+        response['Last-Modified'] = http_date(self._conditional_last_modified)
+        patch_cache_control(response, private=True, no_cache=True)  # Revalidate on every use
@@ -0,0 +1,271 @@
+# crp_core/pagination.py
+"""
+Keyset (cursor) pagination for large list endpoints.
+
+Page-number pagination costs an OFFSET of (page - 1) x size plus a COUNT(*) on every
+request, so deep pages of big tenants get slower the further a user pages.
+`KeysetCursorPagination` instead filters on the values of the last row served:
+
+    WHERE (date < d) OR (date = d AND voucher_number < n) OR (... AND id < pk)
+    ORDER BY date DESC, voucher_number DESC, id DESC LIMIT size + 1
+
+which an index on the ordering columns answers at constant cost whatever the page depth.
+The ordering comes from the view's `get_pagination_ordering()` when it defines one (actions
+ordering by annotations), else its OrderingFilter / `ordering` (so `?ordering=` keeps
+working), with the primary key appended as a unique tiebreaker. NULLs sort as the largest
+value (PostgreSQL's default), so nullable columns such as `Voucher.voucher_number` page
+correctly and still match a plain b-tree index.
+
+No count is returned unless asked for with `?count=exact` or `?count=approximate`; the
+latter uses the PostgreSQL planner's row estimate (EXPLAIN, no table scan) and falls back
+to an exact count below `API_APPROXIMATE_COUNT_THRESHOLD` rows or on other databases.
+"""
+
+import base64
+import datetime
+import json
+import logging
+from collections import namedtuple
+from decimal import Decimal
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DatabaseError, connections
+from django.db.models import F, Model, Q
+from django.utils.encoding import force_str
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+logger = logging.getLogger("crp_core.pagination")
+
+API_APPROXIMATE_COUNT_THRESHOLD = getattr(settings, 'API_APPROXIMATE_COUNT_THRESHOLD', 10000)
+
+COUNT_EXACT = 'exact'
+COUNT_APPROXIMATE = 'approximate'
+
+KeysetCursor = namedtuple('KeysetCursor', ['values', 'reverse'])
+
+
+def _encode_value(value):
+    """JSON-safe cursor value that Django lookups accept back as-is."""
+    if isinstance(value, Model):
+        value = value.pk
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()  # Full precision (DjangoJSONEncoder truncates microseconds)
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination on the full ordering (not DRF's first-field position + offset).
+
+    Usage:
+        class VoucherViewSet(...):
+            pagination_class = KeysetCursorPagination
+            ordering = ['-date', '-voucher_number']  # Back it with an index on these columns
+
+            def get_pagination_ordering(self):  # Optional; None falls back to the filter/ordering
+                return ('-balance', 'name') if self.action == 'balances' else None
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = ('-pk',)  # Used only when the view has no OrderingFilter/ordering
+    count_query_param = 'count'
+    count_query_description = _("Include the total count: 'exact', or 'approximate' (planner estimate).")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        self.count, self.count_is_approximate = self.get_count(queryset, request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        queryset = queryset.order_by(*self._order_by(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self._after_cursor_filter(self.cursor.values, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    # --- Ordering ---
+
+    def get_ordering(self, request, queryset, view):
+        """
+        View ordering (`view.get_pagination_ordering()`, else OrderingFilter, else `view.ordering`)
+        plus the primary key as a unique tiebreaker.
+        """
+        get_pagination_ordering = getattr(view, 'get_pagination_ordering', None)
+        ordering = get_pagination_ordering() if get_pagination_ordering else None
+        if not ordering:
+            for filter_cls in getattr(view, 'filter_backends', []):
+                if hasattr(filter_cls, 'get_ordering'):
+                    ordering = filter_cls().get_ordering(request, queryset, view)
+                    break
+        ordering = ordering or getattr(view, 'ordering', None) or self.ordering
+        ordering = [ordering] if isinstance(ordering, str) else list(ordering)
+        if ordering[-1].lstrip('-') not in ('pk', self.model._meta.pk.name):
+            ordering.append('-pk' if ordering[-1].startswith('-') else 'pk')
+        return tuple(ordering)
+
+    def _is_nullable(self, field_path: str) -> bool:
+        model = self.model
+        for part in field_path.split('__'):
+            try:
+                field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return True  # Annotation: make no assumption
+            if getattr(field, 'null', False):
+                return True
+            model = field.related_model or model
+        return False
+
+    def _order_by(self, reverse: bool):
+        expressions = []
+        for field in self.ordering:
+            name, descending = field.lstrip('-'), field.startswith('-')
+            if descending != reverse:
+                expressions.append(F(name).desc(nulls_first=True) if self._is_nullable(name) else F(name).desc())
+            else:
+                expressions.append(F(name).asc(nulls_last=True) if self._is_nullable(name) else F(name).asc())
+        return expressions
+
+    def _after_cursor_filter(self, values, reverse: bool) -> Q:
+        """Rows strictly after `values` in the (possibly reversed) ordering, NULL being the largest value."""
+        condition, equal_so_far = Q(pk__in=[]), Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            nullable = self._is_nullable(name)
+            if value is None:
+                after = Q(**{f'{name}__isnull': False}) if descending else None
+                equal = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if nullable and not descending:
+                    after |= Q(**{f'{name}__isnull': True})
+                equal = Q(**{name: value})
+            if after is not None:
+                condition |= equal_so_far & after
+            equal_so_far &= equal
+        return condition
+
+    def _values_from_instance(self, instance):
+        values = []
+        for field in self.ordering:
+            value = instance
+            for part in field.lstrip('-').split('__'):
+                value = getattr(value, part, None)
+                if value is None:
+                    break
+            values.append(_encode_value(value))
+        return values
+
+    # --- Cursor encoding ---
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            values, reverse = payload['v'], bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)  # Cursor from another ordering
+        return KeysetCursor(values=values, reverse=reverse)
+
+    def encode_cursor(self, cursor):
+        payload = {'v': cursor.values}
+        if cursor.reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:  # Nothing before a backwards cursor: the next page is the first one
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(KeysetCursor(values=self._values_from_instance(self.page[-1]), reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(KeysetCursor(values=self._values_from_instance(self.page[0]), reverse=True))
+
+    # --- Optional count ---
+
+    def get_count(self, queryset, request):
+        """Returns (count, is_approximate); (None, False) unless requested with `?count=`."""
+        mode = request.query_params.get(self.count_query_param)
+        if mode == COUNT_APPROXIMATE:
+            estimate = self.estimate_count(queryset)
+            if estimate is not None and estimate >= API_APPROXIMATE_COUNT_THRESHOLD:
+                return estimate, True
+        if mode in (COUNT_EXACT, COUNT_APPROXIMATE):
+            return queryset.count(), False
+        return None, False
+
+    def estimate_count(self, queryset):
+        """Planner row estimate for the filtered queryset (PostgreSQL only, otherwise None)."""
+        if connections[queryset.db].vendor != 'postgresql':
+            return None
+        try:
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows'])
+        except (DatabaseError, ValueError, KeyError, IndexError, TypeError) as e:
+            logger.warning("Row estimate failed for %s, falling back to an exact count: %s",
+                           queryset.model.__name__, e)
+            return None
+
+    # --- Response / schema ---
+
+    def get_paginated_response(self, data):
+        payload = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            payload['count'] = self.count
+            payload['count_is_approximate'] = self.count_is_approximate
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties'].update({
+            'count': {'type': 'integer', 'description': "Only with ?count=exact|approximate."},
+            'count_is_approximate': {'type': 'boolean'},
+        })
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': force_str(self.count_query_description),
+            'schema': {'type': 'string', 'enum': [COUNT_EXACT, COUNT_APPROXIMATE]},
+        })
+        return parameters
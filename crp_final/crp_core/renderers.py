@@ -0,0 +1,69 @@
+# crp_core/renderers.py
+"""
+orjson-backed JSON renderer for large read-only payloads (financial reports).
+
+`FastJSONRenderer` writes the same bytes as DRF's `JSONRenderer` for compact output:
+same type handling as DRF's JSONEncoder (dates, UUIDs, lazy strings, raw Decimals as
+numbers) and U+2028 / U+2029 escaped. It hands the payload to `JSONRenderer` whenever
+orjson would write something else or cannot encode it: orjson not installed, indented
+output (browsable API, `; indent=` in Accept), non-default UNICODE/COMPACT/STRICT_JSON
+settings, non-string dict keys, integers beyond 64 bits, Decimals whose float form has
+an exponent, and any type the hook does not know.
+
+Native floats are written by orjson (same digits, but exponent notation and NaN differ
+from Python's), so use it on views whose amounts are serialized as strings.
+"""
+
+import datetime
+import decimal
+import math
+from types import GeneratorType
+
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional: JSONRenderer output without it
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson is not None else 0
+
+
+def _default(obj):
+    """orjson hook for the types DRF's JSONEncoder handles and orjson does not."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        value = float(obj)
+        if not math.isfinite(value) or 'e' in repr(value):
+            raise TypeError("Decimal left to JSONRenderer")
+        return value
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, (QuerySet, GeneratorType, set, frozenset)):
+        return tuple(obj)
+    raise TypeError(f"Type is not handled by the fast path: {type(obj).__name__}")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer with the compact output written by orjson."""
+
+    def use_fast_path(self, accepted_media_type, renderer_context) -> bool:
+        return (orjson is not None and not self.ensure_ascii and self.compact and self.strict
+                and self.get_indent(accepted_media_type, renderer_context) is None)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if not self.use_fast_path(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same strict javascript subset as JSONRenderer
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,126 @@
+# crp_core/serializers.py
+"""
+Fast read-only representation for serializers of trusted service output.
+
+Report endpoints serialize thousands of dict rows built by the report services (trial
+balance hierarchy, P&L lines, ledger entries). DRF's `Serializer.to_representation` goes
+through `_readable_fields` and `field.get_attribute` for every field of every row, and
+`DecimalField` copies the decimal context for every amount. `CompiledRepresentationMixin`
+compiles the field tree once per serializer instance instead:
+  - dict keys are read directly (a missing key falls back to `field.get_attribute`, so
+    defaults, nulls and skipped fields behave as in DRF),
+  - nested and `many=True` serializers are compiled recursively, recursive node
+    serializers once per class,
+  - DecimalFields quantize with a precomputed exponent and context,
+  - every other field keeps its own `to_representation`.
+The output equals DRF's for the same input. Use it on read-only serializers whose fields
+do not depend on the request context.
+"""
+
+import decimal
+from collections.abc import Mapping
+
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject, RelatedField
+from rest_framework.settings import api_settings
+
+_SKIP = object()
+
+
+def _decimal_to_string(field):
+    """`DecimalField.to_representation` with the quantize exponent and context built once."""
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if field.decimal_places is None or not coerce_to_string or field.localize or field.normalize_output:
+        return field.to_representation
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    rounding = field.rounding
+
+    def to_string(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+
+    return to_string
+
+
+def _is_compilable(serializer) -> bool:
+    return type(serializer).to_representation in (serializers.Serializer.to_representation,
+                                                  CompiledRepresentationMixin.to_representation)
+
+
+def _field_converter(field, compiled):
+    if isinstance(field, serializers.ListSerializer):
+        if type(field).to_representation is not serializers.ListSerializer.to_representation \
+                or not _is_compilable(field.child):
+            return field.to_representation
+        child = _compile(field.child, compiled)
+        return lambda data: [child(item) for item in (data.all() if isinstance(data, BaseManager) else data)]
+    if isinstance(field, serializers.BaseSerializer):
+        return _compile(field, compiled) if _is_compilable(field) else field.to_representation
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_to_string(field)
+    return field.to_representation
+
+
+def _get_attribute(field, instance):
+    """DRF's attribute lookup for one field: the value, None, or _SKIP for an omitted field."""
+    try:
+        attribute = field.get_attribute(instance)
+    except SkipField:
+        return _SKIP
+    if isinstance(attribute, PKOnlyObject) and attribute.pk is None:
+        return None
+    return attribute
+
+
+def _compile(serializer, compiled):
+    """Returns `instance -> dict` equivalent to `Serializer.to_representation` for the serializer."""
+    serializer_class = type(serializer)
+    if serializer_class in compiled:
+        return compiled[serializer_class]
+    steps = []
+
+    def represent(instance):
+        ret = {}
+        is_mapping = isinstance(instance, Mapping)
+        for field_name, key, field, convert in steps:
+            if is_mapping and key is not None:
+                try:
+                    attribute = instance[key]
+                except KeyError:
+                    attribute = _get_attribute(field, instance)
+            else:
+                attribute = _get_attribute(field, instance)
+            if attribute is _SKIP:
+                continue
+            ret[field_name] = None if attribute is None else convert(attribute)
+        return ret
+
+    compiled[serializer_class] = represent  # Before the fields, so recursive children resolve to it
+    for field in serializer._readable_fields:
+        # Plain dict key unless the source is dotted/'*' or the field resolves related objects
+        direct = len(field.source_attrs) == 1 and not isinstance(field, RelatedField)
+        steps.append((field.field_name, field.source_attrs[0] if direct else None, field,
+                      _field_converter(field, compiled)))
+    return represent
+
+
+class CompiledRepresentationMixin:
+    """
+    Serializer mixin compiling `to_representation` for large read-only payloads of dicts.
+
+    Usage:
+        class TrialBalanceStructuredResponseSerializer(CompiledRepresentationMixin, serializers.Serializer):
+            ...
+    """
+
+    def to_representation(self, instance):
+        represent = self.__dict__.get('_compiled_representation')
+        if represent is None:
+            represent = self._compiled_representation = _compile(self, {})
+        return represent(instance)
@@ -1,3 +1,19 @@
-from django.shortcuts import render
+# crp_core/views.py
 
-# Create your views here.
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from .instrumentation import process_metrics
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Process-local performance counters in the Prometheus text format.
+    Only answers requests from `PERF_METRICS_ALLOWED_IPS` (loopback by default).
+    """
+    allowed_ips = getattr(settings, 'PERF_METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if request.META.get('REMOTE_ADDR') not in allowed_ips:
+        raise Http404
+    return HttpResponse(process_metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -76,6 +76,7 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'crp_core.middleware.PerformanceMiddleware',  # Query/cache/span metrics, Server-Timing header
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,6 +87,7 @@ MIDDLEWARE = [
     # --- Add Django-CRUM Middleware HERE ---
     'crum.CurrentRequestUserMiddleware',
     # ---------------------------------------
+    'crp_core.middleware.ReplicaFreshnessMiddleware',  # Pins recent writers' report reads to the primary
 
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -127,6 +129,30 @@ DATABASES = {
     }
 }
 
+# --- Optional reporting read replica ---
+# Set DB_REPLICA_HOST (and optionally DB_REPLICA_NAME/PORT) to send report/export reads to a replica.
+# Reads opt in via crp_core.db_routers.use_reporting_replica; writes always go to 'default'.
+REPORTING_REPLICA_ALIAS = 'replica'
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=30, cast=int)  # Read-your-writes window
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+if DB_REPLICA_HOST:
+    DATABASES[REPORTING_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': DB_REPLICA_HOST,
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['crp_core.db_routers.ReportingReplicaRouter']
+
+# --- Performance instrumentation (crp_core.instrumentation) ---
+PERF_INSTRUMENTATION_ENABLED = config('PERF_INSTRUMENTATION_ENABLED', default=True, cast=bool)
+PERF_SERVER_TIMING = config('PERF_SERVER_TIMING', default='staff')  # 'all', 'staff' or 'off'
+PERF_SLOW_REQUEST_MS = config('PERF_SLOW_REQUEST_MS', default=1000, cast=int)  # Logged at WARNING above this
+# Prometheus-style counters at /metrics/, only for requests from these addresses
+PERF_METRICS_ENDPOINT_ENABLED = config('PERF_METRICS_ENDPOINT_ENABLED', default=False, cast=bool)
+PERF_METRICS_ALLOWED_IPS = config('PERF_METRICS_ALLOWED_IPS', default='127.0.0.1,::1').split(',')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -195,6 +221,21 @@ SIMPLE_JWT = {
 }
 
 CELERY_TASK_ALWAYS_EAGER = True
+# Seed a new company's Chart of Accounts in a Celery task after sign-up (Company.coa_seeding_status)
+COA_SEEDING_ASYNC = config('COA_SEEDING_ASYNC', default=False, cast=bool)
+
+from celery.schedules import crontab
+CELERY_BEAT_SCHEDULE = {
+    # Set-based overdue / paid status sweep for invoices and bills (crp_accounting.tasks)
+    'sweep-document-statuses-nightly': {
+        'task': 'crp_accounting.tasks.sweep_document_statuses',
+        'schedule': crontab(hour=1, minute=15),
+    },
+    'generate-recurring-vouchers-daily': {
+        'task': 'crp_accounting.tasks.generate_recurring_vouchers',
+        'schedule': crontab(hour=0, minute=30),
+    },
+}
 
 # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST = config('EMAIL_HOST')
@@ -280,10 +321,14 @@ REST_FRAMEWORK = {
     # 'EXCEPTION_HANDLER': 'your_project_core.exceptions.custom_api_exception_handler',
 
     # --- Other Optional Settings ---
+    # Large lists (vouchers, parties, accounts) set crp_core.pagination.KeysetCursorPagination
+    # per view; small reference lists keep page numbers.
     # 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     # 'PAGE_SIZE': 25,
     # 'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
+# ?count=approximate on cursor-paginated lists: planner estimate at or above this many rows, exact count below
+API_APPROXIMATE_COUNT_THRESHOLD = config('API_APPROXIMATE_COUNT_THRESHOLD', default=10000, cast=int)
 
 # --- Caching ---
 # https://docs.djangoproject.com/en/stable/topics/cache/
@@ -450,6 +495,21 @@ JAZZMIN_UI_TWEAKS = {
         "success": "btn-success",
     }
 }
+# --- Hot-path logging (crp_core.logging_utils) ---
+# Posting signals/tasks, report services and tenant managers log per voucher/report; their
+# per-line DEBUG detail is sampled and capped per voucher.
+HOT_PATH_LOG_LEVEL = config('HOT_PATH_LOG_LEVEL', default='INFO')
+HOT_PATH_DEBUG_SAMPLE_RATE = config('HOT_PATH_DEBUG_SAMPLE_RATE', default=0.01, cast=float)
+HOT_PATH_MAX_DETAIL_RECORDS = config('HOT_PATH_MAX_DETAIL_RECORDS', default=20, cast=int)
+HOT_PATH_LOGGERS = [
+    'crp_accounting.signals_DEBUG',
+    'crp_accounting.tasks',
+    'crp_accounting.services.voucher',
+    'crp_accounting.services.reports',
+    'crp_accounting.services.ledger_service',
+    'company.managers',
+]
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -462,4 +522,5 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'DEBUG',  # This is the key change
     },
+    'loggers': {name: {'level': HOT_PATH_LOG_LEVEL} for name in HOT_PATH_LOGGERS},
 }
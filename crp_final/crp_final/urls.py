@@ -15,6 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
 from django.shortcuts import redirect
 from django.urls import path, include
@@ -41,4 +42,8 @@ urlpatterns = [
         include(('crp_accounting.urls', 'crp_accounting'), namespace='crp_accounting_api')
     ),
     path('api/company/', include('company.urls', namespace='company_api')),
-]
\ No newline at end of file
+]
+
+if getattr(settings, 'PERF_METRICS_ENDPOINT_ENABLED', False):
+    from crp_core.views import metrics_view
+    urlpatterns.append(path('metrics/', metrics_view, name='perf-metrics'))